@@ -0,0 +1,214 @@
+import asyncio
+import hashlib
+import os
+
+import pytest
+from fastapi import FastAPI
+
+from tusfastapiserver import TUS_RESUMABLE
+from tusfastapiserver.completion import ContentStore
+from tusfastapiserver.completion import DeduplicationHandler
+from tusfastapiserver.completion.dedup import IncrementalHasher
+from tusfastapiserver.config import Config
+from tusfastapiserver.config import MetadataStrategyType
+from tusfastapiserver.config import TusExtension
+from tusfastapiserver.metadata import LocalMetadataStrategy
+from tusfastapiserver.routers import add_tus_routers
+from tusfastapiserver.schemas import UploadMetadata
+from tusfastapiserver.testing import send_request
+
+DATA = b"report line\n" * 5000
+DIGEST = hashlib.sha256(DATA).hexdigest()
+
+
+@pytest.fixture
+def content_store(tmp_path):
+    return ContentStore(str(tmp_path / "objects"))
+
+
+def write_file(path, data=DATA):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    return str(path)
+
+
+class TestIncrementalHasher:
+    def test_digest_of_ordered_chunks(self):
+        hasher = IncrementalHasher()
+        hasher.update("1", 0, DATA[:100])
+        hasher.update("1", 100, DATA[100:])
+        assert hasher.finish("1", len(DATA)) == DIGEST
+        assert hasher.finish("1", len(DATA)) is None
+
+    def test_gap_discards_state(self):
+        hasher = IncrementalHasher()
+        hasher.update("1", 0, DATA[:100])
+        hasher.update("1", 200, DATA[200:])
+        assert hasher.finish("1", len(DATA)) is None
+
+    def test_resume_without_state_is_not_hashed(self):
+        hasher = IncrementalHasher()
+        hasher.update("1", 100, DATA[100:])
+        assert hasher.finish("1", len(DATA)) is None
+
+    def test_max_uploads(self):
+        hasher = IncrementalHasher(max_uploads=1)
+        hasher.update("1", 0, b"a")
+        hasher.update("2", 0, b"b")
+        assert hasher.finish("1", 1) is None
+        assert hasher.finish("2", 1) is not None
+
+
+class TestContentStore:
+    def test_add_links_duplicates(self, content_store, tmp_path):
+        first = write_file(tmp_path / "a" / "a")
+        second = write_file(tmp_path / "b" / "b")
+
+        assert content_store.add(first, DIGEST) is False
+        assert content_store.add(second, DIGEST) is True
+        assert os.path.samefile(first, second)
+        assert content_store.reference_count(DIGEST) == 2
+        with open(second, "rb") as f:
+            assert f.read() == DATA
+
+        # Adding an upload again is a no-op.
+        assert content_store.add(second, DIGEST) is False
+        assert content_store.reference_count(DIGEST) == 2
+
+    def test_release_keeps_referenced_objects(self, content_store, tmp_path):
+        first = write_file(tmp_path / "a" / "a")
+        second = write_file(tmp_path / "b" / "b")
+        content_store.add(first, DIGEST)
+        content_store.add(second, DIGEST)
+
+        os.remove(first)
+        assert content_store.release(DIGEST) is False
+        with open(second, "rb") as f:
+            assert f.read() == DATA
+
+        os.remove(second)
+        assert content_store.release(DIGEST) is True
+        assert content_store.reference_count(DIGEST) == 0
+
+    def test_collect(self, content_store, tmp_path):
+        path = write_file(tmp_path / "a" / "a")
+        content_store.add(path, DIGEST)
+        assert content_store.collect() == 0
+        os.remove(path)
+        assert content_store.collect() == 1
+
+
+class TestDeduplicationHandler:
+    def test_hashes_file_without_digest(self, content_store, tmp_path):
+        config = Config(file_path=str(tmp_path), metadata_path=str(tmp_path))
+        metadata_strategy = LocalMetadataStrategy(config)
+        handler = DeduplicationHandler(content_store, config)
+        for name in ("a", "b"):
+            metadata = UploadMetadata(
+                id=name,
+                upload_storage_path=write_file(tmp_path / name / name),
+                upload_metadata_path=metadata_strategy.generate_metadata_path(name),
+                storage_strategy_type="LOCAL",
+                metadata_strategy_type="LOCAL",
+            )
+            metadata_strategy.initialize(metadata)
+            handler.handle(metadata)
+            assert metadata_strategy.get_metadata(name).content_digest == DIGEST
+        assert os.path.samefile(tmp_path / "a" / "a", tmp_path / "b" / "b")
+        assert content_store.reference_count(DIGEST) == 2
+
+    def test_skips_deleted_upload(self, content_store, tmp_path):
+        config = Config(file_path=str(tmp_path), metadata_path=str(tmp_path))
+        DeduplicationHandler(content_store, config).handle(
+            UploadMetadata(
+                id="a",
+                upload_storage_path=write_file(tmp_path / "a" / "a"),
+                storage_strategy_type="LOCAL",
+                metadata_strategy_type="LOCAL",
+            )
+        )
+        assert content_store.reference_count(DIGEST) == 0
+
+    def test_rejects_journal_metadata(self, content_store, tmp_path):
+        config = Config(
+            metadata_path=str(tmp_path),
+            metadata_strategy_type=MetadataStrategyType.JOURNAL,
+        )
+        with pytest.raises(ValueError):
+            DeduplicationHandler(content_store, config)
+
+    def test_upload_is_hashed_while_written(self, content_store, tmp_path):
+        config = Config(
+            file_path=str(tmp_path / "files"),
+            metadata_path=str(tmp_path / "files"),
+            enabled_extensions=[TusExtension.CREATION, TusExtension.TERMINATION],
+            content_store=content_store,
+        )
+        app = FastAPI()
+        add_tus_routers(app, config)
+        headers = {"tus-resumable": TUS_RESUMABLE}
+
+        async def scenario():
+            response = await send_request(
+                app,
+                "POST",
+                "/files",
+                headers={**headers, "upload-length": str(len(DATA))},
+            )
+            url = "/files/" + response.headers["location"].rsplit("/", 1)[1]
+            await send_request(
+                app,
+                "PATCH",
+                url,
+                headers={
+                    **headers,
+                    "upload-offset": "0",
+                    "content-type": "application/offset+octet-stream",
+                },
+                body=DATA,
+                chunk_size=4096,
+            )
+            return url.rsplit("/", 1)[1]
+
+        file_id = asyncio.run(scenario())
+        metadata = LocalMetadataStrategy(config).get_metadata(file_id)
+        assert metadata.content_digest == DIGEST
+
+        DeduplicationHandler(content_store, config).handle(metadata)
+        assert content_store.reference_count(DIGEST) == 1
+        asyncio.run(send_request(app, "DELETE", f"/files/{file_id}", headers=headers))
+        assert not os.path.exists(content_store.get_path(DIGEST))
+
+    def test_digest_hashed_from_disk_is_released(self, content_store, tmp_path):
+        config = Config(
+            file_path=str(tmp_path / "files"),
+            metadata_path=str(tmp_path / "files"),
+            enabled_extensions=[TusExtension.CREATION, TusExtension.TERMINATION],
+            content_store=content_store,
+        )
+        app = FastAPI()
+        add_tus_routers(app, config)
+        headers = {"tus-resumable": TUS_RESUMABLE}
+
+        async def create():
+            response = await send_request(
+                app,
+                "POST",
+                "/files",
+                headers={**headers, "upload-length": str(len(DATA))},
+            )
+            return response.headers["location"].rsplit("/", 1)[1]
+
+        file_id = asyncio.run(create())
+        metadata_strategy = LocalMetadataStrategy(config)
+        metadata = metadata_strategy.get_metadata(file_id)
+        write_file(metadata.upload_storage_path)
+        metadata.upload_offset = len(DATA)
+        metadata_strategy.update(metadata)
+
+        DeduplicationHandler(content_store, config).handle(metadata)
+        assert metadata_strategy.get_metadata(file_id).content_digest == DIGEST
+        assert content_store.reference_count(DIGEST) == 1
+        asyncio.run(send_request(app, "DELETE", f"/files/{file_id}", headers=headers))
+        assert not os.path.exists(content_store.get_path(DIGEST))
@@ -0,0 +1,153 @@
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+from tusfastapiserver.completion import BaseCompletionHandler
+from tusfastapiserver.completion import CompletionQueue
+from tusfastapiserver.completion import ExecutionMode
+from tusfastapiserver.config import MetadataStrategyType
+from tusfastapiserver.config import StorageStrategyType
+from tusfastapiserver.schemas import UploadMetadata
+
+
+class RecordingHandler(BaseCompletionHandler):
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.handled = []
+
+    async def handle(self, upload_metadata: UploadMetadata, *args, **kwargs):
+        if self.failures > 0:
+            self.failures -= 1
+            raise RuntimeError("handler failed")
+        self.handled.append(upload_metadata.id)
+
+
+class BlockingHandler(RecordingHandler):
+    def __init__(self):
+        super().__init__()
+        self.released = asyncio.Event()
+
+    async def handle(self, upload_metadata: UploadMetadata, *args, **kwargs):
+        await self.released.wait()
+        self.handled.append(upload_metadata.id)
+
+
+class ThreadHandler(RecordingHandler):
+    execution_mode = ExecutionMode.THREAD
+
+    def handle(self, upload_metadata: UploadMetadata, *args, **kwargs):
+        self.handled.append(upload_metadata.id)
+
+
+@pytest.fixture
+def upload_metadata():
+    return UploadMetadata(
+        id="123",
+        upload_length=10,
+        upload_offset=10,
+        upload_storage_path="test",
+        upload_metadata_path="test",
+        storage_strategy_type=StorageStrategyType.LOCAL,
+        metadata_strategy_type=MetadataStrategyType.LOCAL,
+    )
+
+
+async def wait_until_idle(queue: CompletionQueue):
+    for _ in range(200):
+        if queue.backlog == 0 and queue.stats()["running"] == 0:
+            return
+        await asyncio.sleep(0.01)
+
+
+class TestCompletionQueue:
+    def test_enqueue_dispatches_to_all_handlers(self, upload_metadata):
+        async def run():
+            async_handler = RecordingHandler()
+            thread_handler = ThreadHandler()
+            with tempfile.TemporaryDirectory() as temp_dir:
+                queue = CompletionQueue(
+                    [async_handler, thread_handler], queue_path=temp_dir
+                )
+                await queue.start()
+                assert await queue.enqueue(upload_metadata) is True
+                await wait_until_idle(queue)
+                await queue.stop()
+                assert os.listdir(queue.pending_path) == []
+            return async_handler, thread_handler
+
+        async_handler, thread_handler = asyncio.run(run())
+        assert async_handler.handled == ["123"]
+        assert thread_handler.handled == ["123"]
+
+    def test_failed_job_is_retried(self, upload_metadata):
+        async def run():
+            handler = RecordingHandler(failures=2)
+            with tempfile.TemporaryDirectory() as temp_dir:
+                queue = CompletionQueue([handler], queue_path=temp_dir, retry_delay=0)
+                await queue.start()
+                await queue.enqueue(upload_metadata)
+                await wait_until_idle(queue)
+                await queue.stop()
+            return handler
+
+        handler = asyncio.run(run())
+        assert handler.handled == ["123"]
+
+    def test_job_is_moved_to_failed_after_max_retries(self, upload_metadata):
+        async def run():
+            handler = RecordingHandler(failures=10)
+            with tempfile.TemporaryDirectory() as temp_dir:
+                queue = CompletionQueue(
+                    [handler], queue_path=temp_dir, retry_delay=0, max_retries=1
+                )
+                await queue.start()
+                await queue.enqueue(upload_metadata)
+                await wait_until_idle(queue)
+                await queue.stop()
+                return os.listdir(queue.pending_path), os.listdir(queue.failed_path)
+
+        pending, failed = asyncio.run(run())
+        assert pending == []
+        assert failed == ["123.RecordingHandler.json"]
+
+    def test_pending_jobs_survive_restart(self, upload_metadata):
+        async def run():
+            handler = RecordingHandler()
+            with tempfile.TemporaryDirectory() as temp_dir:
+                stopped_queue = CompletionQueue([handler], queue_path=temp_dir)
+                await stopped_queue.enqueue(upload_metadata)
+                assert handler.handled == []
+
+                queue = CompletionQueue([handler], queue_path=temp_dir)
+                await queue.start()
+                await wait_until_idle(queue)
+                await queue.stop()
+            return handler
+
+        handler = asyncio.run(run())
+        assert handler.handled == ["123"]
+
+    def test_overflow_signals_backpressure(self, upload_metadata):
+        async def run():
+            handler = BlockingHandler()
+            with tempfile.TemporaryDirectory() as temp_dir:
+                queue = CompletionQueue(
+                    [handler], queue_path=temp_dir, max_pending=1, max_concurrency=1
+                )
+                await queue.start()
+                results = []
+                for file_id in ("1", "2", "3"):
+                    upload_metadata.id = file_id
+                    results.append(await queue.enqueue(upload_metadata))
+                saturated = queue.is_saturated
+                handler.released.set()
+                await wait_until_idle(queue)
+                await queue.stop()
+            return handler, results, saturated
+
+        handler, results, saturated = asyncio.run(run())
+        assert saturated is True
+        assert results[-1] is False
+        assert sorted(handler.handled) == ["1", "2", "3"]
@@ -0,0 +1,42 @@
+import pytest
+
+from tusfastapiserver.config import Config
+from tusfastapiserver.config import MetadataStrategyType
+from tusfastapiserver.config import StorageStrategyType
+from tusfastapiserver.schemas import UploadMetadata
+
+
+@pytest.fixture
+def config(tmp_path):
+    return Config(file_path=str(tmp_path), metadata_path=str(tmp_path))
+
+
+@pytest.fixture
+def create_metadata():
+    """Factory of ``UploadMetadata`` for tests.
+
+    Paths and strategy types come from ``storage_strategy`` and
+    ``metadata_strategy`` when given, other fields from keyword arguments.
+    """
+
+    def create(
+        file_id: str = "1", storage_strategy=None, metadata_strategy=None, **kwargs
+    ) -> UploadMetadata:
+        fields = {
+            "id": file_id,
+            "upload_storage_path": f"/tmp/{file_id}",
+            "storage_strategy_type": StorageStrategyType.LOCAL,
+            "metadata_strategy_type": MetadataStrategyType.LOCAL,
+        }
+        if storage_strategy is not None:
+            fields["upload_storage_path"] = storage_strategy.generate_file_path(file_id)
+            fields["storage_strategy_type"] = storage_strategy.storage_strategy_type
+        if metadata_strategy is not None:
+            fields["upload_metadata_path"] = metadata_strategy.generate_metadata_path(
+                file_id
+            )
+            fields["metadata_strategy_type"] = metadata_strategy.metadata_strategy_type
+        fields.update(kwargs)
+        return UploadMetadata(**fields)
+
+    return create
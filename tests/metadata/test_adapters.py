@@ -0,0 +1,49 @@
+import asyncio
+
+from tusfastapiserver.config import Config
+from tusfastapiserver.metadata import AsyncBaseMetadataStrategy
+from tusfastapiserver.metadata import LocalMetadataStrategy
+from tusfastapiserver.metadata import ThreadedMetadataStrategy
+from tusfastapiserver.metadata import to_async_metadata_strategy
+from tusfastapiserver.schemas import UploadMetadata
+
+
+class NativeMetadataStrategy(AsyncBaseMetadataStrategy):
+    def __init__(self, config):
+        super().__init__(config)
+        self.uploads = {}
+
+    async def is_metadata_exists(self, file_id: str) -> bool:
+        return file_id in self.uploads
+
+    async def get_metadata(self, file_id: str) -> UploadMetadata:
+        return self.uploads[file_id]
+
+
+class TestThreadedMetadataStrategy:
+    def test_wraps_sync_strategy(self, config, create_metadata):
+        strategy = to_async_metadata_strategy(LocalMetadataStrategy(config))
+        metadata = create_metadata(metadata_strategy=strategy)
+
+        async def scenario():
+            await strategy.initialize(metadata)
+            assert await strategy.is_metadata_exists("1") is True
+            metadata.upload_offset = 10
+            await strategy.update(metadata)
+            assert (await strategy.get_metadata("1")).upload_offset == 10
+            assert (await strategy.get_metadata_many(["1", "2"]))["2"] is None
+            await strategy.delete(metadata)
+            assert await strategy.is_metadata_exists("1") is False
+
+        asyncio.run(scenario())
+        assert isinstance(strategy, ThreadedMetadataStrategy)
+
+    def test_async_strategy_is_not_wrapped(self):
+        strategy = NativeMetadataStrategy(Config())
+        assert to_async_metadata_strategy(strategy) is strategy
+
+    def test_default_get_metadata_many(self, create_metadata):
+        strategy = NativeMetadataStrategy(Config())
+        strategy.uploads["1"] = create_metadata()
+        result = asyncio.run(strategy.get_metadata_many(["1", "2"]))
+        assert result == {"1": strategy.uploads["1"], "2": None}
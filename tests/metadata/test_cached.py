@@ -0,0 +1,169 @@
+import asyncio
+import json
+import multiprocessing
+import os
+
+import pytest
+from fastapi import FastAPI
+
+from tusfastapiserver import TUS_RESUMABLE
+from tusfastapiserver.config import Config
+from tusfastapiserver.config import MetadataStrategyType
+from tusfastapiserver.metadata import CachedMetadataStrategy
+from tusfastapiserver.routers import add_tus_routers
+from tusfastapiserver.testing import send_request
+
+
+@pytest.fixture
+def config(config):
+    config.metadata_strategy_type = MetadataStrategyType.CACHED
+    return config
+
+
+def update_offset(metadata_path: str, file_id: str, upload_offset: int):
+    strategy = CachedMetadataStrategy(
+        Config(
+            metadata_strategy_type=MetadataStrategyType.CACHED,
+            metadata_path=metadata_path,
+        )
+    )
+    metadata = strategy.get_metadata(file_id)
+    metadata.upload_offset = upload_offset
+    strategy.update(metadata)
+    strategy.close()
+
+
+class TestCachedMetadataStrategy:
+    def test_reads_come_from_memory(self, config, create_metadata):
+        strategy = CachedMetadataStrategy(config)
+        strategy.open()
+        metadata = create_metadata("a", metadata_strategy=strategy)
+        strategy.initialize(metadata)
+        # A change that bypasses the strategy is not seen until invalidated.
+        with open(metadata.upload_metadata_path, "w", encoding="utf-8") as f:
+            json.dump({**metadata.model_dump(mode="json"), "upload_offset": 10}, f)
+
+        assert strategy.get_metadata("a").upload_offset == 0
+        strategy.invalidate("a")
+        assert strategy.get_metadata("a").upload_offset == 10
+        strategy.close()
+
+    def test_returns_copies(self, config, create_metadata):
+        strategy = CachedMetadataStrategy(config)
+        strategy.initialize(create_metadata("a", metadata_strategy=strategy))
+        strategy.get_metadata("a").upload_offset = 50
+        assert strategy.get_metadata("a").upload_offset == 0
+        strategy.close()
+
+    def test_sees_writes_of_other_workers(self, config, create_metadata):
+        first = CachedMetadataStrategy(config)
+        second = CachedMetadataStrategy(config)
+        first.initialize(create_metadata("a", metadata_strategy=first))
+        assert first.get_metadata("a").upload_offset == 0
+
+        metadata = second.get_metadata("a")
+        metadata.upload_offset = 40
+        second.update(metadata)
+        assert first.get_metadata("a").upload_offset == 40
+
+        second.delete(metadata)
+        assert not first.is_metadata_exists("a")
+        with pytest.raises(FileNotFoundError):
+            first.get_metadata("a")
+        first.close()
+        second.close()
+
+    def test_instances_of_a_process_share_the_generation_table(
+        self, config, create_metadata
+    ):
+        first = CachedMetadataStrategy(config)
+        second = CachedMetadataStrategy(config)
+        first.open()
+        second.open()
+        assert first._table is second._table
+        assert first._table.references == 2
+
+        # Closing one instance keeps the descriptor and its locks of the other.
+        first.close()
+        second.initialize(create_metadata("a", metadata_strategy=second))
+        with second._lock_slot(second._get_slot("a")):
+            assert second.get_metadata("a").upload_offset == 0
+        table = second._table
+        second.close()
+        assert table.references == 0
+        assert table.generations.closed
+
+    def test_sees_writes_of_other_processes(self, config, create_metadata):
+        strategy = CachedMetadataStrategy(config)
+        strategy.initialize(create_metadata("a", metadata_strategy=strategy))
+        assert strategy.get_metadata("a").upload_offset == 0
+
+        process = multiprocessing.get_context("spawn").Process(
+            target=update_offset, args=(config.metadata_path, "a", 70)
+        )
+        process.start()
+        process.join(30)
+
+        assert process.exitcode == 0
+        assert strategy.get_metadata("a").upload_offset == 70
+        strategy.close()
+
+    def test_first_worker_fixes_slot_count(self, config, tmp_path):
+        config.metadata_cache_slots = 16
+        first = CachedMetadataStrategy(config)
+        first.open()
+        second = CachedMetadataStrategy(
+            Config(metadata_path=str(tmp_path), metadata_cache_slots=1024)
+        )
+        second.open()
+        assert second._slot_count == 16
+        assert os.path.getsize(first.generations_file_path) == 16 * 8
+        first.close()
+        second.close()
+
+    def test_evicts_least_recently_used(self, config, create_metadata):
+        config.metadata_cache_size = 2
+        strategy = CachedMetadataStrategy(config)
+        for file_id in ("a", "b", "c"):
+            strategy.initialize(create_metadata(file_id, metadata_strategy=strategy))
+        strategy.get_metadata("b")
+        strategy.initialize(create_metadata("d", metadata_strategy=strategy))
+        assert list(strategy._cache) == ["b", "d"]
+        strategy.close()
+
+    def test_head_never_serves_stale_offset(self, config):
+        first_app, second_app = FastAPI(), FastAPI()
+        add_tus_routers(first_app, config)
+        add_tus_routers(second_app, config)
+
+        async def head(app, url):
+            response = await send_request(
+                app, "HEAD", url, headers={"tus-resumable": TUS_RESUMABLE}
+            )
+            return response.headers["upload-offset"]
+
+        async def scenario():
+            response = await send_request(
+                first_app,
+                "POST",
+                "/files",
+                headers={"tus-resumable": TUS_RESUMABLE, "upload-length": "100"},
+            )
+            url = "/files/" + response.headers["location"].rsplit("/", 1)[1]
+            offsets = [await head(first_app, url)]
+            for offset in (0, 50):
+                await send_request(
+                    second_app,
+                    "PATCH",
+                    url,
+                    headers={
+                        "tus-resumable": TUS_RESUMABLE,
+                        "content-type": "application/offset+octet-stream",
+                        "upload-offset": str(offset),
+                    },
+                    body=b"x" * 50,
+                )
+                offsets.append(await head(first_app, url))
+            return offsets
+
+        assert asyncio.run(scenario()) == ["0", "50", "100"]
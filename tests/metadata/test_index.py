@@ -0,0 +1,110 @@
+import os
+import tempfile
+from datetime import datetime
+
+import pytest
+
+from tusfastapiserver.metadata.index import SQLiteMetadataIndex
+from tusfastapiserver.schemas import UploadMetadata
+from tusfastapiserver.schemas import UploadState
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def create_metadata(create_metadata):
+    def create(file_id: str, day: int, **kwargs) -> UploadMetadata:
+        return create_metadata(file_id, created_at=datetime(2025, 1, day), **kwargs)
+
+    return create
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def index(clock):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield SQLiteMetadataIndex(
+            os.path.join(temp_dir, "index", "index.db"),
+            indexed_keys=["tenant"],
+            clock=clock,
+        )
+
+
+class TestSQLiteMetadataIndex:
+    def test_upsert_and_query(self, index, create_metadata):
+        index.upsert(create_metadata("1", 1, upload_length=10))
+        index.upsert(create_metadata("2", 2, upload_length=10, upload_offset=10))
+        uploads, next_cursor = index.query()
+        assert [upload.id for upload in uploads] == ["1", "2"]
+        assert uploads[0].state == UploadState.INCOMPLETE
+        assert uploads[1].state == UploadState.COMPLETED
+        assert next_cursor is None
+
+    def test_filters(self, index, create_metadata):
+        index.upsert(create_metadata("1", 1, upload_length=10))
+        index.upsert(create_metadata("2", 2, upload_length=1000))
+        index.upsert(create_metadata("3", 3, upload_length=10, upload_offset=10))
+
+        def query_ids(**filters):
+            return [upload.id for upload in index.query(**filters)[0]]
+
+        assert query_ids(state=UploadState.INCOMPLETE) == ["1", "2"]
+        assert query_ids(min_length=100) == ["2"]
+        assert query_ids(max_length=100) == ["1", "3"]
+        assert query_ids(created_before=datetime(2025, 1, 2)) == ["1"]
+        assert query_ids(created_after=datetime(2025, 1, 2)) == ["2", "3"]
+
+    def test_metadata_filter(self, index, create_metadata):
+        index.upsert(create_metadata("1", 1, metadata={"tenant": "a", "name": "x"}))
+        index.upsert(create_metadata("2", 2, metadata={"tenant": "b"}))
+        uploads, _ = index.query(metadata={"tenant": "a"})
+        assert [upload.id for upload in uploads] == ["1"]
+        assert uploads[0].metadata == {"tenant": "a"}
+
+    def test_pagination(self, index, create_metadata):
+        for day in range(1, 6):
+            index.upsert(create_metadata(str(day), day))
+        uploads, cursor = index.query(limit=2)
+        assert [upload.id for upload in uploads] == ["1", "2"]
+        uploads, cursor = index.query(limit=2, cursor=cursor)
+        assert [upload.id for upload in uploads] == ["3", "4"]
+        uploads, cursor = index.query(limit=2, cursor=cursor)
+        assert [upload.id for upload in uploads] == ["5"]
+        assert cursor is None
+
+    def test_offset_updates_are_throttled(self, index, clock, create_metadata):
+        upload_metadata = create_metadata("1", 1, upload_length=10)
+        index.upsert(upload_metadata)
+        upload_metadata.upload_offset = 5
+        index.upsert(upload_metadata)
+        assert index.query()[0][0].upload_offset == 0
+        clock.now += index.min_update_interval
+        index.upsert(upload_metadata)
+        assert index.query()[0][0].upload_offset == 5
+
+    def test_state_change_is_always_written(self, index, create_metadata):
+        upload_metadata = create_metadata("1", 1, upload_length=10)
+        index.upsert(upload_metadata)
+        upload_metadata.upload_offset = 10
+        index.upsert(upload_metadata)
+        assert index.query()[0][0].state == UploadState.COMPLETED
+
+    def test_delete(self, index, create_metadata):
+        index.upsert(create_metadata("1", 1, metadata={"tenant": "a"}))
+        index.delete("1")
+        assert index.query() == ([], None)
+        assert index.query(metadata={"tenant": "a"}) == ([], None)
+
+    def test_rebuild(self, index, create_metadata):
+        assert index.rebuild([create_metadata("1", 1), create_metadata("2", 2)]) == 2
+        assert len(index.query()[0]) == 2
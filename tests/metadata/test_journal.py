@@ -0,0 +1,203 @@
+import asyncio
+import functools
+import os
+import time
+
+import pytest
+from fastapi import FastAPI
+
+from tusfastapiserver import TUS_RESUMABLE
+from tusfastapiserver.config import MetadataStrategyType
+from tusfastapiserver.metadata import JournalMetadataStrategy
+from tusfastapiserver.metadata.journal import OFFSET_RECORD
+from tusfastapiserver.routers import add_tus_routers
+from tusfastapiserver.testing import send_request
+
+
+@pytest.fixture
+def config(config):
+    config.metadata_strategy_type = MetadataStrategyType.JOURNAL
+    return config
+
+
+@pytest.fixture
+def create_metadata(create_metadata):
+    return functools.partial(
+        create_metadata,
+        upload_length=100,
+        metadata_strategy_type=MetadataStrategyType.JOURNAL,
+    )
+
+
+def journal_size(strategy: JournalMetadataStrategy) -> int:
+    return os.path.getsize(strategy._get_journal_file_path(strategy._generation))
+
+
+class TestJournalMetadataStrategy:
+    def test_reads_come_from_memory(self, config, create_metadata):
+        strategy = JournalMetadataStrategy(config)
+        strategy.open()
+        metadata = create_metadata("a", metadata={"filename": "a.txt"})
+        strategy.initialize(metadata)
+        metadata.upload_offset = 10
+
+        assert strategy.is_metadata_exists("a")
+        assert strategy.get_metadata("a").upload_offset == 0
+        assert strategy.get_metadata_many(["a", "b"])["b"] is None
+        assert not strategy.is_metadata_exists("b")
+        with pytest.raises(FileNotFoundError):
+            strategy.get_metadata("b")
+        strategy.close()
+
+    def test_offset_update_appends_fixed_size_record(self, config, create_metadata):
+        strategy = JournalMetadataStrategy(config)
+        strategy.open()
+        metadata = create_metadata("a")
+        strategy.initialize(metadata)
+        size = journal_size(strategy)
+
+        for offset in (10, 20, 30):
+            metadata.upload_offset = offset
+            strategy.update(metadata)
+
+        assert journal_size(strategy) == size + 3 * OFFSET_RECORD.size
+        metadata.metadata = {"filename": "a.txt"}
+        strategy.update(metadata)
+        assert journal_size(strategy) > size + 4 * OFFSET_RECORD.size
+        strategy.close()
+
+    def test_replays_journal(self, config, create_metadata):
+        strategy = JournalMetadataStrategy(config)
+        strategy.open()
+        first, second = create_metadata("a"), create_metadata("b")
+        strategy.initialize(first)
+        strategy.initialize(second)
+        first.upload_offset = 42
+        strategy.update(first)
+        strategy.delete(second)
+        # Simulates a crash: nothing is compacted.
+        strategy._journal.close()
+
+        restarted = JournalMetadataStrategy(config)
+        restarted.open()
+        assert restarted.get_metadata("a") == first
+        assert not restarted.is_metadata_exists("b")
+        restarted.close()
+
+    def test_drops_torn_record(self, config, create_metadata):
+        strategy = JournalMetadataStrategy(config)
+        strategy.open()
+        metadata = create_metadata("a")
+        strategy.initialize(metadata)
+        metadata.upload_offset = 10
+        strategy.update(metadata)
+        strategy._journal.write(b"\x01\x00\x00")
+        strategy._journal.close()
+
+        restarted = JournalMetadataStrategy(config)
+        restarted.open()
+        assert restarted.get_metadata("a").upload_offset == 10
+        metadata.upload_offset = 20
+        restarted.update(metadata)
+        restarted._journal.close()
+
+        restarted = JournalMetadataStrategy(config)
+        restarted.open()
+        assert restarted.get_metadata("a").upload_offset == 20
+        restarted.close()
+
+    def test_compaction_writes_snapshot(self, config, create_metadata):
+        strategy = JournalMetadataStrategy(config)
+        strategy.open()
+        metadata = create_metadata("a")
+        strategy.initialize(metadata)
+        strategy.compact()
+        metadata.upload_offset = 50
+        strategy.update(metadata)
+        strategy._journal.close()
+
+        assert os.path.exists(strategy.snapshot_file_path)
+        assert strategy._list_journal_generations() == [2]
+
+        restarted = JournalMetadataStrategy(config)
+        restarted.open()
+        assert restarted.get_metadata("a").upload_offset == 50
+        restarted.initialize(create_metadata("b"))
+        assert restarted._slots["b"] != restarted._slots["a"]
+        restarted.close()
+
+    def test_background_compaction_after_size_threshold(self, config, create_metadata):
+        config.metadata_journal_compaction_size = 1024
+        strategy = JournalMetadataStrategy(config)
+        strategy.open()
+        metadata = create_metadata("a")
+        strategy.initialize(metadata)
+        for offset in range(100):
+            metadata.upload_offset = offset
+            strategy.update(metadata)
+        for _ in range(100):
+            if os.path.exists(strategy.snapshot_file_path):
+                break
+            time.sleep(0.01)
+
+        assert os.path.exists(strategy.snapshot_file_path)
+        assert journal_size(strategy) < 1024
+        strategy.close()
+
+    def test_close_compacts(self, config, create_metadata):
+        strategy = JournalMetadataStrategy(config)
+        strategy.open()
+        strategy.initialize(create_metadata("a"))
+        strategy.close()
+
+        restarted = JournalMetadataStrategy(config)
+        restarted.open()
+        assert restarted._list_journal_generations() == [2]
+        assert restarted.is_metadata_exists("a")
+        restarted.close()
+
+    def test_journals_are_per_node(self, config, create_metadata):
+        first = JournalMetadataStrategy(config)
+        first.initialize(create_metadata("a"))
+        config.node_id = "node-2"
+        second = JournalMetadataStrategy(config)
+        assert not second.is_metadata_exists("a")
+        first.close()
+        second.close()
+
+    def test_upload(self, config):
+        data = b"x" * 100
+
+        async def scenario():
+            app = FastAPI()
+            add_tus_routers(app, config)
+            async with app.router.lifespan_context(app):
+                response = await send_request(
+                    app,
+                    "POST",
+                    "/files",
+                    headers={"tus-resumable": TUS_RESUMABLE, "upload-length": "100"},
+                )
+                url = "/files/" + response.headers["location"].rsplit("/", 1)[1]
+                for offset in range(0, 100, 25):
+                    response = await send_request(
+                        app,
+                        "PATCH",
+                        url,
+                        headers={
+                            "tus-resumable": TUS_RESUMABLE,
+                            "content-type": "application/offset+octet-stream",
+                            "upload-offset": str(offset),
+                        },
+                        body=data[offset : offset + 25],
+                    )
+                    assert response.status_code == 204
+            app = FastAPI()
+            add_tus_routers(app, config)
+            async with app.router.lifespan_context(app):
+                return await send_request(
+                    app, "HEAD", url, headers={"tus-resumable": TUS_RESUMABLE}
+                )
+
+        response = asyncio.run(scenario())
+        assert response.headers["upload-offset"] == "100"
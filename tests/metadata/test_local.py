@@ -183,3 +183,40 @@ class TestLocalMetadataStrategy:
         ) as mock_update_metadata_file:
             local_metadata_strategy.update(upload_metadata)
             mock_update_metadata_file.assert_called_once_with(upload_metadata)
+
+    def test_delete(self, local_metadata_strategy):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            local_metadata_strategy.config.metadata_path = temp_dir
+            metadata_path = local_metadata_strategy.generate_metadata_path("123")
+            upload_metadata = UploadMetadata(
+                id="123",
+                upload_storage_path="test",
+                upload_metadata_path=metadata_path,
+                storage_strategy_type=StorageStrategyType.LOCAL,
+                metadata_strategy_type=MetadataStrategyType.LOCAL,
+            )
+            local_metadata_strategy.initialize(upload_metadata)
+            assert local_metadata_strategy.is_metadata_exists("123") == True
+            local_metadata_strategy.delete(upload_metadata)
+            assert local_metadata_strategy.is_metadata_exists("123") == False
+            assert not os.path.exists(os.path.dirname(metadata_path))
+
+    def test_get_metadata_many(self, local_metadata_strategy):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            local_metadata_strategy.config.metadata_path = temp_dir
+            for file_id in ("1", "2"):
+                local_metadata_strategy.initialize(
+                    UploadMetadata(
+                        id=file_id,
+                        upload_storage_path="test",
+                        upload_metadata_path=local_metadata_strategy.generate_metadata_path(
+                            file_id
+                        ),
+                        storage_strategy_type=StorageStrategyType.LOCAL,
+                        metadata_strategy_type=MetadataStrategyType.LOCAL,
+                    )
+                )
+            metadata_by_id = local_metadata_strategy.get_metadata_many(["1", "2", "3"])
+            assert metadata_by_id["1"].id == "1"
+            assert metadata_by_id["2"].id == "2"
+            assert metadata_by_id["3"] is None
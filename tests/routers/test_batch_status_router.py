@@ -0,0 +1,93 @@
+import asyncio
+import json
+import os
+import uuid
+
+import pytest
+from fastapi import FastAPI
+
+from tusfastapiserver import TUS_RESUMABLE
+from tusfastapiserver.config import Config
+from tusfastapiserver.metadata import LocalMetadataStrategy
+from tusfastapiserver.routers import add_tus_routers
+from tusfastapiserver.testing import send_request
+
+
+@pytest.fixture
+def config(tmp_path):
+    return Config(
+        file_path=str(tmp_path),
+        metadata_path=str(tmp_path),
+        enable_batch_status=True,
+        max_batch_status_size=3,
+    )
+
+
+@pytest.fixture
+def app(config):
+    app = FastAPI()
+    add_tus_routers(app, config)
+    return app
+
+
+async def create(app, length: int) -> str:
+    response = await send_request(
+        app,
+        "POST",
+        "/files",
+        headers={"tus-resumable": TUS_RESUMABLE, "upload-length": str(length)},
+    )
+    return response.headers["location"].rsplit("/", 1)[1]
+
+
+async def get_status(app, ids):
+    return await send_request(
+        app,
+        "POST",
+        "/files/_batch/status",
+        headers={"content-type": "application/json"},
+        body=json.dumps({"ids": ids}).encode(),
+    )
+
+
+class TestBatchStatusRouter:
+    def test_rejects_too_many_ids(self, app):
+        ids = [str(uuid.uuid4()) for _ in range(4)]
+        response = asyncio.run(get_status(app, ids))
+        assert response.status_code == 400
+
+    def test_unknown_ids_are_not_found(self, app):
+        ids = [str(uuid.uuid4()), "../../etc"]
+        response = asyncio.run(get_status(app, ids))
+        assert response.status_code == 200
+        assert json.loads(response.body)["uploads"] == [
+            {
+                "id": file_id,
+                "found": False,
+                "upload_offset": None,
+                "upload_length": None,
+                "upload_defer_length": None,
+                "metadata": None,
+            }
+            for file_id in ids
+        ]
+
+    def test_found_and_missing_uploads(self, app, config):
+        async def scenario():
+            found_id = await create(app, 100)
+            gone_id = await create(app, 200)
+            metadata = LocalMetadataStrategy(config).get_metadata(gone_id)
+            os.remove(metadata.upload_storage_path)
+            unknown_id = str(uuid.uuid4())
+            response = await get_status(app, [found_id, gone_id, unknown_id])
+            return found_id, gone_id, unknown_id, response
+
+        found_id, gone_id, unknown_id, response = asyncio.run(scenario())
+        uploads = json.loads(response.body)["uploads"]
+        assert [(upload["id"], upload["found"]) for upload in uploads] == [
+            (found_id, True),
+            (gone_id, False),
+            (unknown_id, False),
+        ]
+        assert uploads[0]["upload_offset"] == 0
+        assert uploads[0]["upload_length"] == 100
@@ -0,0 +1,145 @@
+import asyncio
+
+import pytest
+from fastapi import Depends
+from fastapi import FastAPI
+from fastapi import HTTPException
+from fastapi import Request
+from fastapi import Response
+
+from tusfastapiserver import TUS_RESUMABLE
+from tusfastapiserver.config import Config
+from tusfastapiserver.routers import HeadRouter
+from tusfastapiserver.routers import add_tus_routers
+from tusfastapiserver.routers.fast_path import FastPathApp
+from tusfastapiserver.testing import send_request
+from tusfastapiserver.testing.benchmark import run
+
+
+def create_app(tmp_path, enable_asgi_fast_path):
+    config = Config(
+        file_path=str(tmp_path / str(enable_asgi_fast_path)),
+        metadata_path=str(tmp_path / str(enable_asgi_fast_path)),
+        enable_asgi_fast_path=enable_asgi_fast_path,
+    )
+    app = FastAPI()
+    add_tus_routers(app, config)
+    return app
+
+
+async def run_scenario(app):
+    created = await send_request(
+        app,
+        "POST",
+        "/files",
+        headers={
+            "tus-resumable": TUS_RESUMABLE,
+            "upload-length": "10",
+            "upload-metadata": "filename dGVzdC50eHQ=",
+        },
+    )
+    url = "/files/" + created.headers["location"].rsplit("/", 1)[1]
+    patch_headers = {
+        "tus-resumable": TUS_RESUMABLE,
+        "content-type": "application/offset+octet-stream",
+    }
+    responses = [
+        await send_request(
+            app, "PATCH", url, {**patch_headers, "upload-offset": "0"}, b"12345"
+        ),
+        await send_request(app, "HEAD", url),
+        await send_request(
+            app, "PATCH", url, {**patch_headers, "upload-offset": "0"}, b"12345"
+        ),
+        await send_request(app, "PATCH", url, {"upload-offset": "5"}, b"12345"),
+        await send_request(
+            app, "PATCH", url, {**patch_headers, "upload-offset": "5"}, b"67890"
+        ),
+        await send_request(app, "HEAD", url),
+        await send_request(app, "HEAD", "/files/missing"),
+        await send_request(
+            app, "PATCH", "/files/missing", {**patch_headers, "upload-offset": "0"}
+        ),
+    ]
+    return [
+        (response.status_code, response.raw_headers, response.body)
+        for response in responses
+    ]
+
+
+class TestFastPath:
+    def test_responses_are_identical(self, tmp_path):
+        regular = asyncio.run(run_scenario(create_app(tmp_path, False)))
+        fast = asyncio.run(run_scenario(create_app(tmp_path, True)))
+        statuses = [status for status, _, _ in fast]
+        assert statuses == [204, 200, 409, 403, 204, 200, 404, 404]
+        assert fast == regular
+
+    def test_serves_patch_and_head_only(self, tmp_path):
+        app = create_app(tmp_path, True)
+        route = app.router.routes[0]
+        assert isinstance(route.app, FastPathApp)
+        assert route.methods == {"PATCH", "HEAD"}
+
+        response = asyncio.run(
+            send_request(
+                app, "DELETE", "/files/missing", {"tus-resumable": TUS_RESUMABLE}
+            )
+        )
+        assert response.status_code == 405
+
+    def test_rejects_router_with_extra_parameters(self, tmp_path):
+        class CustomHeadRouter(HeadRouter):
+            async def handle(
+                self, file_id: str, response: Response, user=Depends(dict)
+            ):
+                return await super().handle(file_id, response)
+
+        with pytest.raises(ValueError):
+            FastPathApp({"HEAD": CustomHeadRouter(Config(file_path=str(tmp_path)))})
+
+    def test_passes_request_to_custom_router(self, tmp_path):
+        seen = []
+
+        class CustomHeadRouter(HeadRouter):
+            async def handle(self, file_id: str, request: Request, response: Response):
+                seen.append(request.headers["x-user"])
+                return await super().handle(file_id, response)
+
+        config = Config(
+            file_path=str(tmp_path),
+            metadata_path=str(tmp_path),
+            enable_asgi_fast_path=True,
+        )
+        app = FastAPI()
+        add_tus_routers(app, config, head_router_cls=CustomHeadRouter)
+        response = asyncio.run(
+            send_request(app, "HEAD", "/files/missing", {"x-user": "alice"})
+        )
+        assert response.status_code == 404
+        assert seen == ["alice"]
+
+    def test_rejects_app_dependencies(self, tmp_path):
+        async def authenticate(request: Request):
+            raise HTTPException(status_code=401)
+
+        config = Config(
+            file_path=str(tmp_path),
+            metadata_path=str(tmp_path),
+            enable_asgi_fast_path=True,
+        )
+        app = FastAPI(dependencies=[Depends(authenticate)])
+        with pytest.raises(ValueError):
+            add_tus_routers(app, config)
+
+        config.enable_asgi_fast_path = False
+        app = FastAPI(dependencies=[Depends(authenticate)])
+        add_tus_routers(app, config)
+        response = asyncio.run(send_request(app, "HEAD", "/files/missing"))
+        assert response.status_code == 401
+
+    @pytest.mark.parametrize("in_memory", [False, True])
+    def test_benchmark(self, tmp_path, in_memory):
+        result = run(True, 5, 16, in_memory=in_memory, repeat=1, path=str(tmp_path))
+        assert result.requests == 10
+        assert result.requests_per_second > 0
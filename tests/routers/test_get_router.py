@@ -0,0 +1,133 @@
+import asyncio
+import base64
+
+import pytest
+from fastapi import FastAPI
+
+from tusfastapiserver import TUS_RESUMABLE
+from tusfastapiserver.config import Config
+from tusfastapiserver.routers import add_tus_routers
+from tusfastapiserver.testing import send_request
+
+DATA = b"0123456789" * 10
+
+
+@pytest.fixture
+def app(tmp_path):
+    config = Config(
+        file_path=str(tmp_path), metadata_path=str(tmp_path), enable_download=True
+    )
+    app = FastAPI()
+    add_tus_routers(app, config)
+    return app
+
+
+def encode_metadata(**metadata) -> str:
+    return ",".join(
+        f"{key} {base64.b64encode(value.encode()).decode()}"
+        for key, value in metadata.items()
+    )
+
+
+async def upload(app, data: bytes = DATA, length=None, **metadata) -> str:
+    headers = {
+        "tus-resumable": TUS_RESUMABLE,
+        "upload-length": str(len(data) if length is None else length),
+    }
+    if metadata:
+        headers["upload-metadata"] = encode_metadata(**metadata)
+    response = await send_request(app, "POST", "/files", headers=headers)
+    url = "/files/" + response.headers["location"].rsplit("/", 1)[1]
+    await send_request(
+        app,
+        "PATCH",
+        url,
+        headers={
+            "tus-resumable": TUS_RESUMABLE,
+            "content-type": "application/offset+octet-stream",
+            "upload-offset": "0",
+        },
+        body=data,
+    )
+    return url
+
+
+def download(app, headers=None, **metadata):
+    async def scenario():
+        url = await upload(app, **metadata)
+        return await send_request(app, "GET", url, headers=headers or {})
+
+    return asyncio.run(scenario())
+
+
+class TestGetRouter:
+    def test_downloads_upload(self, app):
+        response = download(app, filename="report.txt", filetype="text/plain")
+        assert response.status_code == 200
+        assert response.body == DATA
+        assert response.headers["content-length"] == str(len(DATA))
+        assert response.headers["content-type"].startswith("text/plain")
+        assert response.headers["accept-ranges"] == "bytes"
+        assert (
+            response.headers["content-disposition"]
+            == 'attachment; filename="report.txt"'
+        )
+
+    def test_encodes_non_ascii_filename(self, app):
+        response = download(app, filename="rapport é.txt")
+        assert response.headers["content-disposition"] == (
+            "attachment; filename*=utf-8''rapport%20%C3%A9.txt"
+        )
+        assert response.headers["content-type"] == "application/octet-stream"
+
+    def test_range(self, app):
+        response = download(app, headers={"range": "bytes=10-19"})
+        assert response.status_code == 206
+        assert response.body == DATA[10:20]
+        assert response.headers["content-range"] == f"bytes 10-19/{len(DATA)}"
+
+    def test_unsatisfiable_range(self, app):
+        response = download(app, headers={"range": "bytes=1000-"})
+        assert response.status_code == 416
+        assert response.headers["content-range"] == f"bytes */{len(DATA)}"
+
+    def test_not_modified(self, app):
+        async def scenario():
+            url = await upload(app)
+            response = await send_request(app, "GET", url)
+            return await send_request(
+                app, "GET", url, headers={"if-none-match": response.headers["etag"]}
+            )
+
+        response = asyncio.run(scenario())
+        assert response.status_code == 304
+        assert response.body == b""
+
+    def test_if_range(self, app):
+        async def scenario():
+            url = await upload(app)
+            etag = (await send_request(app, "GET", url)).headers["etag"]
+            matching = await send_request(
+                app, "GET", url, headers={"range": "bytes=0-4", "if-range": etag}
+            )
+            stale = await send_request(
+                app, "GET", url, headers={"range": "bytes=0-4", "if-range": '"old"'}
+            )
+            return matching, stale
+
+        matching, stale = asyncio.run(scenario())
+        assert matching.status_code == 206
+        assert matching.body == DATA[:5]
+        assert stale.status_code == 200
+        assert stale.body == DATA
+
+    def test_incomplete_upload_is_a_conflict(self, app):
+        async def scenario():
+            url = await upload(app, length=len(DATA) * 2)
+            return await send_request(app, "GET", url)
+
+        assert asyncio.run(scenario()).status_code == 409
+
+    def test_unknown_upload(self, app):
+        response = asyncio.run(send_request(app, "GET", "/files/unknown"))
+        assert response.status_code == 404
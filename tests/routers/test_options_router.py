@@ -0,0 +1,66 @@
+import asyncio
+
+from fastapi import FastAPI
+
+from tusfastapiserver import TUS_RESUMABLE
+from tusfastapiserver.chunk_size import ChunkSizeAdvisor
+from tusfastapiserver.config import Config
+from tusfastapiserver.config import TusExtension
+from tusfastapiserver.routers import add_tus_routers
+from tusfastapiserver.testing import send_request
+
+
+def options(config: Config):
+    app = FastAPI()
+    add_tus_routers(app, config)
+    return asyncio.run(send_request(app, "OPTIONS", "/files"))
+
+
+class TestOptionsRouter:
+    def test_advertises_max_size(self, tmp_path):
+        response = options(
+            Config(
+                file_path=str(tmp_path),
+                metadata_path=str(tmp_path),
+                max_upload_size=100,
+            )
+        )
+        assert response.status_code == 204
+        assert response.headers["tus-resumable"] == TUS_RESUMABLE
+        assert response.headers["tus-version"] == TUS_RESUMABLE
+        assert response.headers["tus-max-size"] == "100"
+
+    def test_omits_max_size_without_limit(self, tmp_path):
+        response = options(Config(file_path=str(tmp_path), metadata_path=str(tmp_path)))
+        assert "tus-max-size" not in response.headers
+
+    def test_advertises_enabled_extensions(self, tmp_path):
+        response = options(
+            Config(
+                file_path=str(tmp_path),
+                metadata_path=str(tmp_path),
+                enabled_extensions=[
+                    TusExtension.CREATION,
+                    TusExtension.TERMINATION,
+                    TusExtension.CHECKSUM,
+                ],
+            )
+        )
+        assert response.headers["tus-extension"] == (
+            "creation,creation-defer-length,termination"
+        )
+
+    def test_recommends_chunk_size(self, tmp_path):
+        advisor = ChunkSizeAdvisor(initial_chunk_size=4 * 1024 * 1024)
+        config = Config(
+            file_path=str(tmp_path),
+            metadata_path=str(tmp_path),
+            chunk_size_advisor=advisor,
+        )
+        assert options(config).headers["x-tus-recommended-chunk-size"] == str(
+            4 * 1024 * 1024
+        )
+        config.max_request_body_size = 1024 * 1024
+        assert options(config).headers["x-tus-recommended-chunk-size"] == str(
+            1024 * 1024
+        )
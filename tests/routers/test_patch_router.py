@@ -0,0 +1,341 @@
+import asyncio
+import errno
+import os
+
+import pytest
+from fastapi import FastAPI
+
+from tusfastapiserver import TUS_RESUMABLE
+from tusfastapiserver.registry import StrategyRegistry
+from tusfastapiserver.routers import PatchRouter
+from tusfastapiserver.routers import add_tus_routers
+from tusfastapiserver.storages import LocalStorageStrategy
+from tusfastapiserver.testing import send_request
+from tusfastapiserver.testing import upload_with_disconnects
+from tusfastapiserver.testing.faults import FaultInjector
+from tusfastapiserver.testing.faults import with_faults
+
+DATA = bytes(range(256)) * 40
+
+
+@pytest.fixture
+def app(config):
+    app = FastAPI()
+    add_tus_routers(app, config)
+    return app
+
+
+async def create_upload(app, length=len(DATA)) -> str:
+    response = await send_request(
+        app,
+        "POST",
+        "/files",
+        headers={"tus-resumable": TUS_RESUMABLE, "upload-length": str(length)},
+    )
+    assert response.status_code == 201
+    return "/files/" + response.headers["location"].rsplit("/", 1)[1]
+
+
+def read_upload(config, url):
+    file_id = url.rsplit("/", 1)[1]
+    with open(os.path.join(config.file_path, file_id, file_id), "rb") as f:
+        return f.read()
+
+
+class TestPatchRouterDisconnects:
+    @pytest.mark.parametrize(
+        "disconnect_at, chunk_size",
+        [([1], 1024), ([1000, 1001, 5000], 1024), ([3, 4096, 9999], 4096)],
+    )
+    def test_resumes_without_retransmission(
+        self, app, config, disconnect_at, chunk_size
+    ):
+        async def scenario():
+            url = await create_upload(app)
+            return url, await upload_with_disconnects(
+                app, url, DATA, disconnect_at, chunk_size=chunk_size
+            )
+
+        url, report = asyncio.run(scenario())
+        assert report.offsets == sorted(disconnect_at)
+        assert report.retransmitted_bytes == 0
+        assert report.final_offset == len(DATA)
+        assert read_upload(config, url) == DATA
+
+    def test_disconnect_responds_with_committed_offset(self, app):
+        async def scenario():
+            url = await create_upload(app)
+            return await send_request(
+                app,
+                "PATCH",
+                url,
+                headers={
+                    "tus-resumable": TUS_RESUMABLE,
+                    "content-type": "application/offset+octet-stream",
+                    "upload-offset": "0",
+                },
+                body=DATA,
+                chunk_size=100,
+                disconnect_at=250,
+            )
+
+        response = asyncio.run(scenario())
+        assert response.headers["upload-offset"] == "250"
+
+    def test_empty_body(self, app):
+        async def scenario():
+            url = await create_upload(app)
+            return await asyncio.wait_for(
+                send_request(
+                    app,
+                    "PATCH",
+                    url,
+                    headers={
+                        "tus-resumable": TUS_RESUMABLE,
+                        "content-type": "application/offset+octet-stream",
+                        "upload-offset": "0",
+                    },
+                ),
+                5,
+            )
+
+        response = asyncio.run(scenario())
+        assert response.status_code == 204
+        assert response.headers["upload-offset"] == "0"
+
+    def test_read_timeout_commits_received_bytes(self, config, tmp_path):
+        config.patch_read_timeout = 0.05
+        app = FastAPI()
+        add_tus_routers(app, config)
+
+        async def scenario():
+            url = await create_upload(app)
+            response = await send_request(
+                app,
+                "PATCH",
+                url,
+                headers={
+                    "tus-resumable": TUS_RESUMABLE,
+                    "content-type": "application/offset+octet-stream",
+                    "upload-offset": "0",
+                },
+                body=DATA,
+                chunk_size=100,
+                stall_at=300,
+            )
+            head = await send_request(
+                app, "HEAD", url, headers={"tus-resumable": TUS_RESUMABLE}
+            )
+            return response, head
+
+        response, head = asyncio.run(scenario())
+        assert response.status_code == 408
+        assert head.headers["upload-offset"] == "300"
+
+    def test_commit_progress_uses_written_size(self, app, config):
+        router = PatchRouter(config)
+
+        async def scenario():
+            url = await create_upload(app, length=10)
+            file_id = url.rsplit("/", 1)[1]
+            metadata = await router.metadata_strategy.get_metadata(file_id)
+            # A chunk that reached storage before the request was cancelled.
+            await router.storage_strategy.update(metadata, b"0123456789AB")
+            await router._commit_progress(metadata)
+            return url, await router.metadata_strategy.get_metadata(file_id)
+
+        url, metadata = asyncio.run(scenario())
+        assert metadata.upload_offset == 10
+        assert read_upload(config, url) == b"0123456789"
+
+    def test_no_space_commits_written_bytes(self, config):
+        injector = FaultInjector(enospc_probability=1.0)
+        registry = StrategyRegistry(
+            config, storage_strategy_cls=with_faults(LocalStorageStrategy, injector)
+        )
+        app = FastAPI()
+        add_tus_routers(app, config, registry=registry)
+
+        async def scenario():
+            injector.enabled = False
+            url = await create_upload(app, length=100)
+            injector.enabled = True
+            response = await send_request(
+                app,
+                "PATCH",
+                url,
+                headers={
+                    "tus-resumable": TUS_RESUMABLE,
+                    "content-type": "application/offset+octet-stream",
+                    "upload-offset": "0",
+                },
+                body=DATA[:100],
+            )
+            head = await send_request(
+                app, "HEAD", url, headers={"tus-resumable": TUS_RESUMABLE}
+            )
+            return url, response, head
+
+        url, response, head = asyncio.run(scenario())
+        assert response.status_code == 413
+        assert head.headers["upload-offset"] == "50"
+        assert read_upload(config, url) == DATA[:50]
+
+    def test_failed_commit_drops_uncommitted_bytes(self, app, config):
+        router = PatchRouter(config)
+
+        async def scenario():
+            url = await create_upload(app, length=10)
+            file_id = url.rsplit("/", 1)[1]
+            metadata = await router.metadata_strategy.get_metadata(file_id)
+            await router.storage_strategy.update(metadata, b"01234")
+
+            async def update(upload_metadata):
+                raise OSError(errno.ENOSPC, "No space left on device")
+
+            router.metadata_strategy.update = update
+            await router._commit_progress(metadata)
+            return url, metadata
+
+        url, metadata = asyncio.run(scenario())
+        assert metadata.upload_offset == 0
+        assert read_upload(config, url) == b""
+
+
+async def patch(app, url, body, offset=0, headers=None, **kwargs):
+    return await send_request(
+        app,
+        "PATCH",
+        url,
+        headers={
+            "tus-resumable": TUS_RESUMABLE,
+            "content-type": "application/offset+octet-stream",
+            "upload-offset": str(offset),
+            **(headers or {}),
+        },
+        body=body,
+        **kwargs,
+    )
+
+
+async def get_offset(app, url) -> int:
+    head = await send_request(
+        app, "HEAD", url, headers={"tus-resumable": TUS_RESUMABLE}
+    )
+    return int(head.headers["upload-offset"])
+
+
+class TestPatchRouterSizeLimits:
+    def test_rejects_content_length_past_upload_length(self, app, config):
+        async def scenario():
+            url = await create_upload(app, length=100)
+            response = await patch(app, url, DATA[:150])
+            return url, response, await get_offset(app, url)
+
+        url, response, offset = asyncio.run(scenario())
+        assert response.status_code == 413
+        assert offset == 0
+        assert read_upload(config, url) == b""
+
+    def test_keeps_prefix_within_upload_length(self, app, config):
+        async def scenario():
+            url = await create_upload(app, length=100)
+            # The client understates the body it sends.
+            response = await patch(
+                app, url, DATA[:150], headers={"content-length": "100"}, chunk_size=64
+            )
+            return url, response, await get_offset(app, url)
+
+        url, response, offset = asyncio.run(scenario())
+        assert response.status_code == 413
+        assert offset == 100
+        assert read_upload(config, url) == DATA[:100]
+
+    def test_limits_request_body_size(self, config):
+        config.max_request_body_size = 64
+        app = FastAPI()
+        add_tus_routers(app, config)
+
+        async def scenario():
+            url = await create_upload(app, length=200)
+            rejected = await patch(app, url, DATA[:100])
+            truncated = await patch(
+                app, url, DATA[:100], headers={"content-length": "50"}, chunk_size=30
+            )
+            offset = await get_offset(app, url)
+            accepted = await patch(app, url, DATA[64:128], offset=offset)
+            return url, rejected, truncated, offset, accepted
+
+        url, rejected, truncated, offset, accepted = asyncio.run(scenario())
+        assert rejected.status_code == 413
+        assert truncated.status_code == 413
+        assert offset == 64
+        assert accepted.headers["upload-offset"] == "128"
+        assert read_upload(config, url) == DATA[:128]
+
+    def test_limits_deferred_upload_size(self, config):
+        config.max_upload_size = 100
+        app = FastAPI()
+        add_tus_routers(app, config)
+
+        async def scenario():
+            response = await send_request(
+                app,
+                "POST",
+                "/files",
+                headers={"tus-resumable": TUS_RESUMABLE, "upload-defer-length": "1"},
+            )
+            url = "/files/" + response.headers["location"].rsplit("/", 1)[1]
+            too_long = await patch(app, url, b"", headers={"upload-length": "101"})
+            too_large = await patch(app, url, DATA[:101])
+            accepted = await patch(app, url, DATA[:100])
+            return too_long, too_large, accepted
+
+        too_long, too_large, accepted = asyncio.run(scenario())
+        assert too_long.status_code == 413
+        assert too_large.status_code == 413
+        assert accepted.headers["upload-offset"] == "100"
+
+
+class CountingPatchRouter(PatchRouter):
+    completed = []
+
+    async def _on_upload_completed(self, metadata):
+        self.completed.append(metadata.id)
+        await super()._on_upload_completed(metadata)
+
+
+class TestPatchRouterCompletion:
+    @pytest.fixture
+    def app(self, config):
+        CountingPatchRouter.completed = []
+        app = FastAPI()
+        add_tus_routers(app, config, patch_router_cls=CountingPatchRouter)
+        return app
+
+    def test_retries_do_not_complete_again(self, app):
+        async def scenario():
+            url = await create_upload(app, length=3)
+            responses = [await patch(app, url, b"abc")]
+            for _ in range(2):
+                responses.append(await patch(app, url, b"", offset=3))
+            return responses
+
+        responses = asyncio.run(scenario())
+        assert [response.status_code for response in responses] == [204] * 3
+        assert len(CountingPatchRouter.completed) == 1
+
+    def test_setting_deferred_length_completes(self, app):
+        async def scenario():
+            response = await send_request(
+                app,
+                "POST",
+                "/files",
+                headers={"tus-resumable": TUS_RESUMABLE, "upload-defer-length": "1"},
+            )
+            url = "/files/" + response.headers["location"].rsplit("/", 1)[1]
+            await patch(app, url, b"abc")
+            await patch(app, url, b"", offset=3, headers={"upload-length": "3"})
+
+        asyncio.run(scenario())
+        assert len(CountingPatchRouter.completed) == 1
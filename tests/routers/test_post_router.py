@@ -0,0 +1,99 @@
+import asyncio
+import os
+
+from fastapi import FastAPI
+
+from tusfastapiserver import TUS_RESUMABLE
+from tusfastapiserver.config import Config
+from tusfastapiserver.routers import PostRouter
+from tusfastapiserver.routers import add_tus_routers
+from tusfastapiserver.storages import LocalStorageStrategy
+from tusfastapiserver.storages.reservation import ReservationLedger
+from tusfastapiserver.storages.volumes import VolumeSet
+from tusfastapiserver.testing import send_request
+
+
+class TestPostRouter:
+    def test_rejects_upload_over_max_size(self, tmp_path):
+        config = Config(
+            file_path=str(tmp_path), metadata_path=str(tmp_path), max_upload_size=100
+        )
+        app = FastAPI()
+        add_tus_routers(app, config)
+
+        async def create(length: int):
+            return await send_request(
+                app,
+                "POST",
+                "/files",
+                headers={"tus-resumable": TUS_RESUMABLE, "upload-length": str(length)},
+            )
+
+        assert asyncio.run(create(101)).status_code == 413
+        assert asyncio.run(create(100)).status_code == 201
+
+    def test_empty_upload_completes_at_creation(self, tmp_path):
+        completed = []
+
+        class CountingPostRouter(PostRouter):
+            async def _on_upload_completed(self, metadata):
+                completed.append(metadata.id)
+                await super()._on_upload_completed(metadata)
+
+        config = Config(file_path=str(tmp_path), metadata_path=str(tmp_path))
+        app = FastAPI()
+        add_tus_routers(app, config, post_router_cls=CountingPostRouter)
+
+        async def create(length: int):
+            return await send_request(
+                app,
+                "POST",
+                "/files",
+                headers={"tus-resumable": TUS_RESUMABLE, "upload-length": str(length)},
+            )
+
+        response = asyncio.run(create(0))
+        asyncio.run(create(10))
+        assert completed == [response.headers["location"].rsplit("/", 1)[1]]
+
+    def test_reserves_space_on_the_volume_of_the_upload(self, tmp_path, monkeypatch):
+        paths = [str(tmp_path / "disk1"), str(tmp_path / "disk2")]
+        create_empty_file = LocalStorageStrategy._create_empty_file
+
+        def fail_on_first_volume(path):
+            if path.startswith(paths[0]):
+                raise OSError("read-only file system")
+            create_empty_file(path)
+
+        monkeypatch.setattr(
+            LocalStorageStrategy,
+            "_create_empty_file",
+            staticmethod(fail_on_first_volume),
+        )
+        free = {paths[0]: 0, paths[1]: 1000}
+
+        def disk_usage(path):
+            # Uploads are stored in <volume>/<id>/<id>.
+            return 0, 0, free[os.path.dirname(os.path.dirname(path))]
+
+        config = Config(
+            metadata_path=str(tmp_path / "metadata"),
+            storage_volumes=VolumeSet(paths, disk_usage=lambda path: (0, 0, 1000)),
+            reservation_ledger=ReservationLedger(disk_usage=disk_usage),
+        )
+        app = FastAPI()
+        add_tus_routers(app, config)
+
+        async def create(length: int):
+            return await send_request(
+                app,
+                "POST",
+                "/files",
+                headers={"tus-resumable": TUS_RESUMABLE, "upload-length": str(length)},
+            )
+
+        assert asyncio.run(create(100)).status_code == 201
+        free[paths[1]] = 0
+        assert asyncio.run(create(100)).status_code == 413
+        # The file created for the rejected upload is removed.
+        assert len(os.listdir(paths[1])) == 1
@@ -0,0 +1,61 @@
+import asyncio
+import threading
+
+from tusfastapiserver.config import Config
+from tusfastapiserver.schemas import UploadMetadata
+from tusfastapiserver.storages import AsyncBaseStorageStrategy
+from tusfastapiserver.storages import LocalStorageStrategy
+from tusfastapiserver.storages import ThreadedStorageStrategy
+from tusfastapiserver.storages import to_async_storage_strategy
+
+
+class RecordingStorageStrategy(LocalStorageStrategy):
+    def __init__(self, config):
+        super().__init__(config)
+        self.threads = []
+
+    def is_file_exists(self, file_id: str) -> bool:
+        self.threads.append(threading.get_ident())
+        return super().is_file_exists(file_id)
+
+
+class NativeStorageStrategy(AsyncBaseStorageStrategy):
+    pass
+
+
+class TestThreadedStorageStrategy:
+    def test_runs_sync_strategy_in_thread_pool(self, tmp_path):
+        config = Config(file_path=str(tmp_path))
+        sync_strategy = RecordingStorageStrategy(config)
+        strategy = to_async_storage_strategy(sync_strategy)
+        metadata = UploadMetadata(
+            id="1",
+            upload_storage_path=strategy.generate_file_path("1"),
+            upload_metadata_path="unused",
+            storage_strategy_type=strategy.storage_strategy_type,
+            metadata_strategy_type="LOCAL",
+        )
+
+        async def scenario():
+            assert await strategy.is_file_exists("1") is False
+            await strategy.initialize(metadata)
+            await strategy.update(metadata, b"abc")
+            assert await strategy.get_size(metadata) == 3
+            await strategy.truncate(metadata, 1)
+            assert await strategy.get_size(metadata) == 1
+            await strategy.delete(metadata)
+            assert await strategy.is_file_exists("1") is False
+
+        asyncio.run(scenario())
+        assert isinstance(strategy, ThreadedStorageStrategy)
+        assert threading.get_ident() not in sync_strategy.threads
+
+    def test_delegates_other_attributes(self, tmp_path):
+        sync_strategy = LocalStorageStrategy(Config(file_path=str(tmp_path)))
+        strategy = to_async_storage_strategy(sync_strategy)
+        assert strategy.config is sync_strategy.config
+        assert strategy._check_or_make_folder == sync_strategy._check_or_make_folder
+
+    def test_async_strategy_is_not_wrapped(self):
+        strategy = NativeStorageStrategy(Config())
+        assert to_async_storage_strategy(strategy) is strategy
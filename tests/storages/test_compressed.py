@@ -0,0 +1,207 @@
+import asyncio
+import os
+
+import pytest
+from fastapi import FastAPI
+
+from tusfastapiserver import TUS_RESUMABLE
+from tusfastapiserver.config import CompressionCodec
+from tusfastapiserver.metadata import LocalMetadataStrategy
+from tusfastapiserver.routers import add_tus_routers
+from tusfastapiserver.storages import CompressedStorageStrategy
+from tusfastapiserver.storages import LocalStorageStrategy
+from tusfastapiserver.storages.compressed import FRAME_HEADER
+from tusfastapiserver.storages.compressed import RAW
+from tusfastapiserver.storages.compressed import is_compressed_file
+from tusfastapiserver.storages.compressed import iter_decompressed
+from tusfastapiserver.storages.compressed import iter_frame_headers
+from tusfastapiserver.testing import send_request
+
+TEXT = b"timestamp,level,message\n" + b"2025-01-01,INFO,request handled\n" * 2000
+
+
+def create_strategy(config, **kwargs):
+    return CompressedStorageStrategy(LocalStorageStrategy(config), **kwargs)
+
+
+@pytest.fixture
+def create_upload(create_metadata):
+    def create(strategy, file_id="1"):
+        metadata = create_metadata(
+            file_id, storage_strategy=strategy, upload_metadata_path="unused"
+        )
+        strategy.initialize(metadata)
+        return metadata
+
+    return create
+
+
+def write(strategy, metadata, data, chunk_size=8192):
+    for start in range(0, len(data), chunk_size):
+        strategy.update(metadata, data[start : start + chunk_size])
+
+
+def read_codecs(path):
+    with open(path, "rb") as file:
+        return [codec_id for _, codec_id, _, _ in iter_frame_headers(file)]
+
+
+class TestCompressedStorageStrategy:
+    def test_round_trip(self, config, create_upload):
+        strategy = create_strategy(config)
+        metadata = create_upload(strategy)
+        write(strategy, metadata, TEXT)
+
+        path = metadata.upload_storage_path
+        assert os.path.getsize(path) < len(TEXT) / 5
+        assert strategy.get_size(metadata) == len(TEXT)
+        assert b"".join(iter_decompressed(path)) == TEXT
+        assert b"".join(iter_decompressed(path, 10000, 20000)) == TEXT[10000:30000]
+        with strategy.open_file(metadata, offset=5) as reader:
+            assert reader.read() == TEXT[5:]
+
+    def test_incompressible_data_is_stored_raw(self, config, create_upload):
+        strategy = create_strategy(config, skip_frames=2)
+        metadata = create_upload(strategy)
+        data = os.urandom(8192 * 3)
+        write(strategy, metadata, data)
+        write(strategy, metadata, TEXT[:8192])
+
+        # The first chunk is tried, the next two are skipped, then it is retried.
+        assert read_codecs(metadata.upload_storage_path) == [RAW, RAW, RAW, 1]
+        assert b"".join(iter_decompressed(metadata.upload_storage_path)) == (
+            data + TEXT[:8192]
+        )
+
+    def test_keeps_state_of_recent_uploads_only(self, config, create_upload):
+        strategy = create_strategy(config, cache_size=2)
+        uploads = [create_upload(strategy, file_id) for file_id in ("a", "b", "c")]
+        for metadata in uploads:
+            write(strategy, metadata, os.urandom(8192))
+        assert list(strategy._compressed_files) == ["b", "c"]
+        assert list(strategy._skipped_frames) == ["b", "c"]
+
+        # An evicted upload is recognized by its file header again.
+        write(strategy, uploads[0], TEXT[:8192])
+        assert list(strategy._compressed_files) == ["c", "a"]
+        assert read_codecs(uploads[0].upload_storage_path) == [RAW, 1]
+
+    def test_small_chunks_are_stored_raw(self, config, create_upload):
+        strategy = create_strategy(config)
+        metadata = create_upload(strategy)
+        strategy.update(metadata, b"a" * 100)
+        assert read_codecs(metadata.upload_storage_path) == [RAW]
+
+    def test_get_size_removes_torn_frame(self, config, create_upload):
+        strategy = create_strategy(config)
+        metadata = create_upload(strategy)
+        write(strategy, metadata, TEXT[:10000])
+        valid_size = os.path.getsize(metadata.upload_storage_path)
+        with open(metadata.upload_storage_path, "ab") as file:
+            file.write(FRAME_HEADER.pack(1, 5000, 4000) + b"partial")
+
+        assert strategy.get_size(metadata) == 10000
+        assert os.path.getsize(metadata.upload_storage_path) == valid_size
+        strategy.update(metadata, TEXT[10000:20000])
+        assert b"".join(iter_decompressed(metadata.upload_storage_path)) == TEXT[:20000]
+
+    def test_truncate_inside_frame(self, config, create_upload):
+        strategy = create_strategy(config)
+        metadata = create_upload(strategy)
+        write(strategy, metadata, TEXT[:30000], chunk_size=10000)
+        strategy.truncate(metadata, 15000)
+        assert strategy.get_size(metadata) == 15000
+        assert b"".join(iter_decompressed(metadata.upload_storage_path)) == TEXT[:15000]
+
+    def test_zstd(self, config, create_upload):
+        pytest.importorskip("zstandard")
+        strategy = create_strategy(config, codec=CompressionCodec.ZSTD)
+        metadata = create_upload(strategy)
+        write(strategy, metadata, TEXT)
+        assert os.path.getsize(metadata.upload_storage_path) < len(TEXT) / 5
+        assert b"".join(iter_decompressed(metadata.upload_storage_path)) == TEXT
+
+    def test_raw_files_are_passed_through(self, config, create_upload):
+        # An upload written before compression was enabled.
+        local_strategy = LocalStorageStrategy(config)
+        metadata = create_upload(local_strategy)
+        local_strategy.update(metadata, TEXT[:10000])
+
+        strategy = create_strategy(config)
+        assert not is_compressed_file(metadata.upload_storage_path)
+        assert strategy.get_size(metadata) == 10000
+        strategy.update(metadata, TEXT[10000:20000])
+        strategy.truncate(metadata, 15000)
+        with open(metadata.upload_storage_path, "rb") as file:
+            assert file.read() == TEXT[:15000]
+        with strategy.open_file(metadata, offset=5) as reader:
+            assert reader.read() == TEXT[5:15000]
+
+    def test_frames_require_file_header(self, config, create_upload):
+        metadata = create_upload(LocalStorageStrategy(config))
+        with open(metadata.upload_storage_path, "rb") as file:
+            with pytest.raises(ValueError):
+                list(iter_frame_headers(file))
+
+    def test_download_detects_format(self, config, create_upload):
+        config.enable_download = True
+        compressed = create_strategy(config)
+        compressed_metadata = create_upload(compressed, "1")
+        write(compressed, compressed_metadata, TEXT)
+        local = LocalStorageStrategy(config)
+        raw_metadata = create_upload(local, "2")
+        local.update(raw_metadata, TEXT)
+        metadata_strategy = LocalMetadataStrategy(config)
+        for metadata in (compressed_metadata, raw_metadata):
+            metadata.upload_metadata_path = metadata_strategy.generate_metadata_path(
+                metadata.id
+            )
+            metadata.upload_length = metadata.upload_offset = len(TEXT)
+            metadata_strategy.initialize(metadata)
+
+        for compression in (None, CompressionCodec.GZIP):
+            config.storage_compression = compression
+            app = FastAPI()
+            add_tus_routers(app, config)
+            for file_id in ("1", "2"):
+                response = asyncio.run(send_request(app, "GET", f"/files/{file_id}"))
+                assert response.body == TEXT
+
+    def test_upload_and_download(self, config):
+        config.storage_compression = CompressionCodec.GZIP
+        config.enable_download = True
+        app = FastAPI()
+        add_tus_routers(app, config)
+        headers = {"tus-resumable": TUS_RESUMABLE}
+
+        async def scenario():
+            response = await send_request(
+                app,
+                "POST",
+                "/files",
+                headers={**headers, "upload-length": str(len(TEXT))},
+            )
+            url = "/files/" + response.headers["location"].rsplit("/", 1)[1]
+            response = await send_request(
+                app,
+                "PATCH",
+                url,
+                headers={
+                    **headers,
+                    "upload-offset": "0",
+                    "content-type": "application/offset+octet-stream",
+                },
+                body=TEXT,
+            )
+            assert response.headers["upload-offset"] == str(len(TEXT))
+            full = await send_request(app, "GET", url)
+            partial = await send_request(
+                app, "GET", url, headers={"range": "bytes=100-199"}
+            )
+            return full, partial
+
+        full, partial = asyncio.run(scenario())
+        assert full.body == TEXT
+        assert full.headers["content-length"] == str(len(TEXT))
+        assert partial.status_code == 206
+        assert partial.body == TEXT[100:200]
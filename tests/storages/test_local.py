@@ -75,3 +75,20 @@ class TestLocalStorageStrategy:
             local_storage_strategy.update(upload_metadata, chunk)
             mock_file.assert_called_once_with(upload_metadata.upload_storage_path, 'ab')
             mock_file().write.assert_called_once_with(chunk)
+
+    def test_delete(self, local_storage_strategy):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            local_storage_strategy.config.file_path = temp_dir
+            file_path = local_storage_strategy.generate_file_path("123")
+            upload_metadata = UploadMetadata(
+                id="123",
+                upload_storage_path=file_path,
+                upload_metadata_path="test",
+                storage_strategy_type=StorageStrategyType.LOCAL,
+                metadata_strategy_type=StorageStrategyType.LOCAL,
+            )
+            local_storage_strategy.initialize(upload_metadata)
+            assert local_storage_strategy.is_file_exists("123") == True
+            local_storage_strategy.delete(upload_metadata)
+            assert local_storage_strategy.is_file_exists("123") == False
+            assert not os.path.exists(os.path.dirname(file_path))
@@ -0,0 +1,232 @@
+import asyncio
+import os
+import tempfile
+import threading
+
+import pytest
+from fastapi import FastAPI
+
+from tusfastapiserver import TUS_RESUMABLE
+from tusfastapiserver.config import Config
+from tusfastapiserver.config import TusExtension
+from tusfastapiserver.exceptions import InsufficientStorageException
+from tusfastapiserver.exceptions import QuotaExceededException
+from tusfastapiserver.metadata import LocalMetadataStrategy
+from tusfastapiserver.registry import StrategyRegistry
+from tusfastapiserver.routers import add_tus_routers
+from tusfastapiserver.schemas import UploadMetadata
+from tusfastapiserver.storages.reservation import ReservationLedger
+from tusfastapiserver.testing import send_request
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def fake_disk_usage(free: int):
+    return lambda path: (free, 0, free)
+
+
+@pytest.fixture
+def create_metadata(create_metadata):
+    def create(file_id: str, length: int, tenant: str = None) -> UploadMetadata:
+        return create_metadata(
+            file_id,
+            upload_length=length,
+            metadata={"tenant": tenant} if tenant else None,
+        )
+
+    return create
+
+
+class TestReservationLedger:
+    def test_reserve_and_release(self, create_metadata):
+        ledger = ReservationLedger(disk_usage=fake_disk_usage(1000))
+        ledger.reserve(create_metadata("1", 100), "test")
+        assert ledger.usage()["reserved_bytes"] == 100
+        assert ledger.usage()["outstanding_bytes"] == 100
+        ledger.release("1")
+        assert ledger.usage()["reserved_bytes"] == 0
+        assert ledger.usage()["outstanding_bytes"] == 0
+
+    def test_deferred_length_is_not_reserved(self, create_metadata):
+        ledger = ReservationLedger(disk_usage=fake_disk_usage(0))
+        metadata = create_metadata("1", 100)
+        metadata.upload_length = None
+        assert ledger.reserve(metadata, "test") is None
+
+    def test_reserve_async_measures_free_space_off_the_loop(self, create_metadata):
+        threads = []
+
+        def disk_usage(path):
+            threads.append(threading.current_thread())
+            return 1000, 0, 1000
+
+        ledger = ReservationLedger(disk_usage=disk_usage)
+        asyncio.run(ledger.reserve_async(create_metadata("1", 600), "test"))
+        assert ledger.usage()["reserved_bytes"] == 600
+        assert threads and threads[0] is not threading.main_thread()
+        with pytest.raises(InsufficientStorageException):
+            asyncio.run(ledger.reserve_async(create_metadata("2", 600), "test"))
+
+    def test_free_space_accounts_for_outstanding_bytes(self, create_metadata):
+        ledger = ReservationLedger(disk_usage=fake_disk_usage(1000))
+        ledger.reserve(create_metadata("1", 600), "test")
+        with pytest.raises(InsufficientStorageException) as exc_info:
+            ledger.reserve(create_metadata("2", 600), "test")
+        assert exc_info.value.status_code == 413
+
+    def test_consume_reduces_outstanding_bytes(self, create_metadata):
+        ledger = ReservationLedger(disk_usage=fake_disk_usage(1000))
+        ledger.reserve(create_metadata("1", 600), "test")
+        ledger.consume("1", 500)
+        assert ledger.usage()["outstanding_bytes"] == 100
+        assert ledger.usage()["reserved_bytes"] == 600
+
+    def test_global_quota(self, create_metadata):
+        ledger = ReservationLedger(
+            max_reserved_bytes=100, disk_usage=fake_disk_usage(10**9)
+        )
+        ledger.reserve(create_metadata("1", 60), "test")
+        with pytest.raises(QuotaExceededException):
+            ledger.reserve(create_metadata("2", 60), "test")
+
+    def test_tenant_quota(self, create_metadata):
+        ledger = ReservationLedger(
+            tenant_quota_bytes=100,
+            tenant_metadata_key="tenant",
+            disk_usage=fake_disk_usage(10**9),
+        )
+        ledger.reserve(create_metadata("1", 60, tenant="a"), "test")
+        ledger.reserve(create_metadata("2", 60, tenant="b"), "test")
+        with pytest.raises(QuotaExceededException):
+            ledger.reserve(create_metadata("3", 60, tenant="a"), "test")
+        ledger.release("1")
+        ledger.reserve(create_metadata("3", 60, tenant="a"), "test")
+        assert ledger.get_tenant_reserved_bytes("a") == 60
+
+    def test_expire(self, create_metadata):
+        clock = FakeClock()
+        ledger = ReservationLedger(
+            reservation_ttl=10, clock=clock, disk_usage=fake_disk_usage(1000)
+        )
+        ledger.reserve(create_metadata("1", 100), "test")
+        ledger.reserve(create_metadata("2", 100), "test")
+        clock.now = 5
+        ledger.consume("2", 10)
+        clock.now = 11
+        assert ledger.expire() == ["1"]
+        clock.now = 16
+        assert ledger.expire() == ["2"]
+        assert ledger.usage()["reservations"] == 0
+
+    def test_rebuild(self, create_metadata):
+        ledger = ReservationLedger(
+            tenant_metadata_key="tenant", disk_usage=fake_disk_usage(1000)
+        )
+        ledger.reserve(create_metadata("stale", 100), "test")
+        partial = create_metadata("1", 100, tenant="a")
+        partial.upload_offset = 40
+        complete = create_metadata("2", 100)
+        complete.upload_offset = 100
+        deferred = create_metadata("3", 100)
+        deferred.upload_length = None
+
+        ledger.rebuild([partial, complete, deferred])
+        assert ledger.usage() == {
+            "reservations": 1,
+            "reserved_bytes": 100,
+            "outstanding_bytes": 60,
+            "max_reserved_bytes": None,
+        }
+        assert ledger.get_tenant_reserved_bytes("a") == 100
+
+    def test_save_and_load(self, create_metadata):
+        import asyncio
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            ledger_path = os.path.join(temp_dir, "ledger", "ledger.json")
+            ledger = ReservationLedger(
+                ledger_path=ledger_path, disk_usage=fake_disk_usage(1000)
+            )
+            ledger.reserve(create_metadata("1", 100), "test")
+            asyncio.run(ledger.stop())
+
+            restored_ledger = ReservationLedger(ledger_path=ledger_path)
+            asyncio.run(restored_ledger.start())
+            assert restored_ledger.usage()["reserved_bytes"] == 100
+
+
+class TestReservationEndpoints:
+    @pytest.fixture
+    def config(self, tmp_path):
+        return Config(
+            file_path=str(tmp_path),
+            metadata_path=str(tmp_path),
+            enabled_extensions=[TusExtension.CREATION, TusExtension.TERMINATION],
+            reservation_ledger=ReservationLedger(disk_usage=fake_disk_usage(1000)),
+        )
+
+    @staticmethod
+    async def create(app, length: int) -> str:
+        response = await send_request(
+            app,
+            "POST",
+            "/files",
+            headers={"tus-resumable": TUS_RESUMABLE, "upload-length": str(length)},
+        )
+        return response.headers["location"].rsplit("/", 1)[1]
+
+    def test_delete_releases_reservation(self, config):
+        app = FastAPI()
+        add_tus_routers(app, config)
+
+        async def scenario():
+            file_id = await self.create(app, 100)
+            assert config.reservation_ledger.usage()["reserved_bytes"] == 100
+            response = await send_request(
+                app,
+                "DELETE",
+                f"/files/{file_id}",
+                headers={"tus-resumable": TUS_RESUMABLE},
+            )
+            assert response.status_code == 204
+
+        asyncio.run(scenario())
+        assert config.reservation_ledger.usage()["reservations"] == 0
+
+    def test_failed_creation_releases_reservation(self, config, tmp_path):
+        class FailingMetadataStrategy(LocalMetadataStrategy):
+            def initialize(self, upload_metadata):
+                raise OSError("disk full")
+
+        app = FastAPI()
+        registry = StrategyRegistry(
+            config, metadata_strategy_cls=FailingMetadataStrategy
+        )
+        add_tus_routers(app, config, registry=registry)
+
+        with pytest.raises(OSError):
+            asyncio.run(self.create(app, 100))
+        assert config.reservation_ledger.usage()["reservations"] == 0
+        assert os.listdir(tmp_path) == []
+
+    def test_reservations_are_rebuilt_at_startup(self, config):
+        app = FastAPI()
+        add_tus_routers(app, config)
+        asyncio.run(self.create(app, 100))
+
+        # A new worker, e.g. after a crash that skipped saving the ledger.
+        config.reservation_ledger = ReservationLedger(disk_usage=fake_disk_usage(1000))
+        restarted_app = FastAPI()
+        add_tus_routers(restarted_app, config)
+
+        async def start():
+            async with restarted_app.router.lifespan_context(restarted_app):
+                return config.reservation_ledger.usage()["reserved_bytes"]
+
+        assert asyncio.run(start()) == 100
@@ -0,0 +1,129 @@
+import os
+
+import pytest
+
+from tusfastapiserver.config import Config
+from tusfastapiserver.config import VolumePlacementPolicy
+from tusfastapiserver.exceptions import InsufficientStorageException
+from tusfastapiserver.storages import LocalStorageStrategy
+from tusfastapiserver.storages.volumes import VolumeSet
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return [str(tmp_path / "disk1"), str(tmp_path / "disk2"), str(tmp_path / "disk3")]
+
+
+def create_volumes(paths, clock, free=None, **kwargs):
+    free = free or {}
+    return VolumeSet(
+        paths,
+        clock=clock,
+        disk_usage=lambda path: (0, 0, free.get(path, 1000)),
+        **kwargs,
+    )
+
+
+class TestVolumeSet:
+    def test_round_robin(self, paths, clock):
+        volumes = create_volumes(paths, clock)
+        assert [volumes.place().path for _ in range(4)] == [*paths, paths[0]]
+
+    def test_most_free(self, paths, clock):
+        volumes = create_volumes(
+            paths,
+            clock,
+            free={paths[0]: 10, paths[1]: 30, paths[2]: 20},
+            policy=VolumePlacementPolicy.MOST_FREE,
+        )
+        assert volumes.place().path == paths[1]
+
+    def test_least_active(self, paths, clock):
+        volumes = create_volumes(
+            paths, clock, policy=VolumePlacementPolicy.LEAST_ACTIVE, activity_window=10
+        )
+        volumes.record_write(os.path.join(paths[0], "a", "a"), "a")
+        volumes.record_write(os.path.join(paths[1], "b", "b"), "b")
+        assert volumes.place().path == paths[2]
+
+        volumes.record_write(os.path.join(paths[2], "c", "c"), "c")
+        volumes.record_write(os.path.join(paths[2], "d", "d"), "d")
+        clock.now += 5
+        volumes.record_write(os.path.join(paths[1], "b", "b"), "b")
+        clock.now += 6
+        # Only the write to the second volume is recent enough to count.
+        assert volumes.place().path == paths[0]
+
+    def test_full_volumes_are_drained(self, paths, clock):
+        volumes = create_volumes(
+            paths, clock, free={paths[0]: 10, paths[1]: 10}, min_free_bytes=100
+        )
+        assert {volumes.place().path for _ in range(3)} == {paths[2]}
+
+    def test_failed_volumes_are_skipped_until_cooldown(self, paths, clock):
+        volumes = create_volumes(paths[:2], clock, failure_cooldown=60)
+        volumes.mark_failed(volumes.volumes[0])
+        assert {volumes.place().path for _ in range(3)} == {paths[1]}
+        clock.now += 61
+        assert {volumes.place().path for _ in range(2)} == set(paths[:2])
+
+    def test_no_volume_available(self, paths, clock):
+        volumes = create_volumes(paths, clock, min_free_bytes=10000)
+        with pytest.raises(InsufficientStorageException):
+            volumes.place()
+
+
+class TestLocalStorageStrategyVolumes:
+    def test_uploads_are_spread_and_found(self, paths, clock, create_metadata):
+        config = Config(storage_volumes=create_volumes(paths, clock))
+        strategy = LocalStorageStrategy(config)
+        for file_id in ("a", "b", "c"):
+            strategy.initialize(create_metadata(file_id, storage_strategy=strategy))
+
+        assert strategy.find_file_path("b") == os.path.join(paths[1], "b", "b")
+        assert strategy.is_file_exists("c")
+        assert not strategy.is_file_exists("d")
+
+    def test_volume_is_chosen_by_initialize(self, paths, clock, create_metadata):
+        checked = []
+        volumes = VolumeSet(
+            paths,
+            clock=clock,
+            disk_usage=lambda path: checked.append(path) or (0, 0, 1),
+        )
+        strategy = LocalStorageStrategy(Config(storage_volumes=volumes))
+        metadata = create_metadata("a", storage_strategy=strategy)
+        assert checked == []
+
+        strategy.initialize(metadata)
+        assert checked == paths
+        assert os.path.exists(metadata.upload_storage_path)
+
+    def test_initialize_moves_upload_off_failed_volume(
+        self, paths, clock, create_metadata
+    ):
+        config = Config(storage_volumes=create_volumes(paths[:2], clock))
+        strategy = LocalStorageStrategy(config)
+        metadata = create_metadata("a", storage_strategy=strategy)
+        # The folder of the upload can not be created on the first volume.
+        os.makedirs(paths[0])
+        with open(os.path.join(paths[0], "a"), "w"):
+            pass
+
+        strategy.initialize(metadata)
+        assert metadata.upload_storage_path == os.path.join(paths[1], "a", "a")
+        assert os.path.exists(metadata.upload_storage_path)
+        assert config.storage_volumes.usage()[0]["failed"] is True
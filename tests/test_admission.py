@@ -0,0 +1,62 @@
+import pytest
+
+from tusfastapiserver.admission import AdmissionController
+from tusfastapiserver.exceptions import ServerBusyException
+from tusfastapiserver.exceptions import TooManyRequestsException
+
+
+class TestAdmissionController:
+    def test_admit_and_release(self):
+        controller = AdmissionController(max_concurrent_requests=1)
+        with controller.admit("1", "client", 100):
+            assert controller.usage()["concurrent_requests"] == 1
+            assert controller.usage()["concurrent_uploads"] == 1
+            assert controller.usage()["inflight_bytes"] == 100
+        assert controller.usage()["concurrent_requests"] == 0
+        assert controller.usage()["concurrent_uploads"] == 0
+        assert controller.usage()["inflight_bytes"] == 0
+
+    def test_concurrent_requests_limit(self):
+        controller = AdmissionController(max_concurrent_requests=1, retry_after=5)
+        ticket = controller.admit("1", "client", 0)
+        with pytest.raises(ServerBusyException) as exc_info:
+            controller.admit("2", "client", 0)
+        assert exc_info.value.status_code == 503
+        assert exc_info.value.headers == {"Retry-After": "5"}
+        ticket.release()
+        controller.admit("2", "client", 0)
+
+    def test_concurrent_uploads_limit_allows_same_upload(self):
+        controller = AdmissionController(max_concurrent_uploads=1)
+        controller.admit("1", "client", 0)
+        controller.admit("1", "client", 0)
+        with pytest.raises(ServerBusyException):
+            controller.admit("2", "client", 0)
+
+    def test_per_client_limit(self):
+        controller = AdmissionController(max_concurrent_requests_per_client=1)
+        controller.admit("1", "client", 0)
+        controller.admit("2", "other", 0)
+        with pytest.raises(TooManyRequestsException) as exc_info:
+            controller.admit("3", "client", 0)
+        assert exc_info.value.status_code == 429
+        assert controller.usage()["rejected_requests"] == 1
+
+    def test_inflight_bytes_limit(self):
+        controller = AdmissionController(max_inflight_bytes=100)
+        controller.admit("1", "client", 60)
+        with pytest.raises(ServerBusyException):
+            controller.admit("2", "client", 60)
+        controller.admit("3", "client", 40)
+
+    def test_oversized_request_is_admitted_when_idle(self):
+        controller = AdmissionController(max_inflight_bytes=100)
+        controller.admit("1", "client", 1000)
+        assert controller.usage()["inflight_bytes"] == 1000
+
+    def test_release_is_idempotent(self):
+        controller = AdmissionController()
+        ticket = controller.admit("1", "client", 10)
+        ticket.release()
+        ticket.release()
+        assert controller.usage()["concurrent_requests"] == 0
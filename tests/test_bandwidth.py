@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from tusfastapiserver.bandwidth import BandwidthScheduler
+from tusfastapiserver.bandwidth import TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+class TestTokenBucket:
+    def test_consume_within_burst(self, clock):
+        bucket = TokenBucket(rate=100, burst=100, clock=clock)
+        assert bucket.consume(100) == 0.0
+
+    def test_consume_overdraws_bucket(self, clock):
+        bucket = TokenBucket(rate=100, burst=100, clock=clock)
+        assert bucket.consume(150) == pytest.approx(0.5)
+        assert bucket.consume(50) == pytest.approx(1.0)
+
+    def test_refill(self, clock):
+        bucket = TokenBucket(rate=100, burst=100, clock=clock)
+        bucket.consume(200)
+        clock.now = 1.0
+        assert bucket.consume(0) == 0.0
+        clock.now = 10.0
+        assert bucket.consume(100) == 0.0
+
+
+class TestBandwidthScheduler:
+    def test_no_limits(self, clock):
+        scheduler = BandwidthScheduler(clock=clock)
+        throttle = scheduler.acquire("1", "client")
+        assert throttle.get_delay(10**9) == 0.0
+
+    def test_per_upload_limit(self, clock):
+        scheduler = BandwidthScheduler(per_upload_rate=100, clock=clock)
+        throttle = scheduler.acquire("1", "client")
+        assert throttle.get_delay(300) == pytest.approx(2.0)
+
+    def test_per_client_limit_is_shared(self, clock):
+        scheduler = BandwidthScheduler(per_client_rate=100, clock=clock)
+        first = scheduler.acquire("1", "client")
+        second = scheduler.acquire("2", "client")
+        other = scheduler.acquire("3", "other")
+        assert first.get_delay(100) == 0.0
+        assert second.get_delay(100) == pytest.approx(1.0)
+        assert other.get_delay(100) == 0.0
+
+    def test_global_rate_is_shared_fairly(self, clock):
+        scheduler = BandwidthScheduler(global_rate=1000, burst_seconds=0.1, clock=clock)
+        first = scheduler.acquire("1", "a")
+        second = scheduler.acquire("2", "b")
+        assert first.get_delay(0) == 0.0
+        assert first.bucket.rate == 500
+        first.close()
+        assert second.get_delay(0) == 0.0
+        assert second.bucket.rate == 1000
+
+    def test_unused_share_goes_to_busy_upload(self, clock):
+        scheduler = BandwidthScheduler(global_rate=1000, burst_seconds=0.1, clock=clock)
+        slow = scheduler.acquire("1", "a")
+        fast = scheduler.acquire("2", "b")
+        # The slow upload sends 10 bytes every 0.1 seconds, the fast one sends
+        # 50 bytes chunks as soon as it is allowed to.
+        senders = {slow: (10, 0.1), fast: (50, 0.0)}
+        next_sends = {slow: 0.0, fast: 0.0}
+        sent = {slow: 0, fast: 0}
+        while clock.now < 5.0:
+            throttle = min(next_sends, key=next_sends.get)
+            clock.now = next_sends[throttle]
+            size, interval = senders[throttle]
+            delay = throttle.get_delay(size)
+            next_sends[throttle] = clock.now + max(delay, interval)
+            if clock.now >= 2.0:
+                sent[throttle] += size
+
+        assert sent[slow] / 3.0 == pytest.approx(100, rel=0.1)
+        assert sent[fast] / 3.0 == pytest.approx(900, rel=0.1)
+        assert fast.bucket.rate == pytest.approx(900, rel=0.1)
+
+    def test_release_drops_client_bucket(self, clock):
+        scheduler = BandwidthScheduler(per_client_rate=100, clock=clock)
+        throttle = scheduler.acquire("1", "client")
+        throttle.close()
+        assert scheduler.active_uploads == 0
+        assert scheduler._client_buckets == {}
+
+    def test_paced_stream(self, clock):
+        scheduler = BandwidthScheduler(per_upload_rate=10**9, clock=clock)
+
+        async def stream():
+            for chunk in (b"a", b"b", b"c"):
+                yield chunk
+
+        async def run():
+            return [chunk async for chunk in scheduler.paced(stream(), "1", "client")]
+
+        assert asyncio.run(run()) == [b"a", b"b", b"c"]
+        assert scheduler.active_uploads == 0
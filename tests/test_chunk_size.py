@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+
+from tusfastapiserver import TUS_RESUMABLE
+from tusfastapiserver.chunk_size import CHUNK_SIZE_ALIGNMENT
+from tusfastapiserver.chunk_size import ChunkSizeAdvisor
+from tusfastapiserver.config import Config
+from tusfastapiserver.routers import add_tus_routers
+from tusfastapiserver.testing import send_request
+
+MB = 1024 * 1024
+
+
+class TestChunkSizeAdvisor:
+    def test_balances_latency_against_transfer_time(self):
+        advisor = ChunkSizeAdvisor(target_overhead=0.05)
+        # 100 MB/s with 10 ms of latency per request: 19 MB keeps the
+        # latency at 5% of the request.
+        advisor.record(100 * MB, 1.0, 0.01)
+        chunk_size = advisor.recommend()
+        assert chunk_size == pytest.approx(19 * MB, abs=CHUNK_SIZE_ALIGNMENT)
+        assert chunk_size % CHUNK_SIZE_ALIGNMENT == 0
+
+    def test_limits_chunk_duration(self):
+        advisor = ChunkSizeAdvisor(max_chunk_duration=2.0)
+        # A slow link with a high latency would otherwise get huge chunks.
+        advisor.record(MB, 1.0, 1.0)
+        assert advisor.recommend() == 2 * MB
+
+    def test_clamps_recommendation(self):
+        advisor = ChunkSizeAdvisor(min_chunk_size=MB, max_chunk_size=16 * MB)
+        advisor.record(1000 * MB, 1.0, 1.0)
+        assert advisor.recommend() == 16 * MB
+        assert advisor.recommend(max_size=3 * MB) == 3 * MB
+        advisor = ChunkSizeAdvisor(min_chunk_size=MB)
+        advisor.record(MB, 1.0, 0.0)
+        assert advisor.recommend() == MB
+
+    def test_smooths_samples(self):
+        advisor = ChunkSizeAdvisor(smoothing=0.5)
+        advisor.record(100, 1.0, 0.1)
+        advisor.record(300, 1.0, 0.3)
+        assert advisor.throughput == pytest.approx(200)
+        assert advisor.latency == pytest.approx(0.2)
+
+    def test_latency_includes_gap_between_requests(self):
+        advisor = ChunkSizeAdvisor(smoothing=1.0, max_request_gap=5.0)
+        advisor.record_request("a", MB, 1.0, started_at=10.0, finished_at=11.1)
+        # The first request of an upload has no gap to measure.
+        assert advisor.latency is None
+        advisor.record_request("a", MB, 1.0, started_at=11.3, finished_at=12.4)
+        assert advisor.latency == pytest.approx(0.1 + 0.2)
+        # A pause is not a round trip.
+        advisor.record_request("a", MB, 1.0, started_at=30.0, finished_at=31.1)
+        assert advisor.latency == pytest.approx(0.3)
+
+    def test_forgets_least_recent_uploads(self):
+        advisor = ChunkSizeAdvisor(max_uploads=1)
+        advisor.record_request("a", MB, 1.0, started_at=0.0, finished_at=1.0)
+        advisor.record_request("b", MB, 1.0, started_at=1.0, finished_at=2.0)
+        advisor.record_request("a", MB, 1.0, started_at=2.0, finished_at=3.0)
+        assert advisor.latency is None
+
+    def test_starts_with_initial_chunk_size(self):
+        assert ChunkSizeAdvisor(initial_chunk_size=5 * MB).recommend() == 5 * MB
+
+    def test_rejects_invalid_target_overhead(self):
+        with pytest.raises(ValueError):
+            ChunkSizeAdvisor(target_overhead=1.0)
+
+
+class TestPatchRouterChunkSize:
+    def test_patch_records_requests(self, tmp_path):
+        advisor = ChunkSizeAdvisor()
+        config = Config(
+            file_path=str(tmp_path),
+            metadata_path=str(tmp_path),
+            chunk_size_advisor=advisor,
+        )
+        app = FastAPI()
+        add_tus_routers(app, config)
+
+        async def scenario():
+            response = await send_request(
+                app,
+                "POST",
+                "/files",
+                headers={"tus-resumable": TUS_RESUMABLE, "upload-length": "1000"},
+            )
+            url = "/files/" + response.headers["location"].rsplit("/", 1)[1]
+            for offset in (0, 500):
+                response = await send_request(
+                    app,
+                    "PATCH",
+                    url,
+                    headers={
+                        "tus-resumable": TUS_RESUMABLE,
+                        "content-type": "application/offset+octet-stream",
+                        "upload-offset": str(offset),
+                    },
+                    body=b"x" * 500,
+                )
+            return response
+
+        response = asyncio.run(scenario())
+        assert advisor.throughput > 0
+        # Measured from the second request on.
+        assert advisor.latency >= 0
+        assert response.headers["x-tus-recommended-chunk-size"] == str(
+            advisor.recommend()
+        )
@@ -0,0 +1,96 @@
+import asyncio
+import socket
+
+import pytest
+
+from tusfastapiserver.cluster import FORWARDED_NODE_HEADER
+from tusfastapiserver.cluster import NodeProxy
+from tusfastapiserver.cluster import NodeRoutingMiddleware
+from tusfastapiserver.config import Config
+from tusfastapiserver.config import NodeRoutingMode
+
+
+@pytest.fixture
+def config():
+    return Config(node_id="a", node_urls={"a": "http://a", "b": "http://b:8000"})
+
+
+def create_scope(path: str, headers=None, query_string: bytes = b"") -> dict:
+    return {
+        "type": "http",
+        "method": "PATCH",
+        "path": path,
+        "query_string": query_string,
+        "headers": headers or [],
+    }
+
+
+def run_middleware(middleware: NodeRoutingMiddleware, scope: dict) -> list:
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(middleware(scope, receive, send))
+    return messages
+
+
+class TestNodeRoutingMiddleware:
+    @pytest.mark.parametrize(
+        "path, headers, expected",
+        [
+            ("/files/b.0123", [], "http://b:8000"),
+            ("/files/a.0123", [], None),  # Owned by this node
+            ("/files/c.0123", [], None),  # Unknown node
+            ("/files/0123", [], None),  # No node part
+            ("/files", [], None),
+            ("/files/_admin/usage", [], None),
+            ("/other/b.0123", [], None),
+            ("/files/b.0123", [(FORWARDED_NODE_HEADER.encode(), b"a")], None),
+        ],
+    )
+    def test_get_owner_url(self, config, path, headers, expected):
+        middleware = NodeRoutingMiddleware(app=None, config=config)
+        assert middleware._get_owner_url(create_scope(path, headers)) == expected
+
+    def test_redirects_to_owner(self, config):
+        middleware = NodeRoutingMiddleware(app=None, config=config)
+        messages = run_middleware(
+            middleware, create_scope("/files/b.0123", query_string=b"x=1")
+        )
+        assert messages[0]["status"] == 307
+        location = (b"location", b"http://b:8000/files/b.0123?x=1")
+        assert location in messages[0]["headers"]
+
+    def test_passes_through_local_uploads(self, config):
+        called = []
+
+        async def app(scope, receive, send):
+            called.append(scope["path"])
+
+        middleware = NodeRoutingMiddleware(app=app, config=config)
+        run_middleware(middleware, create_scope("/files/a.0123"))
+        assert called == ["/files/a.0123"]
+
+    def test_dead_owner_is_a_bad_gateway(self):
+        pytest.importorskip("httpx")
+        # A port nothing listens on.
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        config = Config(
+            node_id="a",
+            node_urls={"a": "http://a", "b": f"http://127.0.0.1:{port}"},
+            node_routing_mode=NodeRoutingMode.PROXY,
+        )
+        proxy = NodeProxy(timeout=5.0)
+        middleware = NodeRoutingMiddleware(app=None, config=config, proxy=proxy)
+        try:
+            messages = run_middleware(middleware, create_scope("/files/b.0123"))
+        finally:
+            asyncio.run(proxy.stop())
+        assert messages[0]["status"] == 502
+        assert (b"tus-resumable", b"1.0.0") in messages[0]["headers"]
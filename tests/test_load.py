@@ -0,0 +1,106 @@
+import asyncio
+import errno
+import os
+
+import pytest
+
+from tusfastapiserver.config import MetadataStrategyType
+from tusfastapiserver.config import StorageStrategyType
+from tusfastapiserver.schemas import UploadMetadata
+from tusfastapiserver.storages import LocalStorageStrategy
+from tusfastapiserver.testing.faults import FaultInjector
+from tusfastapiserver.testing.faults import with_faults
+from tusfastapiserver.testing.load import ASGITransport
+from tusfastapiserver.testing.load import HTTPTransport
+from tusfastapiserver.testing.load import create_app_factory
+from tusfastapiserver.testing.load import main
+from tusfastapiserver.testing.load import run_load
+
+
+class TestFaultInjector:
+    def test_failing_update_writes_part_of_the_chunk(self, config):
+        injector = FaultInjector(enospc_probability=1.0)
+        strategy = with_faults(LocalStorageStrategy, injector)(config)
+        metadata = UploadMetadata(
+            id="upload",
+            upload_length=10,
+            upload_storage_path=strategy.generate_file_path("upload"),
+            upload_metadata_path="upload.json",
+            storage_strategy_type=StorageStrategyType.LOCAL,
+            metadata_strategy_type=MetadataStrategyType.LOCAL,
+        )
+        injector.enabled = False
+        strategy.initialize(metadata)
+        injector.enabled = True
+
+        with pytest.raises(OSError) as error:
+            strategy.update(metadata, b"0123456789")
+
+        assert error.value.errno == errno.ENOSPC
+        assert strategy.get_size(metadata) == 5
+        assert injector.stats() == {"ENOSPC update": 1}
+
+    def test_reads_never_fail(self, config):
+        injector = FaultInjector(enospc_probability=1.0)
+        strategy = with_faults(LocalStorageStrategy, injector)(config)
+        assert strategy.is_file_exists("missing") is False
+        assert injector.stats() == {}
+
+    def test_keeps_class_name(self):
+        faulty_cls = with_faults(LocalStorageStrategy, FaultInjector())
+        assert issubclass(faulty_cls, LocalStorageStrategy)
+        assert faulty_cls.__name__ == "FaultyLocalStorageStrategy"
+
+
+class TestRunLoad:
+    def run(self, path, injector=None, **options):
+        transport = ASGITransport(create_app_factory(str(path), injector))
+        return asyncio.run(
+            run_load(
+                transport,
+                clients=4,
+                uploads_per_client=2,
+                min_size=10_000,
+                max_size=50_000,
+                seed=1,
+                min_chunk=1024,
+                max_chunk=8192,
+                **options,
+            )
+        )
+
+    def test_uploads_are_verified(self, tmp_path):
+        report = self.run(tmp_path)
+        assert report.uploads_verified == 8
+        assert report.uploads_corrupted == 0
+        assert report.latency_summary()["PATCH"]["count"] >= 8
+
+    def test_uploads_survive_faults_and_restarts(self, tmp_path):
+        injector = FaultInjector(
+            slow_probability=0.05, slow_delay=0.01, enospc_probability=0.05, seed=1
+        )
+        report = self.run(
+            tmp_path,
+            injector,
+            restart_interval=0.02,
+            disconnect_probability=0.2,
+        )
+        assert report.uploads_verified == 8
+        assert report.uploads_corrupted == 0
+        assert report.uploads_failed == 0
+        assert report.disconnects > 0
+
+    def test_report_is_serializable(self, tmp_path):
+        report = self.run(tmp_path).to_dict()
+        assert report["uploads_started"] == 8
+        assert set(report["latency"]) >= {"POST", "PATCH", "GET"}
+        assert os.listdir(tmp_path)
+
+    def test_rejects_restarts_of_a_running_server(self, capsys):
+        transport = HTTPTransport("http://localhost:8000")
+        with pytest.raises(ValueError):
+            asyncio.run(run_load(transport, restart_interval=1.0))
+
+        with pytest.raises(SystemExit):
+            main(["--url", "http://localhost:8000", "--restart-interval", "1"])
+        assert "--restart-interval" in capsys.readouterr().err
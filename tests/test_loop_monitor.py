@@ -0,0 +1,127 @@
+import asyncio
+import json
+import threading
+import time
+
+from fastapi import FastAPI
+
+from tusfastapiserver.config import Config
+from tusfastapiserver.loop_monitor import BlockingEvent
+from tusfastapiserver.loop_monitor import LoopMonitor
+from tusfastapiserver.metadata import LocalMetadataStrategy
+from tusfastapiserver.routers import BaseRouter
+from tusfastapiserver.routers import add_tus_routers
+from tusfastapiserver.testing import send_request
+
+
+class SlowMetadataStrategy(LocalMetadataStrategy):
+    def _update_metadata_file(self, *args, **kwargs):
+        time.sleep(0.3)
+
+
+class SlowRouter(BaseRouter):
+    def _get_router_path(self) -> str:
+        return "/slow"
+
+    async def handle(self):
+        SlowMetadataStrategy(self.config)._update_metadata_file()
+
+
+async def run_monitor(monitor: LoopMonitor, blocking):
+    await monitor.start()
+    try:
+        await asyncio.sleep(0.1)
+        await blocking()
+        await asyncio.sleep(0.2)
+    finally:
+        await monitor.stop()
+
+
+class TestLoopMonitor:
+    def test_attributes_stall_to_router_and_strategy_method(self, tmp_path):
+        config = Config(file_path=str(tmp_path), metadata_path=str(tmp_path))
+        monitor = LoopMonitor(interval=0.01, block_threshold=0.1)
+
+        router = SlowRouter(config)
+        asyncio.run(run_monitor(monitor, router.handle))
+        report = monitor.report()
+        assert report["blocked_count"] == 1
+        assert report["blocked_seconds"] >= 0.2
+        event = report["events"][0]
+        assert event["router"] == "SlowRouter.handle"
+        assert event["function"] == "SlowMetadataStrategy._update_metadata_file"
+        assert report["blocking_by_function"] == {
+            "SlowRouter.handle -> SlowMetadataStrategy._update_metadata_file": {
+                "count": 1,
+                "seconds": event["duration"],
+            }
+        }
+        assert report["lag_max"] >= 0.2
+        assert not report["running"]
+
+    def test_records_stall_without_router(self):
+        async def block():
+            time.sleep(0.3)
+
+        monitor = LoopMonitor(interval=0.01, block_threshold=0.1)
+        asyncio.run(run_monitor(monitor, block))
+        event = monitor.report()["events"][0]
+        assert event["router"] is None
+        assert event["function"] is None
+        assert "block" in event["stack"][0]
+
+    def test_no_stall_is_recorded_for_idle_loop(self):
+        async def idle():
+            await asyncio.sleep(0.1)
+
+        monitor = LoopMonitor(interval=0.01, block_threshold=0.1)
+        asyncio.run(run_monitor(monitor, idle))
+        assert monitor.stats()["blocked_count"] == 0
+        assert monitor.stats()["lag_p50"] < 0.1
+
+    def test_report_is_a_copy_taken_while_events_are_recorded(self):
+        monitor = LoopMonitor(max_events=10)
+
+        def record():
+            for index in range(2000):
+                event = BlockingEvent(0.0, 0.0, None, f"function{index % 50}", [])
+                monitor._record_event(event, 0.001)
+
+        thread = threading.Thread(target=record)
+        thread.start()
+        while thread.is_alive():
+            monitor.report()
+        thread.join()
+
+        report = monitor.report()
+        assert report["blocked_count"] == 2000
+        assert len(report["events"]) == 10
+        report["blocking_by_function"]["None -> function0"]["count"] = 0
+        totals = monitor.report()["blocking_by_function"]["None -> function0"]
+        assert totals["count"] == 40
+
+    def test_endpoint(self, tmp_path):
+        monitor = LoopMonitor()
+        config = Config(
+            file_path=str(tmp_path),
+            metadata_path=str(tmp_path),
+            loop_monitor=monitor,
+            enable_loop_monitor_endpoint=True,
+            enable_usage_endpoint=True,
+        )
+        app = FastAPI()
+        add_tus_routers(app, config)
+
+        async def main():
+            async with app.router.lifespan_context(app):
+                assert monitor.is_running
+                await asyncio.sleep(0.2)
+                loop = await send_request(app, "GET", "/files/_admin/loop")
+                usage = await send_request(app, "GET", "/files/_admin/usage")
+            return loop, usage
+
+        loop, usage = asyncio.run(main())
+        assert not monitor.is_running
+        assert loop.status_code == 200
+        assert json.loads(loop.body)["events"] == []
+        assert json.loads(usage.body)["event_loop"]["blocked_count"] == 0
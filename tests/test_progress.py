@@ -0,0 +1,207 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import FastAPI
+
+from tusfastapiserver import TUS_RESUMABLE
+from tusfastapiserver.config import Config
+from tusfastapiserver.config import TusExtension
+from tusfastapiserver.progress import LocalProgressBroadcaster
+from tusfastapiserver.routers import add_tus_routers
+from tusfastapiserver.testing import send_request
+
+
+class CountingBroadcaster(LocalProgressBroadcaster):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.batches = []
+
+    async def _send(self, batch):
+        self.batches.append(batch)
+        await super()._send(batch)
+
+
+def parse_events(body: bytes):
+    events = []
+    for message in body.decode().split("\n\n"):
+        lines = dict(
+            line.split(": ", 1) for line in message.splitlines() if ": " in line
+        )
+        if "event" in lines:
+            events.append((lines["event"], lines["data"]))
+    return events
+
+
+class TestLocalProgressBroadcaster:
+    def test_coalesces_updates(self, create_metadata):
+        async def scenario():
+            broadcaster = CountingBroadcaster(interval=0.05)
+            await broadcaster.start()
+            with broadcaster.subscribe(["a"]) as subscription:
+                for offset in range(1, 101):
+                    broadcaster.publish(
+                        create_metadata("a", upload_offset=offset, upload_length=100)
+                    )
+                    broadcaster.publish(
+                        create_metadata("b", upload_offset=offset, upload_length=100)
+                    )
+                updates = await subscription.get(timeout=1)
+            await broadcaster.stop()
+            return broadcaster, updates
+
+        broadcaster, updates = asyncio.run(scenario())
+        assert [(progress.id, progress.upload_offset) for progress in updates] == [
+            ("a", 100)
+        ]
+        assert len(broadcaster.batches) == 1
+
+    def test_rate_limits_batches(self, create_metadata):
+        async def scenario():
+            broadcaster = CountingBroadcaster(interval=0.05)
+            await broadcaster.start()
+            for offset in range(30):
+                broadcaster.publish(
+                    create_metadata("a", upload_offset=offset, upload_length=100)
+                )
+                await asyncio.sleep(0.01)
+            await broadcaster.stop()
+            return broadcaster
+
+        broadcaster = asyncio.run(scenario())
+        assert 2 <= len(broadcaster.batches) <= 8
+        assert broadcaster.batches[-1][-1].upload_offset == 29
+
+    def test_stop_closes_subscriptions(self):
+        async def scenario():
+            broadcaster = LocalProgressBroadcaster()
+            await broadcaster.start()
+            subscription = broadcaster.subscribe(["a", "b"])
+            assert broadcaster.subscriber_count == 1
+            await broadcaster.stop()
+            return broadcaster, subscription, await subscription.get(timeout=1)
+
+        broadcaster, subscription, updates = asyncio.run(scenario())
+        assert subscription.closed
+        assert updates == []
+        assert broadcaster.subscriber_count == 0
+
+    def test_publish_before_start_is_ignored(self, create_metadata):
+        broadcaster = LocalProgressBroadcaster()
+        broadcaster.publish(create_metadata("a", upload_length=100))
+        assert broadcaster._pending == {}
+
+
+class TestProgressRouter:
+    @pytest.fixture
+    def config(self, tmp_path):
+        return Config(
+            file_path=str(tmp_path),
+            metadata_path=str(tmp_path),
+            enable_progress_endpoint=True,
+            progress_broadcaster=LocalProgressBroadcaster(interval=0.01),
+            max_progress_subscription_size=3,
+            enabled_extensions=[TusExtension.CREATION, TusExtension.TERMINATION],
+        )
+
+    @pytest.fixture
+    def app(self, config):
+        app = FastAPI()
+        add_tus_routers(app, config)
+        return app
+
+    def test_streams_committed_offsets(self, app):
+        async def scenario():
+            async with app.router.lifespan_context(app):
+                response = await send_request(
+                    app,
+                    "POST",
+                    "/files",
+                    headers={"tus-resumable": TUS_RESUMABLE, "upload-length": "100"},
+                )
+                file_id = response.headers["location"].rsplit("/", 1)[1]
+                stream = asyncio.create_task(
+                    send_request(
+                        app, "GET", f"/files/_progress/events?id={file_id}&id=missing"
+                    )
+                )
+                await asyncio.sleep(0.05)
+                for offset in (0, 50):
+                    await send_request(
+                        app,
+                        "PATCH",
+                        f"/files/{file_id}",
+                        headers={
+                            "tus-resumable": TUS_RESUMABLE,
+                            "content-type": "application/offset+octet-stream",
+                            "upload-offset": str(offset),
+                        },
+                        body=b"x" * 50,
+                    )
+                return file_id, await asyncio.wait_for(stream, 5)
+
+        file_id, response = asyncio.run(scenario())
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = parse_events(response.body)
+        assert events[0][0] == "progress"
+        assert json.loads(events[0][1]) == {
+            "id": file_id,
+            "upload_offset": 0,
+            "upload_length": 100,
+        }
+        assert events[1] == ("not_found", "missing")
+        assert json.loads(events[-1][1])["upload_offset"] == 100
+
+    def test_completed_upload_ends_stream(self, app):
+        async def scenario():
+            async with app.router.lifespan_context(app):
+                response = await send_request(
+                    app,
+                    "POST",
+                    "/files",
+                    headers={"tus-resumable": TUS_RESUMABLE, "upload-length": "0"},
+                )
+                file_id = response.headers["location"].rsplit("/", 1)[1]
+                return await asyncio.wait_for(
+                    send_request(app, "GET", f"/files/_progress/events?id={file_id}"),
+                    5,
+                )
+
+        response = asyncio.run(scenario())
+        assert [event for event, _ in parse_events(response.body)] == ["progress"]
+
+    def test_terminated_upload_ends_stream(self, app):
+        async def scenario():
+            async with app.router.lifespan_context(app):
+                response = await send_request(
+                    app,
+                    "POST",
+                    "/files",
+                    headers={"tus-resumable": TUS_RESUMABLE, "upload-length": "100"},
+                )
+                file_id = response.headers["location"].rsplit("/", 1)[1]
+                stream = asyncio.create_task(
+                    send_request(app, "GET", f"/files/_progress/events?id={file_id}")
+                )
+                await asyncio.sleep(0.05)
+                await send_request(
+                    app,
+                    "DELETE",
+                    f"/files/{file_id}",
+                    headers={"tus-resumable": TUS_RESUMABLE},
+                )
+                return file_id, await asyncio.wait_for(stream, 5)
+
+        file_id, response = asyncio.run(scenario())
+        assert parse_events(response.body)[-1] == ("terminated", file_id)
+
+    def test_rejects_too_many_uploads(self, app):
+        response = asyncio.run(
+            send_request(app, "GET", "/files/_progress/events?id=a&id=b&id=c&id=d")
+        )
+        assert response.status_code == 400
+
+    def test_requires_ids(self, app):
+        response = asyncio.run(send_request(app, "GET", "/files/_progress/events"))
+        assert response.status_code == 422
@@ -0,0 +1,287 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+
+import pytest
+from fastapi import FastAPI
+
+from tusfastapiserver.config import CompressionCodec
+from tusfastapiserver.config import Config
+from tusfastapiserver.config import MetadataStrategyType
+from tusfastapiserver.metadata import LocalMetadataStrategy
+from tusfastapiserver.recovery import RecoveryAction
+from tusfastapiserver.recovery import StartupRecoveryLock
+from tusfastapiserver.recovery import UploadReconciler
+from tusfastapiserver.recovery import main
+from tusfastapiserver.routers import add_tus_routers
+from tusfastapiserver.schemas import UploadMetadata
+from tusfastapiserver.storages import CompressedStorageStrategy
+from tusfastapiserver.storages import LocalStorageStrategy
+from tusfastapiserver.storages.compressed import iter_decompressed
+from tusfastapiserver.storages.volumes import VolumeSet
+
+
+@pytest.fixture
+def reconciler(config, tmp_path):
+    return UploadReconciler(
+        config, max_workers=2, checkpoint_path=str(tmp_path / "checkpoint.json")
+    )
+
+
+def create_upload(config, file_id, data, upload_offset, upload_length=None):
+    storage_strategy = LocalStorageStrategy(config)
+    metadata_strategy = LocalMetadataStrategy(config)
+    metadata = UploadMetadata(
+        id=file_id,
+        upload_storage_path=storage_strategy.generate_file_path(file_id),
+        upload_metadata_path=metadata_strategy.generate_metadata_path(file_id),
+        storage_strategy_type=storage_strategy.storage_strategy_type,
+        metadata_strategy_type=metadata_strategy.metadata_strategy_type,
+        upload_offset=upload_offset,
+        upload_length=upload_length,
+    )
+    storage_strategy.initialize(metadata)
+    metadata_strategy.initialize(metadata)
+    with open(metadata.upload_storage_path, "wb") as f:
+        f.write(data)
+    return metadata
+
+
+def set_mtime(path, mtime):
+    os.utime(path, (mtime, mtime))
+
+
+def hold_recovery_lock(path, locked, done):
+    lock = StartupRecoveryLock(path)
+    lock.acquire()
+    lock.share()
+    locked.set()
+    done.wait(30)
+    lock.release()
+
+
+class TestUploadReconciler:
+    def test_rejects_journal_metadata(self, config):
+        config.metadata_strategy_type = MetadataStrategyType.JOURNAL
+        with pytest.raises(ValueError):
+            UploadReconciler(config)
+
+    def test_consistent_upload_is_verified(self, config, reconciler):
+        create_upload(config, "a", b"12345", upload_offset=5, upload_length=10)
+        assert reconciler.reconcile("a") == RecoveryAction.VERIFIED
+
+    def test_repairs_offset_from_data_size(self, config, reconciler):
+        create_upload(config, "a", b"12345", upload_offset=2, upload_length=10)
+        assert reconciler.reconcile("a") == RecoveryAction.OFFSET_REPAIRED
+        assert LocalMetadataStrategy(config).get_metadata("a").upload_offset == 5
+
+    def test_truncates_data_beyond_upload_length(self, config, reconciler):
+        metadata = create_upload(
+            config, "a", b"1234567", upload_offset=3, upload_length=5
+        )
+        assert reconciler.reconcile("a") == RecoveryAction.TRUNCATED
+        assert os.path.getsize(metadata.upload_storage_path) == 5
+        assert LocalMetadataStrategy(config).get_metadata("a").upload_offset == 5
+
+    def test_quarantines_data_without_metadata(self, config, reconciler):
+        metadata = create_upload(config, "a", b"123", upload_offset=3)
+        os.remove(metadata.upload_metadata_path)
+        assert reconciler.reconcile("a") == RecoveryAction.QUARANTINED_DATA
+        assert not os.path.exists(metadata.upload_storage_path)
+        assert os.path.exists(os.path.join(reconciler.quarantine_path, "data", "a"))
+
+    def test_quarantines_metadata_without_data(self, config, reconciler):
+        metadata = create_upload(config, "a", b"123", upload_offset=3)
+        os.remove(metadata.upload_storage_path)
+        assert reconciler.reconcile("a") == RecoveryAction.QUARANTINED_METADATA
+        assert not os.path.exists(metadata.upload_metadata_path)
+        assert os.path.exists(
+            os.path.join(reconciler.quarantine_path, "metadata", "a.json")
+        )
+
+    def test_quarantines_corrupted_metadata(self, config, reconciler):
+        metadata = create_upload(config, "a", b"123", upload_offset=3)
+        with open(metadata.upload_metadata_path, "w") as f:
+            f.write("{")
+        assert reconciler.reconcile("a") == RecoveryAction.QUARANTINED_METADATA
+        assert not os.path.exists(metadata.upload_storage_path)
+
+    def test_run_reports_actions(self, config, reconciler):
+        create_upload(config, "a", b"12", upload_offset=2)
+        create_upload(config, "b", b"12", upload_offset=1)
+        report = reconciler.run()
+        assert report.total == 2
+        assert report.actions == {
+            RecoveryAction.VERIFIED: 1,
+            RecoveryAction.OFFSET_REPAIRED: 1,
+        }
+
+    def test_run_skips_uploads_unchanged_since_checkpoint(self, config, reconciler):
+        old = create_upload(config, "a", b"12", upload_offset=1)
+        recent = create_upload(config, "b", b"12", upload_offset=1)
+        for path in (old.upload_storage_path, old.upload_metadata_path):
+            set_mtime(path, time.time() - 3600)
+        with open(reconciler.checkpoint_path, "w") as f:
+            json.dump({"verified_before": time.time() - 60, "in_progress": None}, f)
+
+        report = reconciler.run()
+        assert report.actions == {
+            RecoveryAction.UNCHANGED: 1,
+            RecoveryAction.OFFSET_REPAIRED: 1,
+        }
+        assert LocalMetadataStrategy(config).get_metadata("a").upload_offset == 1
+        assert LocalMetadataStrategy(config).get_metadata(recent.id).upload_offset == 2
+
+        report = reconciler.run(full=True)
+        assert report.actions[RecoveryAction.OFFSET_REPAIRED] == 1
+
+    def test_run_resumes_interrupted_run(self, config, reconciler):
+        create_upload(config, "a", b"12", upload_offset=1)
+        create_upload(config, "b", b"12", upload_offset=1)
+        with open(reconciler.checkpoint_path, "w") as f:
+            json.dump(
+                {
+                    "verified_before": None,
+                    "in_progress": {"started_at": time.time(), "position": "a"},
+                },
+                f,
+            )
+        report = reconciler.run()
+        assert report.total == 1
+        assert LocalMetadataStrategy(config).get_metadata("a").upload_offset == 1
+        assert LocalMetadataStrategy(config).get_metadata("b").upload_offset == 2
+
+        with open(reconciler.checkpoint_path) as f:
+            assert json.load(f)["in_progress"] is None
+
+    def test_run_saves_checkpoint_per_batch(self, config, tmp_path):
+        reconciler = UploadReconciler(
+            config, batch_size=1, checkpoint_path=str(tmp_path / "checkpoint.json")
+        )
+        create_upload(config, "a", b"1", upload_offset=1)
+        create_upload(config, "b", b"1", upload_offset=1)
+        checkpoints = []
+        save_checkpoint = reconciler._save_checkpoint
+        reconciler._save_checkpoint = lambda checkpoint: (
+            checkpoints.append(checkpoint),
+            save_checkpoint(checkpoint),
+        )
+        reconciler.run()
+        in_progress = [checkpoint["in_progress"] for checkpoint in checkpoints]
+        positions = [upload and upload["position"] for upload in in_progress]
+        assert positions == ["a", "b", None]
+
+    def test_run_reports_failures_and_checkpoints_before_them(self, config, reconciler):
+        for file_id in ("a", "b", "c"):
+            create_upload(config, file_id, b"12", upload_offset=1)
+        reconcile = reconciler.reconcile
+
+        def fail_on_b(file_id):
+            if file_id == "b":
+                raise OSError("Input/output error")
+            return reconcile(file_id)
+
+        reconciler.reconcile = fail_on_b
+        report = reconciler.run()
+        assert report.failed == 1
+        assert report.actions[RecoveryAction.OFFSET_REPAIRED] == 2
+        with open(reconciler.checkpoint_path) as f:
+            checkpoint = json.load(f)
+        assert checkpoint["verified_before"] is None
+        assert checkpoint["in_progress"]["position"] == "a"
+
+        reconciler.reconcile = reconcile
+        report = reconciler.run()
+        assert report.actions == {
+            RecoveryAction.OFFSET_REPAIRED: 1,
+            RecoveryAction.VERIFIED: 1,
+        }
+        with open(reconciler.checkpoint_path) as f:
+            assert json.load(f)["in_progress"] is None
+
+    def test_main(self, config, tmp_path, capsys):
+        create_upload(config, "a", b"12", upload_offset=1)
+        assert (
+            main(["--file-path", str(tmp_path), "--metadata-path", str(tmp_path)]) == 0
+        )
+        output = json.loads(capsys.readouterr().out)
+        assert output["actions"] == {"OFFSET_REPAIRED": 1}
+
+    def test_reconciles_uploads_on_all_volumes(self, tmp_path):
+        volumes = [str(tmp_path / "disk1"), str(tmp_path / "disk2")]
+        config = Config(
+            file_path=volumes[0],
+            metadata_path=str(tmp_path / "metadata"),
+            storage_volumes=VolumeSet(volumes),
+        )
+        create_upload(config, "a", b"12", upload_offset=1)
+        metadata = create_upload(config, "b", b"12", upload_offset=1)
+        assert metadata.upload_storage_path.startswith(volumes[1])
+        os.remove(metadata.upload_metadata_path)
+
+        report = UploadReconciler(config).run()
+        assert report.actions == {
+            RecoveryAction.OFFSET_REPAIRED: 1,
+            RecoveryAction.QUARANTINED_DATA: 1,
+        }
+
+    @pytest.mark.parametrize("compression", [None, "GZIP"])
+    def test_reconciles_compressed_uploads(self, config, tmp_path, compression, capsys):
+        text = b"2025-01-01,INFO,request handled\n" * 2000
+        metadata = create_upload(config, "a", b"", upload_offset=1000)
+        strategy = CompressedStorageStrategy(LocalStorageStrategy(config))
+        strategy.initialize(metadata)
+        for start in range(0, len(text), 8192):
+            strategy.update(metadata, text[start : start + 8192])
+        assert os.path.getsize(metadata.upload_storage_path) < len(text) / 5
+        raw = create_upload(config, "b", b"12", upload_offset=1)
+
+        argv = ["--file-path", str(tmp_path), "--metadata-path", str(tmp_path)]
+        if compression is not None:
+            argv += ["--compression", compression, "--compression-level", "1"]
+        assert main(argv) == 0
+
+        metadata_strategy = LocalMetadataStrategy(config)
+        assert metadata_strategy.get_metadata("a").upload_offset == len(text)
+        assert b"".join(iter_decompressed(metadata.upload_storage_path)) == text
+        assert metadata_strategy.get_metadata("b").upload_offset == 2
+        with open(raw.upload_storage_path, "rb") as f:
+            assert f.read() == b"12"
+
+
+class TestStartupRecovery:
+    def test_recovers_on_startup(self, config, tmp_path):
+        config.recover_on_startup = True
+        config.recovery_checkpoint_path = str(tmp_path / "checkpoint.json")
+        create_upload(config, "a", b"12", upload_offset=1)
+        app = FastAPI()
+        add_tus_routers(app, config)
+
+        async def run():
+            async with app.router.lifespan_context(app):
+                metadata = LocalMetadataStrategy(config).get_metadata("a")
+                assert metadata.upload_offset == 2
+
+        asyncio.run(run())
+
+    def test_worker_skips_recovery_while_another_serves(self, tmp_path):
+        path = str(tmp_path / "recovery.lock")
+        context = multiprocessing.get_context("spawn")
+        locked, done = context.Event(), context.Event()
+        process = context.Process(target=hold_recovery_lock, args=(path, locked, done))
+        process.start()
+        try:
+            assert locked.wait(30)
+            lock = StartupRecoveryLock(path)
+            assert not lock.acquire()
+            lock.release()
+        finally:
+            done.set()
+            process.join(30)
+        assert process.exitcode == 0
+
+        lock = StartupRecoveryLock(path)
+        assert lock.acquire()
+        lock.release()
@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+
+from tusfastapiserver.config import Config
+from tusfastapiserver.metadata import LocalMetadataStrategy
+from tusfastapiserver.registry import StrategyRegistry
+from tusfastapiserver.routers import HeadRouter
+from tusfastapiserver.routers import PatchRouter
+from tusfastapiserver.routers import PostRouter
+from tusfastapiserver.routers import add_tus_routers
+from tusfastapiserver.storages import LocalStorageStrategy
+
+
+class RecordingStorageStrategy(LocalStorageStrategy):
+    events = []
+
+    def open(self):
+        self.events.append("open storage")
+
+    def close(self):
+        self.events.append("close storage")
+
+
+class FailingMetadataStrategy(LocalMetadataStrategy):
+    def open(self):
+        raise OSError("metadata backend is unavailable")
+
+
+@pytest.fixture
+def config(tmp_path):
+    return Config(file_path=str(tmp_path), metadata_path=str(tmp_path / "metadata"))
+
+
+@pytest.fixture(autouse=True)
+def clear_events():
+    RecordingStorageStrategy.events.clear()
+
+
+class TestStrategyRegistry:
+    def test_routers_share_strategies(self, config):
+        registry = StrategyRegistry(config)
+        routers = [
+            router_cls(config=config, registry=registry)
+            for router_cls in (PostRouter, PatchRouter, HeadRouter)
+        ]
+        assert len({id(router.storage_strategy) for router in routers}) == 1
+        assert len({id(router.metadata_strategy) for router in routers}) == 1
+        assert len(registry.strategies) == 2
+
+    def test_routers_without_registry_do_not_share(self, config):
+        first, second = PostRouter(config=config), PatchRouter(config=config)
+        assert first.storage_strategy is not second.storage_strategy
+
+    def test_strategy_set_on_router_is_shared(self, config):
+        registry = StrategyRegistry(config)
+        post_router = PostRouter(config=config, registry=registry)
+        patch_router = PatchRouter(config=config, registry=registry)
+        post_router.storage_strategy = RecordingStorageStrategy
+        patch_router.storage_strategy = RecordingStorageStrategy
+        assert post_router.storage_strategy is patch_router.storage_strategy
+
+    def test_startup_opens_and_shutdown_closes(self, config):
+        registry = StrategyRegistry(config)
+        registry.get_storage_strategy(RecordingStorageStrategy)
+        metadata_strategy = registry.get_metadata_strategy()
+
+        asyncio.run(registry.startup())
+        assert registry.is_started
+        assert RecordingStorageStrategy.events == ["open storage"]
+        assert metadata_strategy.strategy._read_executor is not None
+
+        asyncio.run(registry.shutdown())
+        assert not registry.is_started
+        assert RecordingStorageStrategy.events == ["open storage", "close storage"]
+        assert metadata_strategy.strategy._read_executor is None
+
+    def test_failed_startup_closes_opened_strategies(self, config):
+        registry = StrategyRegistry(config)
+        registry.get_storage_strategy(RecordingStorageStrategy)
+        registry.get_metadata_strategy(FailingMetadataStrategy)
+
+        with pytest.raises(OSError):
+            asyncio.run(registry.startup())
+        assert RecordingStorageStrategy.events == ["open storage", "close storage"]
+
+    def test_add_tus_routers_uses_lifespan(self, config):
+        app = FastAPI()
+        registry = StrategyRegistry(config)
+        registry.get_storage_strategy(RecordingStorageStrategy)
+        add_tus_routers(app, config, registry=registry)
+
+        async def main():
+            async with app.router.lifespan_context(app):
+                assert registry.is_started
+
+        asyncio.run(main())
+        assert RecordingStorageStrategy.events == ["open storage", "close storage"]
+
+    def test_default_strategy_classes_can_be_replaced(self, config):
+        registry = StrategyRegistry(
+            config, storage_strategy_cls=RecordingStorageStrategy
+        )
+        router = PostRouter(config=config, registry=registry)
+        assert isinstance(router.storage_strategy.strategy, RecordingStorageStrategy)
+        assert isinstance(router.metadata_strategy.strategy, LocalMetadataStrategy)
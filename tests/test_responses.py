@@ -0,0 +1,102 @@
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+from tusfastapiserver.responses import FileRangeResponse
+from tusfastapiserver.responses import ZERO_COPY_SEND_EXTENSION
+
+
+def run_response(response: FileRangeResponse, scope: dict) -> list:
+    messages = []
+
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(response(scope, receive, send))
+    return messages
+
+
+class TestFileRangeResponse:
+    def test_sends_chunks_without_zero_copy(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "file")
+            with open(path, "wb") as f:
+                f.write(b"hello world")
+            response = FileRangeResponse(path, offset=6, count=5)
+            response.chunk_size = 2
+            messages = run_response(response, {"type": "http", "method": "GET"})
+
+        assert messages[0]["status"] == 200
+        assert (b"content-length", b"5") in messages[0]["headers"]
+        assert b"".join(message["body"] for message in messages[1:]) == b"world"
+        assert messages[-1]["more_body"] is False
+
+    def test_uses_zero_copy_send_extension(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "file")
+            with open(path, "wb") as f:
+                f.write(b"hello world")
+            response = FileRangeResponse(path, offset=6, count=5)
+            scope = {
+                "type": "http",
+                "method": "GET",
+                "extensions": {ZERO_COPY_SEND_EXTENSION: {}},
+            }
+            messages = run_response(response, scope)
+
+        assert messages[1]["type"] == ZERO_COPY_SEND_EXTENSION
+        assert messages[1]["offset"] == 6
+        assert messages[1]["count"] == 5
+
+    def test_head_sends_no_body(self):
+        response = FileRangeResponse("missing", offset=0, count=5)
+        messages = run_response(response, {"type": "http", "method": "HEAD"})
+        assert messages[1] == {
+            "type": "http.response.body",
+            "body": b"",
+            "more_body": False,
+        }
+
+    def test_short_file_is_an_error(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "file")
+            with open(path, "wb") as f:
+                f.write(b"hello")
+            response = FileRangeResponse(path, offset=0, count=11)
+            messages = []
+
+            async def receive():
+                return {"type": "http.request"}
+
+            async def send(message):
+                messages.append(message)
+
+            with pytest.raises(EOFError):
+                asyncio.run(response({"type": "http", "method": "GET"}, receive, send))
+        # No headers were sent, so the server can still answer with an error.
+        assert messages == []
+
+    def test_file_truncated_while_sent_is_an_error(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "file")
+            with open(path, "wb") as f:
+                f.write(b"hello world")
+            response = FileRangeResponse(path, offset=0, count=11)
+            response.chunk_size = 4
+            messages = []
+
+            async def receive():
+                return {"type": "http.request"}
+
+            async def send(message):
+                messages.append(message)
+                os.truncate(path, 6)
+
+            with pytest.raises(EOFError):
+                asyncio.run(response({"type": "http", "method": "GET"}, receive, send))
+        assert messages[-1]["more_body"] is True
@@ -0,0 +1,300 @@
+import asyncio
+import json
+import multiprocessing
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+import pytest
+from fastapi import FastAPI
+
+from tusfastapiserver import TUS_RESUMABLE
+from tusfastapiserver.config import Config
+from tusfastapiserver.config import MetadataStrategyType
+from tusfastapiserver.config import StorageStrategyType
+from tusfastapiserver.config import TusExtension
+from tusfastapiserver.routers import add_tus_routers
+from tusfastapiserver.schemas import UploadMetadata
+from tusfastapiserver.schemas import WebhookEventType
+from tusfastapiserver.testing import send_request
+from tusfastapiserver.webhooks import WebhookNotifier
+from tusfastapiserver.webhooks import WebhookOutbox
+
+
+class WebhookStub:
+    """Local HTTP server that records webhook batches and fails the first
+    ``failures`` requests with 503."""
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.batches = []
+        self.received = threading.Event()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["content-length"]))
+                if stub.failures > 0:
+                    stub.failures -= 1
+                    self.send_response(503)
+                else:
+                    stub.batches.append(json.loads(body)["events"])
+                    stub.received.set()
+                    self.send_response(204)
+                self.send_header("content-length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/hooks"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def events(self):
+        return [event for batch in self.batches for event in batch]
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    stub = WebhookStub()
+    yield stub
+    stub.close()
+
+
+def create_upload_metadata() -> UploadMetadata:
+    return UploadMetadata(
+        id="upload",
+        upload_length=10,
+        upload_offset=10,
+        upload_storage_path="upload",
+        storage_strategy_type=StorageStrategyType.LOCAL,
+        metadata_strategy_type=MetadataStrategyType.LOCAL,
+    )
+
+
+def claim_delivery(path: str):
+    sys.exit(0 if WebhookOutbox(path).claim_delivery() else 1)
+
+
+def run_in_process(target, *args) -> int:
+    process = multiprocessing.get_context("spawn").Process(target=target, args=args)
+    process.start()
+    process.join(30)
+    return process.exitcode
+
+
+async def wait_for(condition, timeout: float = 5.0):
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("Condition was not met in time")
+
+
+async def upload(app, data: bytes) -> str:
+    response = await send_request(
+        app,
+        "POST",
+        "/files",
+        headers={"tus-resumable": TUS_RESUMABLE, "upload-length": str(len(data))},
+    )
+    url = "/files/" + response.headers["location"].rsplit("/", 1)[1]
+    await send_request(
+        app,
+        "PATCH",
+        url,
+        headers={
+            "tus-resumable": TUS_RESUMABLE,
+            "content-type": "application/offset+octet-stream",
+            "upload-offset": "0",
+        },
+        body=data,
+    )
+    return url
+
+
+class TestWebhookNotifier:
+    def test_sends_lifecycle_events_in_batches(self, tmp_path, stub):
+        notifier = WebhookNotifier(stub.url, str(tmp_path / "webhooks"), interval=0.2)
+        config = Config(
+            file_path=str(tmp_path),
+            metadata_path=str(tmp_path),
+            enabled_extensions=[TusExtension.CREATION, TusExtension.TERMINATION],
+            webhook_notifier=notifier,
+        )
+        app = FastAPI()
+        add_tus_routers(app, config)
+
+        async def scenario():
+            async with app.router.lifespan_context(app):
+                urls = [await upload(app, b"x" * 10) for _ in range(3)]
+                await send_request(
+                    app, "DELETE", urls[0], headers={"tus-resumable": TUS_RESUMABLE}
+                )
+                await wait_for(lambda: len(stub.events) == 7)
+            return urls
+
+        urls = asyncio.run(scenario())
+        assert len(stub.batches) <= 3
+        types = [(event["type"], event["upload"]["id"]) for event in stub.events]
+        file_ids = [url.rsplit("/", 1)[1] for url in urls]
+        assert (WebhookEventType.CREATED.value, file_ids[1]) in types
+        assert (WebhookEventType.COMPLETED.value, file_ids[2]) in types
+        assert types[-1] == (WebhookEventType.TERMINATED.value, file_ids[0])
+        completed = stub.events[1]
+        assert completed["upload"]["upload_offset"] == 10
+
+    def test_retries_with_backoff(self, tmp_path):
+        stub = WebhookStub(failures=2)
+        notifier = WebhookNotifier(
+            stub.url, str(tmp_path), interval=0.01, retry_delay=0.05
+        )
+        upload_metadata = create_upload_metadata()
+
+        async def scenario():
+            await notifier.start()
+            await notifier.notify(WebhookEventType.COMPLETED, upload_metadata)
+            await wait_for(lambda: stub.batches)
+            await wait_for(lambda: notifier.outbox.read(10) == ([], 0))
+            await notifier.stop()
+
+        try:
+            asyncio.run(scenario())
+        finally:
+            stub.close()
+        assert len(stub.events) == 1
+        assert stub.failures == 0
+        assert notifier.outbox.read(10) == ([], 0)
+
+    def test_undelivered_events_survive_restart(self, tmp_path):
+        upload_metadata = create_upload_metadata()
+
+        async def queue_events():
+            notifier = WebhookNotifier("http://127.0.0.1:9/hooks", str(tmp_path))
+            await notifier.notify(WebhookEventType.CREATED, upload_metadata)
+            await notifier.notify(WebhookEventType.COMPLETED, upload_metadata)
+
+        asyncio.run(queue_events())
+        stub = WebhookStub()
+        notifier = WebhookNotifier(stub.url, str(tmp_path), interval=0.01)
+
+        async def deliver():
+            await notifier.start()
+            await wait_for(lambda: len(stub.events) == 2)
+            await notifier.stop()
+
+        try:
+            asyncio.run(deliver())
+        finally:
+            stub.close()
+        assert len(stub.batches) == 1
+
+    def test_gives_up_after_max_retries(self, tmp_path):
+        stub = WebhookStub(failures=100)
+        notifier = WebhookNotifier(
+            stub.url, str(tmp_path), interval=0.01, retry_delay=0.01, max_retries=2
+        )
+
+        async def scenario():
+            await notifier.start()
+            await notifier.notify(WebhookEventType.CREATED, create_upload_metadata())
+            await wait_for(lambda: stub.failures == 97)
+            await wait_for(lambda: notifier.outbox.read(10) == ([], 0))
+            await notifier.stop()
+
+        try:
+            asyncio.run(scenario())
+        finally:
+            stub.close()
+        with open(notifier.outbox.failed_file_path, encoding="utf-8") as f:
+            assert len(f.readlines()) == 1
+
+    def test_filters_event_types(self, tmp_path):
+        notifier = WebhookNotifier(
+            "http://127.0.0.1:9/hooks",
+            str(tmp_path),
+            event_types=[WebhookEventType.COMPLETED],
+        )
+        asyncio.run(notifier.notify(WebhookEventType.CREATED, create_upload_metadata()))
+        assert notifier.outbox.read(10) == ([], 0)
+
+
+class TestWebhookOutbox:
+    def test_only_one_worker_delivers(self, tmp_path):
+        outbox = WebhookOutbox(str(tmp_path))
+        outbox.open()
+        assert outbox.claim_delivery()
+        assert run_in_process(claim_delivery, str(tmp_path)) == 1
+        outbox.release_delivery()
+        assert run_in_process(claim_delivery, str(tmp_path)) == 0
+
+    def test_appends_of_other_workers_are_kept(self, tmp_path):
+        delivering = WebhookOutbox(str(tmp_path))
+        delivering.open()
+        notifier = WebhookNotifier("http://127.0.0.1:9", str(tmp_path))
+        asyncio.run(notifier.notify(WebhookEventType.CREATED, create_upload_metadata()))
+        events, position = delivering.read(10)
+        # Another worker appends after the events were read.
+        asyncio.run(
+            notifier.notify(WebhookEventType.COMPLETED, create_upload_metadata())
+        )
+        delivering.acknowledge(position)
+        rest, _ = delivering.read(10)
+        assert [event.type for event in events + rest] == [
+            WebhookEventType.CREATED,
+            WebhookEventType.COMPLETED,
+        ]
+
+    def test_concurrent_appends_are_all_written(self, tmp_path):
+        outbox = WebhookOutbox(str(tmp_path))
+        notifier = WebhookNotifier("http://127.0.0.1:9", str(tmp_path))
+        notifier.outbox = outbox
+
+        async def notify_many():
+            await asyncio.gather(
+                *(
+                    notifier.notify(WebhookEventType.CREATED, create_upload_metadata())
+                    for _ in range(50)
+                )
+            )
+
+        asyncio.run(notify_many())
+        assert len(outbox.read(100)[0]) == 50
+
+    def test_drops_torn_append(self, tmp_path):
+        outbox = WebhookOutbox(str(tmp_path))
+        outbox.open()
+        asyncio.run(
+            WebhookNotifier("http://127.0.0.1:9", str(tmp_path)).notify(
+                WebhookEventType.CREATED, create_upload_metadata()
+            )
+        )
+        with open(outbox.events_file_path, "ab") as f:
+            f.write(b'{"id": "torn"')
+        outbox.open()
+        events, position = outbox.read(10)
+        assert len(events) == 1
+        outbox.acknowledge(position)
+        assert outbox.read(10) == ([], 0)
+
+    def test_acknowledges_partially(self, tmp_path):
+        outbox = WebhookOutbox(str(tmp_path))
+        outbox.open()
+        notifier = WebhookNotifier("http://127.0.0.1:9", str(tmp_path))
+        for _ in range(3):
+            asyncio.run(
+                notifier.notify(WebhookEventType.CREATED, create_upload_metadata())
+            )
+        first, position = outbox.read(2)
+        outbox.acknowledge(position)
+        rest, _ = outbox.read(10)
+        assert len(first) == 2
+        assert len(rest) == 1
@@ -0,0 +1,66 @@
+import asyncio
+import time
+
+import pytest
+
+from tusfastapiserver.utils.concurrency import run_to_completion
+from tusfastapiserver.utils.concurrency import shield_until_complete
+
+
+class TestShieldUntilComplete:
+    def test_cancelled_caller_waits_for_completion(self):
+        events = []
+
+        async def commit():
+            await asyncio.sleep(0.05)
+            events.append("committed")
+
+        async def caller():
+            await shield_until_complete(commit())
+
+        async def scenario():
+            task = asyncio.create_task(caller())
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            events.append("caller done")
+
+        asyncio.run(scenario())
+        assert events == ["committed", "caller done"]
+
+    def test_error_is_raised_after_cancellation(self):
+        async def commit():
+            await asyncio.sleep(0.02)
+            raise OSError("commit failed")
+
+        async def scenario():
+            task = asyncio.create_task(shield_until_complete(commit()))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            await task
+
+        with pytest.raises(OSError):
+            asyncio.run(scenario())
+
+
+class TestRunToCompletion:
+    def test_cancelled_write_is_not_abandoned(self):
+        written = []
+
+        def write():
+            time.sleep(0.05)
+            written.append(b"chunk")
+
+        async def scenario():
+            task = asyncio.create_task(run_to_completion(write))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            return list(written)
+
+        assert asyncio.run(scenario()) == [b"chunk"]
+
+    def test_returns_result(self):
+        assert asyncio.run(run_to_completion(sum, [1, 2, 3])) == 6
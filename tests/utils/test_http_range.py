@@ -0,0 +1,42 @@
+import pytest
+
+from tusfastapiserver.exceptions import RangeNotSatisfiableException
+from tusfastapiserver.utils.http_range import content_range
+from tusfastapiserver.utils.http_range import parse
+
+
+@pytest.mark.parametrize(
+    "range_header, size, expected",
+    [
+        (None, 10, None),  # No header -> whole file
+        ("bytes=0-4", 10, (0, 4)),
+        ("bytes=5-", 10, (5, 9)),  # Open-ended range
+        ("bytes=-3", 10, (7, 9)),  # Suffix range
+        ("bytes=-30", 10, (0, 9)),  # Suffix longer than file
+        ("bytes=2-100", 10, (2, 9)),  # End is clamped
+        ("bytes=5-2", 10, None),  # Invalid range is ignored
+        ("bytes=0-1,4-5", 10, None),  # Multiple ranges are ignored
+        ("items=0-1", 10, None),  # Unknown unit is ignored
+        ("bytes=-", 10, None),
+    ],
+)
+def test_parse(range_header, size, expected):
+    assert parse(range_header, size) == expected
+
+
+@pytest.mark.parametrize(
+    "range_header, size",
+    [
+        ("bytes=10-", 10),  # Start past the end
+        ("bytes=-0", 10),  # Empty suffix
+        ("bytes=-5", 0),  # Empty file
+    ],
+)
+def test_parse_not_satisfiable(range_header, size):
+    with pytest.raises(RangeNotSatisfiableException) as exc_info:
+        parse(range_header, size)
+    assert exc_info.value.headers == {"Content-Range": f"bytes */{size}"}
+
+
+def test_content_range():
+    assert content_range(0, 4, 10) == "bytes 0-4/10"
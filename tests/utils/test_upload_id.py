@@ -0,0 +1,53 @@
+import uuid
+
+import pytest
+
+from tusfastapiserver.utils.upload_id import generate
+from tusfastapiserver.utils.upload_id import get_node_id
+from tusfastapiserver.utils.upload_id import validate
+
+
+def test_generate_without_node_id():
+    file_id = generate()
+    assert str(uuid.UUID(file_id)) == file_id
+    assert get_node_id(file_id) is None
+
+
+def test_generate_with_node_id():
+    file_id = generate("node-1")
+    assert file_id.startswith("node-1.")
+    assert get_node_id(file_id) == "node-1"
+
+
+@pytest.mark.parametrize("node_id", ["node.1", "_node", "-node", ""])
+def test_generate_with_invalid_node_id(node_id):
+    with pytest.raises(ValueError):
+        generate(node_id)
+
+
+@pytest.mark.parametrize(
+    "file_id, expected",
+    [
+        ("node-1.0123456789abcdef", "node-1"),
+        ("0123456789abcdef", None),  # No node part
+        (".0123456789abcdef", None),  # Empty node part
+        ("nöde.0123456789abcdef", None),  # Invalid node part
+        ("_cache.0123456789abcdef", None),  # Reserved prefix
+    ],
+)
+def test_get_node_id(file_id, expected):
+    assert get_node_id(file_id) == expected
+
+
+@pytest.mark.parametrize(
+    "file_id, expected",
+    [
+        (str(uuid.uuid4()), True),
+        ("node-1.0123456789abcdef", True),
+        ("../secret", False),
+        ("a/b", False),
+        ("", False),
+    ],
+)
+def test_validate(file_id, expected):
+    assert validate(file_id) == expected
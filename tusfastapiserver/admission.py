@@ -0,0 +1,149 @@
+import logging
+from typing import Dict
+from typing import Optional
+
+from fastapi import Request
+
+from tusfastapiserver.exceptions import ServerBusyException
+from tusfastapiserver.exceptions import TooManyRequestsException
+from tusfastapiserver.utils.request import get_client_key
+from tusfastapiserver.utils.request import get_content_length
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionTicket:
+    def __init__(
+        self,
+        controller: "AdmissionController",
+        file_id: str,
+        client_key: str,
+        inflight_bytes: int,
+    ):
+        self.controller = controller
+        self.file_id = file_id
+        self.client_key = client_key
+        self.inflight_bytes = inflight_bytes
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self.controller.release(self)
+
+    def __enter__(self) -> "AdmissionTicket":
+        return self
+
+    def __exit__(self, *args):
+        self.release()
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_concurrent_uploads: Optional[int] = None,
+        max_concurrent_requests: Optional[int] = None,
+        max_concurrent_requests_per_client: Optional[int] = None,
+        max_inflight_bytes: Optional[int] = None,
+        unknown_content_length: int = 1024 * 1024,
+        client_key_header: Optional[str] = None,
+        retry_after: int = 1,
+    ):
+        self.max_concurrent_uploads = max_concurrent_uploads
+        self.max_concurrent_requests = max_concurrent_requests
+        self.max_concurrent_requests_per_client = max_concurrent_requests_per_client
+        self.max_inflight_bytes = max_inflight_bytes
+        self.unknown_content_length = unknown_content_length
+        self.client_key_header = client_key_header
+        self.retry_after = retry_after
+
+        self._uploads: Dict[str, int] = {}
+        self._clients: Dict[str, int] = {}
+        self._requests = 0
+        self._inflight_bytes = 0
+        self._rejected = 0
+
+    def usage(self) -> Dict[str, Optional[int]]:
+        return {
+            "concurrent_uploads": len(self._uploads),
+            "max_concurrent_uploads": self.max_concurrent_uploads,
+            "concurrent_requests": self._requests,
+            "max_concurrent_requests": self.max_concurrent_requests,
+            "inflight_bytes": self._inflight_bytes,
+            "max_inflight_bytes": self.max_inflight_bytes,
+            "rejected_requests": self._rejected,
+        }
+
+    def admit_request(self, file_id: str, request: Request) -> AdmissionTicket:
+        content_length = get_content_length(request)
+        return self.admit(
+            file_id,
+            get_client_key(request, self.client_key_header),
+            (
+                content_length
+                if content_length is not None
+                else self.unknown_content_length
+            ),
+        )
+
+    def admit(
+        self, file_id: str, client_key: str, inflight_bytes: int
+    ) -> AdmissionTicket:
+        self._check_limits(file_id, client_key, inflight_bytes)
+        self._uploads[file_id] = self._uploads.get(file_id, 0) + 1
+        self._clients[client_key] = self._clients.get(client_key, 0) + 1
+        self._requests += 1
+        self._inflight_bytes += inflight_bytes
+        return AdmissionTicket(self, file_id, client_key, inflight_bytes)
+
+    def _check_limits(self, file_id: str, client_key: str, inflight_bytes: int):
+        if (
+            self.max_concurrent_requests_per_client is not None
+            and self._clients.get(client_key, 0)
+            >= self.max_concurrent_requests_per_client
+        ):
+            self._reject(f"client {client_key} reached its request limit")
+            raise TooManyRequestsException(self.retry_after)
+
+        if (
+            self.max_concurrent_requests is not None
+            and self._requests >= self.max_concurrent_requests
+        ):
+            self._reject("concurrent request limit reached")
+            raise ServerBusyException(self.retry_after)
+
+        if (
+            self.max_concurrent_uploads is not None
+            and file_id not in self._uploads
+            and len(self._uploads) >= self.max_concurrent_uploads
+        ):
+            self._reject("concurrent upload limit reached")
+            raise ServerBusyException(self.retry_after)
+
+        # A single request larger than the whole budget is let through when
+        # nothing else is in flight, otherwise it could never be admitted.
+        if (
+            self.max_inflight_bytes is not None
+            and self._inflight_bytes > 0
+            and self._inflight_bytes + inflight_bytes > self.max_inflight_bytes
+        ):
+            self._reject("in-flight bytes limit reached")
+            raise ServerBusyException(self.retry_after)
+
+    def _reject(self, reason: str):
+        self._rejected += 1
+        logger.warning(f"Request rejected: {reason}")
+
+    def release(self, ticket: AdmissionTicket):
+        self._decrement(self._uploads, ticket.file_id)
+        self._decrement(self._clients, ticket.client_key)
+        self._requests -= 1
+        self._inflight_bytes -= ticket.inflight_bytes
+
+    @staticmethod
+    def _decrement(counter: Dict[str, int], key: str):
+        remaining = counter.get(key, 1) - 1
+        if remaining > 0:
+            counter[key] = remaining
+        else:
+            counter.pop(key, None)
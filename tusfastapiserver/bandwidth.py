@@ -0,0 +1,219 @@
+import asyncio
+import time
+from typing import AsyncIterator
+from typing import Callable
+from typing import Dict
+from typing import Optional
+from typing import Set
+
+from fastapi import Request
+
+from tusfastapiserver.utils.request import get_client_key
+
+
+class TokenBucket:
+    # Consumption may overdraw the bucket; the debt is returned as the time the
+    # caller has to wait, so every acquisition is O(1) regardless of its size.
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.burst = burst if burst is not None else rate
+        self._clock = clock
+        self._tokens = self.burst
+        self._updated_at = clock()
+
+    def set_rate(self, rate: float, burst: Optional[float] = None):
+        self._refill()
+        self.rate = rate
+        self.burst = burst if burst is not None else rate
+        self._tokens = min(self._tokens, self.burst)
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._updated_at) * self.rate
+        )
+        self._updated_at = now
+
+    def consume(self, amount: int) -> float:
+        self._refill()
+        self._tokens -= amount
+        if self._tokens >= 0:
+            return 0.0
+        return -self._tokens / self.rate
+
+
+class UploadThrottle:
+    def __init__(
+        self,
+        scheduler: "BandwidthScheduler",
+        upload_id: str,
+        client_key: str,
+        bucket: Optional[TokenBucket],
+    ):
+        self.scheduler = scheduler
+        self.upload_id = upload_id
+        self.client_key = client_key
+        self.bucket = bucket
+        # Bytes per second over the last measurement window, None before the
+        # first window ends.
+        self.usage: Optional[float] = None
+        self._measured_at = scheduler._clock()
+        self._measured_bytes = 0
+
+    def measure(self, now: float) -> Optional[float]:
+        elapsed = now - self._measured_at
+        if elapsed >= self.scheduler.rebalance_interval:
+            self.usage = self._measured_bytes / elapsed
+            self._measured_at = now
+            self._measured_bytes = 0
+        return self.usage
+
+    def get_delay(self, amount: int) -> float:
+        return self.scheduler.get_delay(self, amount)
+
+    async def throttle(self, amount: int):
+        delay = self.get_delay(amount)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def close(self):
+        self.scheduler.release(self)
+
+
+class BandwidthScheduler:
+    """Paces request body reads with per-upload, per-client and global limits.
+
+    The global rate is shared max-min fairly, so fast senders cannot starve
+    slow ones and no bandwidth is left unused: every ``rebalance_interval``
+    seconds, uploads that used less than an even split of what is left keep
+    what they used, and the rest is split evenly between the others. An upload
+    is assumed to use its full share until its first interval is measured.
+    Rates are in bytes per second, ``None`` disables a limit.
+    """
+
+    def __init__(
+        self,
+        global_rate: Optional[float] = None,
+        per_client_rate: Optional[float] = None,
+        per_upload_rate: Optional[float] = None,
+        client_key_header: Optional[str] = None,
+        burst_seconds: float = 1.0,
+        rebalance_interval: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.global_rate = global_rate
+        self.per_client_rate = per_client_rate
+        self.per_upload_rate = per_upload_rate
+        self.client_key_header = client_key_header
+        self.burst_seconds = burst_seconds
+        self.rebalance_interval = rebalance_interval
+        self._clock = clock
+
+        self._global_bucket = self._create_bucket(global_rate)
+        self._client_buckets: Dict[str, TokenBucket] = {}
+        self._client_uploads: Dict[str, int] = {}
+        self._throttles: Set[UploadThrottle] = set()
+        self._fair_share = global_rate
+        self._rebalanced_at = clock()
+
+    def _create_bucket(self, rate: Optional[float]) -> Optional[TokenBucket]:
+        if rate is None:
+            return None
+        return self._create_limited_bucket(rate)
+
+    def _create_limited_bucket(self, rate: float) -> TokenBucket:
+        return TokenBucket(rate, rate * self.burst_seconds, clock=self._clock)
+
+    @property
+    def active_uploads(self) -> int:
+        return len(self._throttles)
+
+    def get_client_key(self, request: Request) -> str:
+        return get_client_key(request, self.client_key_header)
+
+    def _get_upload_rate(self) -> Optional[float]:
+        rates = []
+        if self.per_upload_rate is not None:
+            rates.append(self.per_upload_rate)
+        if self._fair_share is not None:
+            rates.append(self._fair_share)
+        return min(rates) if rates else None
+
+    def _rebalance(self, now: float):
+        self._rebalanced_at = now
+        if self.global_rate is None:
+            return
+        # Unmeasured uploads sort last: they are assumed to use their share.
+        usages = sorted(
+            (throttle.measure(now) for throttle in self._throttles),
+            key=lambda usage: float("inf") if usage is None else usage,
+        )
+        capacity = self.global_rate
+        remaining = len(usages)
+        for usage in usages:
+            if usage is None or usage * remaining >= capacity:
+                break
+            capacity -= usage
+            remaining -= 1
+        # With every upload below its share, none is limited until the next
+        # rebalance; the global bucket still caps their sum.
+        self._fair_share = capacity / remaining if remaining else self.global_rate
+
+    def acquire(self, upload_id: str, client_key: str) -> UploadThrottle:
+        self._client_uploads[client_key] = self._client_uploads.get(client_key, 0) + 1
+        if self.per_client_rate is not None and client_key not in self._client_buckets:
+            self._client_buckets[client_key] = self._create_limited_bucket(
+                self.per_client_rate
+            )
+        throttle = UploadThrottle(self, upload_id, client_key, None)
+        self._throttles.add(throttle)
+        self._rebalance(self._clock())
+        throttle.bucket = self._create_bucket(self._get_upload_rate())
+        return throttle
+
+    def release(self, throttle: UploadThrottle):
+        self._throttles.discard(throttle)
+        self._rebalance(self._clock())
+        remaining = self._client_uploads.get(throttle.client_key, 1) - 1
+        if remaining > 0:
+            self._client_uploads[throttle.client_key] = remaining
+        else:
+            self._client_uploads.pop(throttle.client_key, None)
+            self._client_buckets.pop(throttle.client_key, None)
+
+    def get_delay(self, throttle: UploadThrottle, amount: int) -> float:
+        throttle._measured_bytes += amount
+        now = self._clock()
+        if now - self._rebalanced_at >= self.rebalance_interval:
+            self._rebalance(now)
+        delays = [0.0]
+        if throttle.bucket is not None:
+            upload_rate = self._get_upload_rate()
+            if upload_rate is not None and upload_rate != throttle.bucket.rate:
+                throttle.bucket.set_rate(upload_rate, upload_rate * self.burst_seconds)
+            delays.append(throttle.bucket.consume(amount))
+        client_bucket = self._client_buckets.get(throttle.client_key)
+        if client_bucket is not None:
+            delays.append(client_bucket.consume(amount))
+        if self._global_bucket is not None:
+            delays.append(self._global_bucket.consume(amount))
+        return max(delays)
+
+    async def paced(
+        self, stream: AsyncIterator[bytes], upload_id: str, client_key: str
+    ) -> AsyncIterator[bytes]:
+        # The next chunk is only pulled from the stream once the previous one
+        # has been paid for, so a throttled sender is slowed down by TCP flow
+        # control instead of the server buffering its data.
+        throttle = self.acquire(upload_id, client_key)
+        try:
+            async for chunk in stream:
+                yield chunk
+                await throttle.throttle(len(chunk))
+        finally:
+            throttle.close()
@@ -0,0 +1,106 @@
+from collections import OrderedDict
+from typing import Optional
+
+CHUNK_SIZE_ALIGNMENT = 64 * 1024
+
+
+class ChunkSizeAdvisor:
+    """Recommends a ``PATCH`` chunk size from the recent write throughput and
+    request latency of this node.
+
+    Both are exponentially weighted moving averages over completed ``PATCH``
+    requests: throughput is the body size over the time spent receiving and
+    writing it, latency is the rest of the request plus the gap since the
+    previous request on the same upload ended. The server cannot measure the
+    round trip of a client, but clients send the next chunk once they have the
+    response, so the gap includes it. Gaps longer than ``max_request_gap``
+    seconds are pauses and are ignored.
+
+    The recommendation is the smallest chunk that keeps the latency within
+    ``target_overhead`` of the request time, so a failed request loses as
+    little as possible, but never a chunk that takes longer than
+    ``max_chunk_duration`` seconds to send.
+    """
+
+    def __init__(
+        self,
+        target_overhead: float = 0.05,
+        max_chunk_duration: float = 10.0,
+        min_chunk_size: int = 256 * 1024,
+        max_chunk_size: int = 256 * 1024 * 1024,
+        initial_chunk_size: int = 8 * 1024 * 1024,
+        smoothing: float = 0.2,
+        max_request_gap: float = 5.0,
+        max_uploads: int = 10000,
+    ):
+        if not 0 < target_overhead < 1:
+            raise ValueError("target_overhead must be between 0 and 1")
+        if not 0 < smoothing <= 1:
+            raise ValueError("smoothing must be in (0, 1]")
+        self.target_overhead = target_overhead
+        self.max_chunk_duration = max_chunk_duration
+        self.min_chunk_size = min_chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.initial_chunk_size = initial_chunk_size
+        self.smoothing = smoothing
+        self.max_request_gap = max_request_gap
+        self.max_uploads = max_uploads
+        self.throughput: Optional[float] = None
+        self.latency: Optional[float] = None
+        # Upload id -> end of its last request.
+        self._last_requests: "OrderedDict[str, float]" = OrderedDict()
+
+    def _average(self, average: Optional[float], sample: float) -> float:
+        if average is None:
+            return sample
+        return average + self.smoothing * (sample - average)
+
+    def record(self, size: int, transfer_time: float, latency: Optional[float]):
+        """Records a ``PATCH`` request that wrote ``size`` bytes in
+        ``transfer_time`` seconds and spent ``latency`` seconds on the rest,
+        if known."""
+        if size > 0 and transfer_time > 0:
+            self.throughput = self._average(self.throughput, size / transfer_time)
+        if latency is not None:
+            self.latency = self._average(self.latency, max(latency, 0.0))
+
+    def record_request(
+        self,
+        file_id: str,
+        size: int,
+        transfer_time: float,
+        started_at: float,
+        finished_at: float,
+    ):
+        """Records a ``PATCH`` request on ``file_id`` that ran from
+        ``started_at`` to ``finished_at`` (``time.monotonic``) and wrote
+        ``size`` bytes in ``transfer_time`` seconds of it."""
+        latency = None
+        previous = self._last_requests.pop(file_id, None)
+        if previous is not None and 0 <= started_at - previous <= self.max_request_gap:
+            gap = started_at - previous
+            latency = finished_at - started_at - transfer_time + gap
+        self._last_requests[file_id] = finished_at
+        while len(self._last_requests) > self.max_uploads:
+            self._last_requests.popitem(last=False)
+        self.record(size, transfer_time, latency)
+
+    def recommend(self, max_size: Optional[int] = None) -> int:
+        chunk_size: float
+        if self.throughput is None or self.latency is None:
+            chunk_size = self.initial_chunk_size
+        else:
+            # latency / (latency + chunk_size / throughput) <= target_overhead
+            chunk_size = min(
+                self.throughput
+                * self.latency
+                * (1 - self.target_overhead)
+                / self.target_overhead,
+                self.throughput * self.max_chunk_duration,
+            )
+        size = min(max(int(chunk_size), self.min_chunk_size), self.max_chunk_size)
+        if max_size is not None:
+            size = min(size, max_size)
+        if size >= CHUNK_SIZE_ALIGNMENT:
+            size -= size % CHUNK_SIZE_ALIGNMENT
+        return max(size, 1)
@@ -0,0 +1,190 @@
+import logging
+from typing import AsyncIterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.responses import RedirectResponse
+from starlette.types import ASGIApp
+from starlette.types import Receive
+from starlette.types import Scope
+from starlette.types import Send
+
+from tusfastapiserver import TUS_RESUMABLE
+from tusfastapiserver.config import Config
+from tusfastapiserver.config import NodeRoutingMode
+from tusfastapiserver.utils.upload_id import get_node_id
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+
+FORWARDED_NODE_HEADER = "tus-forwarded-by"
+HOP_BY_HOP_HEADERS = {
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "te",
+    "trailers",
+    "transfer-encoding",
+    "upgrade",
+    "host",
+}
+
+
+class NodeProxy:
+    def __init__(self, timeout: float = 60.0, max_connections: int = 100):
+        if httpx is None:
+            raise RuntimeError("httpx is required to proxy uploads between nodes")
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._client: Optional["httpx.AsyncClient"] = None
+
+    @property
+    def client(self) -> "httpx.AsyncClient":
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.max_connections),
+            )
+        return self._client
+
+    async def start(self):
+        _ = self.client
+
+    async def stop(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @staticmethod
+    def _get_request_headers(scope: Scope, node_id: str) -> List[Tuple[str, str]]:
+        headers = Headers(scope=scope)
+        request_headers = [
+            (key, value)
+            for key, value in headers.items()
+            if key not in HOP_BY_HOP_HEADERS
+        ]
+        if "x-forwarded-host" not in headers and "host" in headers:
+            request_headers.append(("x-forwarded-host", headers["host"]))
+        if "x-forwarded-proto" not in headers:
+            request_headers.append(("x-forwarded-proto", scope.get("scheme", "http")))
+        request_headers.append((FORWARDED_NODE_HEADER, node_id))
+        return request_headers
+
+    @staticmethod
+    async def _iter_body(receive: Receive) -> AsyncIterator[bytes]:
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body = message.get("body", b"")
+            if body:
+                yield body
+            if not message.get("more_body", False):
+                return
+
+    async def forward(
+        self, scope: Scope, receive: Receive, send: Send, url: str, node_id: str
+    ):
+        has_body = scope["method"] in ("PATCH", "POST", "PUT")
+        request = self.client.build_request(
+            scope["method"],
+            url,
+            headers=self._get_request_headers(scope, node_id),
+            content=self._iter_body(receive) if has_body else None,
+        )
+        try:
+            response = await self.client.send(request, stream=True)
+        except httpx.TransportError as error:
+            logger.warning(f"Failed to forward {scope['method']} to {url}: {error!r}")
+            error_response = JSONResponse(
+                {"detail": "The node that owns the upload is unavailable"},
+                status_code=502,
+                headers={"Tus-Resumable": TUS_RESUMABLE},
+            )
+            await error_response(scope, receive, send)
+            return
+        try:
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": response.status_code,
+                    "headers": [
+                        (key, value)
+                        for key, value in response.headers.raw
+                        if key.decode("latin-1").lower() not in HOP_BY_HOP_HEADERS
+                    ],
+                }
+            )
+            async for chunk in response.aiter_raw():
+                await send(
+                    {"type": "http.response.body", "body": chunk, "more_body": True}
+                )
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            await response.aclose()
+
+
+class NodeRoutingMiddleware:
+    def __init__(
+        self, app: ASGIApp, config: Config, proxy: Optional[NodeProxy] = None
+    ) -> None:
+        if config.node_id is None:
+            raise ValueError("NodeRoutingMiddleware requires config.node_id")
+        self.app = app
+        self.config = config
+        self.node_id: str = config.node_id
+        self.proxy = proxy
+        self.upload_path_prefix = f"{config.path_prefix.rstrip('/')}/"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        owner_url = self._get_owner_url(scope)
+        if owner_url is None:
+            await self.app(scope, receive, send)
+            return
+
+        url = f"{owner_url.rstrip('/')}{scope['path']}"
+        if scope.get("query_string"):
+            url = f"{url}?{scope['query_string'].decode('latin-1')}"
+
+        proxy = self.proxy
+        if self.config.node_routing_mode == NodeRoutingMode.PROXY and proxy is not None:
+            logger.debug(f"Proxying {scope['method']} {scope['path']} to {url}")
+            await proxy.forward(scope, receive, send, url, self.node_id)
+            return
+
+        logger.debug(f"Redirecting {scope['method']} {scope['path']} to {url}")
+        response = RedirectResponse(
+            url, status_code=307, headers={"Tus-Resumable": TUS_RESUMABLE}
+        )
+        await response(scope, receive, send)
+
+    def _get_owner_url(self, scope: Scope) -> Optional[str]:
+        path = scope["path"]
+        if not path.startswith(self.upload_path_prefix):
+            return None
+
+        file_id = path[len(self.upload_path_prefix) :]
+        if "/" in file_id:
+            return None
+
+        # A request that was already forwarded is never forwarded again.
+        if FORWARDED_NODE_HEADER in Headers(scope=scope):
+            return None
+
+        node_id = get_node_id(file_id)
+        if node_id is None or node_id == self.node_id:
+            return None
+        return self.config.node_urls.get(node_id)
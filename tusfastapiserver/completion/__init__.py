@@ -0,0 +1,14 @@
+from tusfastapiserver.completion.handlers import BaseCompletionHandler
+from tusfastapiserver.completion.handlers import ExecutionMode
+from tusfastapiserver.completion.queue import CompletionQueue
+from tusfastapiserver.completion.dedup import ContentStore
+from tusfastapiserver.completion.dedup import DeduplicationHandler
+
+
+__all__ = [
+    "BaseCompletionHandler",
+    "CompletionQueue",
+    "ContentStore",
+    "DeduplicationHandler",
+    "ExecutionMode",
+]
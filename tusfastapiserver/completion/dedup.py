@@ -0,0 +1,209 @@
+import errno
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterator
+from typing import Optional
+from typing import Tuple
+
+from tusfastapiserver.completion.handlers import BaseCompletionHandler
+from tusfastapiserver.completion.handlers import ExecutionMode
+from tusfastapiserver.config import Config
+from tusfastapiserver.config import MetadataStrategyType
+from tusfastapiserver.metadata import CachedMetadataStrategy
+from tusfastapiserver.metadata import LocalMetadataStrategy
+from tusfastapiserver.schemas import UploadMetadata
+from tusfastapiserver.storages.compressed import is_compressed_file
+from tusfastapiserver.storages.compressed import iter_decompressed
+
+logger = logging.getLogger(__name__)
+
+
+# Digests computed on completion are written by another process than the
+# routers, so only strategies that keep no state outside the JSON documents.
+DIGEST_METADATA_STRATEGIES = {
+    MetadataStrategyType.LOCAL: LocalMetadataStrategy,
+    MetadataStrategyType.CACHED: CachedMetadataStrategy,
+}
+
+
+class IncrementalHasher:
+    """Hashes uploads while their chunks are written.
+
+    A digest is only produced when every byte was seen in order; a chunk at an
+    unexpected offset (a restart, a rewritten tail) discards the state and the
+    upload is hashed from disk on completion instead.
+    """
+
+    def __init__(self, algorithm: str = "sha256", max_uploads: int = 10000):
+        self.algorithm = algorithm
+        self.max_uploads = max_uploads
+        self._states: "OrderedDict[str, Tuple[int, hashlib._Hash]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def update(self, file_id: str, offset: int, chunk: bytes):
+        with self._lock:
+            state = self._states.pop(file_id, None)
+        if state is None and offset == 0:
+            state = (0, hashlib.new(self.algorithm))
+        if state is None or state[0] != offset:
+            return
+        hash_object = state[1]
+        hash_object.update(chunk)
+        with self._lock:
+            self._states[file_id] = (offset + len(chunk), hash_object)
+            while len(self._states) > self.max_uploads:
+                self._states.popitem(last=False)
+
+    def finish(self, file_id: str, length: int) -> Optional[str]:
+        with self._lock:
+            state = self._states.pop(file_id, None)
+        if state is None or state[0] != length:
+            return None
+        return state[1].hexdigest()
+
+    def discard(self, file_id: str):
+        with self._lock:
+            self._states.pop(file_id, None)
+
+
+class ContentStore:
+    """Content addressed store of completed uploads.
+
+    Objects are hard links to upload files, so the link count of an object is
+    the number of uploads sharing it plus one; deleting an upload file never
+    affects the other uploads.
+    """
+
+    def __init__(
+        self, path: str, algorithm: str = "sha256", max_hashed_uploads: int = 10000
+    ):
+        self.path = path
+        self.algorithm = algorithm
+        self.hasher = IncrementalHasher(algorithm, max_hashed_uploads)
+
+    def get_path(self, digest: str) -> str:
+        return os.path.join(self.path, digest[:2], digest[2:4], digest)
+
+    def hash_file(self, chunks: Iterator[bytes]) -> str:
+        hash_object = hashlib.new(self.algorithm)
+        for chunk in chunks:
+            hash_object.update(chunk)
+        return hash_object.hexdigest()
+
+    def reference_count(self, digest: str) -> int:
+        try:
+            return os.stat(self.get_path(digest)).st_nlink - 1
+        except FileNotFoundError:
+            return 0
+
+    def add(self, path: str, digest: str) -> bool:
+        """Stores ``path`` under ``digest``. Returns True when an identical
+        object already existed and ``path`` was replaced by a link to it."""
+        object_path = self.get_path(digest)
+        Path(object_path).parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(path, object_path)
+            return False
+        except FileExistsError:
+            pass
+        except OSError as error:
+            if error.errno != errno.EXDEV:
+                raise
+            logger.warning(f"{path} is not on the filesystem of the content store")
+            return False
+
+        if os.path.samefile(path, object_path):
+            return False
+        if os.path.getsize(path) != os.path.getsize(object_path):
+            logger.warning(f"Object {digest} is stored differently than {path}")
+            return False
+
+        temporary_path = f"{path}.dedup"
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        os.link(object_path, temporary_path)
+        os.replace(temporary_path, path)
+        return True
+
+    def release(self, digest: str) -> bool:
+        """Removes the object once no upload links to it."""
+        object_path = self.get_path(digest)
+        try:
+            if os.stat(object_path).st_nlink > 1:
+                return False
+            os.remove(object_path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def collect(self) -> int:
+        """Removes every object without uploads, e.g. after uploads were
+        removed without going through ``release``."""
+        removed = 0
+        for _, _, files in os.walk(self.path):
+            for name in files:
+                if self.release(name):
+                    removed += 1
+        logger.info(f"Removed {removed} unreferenced objects")
+        return removed
+
+
+class DeduplicationHandler(BaseCompletionHandler):
+    """Replaces completed uploads that already exist in the content store with
+    hard links to the stored copy.
+
+    Uploads without a ``content_digest`` are hashed from disk and the digest is
+    saved to their metadata, so that terminating them releases the object.
+    """
+
+    execution_mode = ExecutionMode.THREAD
+
+    def __init__(self, content_store: ContentStore, config: Config):
+        if config.metadata_strategy_type not in DIGEST_METADATA_STRATEGIES:
+            raise ValueError(
+                "DeduplicationHandler only supports the LOCAL and CACHED "
+                "metadata strategies"
+            )
+        self.content_store = content_store
+        self.config = config
+        self.metadata_strategy = DIGEST_METADATA_STRATEGIES[
+            config.metadata_strategy_type
+        ](config)
+
+    def _iter_content(self, path: str) -> Iterator[bytes]:
+        if is_compressed_file(path):
+            yield from iter_decompressed(path)
+            return
+        with open(path, "rb") as file:
+            while chunk := file.read(1024 * 1024):
+                yield chunk
+
+    def _save_digest(self, file_id: str, digest: str) -> bool:
+        # The routers may have changed the metadata since the job was queued.
+        try:
+            upload_metadata = self.metadata_strategy.get_metadata(file_id)
+        except FileNotFoundError:
+            return False
+        upload_metadata.content_digest = digest
+        self.metadata_strategy.update(upload_metadata)
+        return True
+
+    def handle(self, upload_metadata: UploadMetadata, *args, **kwargs):
+        path = upload_metadata.upload_storage_path
+        if not os.path.exists(path):
+            logger.info(f"Upload {upload_metadata.id} no longer exists")
+            return
+        digest = upload_metadata.content_digest
+        if digest is None:
+            digest = self.content_store.hash_file(self._iter_content(path))
+            # Saved before linking: releasing an object that was never added
+            # is harmless, an added object nobody releases is not.
+            if not self._save_digest(upload_metadata.id, digest):
+                logger.info(f"Upload {upload_metadata.id} no longer exists")
+                return
+        if self.content_store.add(path, digest):
+            logger.info(f"Upload {upload_metadata.id} deduplicated as {digest}")
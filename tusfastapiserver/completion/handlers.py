@@ -0,0 +1,23 @@
+from enum import Enum
+
+from tusfastapiserver.schemas import UploadMetadata
+
+
+class ExecutionMode(str, Enum):
+    ASYNC = "ASYNC"
+    THREAD = "THREAD"
+    PROCESS = "PROCESS"
+
+
+class BaseCompletionHandler:
+    # ASYNC handlers are awaited on the event loop and must not block it.
+    # THREAD and PROCESS handlers are plain functions executed in the queue's
+    # executors; PROCESS handlers must be picklable.
+    execution_mode: ExecutionMode = ExecutionMode.ASYNC
+
+    @property
+    def name(self) -> str:
+        return type(self).__name__
+
+    def handle(self, upload_metadata: UploadMetadata, *args, **kwargs):
+        raise NotImplementedError()
@@ -0,0 +1,261 @@
+import os
+import asyncio
+import logging
+from collections import deque
+from concurrent.futures import Executor
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Deque
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+
+from starlette.concurrency import run_in_threadpool
+
+from tusfastapiserver.completion.handlers import BaseCompletionHandler
+from tusfastapiserver.completion.handlers import ExecutionMode
+from tusfastapiserver.schemas import CompletionJob
+from tusfastapiserver.schemas import UploadMetadata
+
+logger = logging.getLogger(__name__)
+
+
+class CompletionQueue:
+    def __init__(
+        self,
+        handlers: Sequence[BaseCompletionHandler],
+        queue_path: str = os.path.join("tmp", "tusfastapiserver", "completion"),
+        max_concurrency: int = 4,
+        max_pending: int = 1000,
+        max_retries: int = 5,
+        retry_delay: float = 1.0,
+        max_retry_delay: float = 300.0,
+    ):
+        self.handlers: Dict[str, BaseCompletionHandler] = {
+            handler.name: handler for handler in handlers
+        }
+        self.queue_path = queue_path
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+
+        self._ready: Optional[asyncio.Queue] = None
+        self._overflow: Deque[str] = deque()
+        self._retry_timers: Dict[str, asyncio.TimerHandle] = {}
+        self._workers: List[asyncio.Task] = []
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._running_jobs = 0
+
+    @property
+    def pending_path(self) -> str:
+        return os.path.join(self.queue_path, "pending")
+
+    @property
+    def failed_path(self) -> str:
+        return os.path.join(self.queue_path, "failed")
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self._workers)
+
+    @property
+    def is_saturated(self) -> bool:
+        return bool(self._overflow)
+
+    @property
+    def backlog(self) -> int:
+        ready = self._ready.qsize() if self._ready is not None else 0
+        return ready + len(self._overflow) + len(self._retry_timers)
+
+    def stats(self) -> Dict[str, int | bool]:
+        return {
+            "running": self._running_jobs,
+            "backlog": self.backlog,
+            "overflow": len(self._overflow),
+            "retrying": len(self._retry_timers),
+            "saturated": self.is_saturated,
+        }
+
+    async def start(self):
+        if self.is_running:
+            return
+        await run_in_threadpool(self._check_or_make_folders)
+        self._ready = asyncio.Queue(maxsize=self.max_pending)
+        self._thread_pool = ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="tus-completion"
+        )
+        if any(
+            handler.execution_mode == ExecutionMode.PROCESS
+            for handler in self.handlers.values()
+        ):
+            self._process_pool = ProcessPoolExecutor(max_workers=self.max_concurrency)
+
+        pending_job_ids = await run_in_threadpool(self._list_pending_jobs)
+        logger.info(f"Restoring {len(pending_job_ids)} pending completion jobs")
+        for job_id in pending_job_ids:
+            self._schedule(job_id)
+
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.max_concurrency)
+        ]
+
+    async def stop(self):
+        for timer in self._retry_timers.values():
+            timer.cancel()
+        self._retry_timers.clear()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._ready = None
+        self._overflow.clear()
+        for executor in (self._thread_pool, self._process_pool):
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+        self._thread_pool = None
+        self._process_pool = None
+
+    async def enqueue(self, upload_metadata: UploadMetadata) -> bool:
+        jobs = [
+            CompletionJob(
+                id=f"{upload_metadata.id}.{handler_name}",
+                handler_name=handler_name,
+                upload_metadata=upload_metadata,
+            )
+            for handler_name in self.handlers
+        ]
+        await run_in_threadpool(self._write_jobs, jobs)
+        for job in jobs:
+            self._schedule(job.id)
+        if self.is_saturated:
+            logger.warning(
+                f"Completion queue is saturated, {len(self._overflow)} jobs are waiting"
+            )
+        return not self.is_saturated
+
+    def _schedule(self, job_id: str):
+        self._retry_timers.pop(job_id, None)
+        if self._ready is None:
+            # Not started yet: the job is persisted and will be restored on start.
+            return
+        try:
+            self._ready.put_nowait(job_id)
+        except asyncio.QueueFull:
+            self._overflow.append(job_id)
+
+    async def _worker(self):
+        while True:
+            job_id = await self._ready.get()
+            self._running_jobs += 1
+            try:
+                await self._process(job_id)
+            except Exception:
+                logger.exception(f"Unexpected error while processing job {job_id}")
+            finally:
+                self._running_jobs -= 1
+                self._ready.task_done()
+                while self._overflow and not self._ready.full():
+                    self._ready.put_nowait(self._overflow.popleft())
+
+    async def _process(self, job_id: str):
+        job = await run_in_threadpool(self._read_job, job_id)
+        if job is None:
+            return
+
+        handler = self.handlers.get(job.handler_name)
+        if handler is None:
+            logger.error(f"No completion handler named {job.handler_name}")
+            await run_in_threadpool(self._fail_job, job)
+            return
+
+        try:
+            await self._run_handler(handler, job.upload_metadata)
+        except Exception as error:
+            logger.warning(f"Completion handler {handler.name} failed: {error!r}")
+            await self._retry_or_fail(job, error)
+            return
+
+        logger.info(f"Completion job {job_id} finished")
+        await run_in_threadpool(self._remove_job, job_id)
+
+    async def _run_handler(
+        self, handler: BaseCompletionHandler, upload_metadata: UploadMetadata
+    ):
+        if handler.execution_mode == ExecutionMode.ASYNC:
+            await handler.handle(upload_metadata)
+            return
+
+        executor: Optional[Executor] = self._thread_pool
+        if handler.execution_mode == ExecutionMode.PROCESS:
+            executor = self._process_pool
+        await asyncio.get_running_loop().run_in_executor(
+            executor, handler.handle, upload_metadata
+        )
+
+    async def _retry_or_fail(self, job: CompletionJob, error: Exception):
+        job.attempts += 1
+        job.last_error = repr(error)
+        if job.attempts > self.max_retries:
+            logger.error(
+                f"Completion job {job.id} failed after {job.attempts} attempts"
+            )
+            await run_in_threadpool(self._fail_job, job)
+            return
+
+        await run_in_threadpool(self._write_job, job)
+        delay = min(self.retry_delay * 2 ** (job.attempts - 1), self.max_retry_delay)
+        self._retry_timers[job.id] = asyncio.get_running_loop().call_later(
+            delay, self._schedule, job.id
+        )
+
+    def _generate_job_path(self, job_id: str, failed: bool = False) -> str:
+        folder = self.failed_path if failed else self.pending_path
+        return os.path.join(folder, f"{job_id}.json")
+
+    def _check_or_make_folders(self) -> None:
+        Path(self.pending_path).mkdir(parents=True, exist_ok=True)
+        Path(self.failed_path).mkdir(parents=True, exist_ok=True)
+
+    def _list_pending_jobs(self) -> List[str]:
+        with os.scandir(self.pending_path) as entries:
+            return sorted(
+                entry.name[: -len(".json")]
+                for entry in entries
+                if entry.name.endswith(".json")
+            )
+
+    def _write_job(self, job: CompletionJob, failed: bool = False) -> None:
+        path = self._generate_job_path(job.id, failed)
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            f.write(job.model_dump_json())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary_path, path)
+
+    def _write_jobs(self, jobs: List[CompletionJob]) -> None:
+        self._check_or_make_folders()
+        for job in jobs:
+            self._write_job(job)
+
+    def _read_job(self, job_id: str) -> Optional[CompletionJob]:
+        try:
+            with open(self._generate_job_path(job_id), "r", encoding="utf-8") as f:
+                return CompletionJob.model_validate_json(f.read())
+        except FileNotFoundError:
+            return None
+
+    def _remove_job(self, job_id: str) -> None:
+        try:
+            os.remove(self._generate_job_path(job_id))
+        except FileNotFoundError:
+            pass
+
+    def _fail_job(self, job: CompletionJob) -> None:
+        self._write_job(job, failed=True)
+        self._remove_job(job.id)
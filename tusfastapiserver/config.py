@@ -1,9 +1,25 @@
 import os
 
 from dataclasses import dataclass, field
+from typing import Dict
 from typing import List
+from typing import Optional
+from typing import TYPE_CHECKING
 from enum import Enum
 
+if TYPE_CHECKING:
+    from tusfastapiserver.metadata.index import SQLiteMetadataIndex
+    from tusfastapiserver.storages.reservation import ReservationLedger
+    from tusfastapiserver.storages.volumes import VolumeSet
+    from tusfastapiserver.admission import AdmissionController
+    from tusfastapiserver.bandwidth import BandwidthScheduler
+    from tusfastapiserver.loop_monitor import LoopMonitor
+    from tusfastapiserver.progress import BaseProgressBroadcaster
+    from tusfastapiserver.webhooks import WebhookNotifier
+    from tusfastapiserver.chunk_size import ChunkSizeAdvisor
+    from tusfastapiserver.completion import CompletionQueue
+    from tusfastapiserver.completion.dedup import ContentStore
+
 
 class StorageStrategyType(str, Enum):
     LOCAL = "LOCAL"
@@ -11,6 +27,24 @@ class StorageStrategyType(str, Enum):
 
 class MetadataStrategyType(str, Enum):
     LOCAL = "LOCAL"
+    JOURNAL = "JOURNAL"
+    CACHED = "CACHED"
+
+
+class CompressionCodec(str, Enum):
+    GZIP = "GZIP"
+    ZSTD = "ZSTD"
+
+
+class VolumePlacementPolicy(str, Enum):
+    ROUND_ROBIN = "ROUND_ROBIN"
+    MOST_FREE = "MOST_FREE"
+    LEAST_ACTIVE = "LEAST_ACTIVE"
+
+
+class NodeRoutingMode(str, Enum):
+    REDIRECT = "REDIRECT"
+    PROXY = "PROXY"
 
 
 class TusExtension(Enum):
@@ -37,12 +71,64 @@ class Config:
     file_path: str = field(default=os.path.join("tmp", "tusfastapiserver"))
     metadata_path: str = field(default=os.path.join("tmp", "tusfastapiserver"))
     path_prefix: str = field(default="/files")
+    storage_volumes: Optional["VolumeSet"] = field(default=None)
+    storage_compression: Optional[CompressionCodec] = field(default=None)
+    storage_compression_level: Optional[int] = field(default=None)
+
+    node_id: Optional[str] = field(default=None)
+    node_urls: Dict[str, str] = field(default_factory=dict)
+    node_routing_mode: NodeRoutingMode = field(default=NodeRoutingMode.REDIRECT)
+    node_proxy_timeout: float = field(default=60.0)
+
+    enable_download: bool = field(default=False)
+    allow_partial_download: bool = field(default=False)
+    download_content_disposition_type: str = field(default="attachment")
+    enable_usage_endpoint: bool = field(default=False)
+    enable_batch_status: bool = field(default=False)
+    enable_upload_listing: bool = field(default=False)
+    enable_loop_monitor_endpoint: bool = field(default=False)
+    enable_progress_endpoint: bool = field(default=False)
+    max_upload_listing_limit: int = field(default=1000)
+    max_batch_status_size: int = field(default=1000)
+    max_progress_subscription_size: int = field(default=1000)
+    progress_keepalive_interval: float = field(default=15.0)
+    metadata_read_concurrency: int = field(default=16)
+    metadata_journal_compaction_interval: float = field(default=60.0)
+    metadata_journal_compaction_size: int = field(default=64 * 1024 * 1024)
+    metadata_cache_size: int = field(default=10000)
+    metadata_cache_slots: int = field(default=65536)
+    patch_read_timeout: Optional[float] = field(default=None)
+    max_upload_size: Optional[int] = field(default=None)
+    max_request_body_size: Optional[int] = field(default=None)
+    enable_asgi_fast_path: bool = field(default=False)
+
+    recover_on_startup: bool = field(default=False)
+    recovery_workers: int = field(default=8)
+    recovery_checkpoint_path: Optional[str] = field(default=None)
+    recovery_quarantine_path: Optional[str] = field(default=None)
+
+    completion_queue: Optional["CompletionQueue"] = field(default=None)
+    content_store: Optional["ContentStore"] = field(default=None)
+    bandwidth_scheduler: Optional["BandwidthScheduler"] = field(default=None)
+    admission_controller: Optional["AdmissionController"] = field(default=None)
+    reservation_ledger: Optional["ReservationLedger"] = field(default=None)
+    metadata_index: Optional["SQLiteMetadataIndex"] = field(default=None)
+    loop_monitor: Optional["LoopMonitor"] = field(default=None)
+    progress_broadcaster: Optional["BaseProgressBroadcaster"] = field(default=None)
+    webhook_notifier: Optional["WebhookNotifier"] = field(default=None)
+    chunk_size_advisor: Optional["ChunkSizeAdvisor"] = field(default=None)
 
     post_router_path: str = field(init=False)
     patch_router_path: str = field(init=False)
     head_router_path: str = field(init=False)
     options_router_path: str = field(init=False)
     delete_router_path: str = field(init=False)
+    get_router_path: str = field(init=False)
+    usage_router_path: str = field(init=False)
+    batch_status_router_path: str = field(init=False)
+    upload_list_router_path: str = field(init=False)
+    loop_monitor_router_path: str = field(init=False)
+    progress_router_path: str = field(init=False)
 
     def __post_init__(self):
         self.post_router_path = f"{self.path_prefix}"
@@ -50,3 +136,9 @@ class Config:
         self.head_router_path = f"{self.path_prefix}/{{file_id}}"
         self.options_router_path = f"{self.path_prefix}"
         self.delete_router_path = f"{self.path_prefix}/{{file_id}}"
+        self.get_router_path = f"{self.path_prefix}/{{file_id}}"
+        self.usage_router_path = f"{self.path_prefix}/_admin/usage"
+        self.batch_status_router_path = f"{self.path_prefix}/_batch/status"
+        self.upload_list_router_path = f"{self.path_prefix}/_admin/uploads"
+        self.loop_monitor_router_path = f"{self.path_prefix}/_admin/loop"
+        self.progress_router_path = f"{self.path_prefix}/_progress/events"
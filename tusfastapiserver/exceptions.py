@@ -99,3 +99,110 @@ class MismatchUploadLengthException(HTTPException):
             detail="Mismatch between Upload-Length and actual metadata length",
             status_code=status.HTTP_409_CONFLICT,
         )
+
+
+class UploadNotCompletedException(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(
+            detail="Upload is not completed",
+            status_code=status.HTTP_409_CONFLICT,
+        )
+
+
+class RangeNotSatisfiableException(HTTPException):
+    def __init__(self, size: int) -> None:
+        super().__init__(
+            detail="Requested range not satisfiable",
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+
+
+class ServerBusyException(HTTPException):
+    def __init__(self, retry_after: int) -> None:
+        super().__init__(
+            detail="Server is busy, retry later",
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class TooManyRequestsException(HTTPException):
+    def __init__(self, retry_after: int) -> None:
+        super().__init__(
+            detail="Too many concurrent requests",
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class InsufficientStorageException(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(
+            detail="Not enough storage space for the upload",
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        )
+
+
+class QuotaExceededException(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(
+            detail="Upload quota exceeded",
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        )
+
+
+class BatchTooLargeException(HTTPException):
+    def __init__(self, max_size: int) -> None:
+        super().__init__(
+            detail=f"Too many file ids, at most {max_size} are allowed",
+            status_code=status.HTTP_400_BAD_REQUEST,
+        )
+
+
+class MetadataIndexNotConfiguredException(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(
+            detail="Metadata index is not configured",
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+        )
+
+
+class ProgressBroadcasterNotConfiguredException(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(
+            detail="Progress broadcaster is not configured",
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+        )
+
+
+class InvalidQueryException(HTTPException):
+    def __init__(self, detail: str) -> None:
+        super().__init__(
+            detail=detail,
+            status_code=status.HTTP_400_BAD_REQUEST,
+        )
+
+
+class RequestTimeoutException(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(
+            detail="Timed out waiting for the request body",
+            status_code=status.HTTP_408_REQUEST_TIMEOUT,
+        )
+
+
+class UploadTooLargeException(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(
+            detail="Upload exceeds its Upload-Length or the maximum upload size",
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        )
+
+
+class RequestBodyTooLargeException(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(
+            detail="Request body exceeds the maximum size",
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        )
@@ -0,0 +1,251 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import asdict
+from dataclasses import dataclass
+from types import CodeType
+from types import FrameType
+from typing import Callable
+from typing import Deque
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BlockingEvent:
+    started_at: float
+    duration: float
+    router: Optional[str]
+    function: Optional[str]
+    stack: List[str]
+
+
+def _iter_subclasses(cls: type):
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from _iter_subclasses(subclass)
+
+
+def _get_attributed_classes() -> Tuple[List[type], List[type]]:
+    from tusfastapiserver.metadata.base import AsyncBaseMetadataStrategy
+    from tusfastapiserver.metadata.base import BaseMetadataStrategy
+    from tusfastapiserver.routers.base_router import BaseRouter
+    from tusfastapiserver.storages.base import AsyncBaseStorageStrategy
+    from tusfastapiserver.storages.base import BaseStorageStrategy
+
+    routers = [BaseRouter, *_iter_subclasses(BaseRouter)]
+    strategies = []
+    for base in (
+        BaseStorageStrategy,
+        AsyncBaseStorageStrategy,
+        BaseMetadataStrategy,
+        AsyncBaseMetadataStrategy,
+    ):
+        strategies.extend([base, *_iter_subclasses(base)])
+    return routers, strategies
+
+
+def _get_method_names(classes: List[type]) -> Dict[CodeType, str]:
+    names = {}
+    for cls in classes:
+        for name, value in vars(cls).items():
+            if isinstance(value, (staticmethod, classmethod)):
+                value = value.__func__
+            code = getattr(value, "__code__", None)
+            if code is not None:
+                names[code] = f"{cls.__name__}.{name}"
+    return names
+
+
+class LoopMonitor:
+    """Measures event loop lag and records callbacks that block the loop.
+
+    A heartbeat task runs on the loop and a watchdog thread checks it. When
+    the heartbeat is late by more than ``block_threshold`` seconds, the
+    watchdog samples the stack of the loop thread and attributes the stall to
+    the router handling the request and to the strategy method being executed
+    (or the innermost frame of this package).
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.05,
+        block_threshold: float = 0.1,
+        max_events: int = 100,
+        max_samples: int = 1024,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.max_events = max_events
+        self._clock = clock
+
+        self._lag_samples: Deque[float] = deque(maxlen=max_samples)
+        self._max_lag = 0.0
+        self._events: Deque[BlockingEvent] = deque(maxlen=max_events)
+        self._blocking_by_function: Dict[str, Dict[str, float]] = {}
+        self._blocked_count = 0
+        self._blocked_seconds = 0.0
+        # The watchdog thread records events while the loop reports them.
+        self._events_lock = threading.Lock()
+
+        self._heartbeat = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        self._router_names: Dict[CodeType, str] = {}
+        self._strategy_names: Dict[CodeType, str] = {}
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None
+
+    async def start(self):
+        if self.is_running:
+            return
+        routers, strategies = _get_attributed_classes()
+        self._router_names = _get_method_names(routers)
+        self._strategy_names = _get_method_names(strategies)
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = self._clock()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._beat())
+        self._thread = threading.Thread(
+            target=self._watch, name="tus-loop-monitor", daemon=True
+        )
+        self._thread.start()
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._stop.set()
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        self._thread.join()
+        self._thread = None
+
+    async def _beat(self):
+        while True:
+            expected = self._clock() + self.interval
+            await asyncio.sleep(self.interval)
+            now = self._clock()
+            self._heartbeat = now
+            self.record_lag(max(now - expected, 0.0))
+
+    def record_lag(self, lag: float):
+        self._lag_samples.append(lag)
+        self._max_lag = max(self._max_lag, lag)
+
+    def _watch(self):
+        blocked_since: Optional[float] = None
+        event: Optional[BlockingEvent] = None
+        while not self._stop.wait(self.block_threshold / 4):
+            heartbeat = self._heartbeat
+            now = self._clock()
+            stalled = now - heartbeat > self.interval + self.block_threshold
+            if stalled and blocked_since != heartbeat:
+                blocked_since = heartbeat
+                event = self._sample(heartbeat)
+            elif not stalled and event is not None:
+                self._record_event(event, self._heartbeat - blocked_since)
+                event = None
+
+    def _sample(self, heartbeat: float) -> BlockingEvent:
+        frame = None
+        if self._loop_thread_id is not None:
+            frame = sys._current_frames().get(self._loop_thread_id)
+        router, function, stack = self._attribute(frame)
+        return BlockingEvent(
+            started_at=time.time() - (self._clock() - heartbeat),
+            duration=0.0,
+            router=router,
+            function=function,
+            stack=stack,
+        )
+
+    def _get_name(self, frame: FrameType) -> str:
+        code = frame.f_code
+        name = self._strategy_names.get(code) or self._router_names.get(code)
+        if name is None:
+            name = getattr(code, "co_qualname", code.co_name)
+        return f"{frame.f_globals.get('__name__', '?')}:{name}"
+
+    def _attribute(
+        self, frame: Optional[FrameType]
+    ) -> Tuple[Optional[str], Optional[str], List[str]]:
+        router = None
+        function = None
+        package_function = None
+        stack: List[str] = []
+        while frame is not None:
+            code = frame.f_code
+            module = frame.f_globals.get("__name__", "")
+            if len(stack) < 20:
+                stack.append(self._get_name(frame))
+            if function is None and code in self._strategy_names:
+                function = self._strategy_names[code]
+            if package_function is None and module.startswith("tusfastapiserver"):
+                package_function = self._get_name(frame)
+            if code in self._router_names:
+                # The outermost router method wins, e.g. PatchRouter.handle.
+                router = self._router_names[code]
+            frame = frame.f_back
+        return router, function or package_function, stack
+
+    def _record_event(self, event: BlockingEvent, duration: float):
+        event.duration = duration
+        key = f"{event.router} -> {event.function}"
+        with self._events_lock:
+            self._events.append(event)
+            self._blocked_count += 1
+            self._blocked_seconds += duration
+            totals = self._blocking_by_function.setdefault(
+                key, {"count": 0, "seconds": 0.0}
+            )
+            totals["count"] += 1
+            totals["seconds"] += duration
+        logger.warning(
+            f"Event loop blocked for {duration * 1000:.0f}ms in {event.function} "
+            f"(router: {event.router})"
+        )
+
+    @staticmethod
+    def _percentile(samples: List[float], percentile: float) -> float:
+        if not samples:
+            return 0.0
+        return samples[min(int(len(samples) * percentile), len(samples) - 1)]
+
+    def stats(self) -> Dict[str, object]:
+        samples = sorted(self._lag_samples)
+        with self._events_lock:
+            blocked_count = self._blocked_count
+            blocked_seconds = self._blocked_seconds
+        return {
+            "running": self.is_running,
+            "lag_p50": self._percentile(samples, 0.5),
+            "lag_p99": self._percentile(samples, 0.99),
+            "lag_max": self._max_lag,
+            "blocked_count": blocked_count,
+            "blocked_seconds": blocked_seconds,
+        }
+
+    def report(self) -> Dict[str, object]:
+        with self._events_lock:
+            blocking_by_function = {
+                key: dict(totals) for key, totals in self._blocking_by_function.items()
+            }
+            events = [asdict(event) for event in reversed(self._events)]
+        return {
+            **self.stats(),
+            "blocking_by_function": blocking_by_function,
+            "events": events,
+        }
@@ -1,8 +1,18 @@
+from tusfastapiserver.metadata.base import AsyncBaseMetadataStrategy
 from tusfastapiserver.metadata.base import BaseMetadataStrategy
 from tusfastapiserver.metadata.local import LocalMetadataStrategy
+from tusfastapiserver.metadata.journal import JournalMetadataStrategy
+from tusfastapiserver.metadata.cached import CachedMetadataStrategy
+from tusfastapiserver.metadata.adapters import ThreadedMetadataStrategy
+from tusfastapiserver.metadata.adapters import to_async_metadata_strategy
 
 
 __all__ = [
+    "AsyncBaseMetadataStrategy",
     "BaseMetadataStrategy",
+    "CachedMetadataStrategy",
+    "JournalMetadataStrategy",
     "LocalMetadataStrategy",
+    "ThreadedMetadataStrategy",
+    "to_async_metadata_strategy",
 ]
@@ -0,0 +1,67 @@
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Union
+
+from tusfastapiserver.metadata.base import AsyncBaseMetadataStrategy
+from tusfastapiserver.metadata.base import BaseMetadataStrategy
+from tusfastapiserver.schemas import UploadMetadata
+from tusfastapiserver.schemas import UploadMetadataPath
+from tusfastapiserver.utils.concurrency import run_to_completion
+
+
+class ThreadedMetadataStrategy(AsyncBaseMetadataStrategy):
+    """Runs the methods of a synchronous metadata strategy in the thread pool."""
+
+    def __init__(self, strategy: BaseMetadataStrategy):
+        super().__init__(strategy.config)
+        self.strategy = strategy
+        self.metadata_strategy_type = strategy.metadata_strategy_type
+
+    def __getattr__(self, name: str):
+        if name == "strategy":
+            raise AttributeError(name)
+        return getattr(self.strategy, name)
+
+    async def open(self):
+        return await run_to_completion(self.strategy.open)
+
+    async def close(self):
+        return await run_to_completion(self.strategy.close)
+
+    def generate_metadata_path(self, file_id: str) -> UploadMetadataPath:
+        return self.strategy.generate_metadata_path(file_id)
+
+    async def initialize(self, upload_metadata: UploadMetadata, *args, **kwargs):
+        return await run_to_completion(
+            self.strategy.initialize, upload_metadata, *args, **kwargs
+        )
+
+    async def is_metadata_exists(self, file_id: str) -> bool:
+        return await run_to_completion(self.strategy.is_metadata_exists, file_id)
+
+    async def get_metadata(self, file_id: str) -> UploadMetadata:
+        return await run_to_completion(self.strategy.get_metadata, file_id)
+
+    async def get_metadata_many(
+        self, file_ids: List[str]
+    ) -> Dict[str, Optional[UploadMetadata]]:
+        return await run_to_completion(self.strategy.get_metadata_many, file_ids)
+
+    async def update(self, upload_metadata: UploadMetadata, *args, **kwargs):
+        return await run_to_completion(
+            self.strategy.update, upload_metadata, *args, **kwargs
+        )
+
+    async def delete(self, upload_metadata: UploadMetadata, *args, **kwargs):
+        return await run_to_completion(
+            self.strategy.delete, upload_metadata, *args, **kwargs
+        )
+
+
+def to_async_metadata_strategy(
+    strategy: Union[BaseMetadataStrategy, AsyncBaseMetadataStrategy],
+) -> AsyncBaseMetadataStrategy:
+    if isinstance(strategy, AsyncBaseMetadataStrategy):
+        return strategy
+    return ThreadedMetadataStrategy(strategy)
@@ -1,6 +1,11 @@
+from typing import Dict
+from typing import List
+from typing import Optional
+
 from tusfastapiserver.config import Config
 from tusfastapiserver.config import MetadataStrategyType
 from tusfastapiserver.schemas import UploadMetadata
+from tusfastapiserver.schemas import UploadMetadataPath
 
 
 class BaseMetadataStrategy:
@@ -9,6 +14,15 @@ class BaseMetadataStrategy:
     def __init__(self, config: Config, *args, **kwargs):
         self.config = config
 
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def generate_metadata_path(self, file_id: str) -> UploadMetadataPath:
+        raise NotImplementedError()
+
     def initialize(self, *args, **kwargs):
         raise NotImplementedError()
 
@@ -18,5 +32,67 @@ class BaseMetadataStrategy:
     def get_metadata(self, file_id: str) -> UploadMetadata:
         raise NotImplementedError()
 
+    def get_metadata_many(
+        self, file_ids: List[str]
+    ) -> Dict[str, Optional[UploadMetadata]]:
+        return {
+            file_id: (
+                self.get_metadata(file_id) if self.is_metadata_exists(file_id) else None
+            )
+            for file_id in file_ids
+        }
+
     def update(self, upload_metadata: UploadMetadata, *args, **kwargs):
         raise NotImplementedError()
+
+    def delete(self, upload_metadata: UploadMetadata, *args, **kwargs):
+        raise NotImplementedError()
+
+
+class AsyncBaseMetadataStrategy:
+    """Metadata strategy whose I/O methods are coroutines.
+
+    Routers only talk to this interface; synchronous strategies are wrapped in
+    ``ThreadedMetadataStrategy``, which runs them in the thread pool.
+    """
+
+    metadata_strategy_type: MetadataStrategyType
+
+    def __init__(self, config: Config, *args, **kwargs):
+        self.config = config
+
+    async def open(self):
+        pass
+
+    async def close(self):
+        pass
+
+    def generate_metadata_path(self, file_id: str) -> UploadMetadataPath:
+        raise NotImplementedError()
+
+    async def initialize(self, upload_metadata: UploadMetadata, *args, **kwargs):
+        raise NotImplementedError()
+
+    async def is_metadata_exists(self, file_id: str) -> bool:
+        raise NotImplementedError()
+
+    async def get_metadata(self, file_id: str) -> UploadMetadata:
+        raise NotImplementedError()
+
+    async def get_metadata_many(
+        self, file_ids: List[str]
+    ) -> Dict[str, Optional[UploadMetadata]]:
+        return {
+            file_id: (
+                await self.get_metadata(file_id)
+                if await self.is_metadata_exists(file_id)
+                else None
+            )
+            for file_id in file_ids
+        }
+
+    async def update(self, upload_metadata: UploadMetadata, *args, **kwargs):
+        raise NotImplementedError()
+
+    async def delete(self, upload_metadata: UploadMetadata, *args, **kwargs):
+        raise NotImplementedError()
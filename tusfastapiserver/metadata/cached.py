@@ -0,0 +1,249 @@
+import logging
+import mmap
+import os
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict
+from typing import Iterator
+from typing import Optional
+from typing import Tuple
+
+from tusfastapiserver.config import MetadataStrategyType
+from tusfastapiserver.metadata.local import LocalMetadataStrategy
+from tusfastapiserver.schemas import UploadMetadata
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+
+GENERATION = struct.Struct("<Q")
+LOCK_STRIPES = 64
+
+
+class GenerationTable:
+    """The generation counters of one ``_cache`` directory, mapped once per
+    process.
+
+    ``fcntl`` locks are held by the process and closing any descriptor of the
+    file releases all of them, so all ``CachedMetadataStrategy`` instances of a
+    process that share a ``metadata_path`` share one table: one descriptor,
+    one mapping and one set of thread locks for the slots. ``acquire`` and
+    ``release`` count its users; the last one closes it.
+    """
+
+    _tables: Dict[str, "GenerationTable"] = {}
+    _tables_lock = threading.Lock()
+
+    def __init__(self, path: str, slot_count: int):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.lockf(fd, fcntl.LOCK_EX)
+            try:
+                size = os.fstat(fd).st_size
+                if size < GENERATION.size:
+                    size = slot_count * GENERATION.size
+                    os.ftruncate(fd, size)
+            finally:
+                fcntl.lockf(fd, fcntl.LOCK_UN)
+            self.generations = mmap.mmap(fd, size)
+        except BaseException:
+            os.close(fd)
+            raise
+        self.path = path
+        self.fd = fd
+        self.slot_count = size // GENERATION.size
+        self.slot_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self.references = 0
+        logger.info(f"Mapped {self.slot_count} metadata generation slots from {path}")
+
+    @classmethod
+    def acquire(cls, path: str, slot_count: int) -> "GenerationTable":
+        path = os.path.realpath(path)
+        with cls._tables_lock:
+            table = cls._tables.get(path)
+            if table is None:
+                table = cls._tables[path] = cls(path, slot_count)
+            table.references += 1
+            return table
+
+    def release(self):
+        with self._tables_lock:
+            self.references -= 1
+            if self.references > 0:
+                return
+            del self._tables[self.path]
+            self.generations.close()
+            os.close(self.fd)
+
+    def read(self, slot: int) -> int:
+        return GENERATION.unpack_from(self.generations, slot * GENERATION.size)[0]
+
+    def increment(self, slot: int) -> int:
+        generation = self.read(slot) + 1
+        GENERATION.pack_into(self.generations, slot * GENERATION.size, generation)
+        return generation
+
+    @contextmanager
+    def lock(self, slot: int) -> Iterator[None]:
+        # fcntl locks are held by the process, so threads also need a lock.
+        with self.slot_locks[slot % LOCK_STRIPES]:
+            position = slot * GENERATION.size
+            fcntl.lockf(self.fd, fcntl.LOCK_EX, GENERATION.size, position)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self.fd, fcntl.LOCK_UN, GENERATION.size, position)
+
+
+class CachedMetadataStrategy(LocalMetadataStrategy):
+    """``LocalMetadataStrategy`` that keeps recently used metadata in memory,
+    coherently across the worker processes sharing a ``metadata_path``.
+
+    Every upload hashes to a slot of a generation counter table, a file in
+    ``<metadata_path>/_cache`` that all workers map into memory. Writers
+    change the JSON document and increment the slot while holding an
+    ``fcntl`` lock on it. Readers take no lock: they read the slot before the
+    document and cache both, and a cached document is only used while its slot
+    still holds the same generation. A reader therefore sees every write that
+    completed before the read started, on any worker.
+
+    ``metadata_cache_slots`` is the size of the table; uploads sharing a slot
+    only invalidate each other. The table size is fixed by the first worker
+    that creates the file. At most ``metadata_cache_size`` documents are
+    cached per worker. Instances of a process share the table, see
+    ``GenerationTable``.
+    """
+
+    metadata_strategy_type = MetadataStrategyType.CACHED
+
+    def __init__(self, config, *args, **kwargs):
+        if fcntl is None:
+            raise RuntimeError("CachedMetadataStrategy requires fcntl locks")
+        super().__init__(config, *args, **kwargs)
+        self.cache_path = os.path.join(config.metadata_path, "_cache")
+        self._cache: "OrderedDict[str, Tuple[int, UploadMetadata]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._open_lock = threading.Lock()
+        self._table: Optional[GenerationTable] = None
+
+    @property
+    def generations_file_path(self) -> str:
+        return os.path.join(self.cache_path, "generations")
+
+    @property
+    def _slot_count(self) -> int:
+        return self._get_table().slot_count
+
+    def open(self):
+        super().open()
+        self._get_table()
+
+    def close(self):
+        with self._open_lock:
+            if self._table is not None:
+                self._table.release()
+                self._table = None
+        with self._cache_lock:
+            self._cache.clear()
+        super().close()
+
+    def _get_table(self) -> GenerationTable:
+        table = self._table
+        if table is None:
+            with self._open_lock:
+                if self._table is None:
+                    self._table = GenerationTable.acquire(
+                        self.generations_file_path, self.config.metadata_cache_slots
+                    )
+                table = self._table
+        return table
+
+    def _get_slot(self, file_id: str) -> int:
+        return zlib.crc32(file_id.encode()) % self._slot_count
+
+    def _read_generation(self, slot: int) -> int:
+        return self._get_table().read(slot)
+
+    @contextmanager
+    def _lock_slot(self, slot: int) -> Iterator[None]:
+        with self._get_table().lock(slot):
+            yield
+
+    def _increment_generation(self, slot: int) -> int:
+        return self._get_table().increment(slot)
+
+    def _get_cached(self, file_id: str, generation: int) -> Optional[UploadMetadata]:
+        with self._cache_lock:
+            entry = self._cache.get(file_id)
+            if entry is None:
+                return None
+            if entry[0] != generation:
+                del self._cache[file_id]
+                return None
+            self._cache.move_to_end(file_id)
+            return entry[1]
+
+    def _set_cached(self, generation: int, upload_metadata: UploadMetadata):
+        with self._cache_lock:
+            self._cache[upload_metadata.id] = (generation, upload_metadata.model_copy())
+            self._cache.move_to_end(upload_metadata.id)
+            while len(self._cache) > self.config.metadata_cache_size:
+                self._cache.popitem(last=False)
+
+    def invalidate(self, file_id: str):
+        """Drops ``file_id`` from the caches of all workers, for changes made
+        to its document outside of this strategy."""
+        slot = self._get_slot(file_id)
+        with self._lock_slot(slot):
+            self._increment_generation(slot)
+        with self._cache_lock:
+            self._cache.pop(file_id, None)
+
+    def is_metadata_exists(self, file_id: str) -> bool:
+        slot = self._get_slot(file_id)
+        if self._get_cached(file_id, self._read_generation(slot)) is not None:
+            return True
+        return super().is_metadata_exists(file_id)
+
+    def get_metadata(self, file_id: str) -> UploadMetadata:
+        slot = self._get_slot(file_id)
+        # The generation is read first: a write that lands in between bumps it,
+        # so the document read below is cached under an outdated generation.
+        generation = self._read_generation(slot)
+        upload_metadata = self._get_cached(file_id, generation)
+        if upload_metadata is not None:
+            return upload_metadata.model_copy()
+        upload_metadata = super().get_metadata(file_id)
+        self._set_cached(generation, upload_metadata)
+        return upload_metadata
+
+    def initialize(self, upload_metadata: UploadMetadata) -> None:
+        slot = self._get_slot(upload_metadata.id)
+        with self._lock_slot(slot):
+            super().initialize(upload_metadata)
+            generation = self._increment_generation(slot)
+        self._set_cached(generation, upload_metadata)
+
+    def update(self, upload_metadata: UploadMetadata, *args, **kwargs):
+        slot = self._get_slot(upload_metadata.id)
+        with self._lock_slot(slot):
+            super().update(upload_metadata, *args, **kwargs)
+            generation = self._increment_generation(slot)
+        self._set_cached(generation, upload_metadata)
+
+    def delete(self, upload_metadata: UploadMetadata, *args, **kwargs):
+        slot = self._get_slot(upload_metadata.id)
+        with self._lock_slot(slot):
+            super().delete(upload_metadata, *args, **kwargs)
+            self._increment_generation(slot)
+        with self._cache_lock:
+            self._cache.pop(upload_metadata.id, None)
@@ -0,0 +1,261 @@
+import base64
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+from tusfastapiserver.schemas import UploadIndexEntry
+from tusfastapiserver.schemas import UploadMetadata
+from tusfastapiserver.schemas import UploadState
+
+logger = logging.getLogger(__name__)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS uploads (
+    id TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    upload_offset INTEGER NOT NULL,
+    upload_length INTEGER,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS uploads_state_created_at ON uploads (state, created_at, id);
+CREATE INDEX IF NOT EXISTS uploads_created_at ON uploads (created_at, id);
+CREATE INDEX IF NOT EXISTS uploads_updated_at ON uploads (updated_at);
+CREATE INDEX IF NOT EXISTS uploads_upload_length ON uploads (upload_length);
+CREATE TABLE IF NOT EXISTS upload_metadata (
+    id TEXT NOT NULL REFERENCES uploads (id) ON DELETE CASCADE,
+    key TEXT NOT NULL,
+    value TEXT,
+    PRIMARY KEY (id, key)
+);
+CREATE INDEX IF NOT EXISTS upload_metadata_key_value ON upload_metadata (key, value);
+"""
+
+
+def get_state(upload_metadata: UploadMetadata) -> UploadState:
+    if (
+        upload_metadata.upload_length is not None
+        and upload_metadata.upload_offset >= upload_metadata.upload_length
+    ):
+        return UploadState.COMPLETED
+    return UploadState.INCOMPLETE
+
+
+def encode_cursor(created_at: float, file_id: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([created_at, file_id]).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[float, str]:
+    created_at, file_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    return float(created_at), str(file_id)
+
+
+class SQLiteMetadataIndex:
+    """Secondary index over upload metadata, kept up to date by the strategy.
+
+    Offset-only changes of an upload are written at most once per
+    ``min_update_interval`` seconds; state changes are always written.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        indexed_keys: Sequence[str] = (),
+        min_update_interval: float = 5.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path
+        self.indexed_keys = list(indexed_keys)
+        self.min_update_interval = min_update_interval
+        self._clock = clock
+        self._local = threading.local()
+        self._last_writes: Dict[str, Tuple[UploadState, float]] = {}
+        self._initialized = False
+        self._initialize_lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            self._initialize()
+            connection = self._connect()
+            self._local.connection = connection
+        return connection
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA foreign_keys=ON")
+        return connection
+
+    def _initialize(self):
+        with self._initialize_lock:
+            if self._initialized:
+                return
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            connection = self._connect()
+            connection.executescript(SCHEMA)
+            connection.close()
+            self._initialized = True
+
+    def _should_write(
+        self, upload_metadata: UploadMetadata, state: UploadState
+    ) -> bool:
+        last_write = self._last_writes.get(upload_metadata.id)
+        if last_write is None:
+            return True
+        last_state, last_written_at = last_write
+        return (
+            last_state != state
+            or self._clock() - last_written_at >= self.min_update_interval
+        )
+
+    def upsert(self, upload_metadata: UploadMetadata, force: bool = False):
+        state = get_state(upload_metadata)
+        if not force and not self._should_write(upload_metadata, state):
+            return
+        now = self._clock()
+        connection = self.connection
+        with connection:
+            connection.execute("BEGIN")
+            connection.execute(
+                """
+                INSERT INTO uploads
+                    (id, state, upload_offset, upload_length, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (id) DO UPDATE SET
+                    state = excluded.state,
+                    upload_offset = excluded.upload_offset,
+                    upload_length = excluded.upload_length,
+                    updated_at = excluded.updated_at
+                """,
+                (
+                    upload_metadata.id,
+                    state.value,
+                    upload_metadata.upload_offset,
+                    upload_metadata.upload_length,
+                    upload_metadata.created_at.timestamp(),
+                    now,
+                ),
+            )
+            connection.executemany(
+                "INSERT OR REPLACE INTO upload_metadata (id, key, value) VALUES (?, ?, ?)",
+                [
+                    (upload_metadata.id, key, value)
+                    for key, value in (upload_metadata.metadata or {}).items()
+                    if key in self.indexed_keys
+                ],
+            )
+        if state == UploadState.COMPLETED:
+            self._last_writes.pop(upload_metadata.id, None)
+        else:
+            self._last_writes[upload_metadata.id] = (state, now)
+
+    def delete(self, file_id: str):
+        self._last_writes.pop(file_id, None)
+        connection = self.connection
+        with connection:
+            connection.execute("DELETE FROM uploads WHERE id = ?", (file_id,))
+
+    def rebuild(self, uploads: Iterable[UploadMetadata]) -> int:
+        count = 0
+        for upload_metadata in uploads:
+            self.upsert(upload_metadata, force=True)
+            count += 1
+        logger.info(f"Indexed {count} uploads")
+        return count
+
+    def query(
+        self,
+        state: Optional[UploadState] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        updated_before: Optional[datetime] = None,
+        min_length: Optional[int] = None,
+        max_length: Optional[int] = None,
+        metadata: Optional[Dict[str, str]] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[UploadIndexEntry], Optional[str]]:
+        conditions = []
+        parameters: list = []
+        if state is not None:
+            conditions.append("state = ?")
+            parameters.append(state.value)
+        if created_after is not None:
+            conditions.append("created_at >= ?")
+            parameters.append(created_after.timestamp())
+        if created_before is not None:
+            conditions.append("created_at < ?")
+            parameters.append(created_before.timestamp())
+        if updated_before is not None:
+            conditions.append("updated_at < ?")
+            parameters.append(updated_before.timestamp())
+        if min_length is not None:
+            conditions.append("upload_length >= ?")
+            parameters.append(min_length)
+        if max_length is not None:
+            conditions.append("upload_length <= ?")
+            parameters.append(max_length)
+        for key, value in (metadata or {}).items():
+            conditions.append(
+                "EXISTS (SELECT 1 FROM upload_metadata m "
+                "WHERE m.id = uploads.id AND m.key = ? AND m.value = ?)"
+            )
+            parameters.extend([key, value])
+        if cursor is not None:
+            cursor_created_at, cursor_id = decode_cursor(cursor)
+            conditions.append("(created_at, id) > (?, ?)")
+            parameters.extend([cursor_created_at, cursor_id])
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self.connection.execute(
+            f"""
+            SELECT id, state, upload_offset, upload_length, created_at, updated_at
+            FROM uploads {where}
+            ORDER BY created_at, id
+            LIMIT ?
+            """,
+            [*parameters, limit + 1],
+        ).fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1][4], rows[-1][0])
+        return self._get_entries(rows), next_cursor
+
+    def _get_entries(self, rows: List[tuple]) -> List[UploadIndexEntry]:
+        metadata_by_id: Dict[str, Dict[str, Optional[str]]] = {}
+        if rows:
+            placeholders = ",".join("?" for _ in rows)
+            for file_id, key, value in self.connection.execute(
+                f"SELECT id, key, value FROM upload_metadata WHERE id IN ({placeholders})",
+                [row[0] for row in rows],
+            ):
+                metadata_by_id.setdefault(file_id, {})[key] = value
+        return [
+            UploadIndexEntry(
+                id=file_id,
+                state=UploadState(state),
+                upload_offset=upload_offset,
+                upload_length=upload_length,
+                created_at=datetime.fromtimestamp(created_at),
+                updated_at=datetime.fromtimestamp(updated_at),
+                metadata=metadata_by_id.get(file_id, {}),
+            )
+            for file_id, state, upload_offset, upload_length, created_at, updated_at in rows
+        ]
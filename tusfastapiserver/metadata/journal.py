@@ -0,0 +1,416 @@
+import errno
+import json
+import logging
+import os
+import struct
+import threading
+import zlib
+from pathlib import Path
+from typing import BinaryIO
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from tusfastapiserver.config import MetadataStrategyType
+from tusfastapiserver.metadata import BaseMetadataStrategy
+from tusfastapiserver.schemas import UploadMetadata
+from tusfastapiserver.schemas import UploadMetadataPath
+
+logger = logging.getLogger(__name__)
+
+
+JOURNAL_MAGIC = b"TUSJRNL1"
+JOURNAL_HEADER = struct.Struct("<8sQ")
+# kind, slot, upload_offset, crc32 of the preceding fields
+OFFSET_RECORD = struct.Struct("<BIQI")
+# kind, slot, payload length; followed by the JSON payload and its crc32
+DOCUMENT_HEADER = struct.Struct("<BII")
+CRC = struct.Struct("<I")
+
+OFFSET = 1
+DOCUMENT = 2
+DELETE = 3
+
+
+class CorruptedJournalError(ValueError):
+    pass
+
+
+class JournalMetadataStrategy(BaseMetadataStrategy):
+    """Keeps the metadata of all uploads in memory and persists every change
+    as an append to a write-ahead journal.
+
+    An offset update, the most frequent change, is a fixed-size 17-byte
+    record. Other changes write the whole document once. Every upload gets a
+    numeric slot in its first document record, which offset records refer to.
+
+    The journal is compacted in a background thread: every
+    ``metadata_journal_compaction_interval`` seconds, or sooner when it
+    grows past ``metadata_journal_compaction_size`` bytes, the state is
+    written to a snapshot and the journals it covers are removed. ``open``
+    loads the snapshot and replays the newer journals. A record torn by a
+    crash is dropped from the end of the journal.
+
+    The state lives in one instance, so all routers must share it through a
+    ``StrategyRegistry``, and every process needs its own ``metadata_path``
+    or ``node_id``.
+    """
+
+    metadata_strategy_type = MetadataStrategyType.JOURNAL
+
+    def __init__(self, config, *args, **kwargs):
+        super().__init__(config, *args, **kwargs)
+        self.journal_path = os.path.join(config.metadata_path, "_journal")
+        self._name = config.node_id or "default"
+        self._uploads: Dict[str, UploadMetadata] = {}
+        self._slots: Dict[str, int] = {}
+        self._ids: Dict[int, str] = {}
+        self._next_slot = 0
+        self._generation = 0
+        self._journal: Optional[BinaryIO] = None
+        self._journal_size = 0
+        self._lock = threading.RLock()
+        self._compaction_lock = threading.Lock()
+        self._compaction_requested = threading.Event()
+        self._stopped = threading.Event()
+        self._compaction_thread: Optional[threading.Thread] = None
+
+    @property
+    def snapshot_file_path(self) -> str:
+        return os.path.join(self.journal_path, f"{self._name}.snapshot.json")
+
+    def _get_journal_file_path(self, generation: int) -> str:
+        return os.path.join(
+            self.journal_path, f"{self._name}.{generation:012d}.journal"
+        )
+
+    def _list_journal_generations(self) -> List[int]:
+        prefix, suffix = f"{self._name}.", ".journal"
+        generations = []
+        for name in os.listdir(self.journal_path):
+            if name.startswith(prefix) and name.endswith(suffix):
+                generation = name[len(prefix) : -len(suffix)]
+                if generation.isdigit():
+                    generations.append(int(generation))
+        return sorted(generations)
+
+    def open(self):
+        self._load()
+        if self._compaction_thread is None:
+            self._stopped.clear()
+            self._compaction_thread = threading.Thread(
+                target=self._run_compaction, name="tus-metadata-journal", daemon=True
+            )
+            self._compaction_thread.start()
+
+    def close(self):
+        if self._compaction_thread is not None:
+            self._stopped.set()
+            self._compaction_requested.set()
+            self._compaction_thread.join()
+            self._compaction_thread = None
+        self.compact()
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+    def _load(self) -> BinaryIO:
+        with self._lock:
+            if self._journal is not None:
+                return self._journal
+            Path(self.journal_path).mkdir(parents=True, exist_ok=True)
+            snapshot_generation = self._load_snapshot()
+            generations = [
+                generation
+                for generation in self._list_journal_generations()
+                if generation > snapshot_generation
+            ]
+            for generation in generations:
+                self._replay(generation, is_last=generation == generations[-1])
+            if generations:
+                journal = self._open_journal(generations[-1])
+            else:
+                journal = self._open_journal(snapshot_generation + 1)
+            logger.info(
+                f"Loaded metadata of {len(self._uploads)} uploads from "
+                f"{len(generations)} journals in {self.journal_path}"
+            )
+            return journal
+
+    def _load_snapshot(self) -> int:
+        try:
+            with open(self.snapshot_file_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return 0
+        for slot, data in snapshot["uploads"]:
+            self._set_upload(slot, UploadMetadata(**data))
+        self._next_slot = max(self._next_slot, snapshot["next_slot"])
+        return snapshot["generation"]
+
+    def _replay(self, generation: int, is_last: bool):
+        path = self._get_journal_file_path(generation)
+        with open(path, "rb") as f:
+            data = f.read()
+        position = 0
+        try:
+            self._check_header(data, generation)
+            position = JOURNAL_HEADER.size
+            while position < len(data):
+                position = self._apply_record(data, position)
+        except CorruptedJournalError as error:
+            logger.warning(f"Dropping journal {path} after byte {position}: {error}")
+            if is_last:
+                os.truncate(path, position)
+                if position == 0:
+                    self._write_header(path, generation)
+
+    @staticmethod
+    def _check_header(data: bytes, generation: int):
+        if len(data) < JOURNAL_HEADER.size:
+            raise CorruptedJournalError("incomplete header")
+        magic, header_generation = JOURNAL_HEADER.unpack_from(data)
+        if magic != JOURNAL_MAGIC or header_generation != generation:
+            raise CorruptedJournalError("invalid header")
+
+    def _apply_record(self, data: bytes, position: int) -> int:
+        kind = data[position]
+        if kind in (OFFSET, DELETE):
+            end = position + OFFSET_RECORD.size
+            if end > len(data):
+                raise CorruptedJournalError("incomplete record")
+            _, slot, upload_offset, crc = OFFSET_RECORD.unpack_from(data, position)
+            if zlib.crc32(data[position : end - CRC.size]) != crc:
+                raise CorruptedJournalError("checksum mismatch")
+            file_id = self._ids.get(slot)
+            if file_id is None:
+                raise CorruptedJournalError(f"unknown slot {slot}")
+            if kind == OFFSET:
+                self._uploads[file_id] = self._uploads[file_id].model_copy(
+                    update={"upload_offset": upload_offset}
+                )
+            else:
+                self._remove_upload(file_id)
+            return end
+        if kind == DOCUMENT:
+            payload_start = position + DOCUMENT_HEADER.size
+            if payload_start > len(data):
+                raise CorruptedJournalError("incomplete record")
+            _, slot, length = DOCUMENT_HEADER.unpack_from(data, position)
+            end = payload_start + length + CRC.size
+            if end > len(data):
+                raise CorruptedJournalError("incomplete record")
+            (crc,) = CRC.unpack_from(data, end - CRC.size)
+            if zlib.crc32(data[position : end - CRC.size]) != crc:
+                raise CorruptedJournalError("checksum mismatch")
+            payload = data[payload_start : end - CRC.size]
+            self._set_upload(slot, UploadMetadata(**json.loads(payload)))
+            return end
+        raise CorruptedJournalError(f"unknown record kind {kind}")
+
+    def _set_upload(self, slot: int, upload_metadata: UploadMetadata):
+        self._uploads[upload_metadata.id] = upload_metadata
+        self._slots[upload_metadata.id] = slot
+        self._ids[slot] = upload_metadata.id
+        self._next_slot = max(self._next_slot, slot + 1)
+
+    def _remove_upload(self, file_id: str):
+        self._uploads.pop(file_id, None)
+        slot = self._slots.pop(file_id, None)
+        if slot is not None:
+            self._ids.pop(slot, None)
+
+    @staticmethod
+    def _write_header(path: str, generation: int):
+        with open(path, "wb") as f:
+            f.write(JOURNAL_HEADER.pack(JOURNAL_MAGIC, generation))
+
+    def _open_journal(self, generation: int) -> BinaryIO:
+        path = self._get_journal_file_path(generation)
+        if not os.path.exists(path):
+            self._write_header(path, generation)
+        journal = open(path, "ab", buffering=0)
+        self._journal = journal
+        self._journal_size = journal.tell()
+        self._generation = generation
+        return journal
+
+    def _append(self, record: bytes):
+        journal = self._journal
+        if journal is None:
+            journal = self._load()
+        try:
+            if journal.write(record) != len(record):
+                raise OSError(errno.ENOSPC, os.strerror(errno.ENOSPC))
+        except OSError:
+            # A partial record would hide every record appended after it.
+            journal.truncate(self._journal_size)
+            raise
+        self._journal_size += len(record)
+        if self._journal_size >= self.config.metadata_journal_compaction_size:
+            self._compaction_requested.set()
+
+    @staticmethod
+    def _pack_offset_record(kind: int, slot: int, upload_offset: int) -> bytes:
+        record = OFFSET_RECORD.pack(kind, slot, upload_offset, 0)[: -CRC.size]
+        return record + CRC.pack(zlib.crc32(record))
+
+    @staticmethod
+    def _pack_document_record(slot: int, upload_metadata: UploadMetadata) -> bytes:
+        payload = upload_metadata.model_dump_json().encode()
+        record = DOCUMENT_HEADER.pack(DOCUMENT, slot, len(payload)) + payload
+        return record + CRC.pack(zlib.crc32(record))
+
+    def _write_document(self, upload_metadata: UploadMetadata):
+        with self._lock:
+            slot = self._slots.get(upload_metadata.id)
+            if slot is None:
+                slot = self._next_slot
+            self._append(self._pack_document_record(slot, upload_metadata))
+            self._set_upload(slot, upload_metadata.model_copy())
+
+    def generate_metadata_path(self, file_id: str) -> UploadMetadataPath:
+        return UploadMetadataPath(self.journal_path)
+
+    def is_metadata_exists(self, file_id: str) -> bool:
+        if self._journal is None:
+            self._load()
+        return file_id in self._uploads
+
+    def get_metadata(self, file_id: str) -> UploadMetadata:
+        if self._journal is None:
+            self._load()
+        upload_metadata = self._uploads.get(file_id)
+        if upload_metadata is None:
+            raise FileNotFoundError(f"No metadata for upload {file_id}")
+        return upload_metadata.model_copy()
+
+    def get_metadata_many(
+        self, file_ids: List[str]
+    ) -> Dict[str, Optional[UploadMetadata]]:
+        if self._journal is None:
+            self._load()
+        result = {}
+        for file_id in file_ids:
+            upload_metadata = self._uploads.get(file_id)
+            result[file_id] = (
+                upload_metadata.model_copy() if upload_metadata is not None else None
+            )
+        return result
+
+    def iter_metadata(self) -> Iterator[UploadMetadata]:
+        if self._journal is None:
+            self._load()
+        for upload_metadata in list(self._uploads.values()):
+            yield upload_metadata.model_copy()
+
+    def initialize(self, upload_metadata: UploadMetadata) -> None:
+        self._write_document(upload_metadata)
+        self._index(upload_metadata)
+
+    def update(self, upload_metadata: UploadMetadata, *args, **kwargs):
+        with self._lock:
+            if self._journal is None:
+                self._load()
+            current = self._uploads.get(upload_metadata.id)
+            if current is not None and dict(
+                current, upload_offset=upload_metadata.upload_offset
+            ) == dict(upload_metadata):
+                slot = self._slots[upload_metadata.id]
+                self._append(
+                    self._pack_offset_record(
+                        OFFSET, slot, upload_metadata.upload_offset
+                    )
+                )
+                self._uploads[upload_metadata.id] = upload_metadata.model_copy()
+            else:
+                self._write_document(upload_metadata)
+        self._index(upload_metadata)
+
+    def delete(self, upload_metadata: UploadMetadata, *args, **kwargs):
+        with self._lock:
+            if self._journal is None:
+                self._load()
+            slot = self._slots.get(upload_metadata.id)
+            if slot is not None:
+                self._append(self._pack_offset_record(DELETE, slot, 0))
+                self._remove_upload(upload_metadata.id)
+        if self.config.metadata_index is not None:
+            self.config.metadata_index.delete(upload_metadata.id)
+
+    def _index(self, upload_metadata: UploadMetadata) -> None:
+        if self.config.metadata_index is not None:
+            self.config.metadata_index.upsert(upload_metadata)
+
+    def _get_state(self) -> Tuple[int, int, List[Tuple[int, UploadMetadata]]]:
+        return (
+            self._generation,
+            self._next_slot,
+            [
+                (self._slots[file_id], upload_metadata)
+                for file_id, upload_metadata in self._uploads.items()
+            ],
+        )
+
+    def compact(self):
+        """Writes a snapshot of the current state and removes the journals it
+        covers. Appends go to a new journal while the snapshot is written."""
+        with self._compaction_lock:
+            with self._lock:
+                if self._journal is None:
+                    return
+                if self._journal_size <= JOURNAL_HEADER.size:
+                    return
+                generation, next_slot, uploads = self._get_state()
+                self._journal.close()
+                self._open_journal(generation + 1)
+                self._compaction_requested.clear()
+            self._write_snapshot(generation, next_slot, uploads)
+            for old_generation in self._list_journal_generations():
+                if old_generation <= generation:
+                    os.remove(self._get_journal_file_path(old_generation))
+            logger.info(
+                f"Compacted metadata journal {generation} into a snapshot of "
+                f"{len(uploads)} uploads"
+            )
+
+    def _write_snapshot(
+        self, generation: int, next_slot: int, uploads: List[Tuple[int, UploadMetadata]]
+    ):
+        snapshot = {
+            "generation": generation,
+            "next_slot": next_slot,
+            "uploads": [
+                [slot, upload_metadata.model_dump(mode="json")]
+                for slot, upload_metadata in uploads
+            ],
+        }
+        temporary_path = f"{self.snapshot_file_path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary_path, self.snapshot_file_path)
+        directory = os.open(self.journal_path, os.O_RDONLY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+
+    def _run_compaction(self):
+        while not self._stopped.is_set():
+            self._compaction_requested.wait(
+                self.config.metadata_journal_compaction_interval
+            )
+            if self._stopped.is_set():
+                return
+            try:
+                self.compact()
+            except Exception:
+                logger.exception(
+                    f"Failed to compact metadata journal {self.journal_path}"
+                )
+                self._stopped.wait(self.config.metadata_journal_compaction_interval)
@@ -1,6 +1,11 @@
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
 
 from tusfastapiserver.schemas import UploadMetadata
 from tusfastapiserver.schemas import UploadMetadataPath
@@ -25,6 +30,48 @@ class LocalMetadataStrategy(BaseMetadataStrategy):
         with open(self.generate_metadata_path(file_id), "r", encoding="utf-8") as f:
             return UploadMetadata(**json.load(f))
 
+    def _get_metadata_or_none(self, file_id: str) -> Optional[UploadMetadata]:
+        try:
+            return self.get_metadata(file_id)
+        except FileNotFoundError:
+            return None
+
+    def get_metadata_many(
+        self, file_ids: List[str]
+    ) -> Dict[str, Optional[UploadMetadata]]:
+        unique_file_ids = list(dict.fromkeys(file_ids))
+        if len(unique_file_ids) <= 1:
+            return {
+                file_id: self._get_metadata_or_none(file_id)
+                for file_id in unique_file_ids
+            }
+        return dict(
+            zip(
+                unique_file_ids,
+                self._get_read_executor().map(
+                    self._get_metadata_or_none, unique_file_ids
+                ),
+            )
+        )
+
+    def open(self):
+        Path(self.config.metadata_path).mkdir(parents=True, exist_ok=True)
+        self._get_read_executor()
+
+    def close(self):
+        executor = getattr(self, "_read_executor", None)
+        if executor is not None:
+            self._read_executor = None
+            executor.shutdown(wait=True)
+
+    def _get_read_executor(self) -> ThreadPoolExecutor:
+        if getattr(self, "_read_executor", None) is None:
+            self._read_executor = ThreadPoolExecutor(
+                max_workers=self.config.metadata_read_concurrency,
+                thread_name_prefix="tus-metadata-read",
+            )
+        return self._read_executor
+
     @staticmethod
     def _check_or_make_folder(path: UploadMetadataPath) -> None:
         Path(path).parent.mkdir(parents=True, exist_ok=True)
@@ -43,6 +90,7 @@ class LocalMetadataStrategy(BaseMetadataStrategy):
     def initialize(self, upload_metadata: UploadMetadata) -> None:
         self._check_or_make_folder(upload_metadata.upload_metadata_path)
         self._create_metadata_file(upload_metadata)
+        self._index(upload_metadata)
 
     def _update_metadata_file(self, upload_metadata: UploadMetadata) -> None:
         with open(upload_metadata.upload_metadata_path, "r+", encoding="utf-8") as f:
@@ -54,3 +102,43 @@ class LocalMetadataStrategy(BaseMetadataStrategy):
 
     def update(self, upload_metadata: UploadMetadata, *args, **kwargs):
         self._update_metadata_file(upload_metadata)
+        self._index(upload_metadata)
+
+    def _index(self, upload_metadata: UploadMetadata) -> None:
+        if self.config.metadata_index is not None:
+            self.config.metadata_index.upsert(upload_metadata)
+
+    def list_file_ids(self) -> Iterator[str]:
+        if not os.path.isdir(self.config.metadata_path):
+            return
+        with os.scandir(self.config.metadata_path) as entries:
+            for entry in entries:
+                if entry.is_dir() and os.path.exists(
+                    self.generate_metadata_path(entry.name)
+                ):
+                    yield entry.name
+
+    def iter_metadata(self) -> Iterator[UploadMetadata]:
+        for file_id in self.list_file_ids():
+            upload_metadata = self._get_metadata_or_none(file_id)
+            if upload_metadata is not None:
+                yield upload_metadata
+
+    @staticmethod
+    def _remove_metadata_file(path: UploadMetadataPath) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        try:
+            Path(path).parent.rmdir()
+        except OSError:
+            pass
+
+    def delete(self, upload_metadata: UploadMetadata, *args, **kwargs):
+        self._remove_metadata_file(
+            upload_metadata.upload_metadata_path
+            or self.generate_metadata_path(upload_metadata.id)
+        )
+        if self.config.metadata_index is not None:
+            self.config.metadata_index.delete(upload_metadata.id)
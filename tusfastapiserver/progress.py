@@ -0,0 +1,158 @@
+import asyncio
+import logging
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Set
+
+from tusfastapiserver.schemas import UploadMetadata
+from tusfastapiserver.schemas import UploadProgress
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressSubscription:
+    """Latest progress of a set of uploads, waiting to be read by one
+    subscriber. Updates that arrive before the subscriber reads them replace
+    each other, so a slow subscriber only receives the newest offsets."""
+
+    def __init__(self, broadcaster: "BaseProgressBroadcaster", file_ids: Iterable[str]):
+        self.broadcaster = broadcaster
+        self.file_ids: Set[str] = set(file_ids)
+        self.closed = False
+        self._latest: Dict[str, UploadProgress] = {}
+        self._updated = asyncio.Event()
+
+    def push(self, progress: UploadProgress):
+        self._latest[progress.id] = progress
+        self._updated.set()
+
+    async def get(self, timeout: Optional[float] = None) -> List[UploadProgress]:
+        """Waits for updates and returns them; returns an empty list after
+        ``timeout`` seconds or when the subscription is closed."""
+        if not self._latest and not self.closed:
+            try:
+                await asyncio.wait_for(self._updated.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        self._updated.clear()
+        updates = list(self._latest.values())
+        self._latest.clear()
+        return updates
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self._updated.set()
+            self.broadcaster.unsubscribe(self)
+
+    def __enter__(self) -> "ProgressSubscription":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class BaseProgressBroadcaster:
+    """Delivers upload progress published by ``PatchRouter`` to subscribers.
+
+    ``publish`` only records the latest progress of an upload. A background
+    task sends what was recorded at most once per ``interval`` seconds, so an
+    upload that commits hundreds of chunks per second produces a few batches.
+
+    ``_send`` transports a batch to every worker; each worker hands received
+    batches to ``_deliver``, which fans them out to its local subscribers. A
+    broadcaster for several workers implements ``_send`` with a message bus
+    and calls ``_deliver`` from a listener started in ``start``.
+    """
+
+    def __init__(self, interval: float = 0.25):
+        self.interval = interval
+        self._pending: Dict[str, UploadProgress] = {}
+        self._subscriptions: Dict[str, Set[ProgressSubscription]] = {}
+        self._published: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self._task is None:
+            self._published = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+            await self._flush()
+        for subscriptions in list(self._subscriptions.values()):
+            for subscription in list(subscriptions):
+                subscription.close()
+
+    def publish(self, upload_metadata: UploadMetadata, terminated: bool = False):
+        if self._task is None or self._published is None:
+            return
+        self._pending[upload_metadata.id] = UploadProgress(
+            id=upload_metadata.id,
+            upload_offset=upload_metadata.upload_offset,
+            upload_length=upload_metadata.upload_length,
+            terminated=terminated,
+        )
+        self._published.set()
+
+    def subscribe(self, file_ids: Iterable[str]) -> ProgressSubscription:
+        subscription = ProgressSubscription(self, file_ids)
+        for file_id in subscription.file_ids:
+            self._subscriptions.setdefault(file_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: ProgressSubscription):
+        for file_id in subscription.file_ids:
+            subscriptions = self._subscriptions.get(file_id)
+            if subscriptions is None:
+                continue
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[file_id]
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(
+            {
+                subscription
+                for subscriptions in self._subscriptions.values()
+                for subscription in subscriptions
+            }
+        )
+
+    async def _run(self):
+        while True:
+            await self._published.wait()
+            await self._flush()
+            await asyncio.sleep(self.interval)
+
+    async def _flush(self):
+        self._published.clear()
+        if not self._pending:
+            return
+        batch = list(self._pending.values())
+        self._pending.clear()
+        try:
+            await self._send(batch)
+        except Exception:
+            logger.exception(f"Failed to send progress of {len(batch)} uploads")
+
+    async def _send(self, batch: List[UploadProgress]):
+        raise NotImplementedError()
+
+    def _deliver(self, batch: List[UploadProgress]):
+        for progress in batch:
+            for subscription in self._subscriptions.get(progress.id, ()):
+                subscription.push(progress)
+
+
+class LocalProgressBroadcaster(BaseProgressBroadcaster):
+    """Delivers progress to subscribers of the same process."""
+
+    async def _send(self, batch: List[UploadProgress]):
+        self._deliver(batch)
@@ -0,0 +1,389 @@
+import argparse
+import json
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from dataclasses import field
+from enum import Enum
+from pathlib import Path
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Set
+
+from pydantic import ValidationError
+
+from tusfastapiserver.config import CompressionCodec
+from tusfastapiserver.config import Config
+from tusfastapiserver.config import MetadataStrategyType
+from tusfastapiserver.metadata import CachedMetadataStrategy
+from tusfastapiserver.metadata import LocalMetadataStrategy
+from tusfastapiserver.storages import LocalStorageStrategy
+from tusfastapiserver.storages import CompressedStorageStrategy
+from tusfastapiserver.storages.volumes import VolumeSet
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+# Strategies keeping one JSON document per upload next to its data.
+RECOVERABLE_METADATA_STRATEGIES = {
+    MetadataStrategyType.LOCAL: LocalMetadataStrategy,
+    MetadataStrategyType.CACHED: CachedMetadataStrategy,
+}
+
+
+class RecoveryAction(str, Enum):
+    UNCHANGED = "UNCHANGED"
+    VERIFIED = "VERIFIED"
+    OFFSET_REPAIRED = "OFFSET_REPAIRED"
+    TRUNCATED = "TRUNCATED"
+    QUARANTINED_DATA = "QUARANTINED_DATA"
+    QUARANTINED_METADATA = "QUARANTINED_METADATA"
+    MISSING = "MISSING"
+    FAILED = "FAILED"
+
+
+@dataclass
+class RecoveryReport:
+    actions: Dict[RecoveryAction, int] = field(default_factory=dict)
+    duration: float = 0.0
+
+    def add(self, action: RecoveryAction):
+        self.actions[action] = self.actions.get(action, 0) + 1
+
+    @property
+    def total(self) -> int:
+        return sum(self.actions.values())
+
+    @property
+    def failed(self) -> int:
+        return self.actions.get(RecoveryAction.FAILED, 0)
+
+
+class UploadReconciler:
+    """Brings data files and metadata of local uploads back in sync after a crash.
+
+    ``PatchRouter`` writes data before metadata, so after a crash the data file
+    may hold more bytes than ``upload_offset`` says (or fewer, if the page cache
+    was lost). The data file is the source of truth: the offset is set to its
+    size and bytes beyond ``upload_length`` are truncated. Data without metadata
+    and metadata without data are moved to the quarantine folder.
+
+    Progress is checkpointed after every batch. Uploads whose files were not
+    modified since the previous completed run are only stat-ed, not parsed.
+    An upload that fails to reconcile is reported as ``FAILED``; the checkpoint
+    stops before it, so the next run checks it again.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        max_workers: int = 8,
+        batch_size: int = 1000,
+        quarantine_path: Optional[str] = None,
+        checkpoint_path: Optional[str] = None,
+        mtime_tolerance: float = 2.0,
+    ):
+        if config.metadata_strategy_type not in RECOVERABLE_METADATA_STRATEGIES:
+            raise ValueError(
+                "Recovery only supports the LOCAL and CACHED metadata strategies"
+            )
+        self.config = config
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.quarantine_path = quarantine_path or os.path.join(
+            config.file_path, "_quarantine"
+        )
+        self.checkpoint_path = checkpoint_path
+        self.lock_path = (
+            f"{checkpoint_path}.lock"
+            if checkpoint_path
+            else os.path.join(config.file_path, "_recovery.lock")
+        )
+        self.mtime_tolerance = mtime_tolerance
+        # Compressed files are recognized by their header, so they are read
+        # correctly whatever the configured compression.
+        self.storage_strategy = CompressedStorageStrategy(
+            LocalStorageStrategy(config),
+            config.storage_compression or CompressionCodec.GZIP,
+            config.storage_compression_level,
+        )
+        self.metadata_strategy = RECOVERABLE_METADATA_STRATEGIES[
+            config.metadata_strategy_type
+        ](config)
+
+    def run(self, full: bool = False) -> RecoveryReport:
+        report = RecoveryReport()
+        started_at = time.time()
+        checkpoint = {} if full else self._load_checkpoint()
+        verified_before = checkpoint.get("verified_before")
+        in_progress = checkpoint.get("in_progress") or {}
+        run_started_at = in_progress.get("started_at", started_at)
+        position = in_progress.get("position")
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                file_ids = self._list_file_ids(executor)
+                if position is not None:
+                    logger.info(f"Resuming recovery after {position}")
+                    file_ids = [file_id for file_id in file_ids if file_id > position]
+                for batch in self._iter_batches(file_ids):
+                    actions = executor.map(
+                        lambda file_id: self._reconcile_if_changed(
+                            file_id, verified_before
+                        ),
+                        batch,
+                    )
+                    for file_id, action in zip(batch, actions):
+                        report.add(action)
+                        if not report.failed:
+                            position = file_id
+                    self._save_checkpoint(
+                        {
+                            "verified_before": verified_before,
+                            "in_progress": {
+                                "started_at": run_started_at,
+                                "position": position,
+                            },
+                        }
+                    )
+        finally:
+            # Releases the generation table of CachedMetadataStrategy.
+            self.metadata_strategy.close()
+
+        if not report.failed:
+            self._save_checkpoint(
+                {"verified_before": run_started_at, "in_progress": None}
+            )
+        report.duration = time.time() - started_at
+        logger.info(
+            f"Recovery checked {report.total} uploads in {report.duration:.2f}s: "
+            f"{ {action.value: count for action, count in report.actions.items()} }"
+        )
+        return report
+
+    def _iter_batches(self, file_ids: List[str]) -> Iterator[List[str]]:
+        for start in range(0, len(file_ids), self.batch_size):
+            yield file_ids[start : start + self.batch_size]
+
+    @staticmethod
+    def _list_directories(path: str) -> Set[str]:
+        if not os.path.isdir(path):
+            return set()
+        with os.scandir(path) as entries:
+            return {
+                entry.name
+                for entry in entries
+                if entry.is_dir() and not entry.name.startswith("_")
+            }
+
+    def _list_file_ids(self, executor: ThreadPoolExecutor) -> List[str]:
+        paths = {*self.storage_strategy.get_volume_paths(), self.config.metadata_path}
+        file_ids = set()
+        for directories in executor.map(self._list_directories, paths):
+            file_ids |= directories
+        return sorted(file_ids)
+
+    @staticmethod
+    def _get_mtime(path: str) -> Optional[float]:
+        try:
+            return os.stat(path).st_mtime
+        except FileNotFoundError:
+            return None
+
+    def _reconcile_if_changed(
+        self, file_id: str, verified_before: Optional[float]
+    ) -> RecoveryAction:
+        if verified_before is not None:
+            data_path = self.storage_strategy.find_file_path(file_id)
+            data_mtime = self._get_mtime(data_path) if data_path else None
+            metadata_mtime = self._get_mtime(
+                self.metadata_strategy.generate_metadata_path(file_id)
+            )
+            threshold = verified_before - self.mtime_tolerance
+            if (
+                data_mtime is not None
+                and metadata_mtime is not None
+                and data_mtime < threshold
+                and metadata_mtime < threshold
+            ):
+                return RecoveryAction.UNCHANGED
+        try:
+            return self.reconcile(file_id)
+        except Exception:
+            logger.exception(f"Failed to reconcile upload {file_id}")
+            return RecoveryAction.FAILED
+
+    def reconcile(self, file_id: str) -> RecoveryAction:
+        has_data = self.storage_strategy.is_file_exists(file_id)
+        has_metadata = self.metadata_strategy.is_metadata_exists(file_id)
+        if not has_data and not has_metadata:
+            return RecoveryAction.MISSING
+        if not has_metadata:
+            self._quarantine(self.storage_strategy.find_file_path(file_id), "data")
+            return RecoveryAction.QUARANTINED_DATA
+        if not has_data:
+            self._quarantine_metadata(file_id)
+            return RecoveryAction.QUARANTINED_METADATA
+
+        try:
+            metadata = self.metadata_strategy.get_metadata(file_id)
+        except (ValueError, ValidationError):
+            logger.warning(f"Metadata of upload {file_id} is corrupted")
+            self._quarantine_metadata(file_id)
+            self._quarantine(self.storage_strategy.find_file_path(file_id), "data")
+            return RecoveryAction.QUARANTINED_METADATA
+
+        action = RecoveryAction.VERIFIED
+        size = self.storage_strategy.get_size(metadata)
+        if metadata.upload_length is not None and size > metadata.upload_length:
+            logger.warning(
+                f"Truncating upload {file_id} from {size} to {metadata.upload_length}"
+            )
+            self.storage_strategy.truncate(metadata, metadata.upload_length)
+            size = metadata.upload_length
+            action = RecoveryAction.TRUNCATED
+
+        if size != metadata.upload_offset:
+            logger.warning(
+                f"Repairing offset of upload {file_id} "
+                f"from {metadata.upload_offset} to {size}"
+            )
+            metadata.upload_offset = size
+            self.metadata_strategy.update(metadata)
+            if action == RecoveryAction.VERIFIED:
+                action = RecoveryAction.OFFSET_REPAIRED
+        return action
+
+    def _quarantine_metadata(self, file_id: str):
+        self._quarantine(
+            self.metadata_strategy.generate_metadata_path(file_id), "metadata"
+        )
+        if isinstance(self.metadata_strategy, CachedMetadataStrategy):
+            self.metadata_strategy.invalidate(file_id)
+
+    def _quarantine(self, path: str, kind: str):
+        target = os.path.join(self.quarantine_path, kind, os.path.basename(path))
+        logger.warning(f"Moving {path} to {target}")
+        Path(target).parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(path, target)
+        try:
+            Path(path).parent.rmdir()
+        except OSError:
+            pass
+
+    def _load_checkpoint(self) -> dict:
+        if self.checkpoint_path is None or not os.path.exists(self.checkpoint_path):
+            return {}
+        with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_checkpoint(self, checkpoint: dict):
+        if self.checkpoint_path is None:
+            return
+        Path(self.checkpoint_path).parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = f"{self.checkpoint_path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f)
+        os.replace(temporary_path, self.checkpoint_path)
+
+
+class StartupRecoveryLock:
+    """Lets one worker of a server recover uploads before any worker serves.
+
+    Serving workers hold a shared lock on ``path`` until they stop. A worker
+    recovers only if it gets the lock exclusively, i.e. no other worker is
+    recovering or serving, and then downgrades it. Other workers wait for the
+    shared lock and skip recovery, as live uploads must not be reconciled.
+    Without ``fcntl`` every worker recovers.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    def acquire(self) -> bool:
+        """Takes the lock, returning whether this worker should recover."""
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is None:
+            return True
+        try:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            logger.info("Another worker recovers or serves uploads, skipping recovery")
+            fcntl.lockf(self._fd, fcntl.LOCK_SH)
+            return False
+
+    def share(self):
+        """Downgrades the lock once recovery is done, letting workers start."""
+        if fcntl is not None and self._fd is not None:
+            fcntl.lockf(self._fd, fcntl.LOCK_SH)
+
+    def release(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Reconcile tusfastapiserver uploads after a crash."
+    )
+    parser.add_argument("--file-path", required=True)
+    parser.add_argument("--metadata-path", required=True)
+    parser.add_argument(
+        "--volume", action="append", default=[], help="data volume, repeatable"
+    )
+    parser.add_argument("--quarantine-path")
+    parser.add_argument("--checkpoint-path")
+    parser.add_argument(
+        "--compression",
+        choices=[codec.value for codec in CompressionCodec],
+        help="codec of the server, used to rewrite truncated compressed frames",
+    )
+    parser.add_argument("--compression-level", type=int)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--full", action="store_true", help="ignore the checkpoint")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    reconciler = UploadReconciler(
+        Config(
+            file_path=args.file_path,
+            metadata_path=args.metadata_path,
+            storage_volumes=VolumeSet(args.volume) if args.volume else None,
+            storage_compression=(
+                CompressionCodec(args.compression) if args.compression else None
+            ),
+            storage_compression_level=args.compression_level,
+        ),
+        max_workers=args.workers,
+        quarantine_path=args.quarantine_path,
+        checkpoint_path=args.checkpoint_path,
+    )
+    report = reconciler.run(full=args.full)
+    print(
+        json.dumps(
+            {
+                "duration": report.duration,
+                "actions": {
+                    action.value: count for action, count in report.actions.items()
+                },
+            }
+        )
+    )
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
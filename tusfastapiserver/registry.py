@@ -0,0 +1,117 @@
+import logging
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Type
+from typing import Union
+
+from tusfastapiserver.config import Config
+from tusfastapiserver.config import MetadataStrategyType
+from tusfastapiserver.config import StorageStrategyType
+from tusfastapiserver.metadata import AsyncBaseMetadataStrategy
+from tusfastapiserver.metadata import CachedMetadataStrategy
+from tusfastapiserver.metadata import JournalMetadataStrategy
+from tusfastapiserver.metadata import LocalMetadataStrategy
+from tusfastapiserver.metadata import to_async_metadata_strategy
+from tusfastapiserver.storages import AsyncBaseStorageStrategy
+from tusfastapiserver.storages import LocalStorageStrategy
+from tusfastapiserver.storages import to_async_storage_strategy
+from tusfastapiserver.storages import with_compression
+
+logger = logging.getLogger(__name__)
+
+
+STORAGE_STRATEGY_MAP = {
+    StorageStrategyType.LOCAL: LocalStorageStrategy,
+}
+
+METADATA_STRATEGY_MAP = {
+    MetadataStrategyType.LOCAL: LocalMetadataStrategy,
+    MetadataStrategyType.JOURNAL: JournalMetadataStrategy,
+    MetadataStrategyType.CACHED: CachedMetadataStrategy,
+}
+
+
+class StrategyRegistry:
+    """Storage and metadata strategies shared by all routers of an app.
+
+    Every strategy class is instantiated once, so caches, pools and locks held
+    by a strategy are shared between POST, PATCH, HEAD and the other routers.
+    ``startup`` opens the strategies and ``shutdown`` closes them in reverse
+    order; ``add_tus_routers`` runs both from the app lifespan.
+
+    ``storage_strategy_cls`` and ``metadata_strategy_cls`` replace the classes
+    selected by the config for every router.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        storage_strategy_cls: Optional[Type] = None,
+        metadata_strategy_cls: Optional[Type] = None,
+    ):
+        self.config = config
+        self.storage_strategy_cls = (
+            storage_strategy_cls or STORAGE_STRATEGY_MAP[config.storage_strategy_type]
+        )
+        self.metadata_strategy_cls = (
+            metadata_strategy_cls
+            or METADATA_STRATEGY_MAP[config.metadata_strategy_type]
+        )
+        self._storage_strategies: Dict[type, AsyncBaseStorageStrategy] = {}
+        self._metadata_strategies: Dict[type, AsyncBaseMetadataStrategy] = {}
+        self._opened: List[
+            Union[AsyncBaseStorageStrategy, AsyncBaseMetadataStrategy]
+        ] = []
+        self.is_started = False
+
+    def get_storage_strategy(
+        self, storage_strategy_cls: Optional[Type] = None
+    ) -> AsyncBaseStorageStrategy:
+        storage_strategy_cls = storage_strategy_cls or self.storage_strategy_cls
+        if storage_strategy_cls not in self._storage_strategies:
+            self._storage_strategies[storage_strategy_cls] = to_async_storage_strategy(
+                with_compression(storage_strategy_cls(self.config), self.config)
+            )
+        return self._storage_strategies[storage_strategy_cls]
+
+    def get_metadata_strategy(
+        self, metadata_strategy_cls: Optional[Type] = None
+    ) -> AsyncBaseMetadataStrategy:
+        metadata_strategy_cls = metadata_strategy_cls or self.metadata_strategy_cls
+        if metadata_strategy_cls not in self._metadata_strategies:
+            self._metadata_strategies[metadata_strategy_cls] = (
+                to_async_metadata_strategy(metadata_strategy_cls(self.config))
+            )
+        return self._metadata_strategies[metadata_strategy_cls]
+
+    @property
+    def strategies(
+        self,
+    ) -> List[Union[AsyncBaseStorageStrategy, AsyncBaseMetadataStrategy]]:
+        return [
+            *self._storage_strategies.values(),
+            *self._metadata_strategies.values(),
+        ]
+
+    async def startup(self):
+        if self.is_started:
+            return
+        try:
+            for strategy in self.strategies:
+                await strategy.open()
+                self._opened.append(strategy)
+        except Exception:
+            await self.shutdown()
+            raise
+        self.is_started = True
+        logger.info(f"Opened {len(self._opened)} strategies")
+
+    async def shutdown(self):
+        while self._opened:
+            strategy = self._opened.pop()
+            try:
+                await strategy.close()
+            except Exception:
+                logger.exception(f"Failed to close {type(strategy).__name__}")
+        self.is_started = False
@@ -0,0 +1,102 @@
+import os
+from typing import BinaryIO
+from typing import Mapping
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+from starlette.types import Receive
+from starlette.types import Scope
+from starlette.types import Send
+
+
+ZERO_COPY_SEND_EXTENSION = "http.response.zerocopysend"
+
+
+class FileRangeResponse(Response):
+    chunk_size = 64 * 1024
+
+    def __init__(
+        self,
+        path: str,
+        offset: int,
+        count: int,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+        media_type: Optional[str] = None,
+    ) -> None:
+        self.path = path
+        self.offset = offset
+        self.count = count
+        self.status_code = status_code
+        self.media_type = media_type
+        self.background = None
+        self.init_headers(headers)
+        self.headers["content-length"] = str(count)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["method"].upper() == "HEAD" or self.count == 0:
+            await self._send_start(send)
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        # Opened before the headers are sent, so a missing or short file is
+        # still an error response rather than a truncated body.
+        file = await run_in_threadpool(self._open)
+        try:
+            await self._send_start(send)
+            if ZERO_COPY_SEND_EXTENSION in scope.get("extensions", {}):
+                # The server transfers the bytes with sendfile(2) directly
+                # from the page cache, without copying them through Python.
+                await send(
+                    {
+                        "type": ZERO_COPY_SEND_EXTENSION,
+                        "file": file,
+                        "offset": self.offset,
+                        "count": self.count,
+                        "more_body": False,
+                    }
+                )
+            else:
+                await self._send_chunks(file, send)
+        finally:
+            file.close()
+
+    async def _send_start(self, send: Send) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            }
+        )
+
+    def _open(self) -> BinaryIO:
+        file = open(self.path, "rb")
+        size = os.fstat(file.fileno()).st_size
+        if size < self.offset + self.count:
+            file.close()
+            raise EOFError(
+                f"{self.path} has {size} bytes, {self.offset + self.count} expected"
+            )
+        return file
+
+    async def _send_chunks(self, file: BinaryIO, send: Send) -> None:
+        position = self.offset
+        remaining = self.count
+        while remaining > 0:
+            size = min(self.chunk_size, remaining)
+            chunk = await run_in_threadpool(os.pread, file.fileno(), size, position)
+            if not chunk:
+                # Truncated while it was sent: the connection must be closed
+                # so that the client notices the missing bytes.
+                raise EOFError(f"{self.path} ended {remaining} bytes early")
+            position += len(chunk)
+            remaining -= len(chunk)
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": remaining > 0,
+                }
+            )
@@ -1,14 +1,33 @@
+from contextlib import asynccontextmanager
+from typing import Awaitable
+from typing import Callable
+from typing import List
 from typing import Type
 from typing import Optional
 from fastapi import FastAPI
+from starlette.concurrency import run_in_threadpool
 from tusfastapiserver.routers.base_router import BaseRouter
 from tusfastapiserver.routers.post_router import PostRouter
 from tusfastapiserver.routers.patch_router import PatchRouter
 from tusfastapiserver.routers.head_router import HeadRouter
 from tusfastapiserver.routers.options_router import OptionsRouter
 from tusfastapiserver.routers.delete_router import DeleteRouter
+from tusfastapiserver.routers.get_router import GetRouter
+from tusfastapiserver.routers.usage_router import UsageRouter
+from tusfastapiserver.routers.batch_status_router import BatchStatusRouter
+from tusfastapiserver.routers.upload_list_router import UploadListRouter
+from tusfastapiserver.routers.loop_monitor_router import LoopMonitorRouter
+from tusfastapiserver.routers.progress_router import ProgressRouter
+from tusfastapiserver.routers.fast_path import add_fast_path
+from tusfastapiserver.cluster import NodeProxy
+from tusfastapiserver.cluster import NodeRoutingMiddleware
 from tusfastapiserver.config import Config
+from tusfastapiserver.config import NodeRoutingMode
 from tusfastapiserver.config import TusExtension
+from tusfastapiserver.recovery import StartupRecoveryLock
+from tusfastapiserver.recovery import UploadReconciler
+from tusfastapiserver.registry import StrategyRegistry
+from tusfastapiserver.storages.reservation import ReservationLedger
 
 
 def add_tus_routers(
@@ -19,23 +38,166 @@ def add_tus_routers(
     head_router_cls: Type[BaseRouter] = HeadRouter,
     options_router_cls: Type[BaseRouter] = OptionsRouter,
     delete_router_cls: Type[BaseRouter] = DeleteRouter,
+    get_router_cls: Type[BaseRouter] = GetRouter,
+    usage_router_cls: Type[BaseRouter] = UsageRouter,
+    batch_status_router_cls: Type[BaseRouter] = BatchStatusRouter,
+    upload_list_router_cls: Type[BaseRouter] = UploadListRouter,
+    loop_monitor_router_cls: Type[BaseRouter] = LoopMonitorRouter,
+    progress_router_cls: Type[BaseRouter] = ProgressRouter,
+    registry: Optional[StrategyRegistry] = None,
 ):
     if config is None:
         config = Config()
+    if registry is None:
+        registry = StrategyRegistry(config)
 
-    mandatory_routers = [
-        post_router_cls,
-        patch_router_cls,
-        head_router_cls,
-        options_router_cls,
+    patch_router = patch_router_cls(config=config, registry=registry)
+    head_router = head_router_cls(config=config, registry=registry)
+    routers = [
+        post_router_cls(config=config, registry=registry),
+        patch_router,
+        head_router,
+        options_router_cls(config=config, registry=registry),
     ]
-    routers = []
-
-    for router_cls in mandatory_routers:
-        routers.append(router_cls(config=config))
 
     if TusExtension.TERMINATION in config.enabled_extensions:
-        routers.append(delete_router_cls(config=config))
+        routers.append(delete_router_cls(config=config, registry=registry))
+
+    if config.enable_download:
+        routers.append(get_router_cls(config=config, registry=registry))
+
+    if config.enable_usage_endpoint:
+        routers.append(usage_router_cls(config=config, registry=registry))
+
+    if config.enable_batch_status:
+        routers.append(batch_status_router_cls(config=config, registry=registry))
+
+    if config.enable_upload_listing:
+        routers.append(upload_list_router_cls(config=config, registry=registry))
+
+    if config.enable_loop_monitor_endpoint and config.loop_monitor is not None:
+        routers.append(loop_monitor_router_cls(config=config, registry=registry))
+
+    if config.enable_progress_endpoint and config.progress_broadcaster is not None:
+        routers.append(progress_router_cls(config=config, registry=registry))
+
+    if config.enable_asgi_fast_path:
+        add_fast_path(
+            app,
+            config.patch_router_path,
+            {"PATCH": patch_router, "HEAD": head_router},
+        )
 
     for router in routers:
         app.include_router(router.get_router())
+
+    # Strategies are opened first and closed last.
+    startup_handlers = [registry.startup]
+    shutdown_handlers = [registry.shutdown]
+    if config.loop_monitor is not None:
+        startup_handlers.append(config.loop_monitor.start)
+        shutdown_handlers.append(config.loop_monitor.stop)
+    if config.recover_on_startup:
+        _add_recovery(config, startup_handlers, shutdown_handlers)
+    if config.progress_broadcaster is not None:
+        startup_handlers.append(config.progress_broadcaster.start)
+        shutdown_handlers.append(config.progress_broadcaster.stop)
+    if config.webhook_notifier is not None:
+        startup_handlers.append(config.webhook_notifier.start)
+        shutdown_handlers.append(config.webhook_notifier.stop)
+    if config.completion_queue is not None:
+        startup_handlers.append(config.completion_queue.start)
+        shutdown_handlers.append(config.completion_queue.stop)
+    if config.reservation_ledger is not None:
+        startup_handlers.append(
+            _get_reservation_handler(config.reservation_ledger, registry)
+        )
+        shutdown_handlers.append(config.reservation_ledger.stop)
+    if config.node_id is not None and config.node_urls:
+        _add_node_routing(app, config, startup_handlers, shutdown_handlers)
+    _wrap_lifespan(app, startup_handlers, shutdown_handlers)
+
+
+def _get_reservation_handler(
+    ledger: ReservationLedger, registry: StrategyRegistry
+) -> Callable[[], Awaitable]:
+    metadata_strategy = registry.get_metadata_strategy()
+
+    async def start():
+        # The metadata is authoritative: a saved ledger lacks the reservations
+        # made after the last clean shutdown.
+        iter_metadata = getattr(metadata_strategy, "iter_metadata", None)
+        if iter_metadata is None:
+            await ledger.start()
+        else:
+            await run_in_threadpool(lambda: ledger.rebuild(iter_metadata()))
+
+    return start
+
+
+def _add_recovery(
+    config: Config,
+    startup_handlers: List[Callable[[], Awaitable]],
+    shutdown_handlers: List[Callable[[], Awaitable]],
+):
+    reconciler = UploadReconciler(
+        config,
+        max_workers=config.recovery_workers,
+        quarantine_path=config.recovery_quarantine_path,
+        checkpoint_path=config.recovery_checkpoint_path,
+    )
+    # Held until shutdown, so workers starting later do not reconcile the
+    # uploads this one serves.
+    lock = StartupRecoveryLock(reconciler.lock_path)
+
+    async def recover():
+        if not await run_in_threadpool(lock.acquire):
+            return
+        try:
+            await run_in_threadpool(reconciler.run)
+        finally:
+            lock.share()
+
+    async def release():
+        lock.release()
+
+    startup_handlers.append(recover)
+    shutdown_handlers.append(release)
+
+
+def _add_node_routing(
+    app: FastAPI,
+    config: Config,
+    startup_handlers: List[Callable[[], Awaitable]],
+    shutdown_handlers: List[Callable[[], Awaitable]],
+):
+    proxy = None
+    if config.node_routing_mode == NodeRoutingMode.PROXY:
+        proxy = NodeProxy(timeout=config.node_proxy_timeout)
+        startup_handlers.append(proxy.start)
+        shutdown_handlers.append(proxy.stop)
+    app.add_middleware(NodeRoutingMiddleware, config=config, proxy=proxy)
+
+
+def _wrap_lifespan(
+    app: FastAPI,
+    startup_handlers: List[Callable[[], Awaitable]],
+    shutdown_handlers: List[Callable[[], Awaitable]],
+):
+    if not startup_handlers and not shutdown_handlers:
+        return
+
+    original_lifespan = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def lifespan(lifespan_app):
+        for handler in startup_handlers:
+            await handler()
+        try:
+            async with original_lifespan(lifespan_app) as state:
+                yield state
+        finally:
+            for handler in reversed(shutdown_handlers):
+                await handler()
+
+    app.router.lifespan_context = lifespan
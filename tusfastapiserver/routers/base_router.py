@@ -1,34 +1,35 @@
+import logging
+from typing import Optional
+
 from fastapi import APIRouter
 from fastapi import Request
 from fastapi import Response
 
 from tusfastapiserver.schemas import UploadMetadata
+from tusfastapiserver.schemas import WebhookEventType
 from tusfastapiserver.config import Config
-from tusfastapiserver.config import StorageStrategyType
-from tusfastapiserver.config import MetadataStrategyType
-from tusfastapiserver.storages import LocalStorageStrategy
-from tusfastapiserver.metadata import LocalMetadataStrategy
-
-
-STORAGE_STRATEGY_MAP = {
-    StorageStrategyType.LOCAL: LocalStorageStrategy,
-}
+from tusfastapiserver.exceptions import UploadTooLargeException
+from tusfastapiserver.registry import METADATA_STRATEGY_MAP  # noqa: F401
+from tusfastapiserver.registry import STORAGE_STRATEGY_MAP  # noqa: F401
+from tusfastapiserver.registry import StrategyRegistry
+from tusfastapiserver.storages import AsyncBaseStorageStrategy
+from tusfastapiserver.metadata import AsyncBaseMetadataStrategy
 
-METADATA_STRATEGY_MAP = {
-    MetadataStrategyType.LOCAL: LocalMetadataStrategy,
-}
+logger = logging.getLogger(__name__)
 
 
 class BaseRouter:
-    def __init__(self, config: Config, dependencies=None) -> None:
+    def __init__(
+        self,
+        config: Config,
+        dependencies=None,
+        registry: Optional[StrategyRegistry] = None,
+    ) -> None:
         self.config = config
+        self.registry = registry or StrategyRegistry(config)
         self.router = APIRouter(dependencies=dependencies or [])
-        self._storage_strategy = STORAGE_STRATEGY_MAP[config.storage_strategy_type](
-            config
-        )
-        self._metadata_strategy = METADATA_STRATEGY_MAP[config.metadata_strategy_type](
-            config
-        )
+        self._storage_strategy = self.registry.get_storage_strategy()
+        self._metadata_strategy = self.registry.get_metadata_strategy()
 
     async def handle(self, *args, **kwargs):
         raise NotImplementedError()
@@ -50,20 +51,57 @@ class BaseRouter:
         )
 
     @property
-    def storage_strategy(self):
+    def storage_strategy(self) -> AsyncBaseStorageStrategy:
         return self._storage_strategy
 
     @storage_strategy.setter
     def storage_strategy(self, storage_strategy):
-        self._storage_strategy = storage_strategy(self.config)
+        self._storage_strategy = self.registry.get_storage_strategy(storage_strategy)
 
     @property
-    def metadata_strategy(self):
+    def metadata_strategy(self) -> AsyncBaseMetadataStrategy:
         return self._metadata_strategy
 
     @metadata_strategy.setter
     def metadata_strategy(self, metadata_strategy):
-        self._metadata_strategy = metadata_strategy(self.config)
+        self._metadata_strategy = self.registry.get_metadata_strategy(metadata_strategy)
+
+    async def _notify_webhook(
+        self, event_type: WebhookEventType, upload_metadata: UploadMetadata
+    ):
+        if self.config.webhook_notifier is not None:
+            await self.config.webhook_notifier.notify(event_type, upload_metadata)
+
+    async def _on_upload_completed(self, metadata: UploadMetadata):
+        logger.info(f"Upload for file_id: {metadata.id} completed")
+        if self.config.reservation_ledger is not None:
+            self.config.reservation_ledger.release(metadata.id)
+        if self.config.content_store is not None:
+            metadata.content_digest = self.config.content_store.hasher.finish(
+                metadata.id, metadata.upload_offset
+            )
+            await self.metadata_strategy.update(metadata)
+        if self.config.completion_queue is not None:
+            await self.config.completion_queue.enqueue(metadata)
+        await self._notify_webhook(WebhookEventType.COMPLETED, metadata)
+
+    def _validate_upload_size(self, upload_length: Optional[str]):
+        max_upload_size = self.config.max_upload_size
+        if (
+            max_upload_size is not None
+            and upload_length is not None
+            and upload_length.isdigit()
+            and int(upload_length) > max_upload_size
+        ):
+            raise UploadTooLargeException()
+
+    def _set_recommended_chunk_size(self, response: Response):
+        if self.config.chunk_size_advisor is not None:
+            response.headers["X-Tus-Recommended-Chunk-Size"] = str(
+                self.config.chunk_size_advisor.recommend(
+                    self.config.max_request_body_size
+                )
+            )
 
     @staticmethod
     def _get_host_and_proto(request: Request) -> tuple:
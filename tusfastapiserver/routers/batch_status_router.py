@@ -0,0 +1,93 @@
+import asyncio
+import logging
+from typing import Dict
+from typing import Optional
+
+from tusfastapiserver.config import Config
+from tusfastapiserver.registry import StrategyRegistry
+from tusfastapiserver.exceptions import BatchTooLargeException
+from tusfastapiserver.routers import BaseRouter
+from tusfastapiserver.schemas import BatchStatusRequest
+from tusfastapiserver.schemas import BatchStatusResponse
+from tusfastapiserver.schemas import UploadMetadata
+from tusfastapiserver.schemas import UploadStatus
+from tusfastapiserver.utils.upload_id import validate as validate_upload_id
+
+logger = logging.getLogger(__name__)
+
+
+class BatchStatusRouter(BaseRouter):
+    def __init__(
+        self,
+        config: Optional[Config] = None,
+        dependencies=None,
+        registry: Optional[StrategyRegistry] = None,
+    ):
+        config = config or Config()
+        super().__init__(config, dependencies, registry)
+        self.add_route("POST")
+
+    def _get_router_path(self) -> str:
+        return self.config.batch_status_router_path
+
+    async def handle(self, batch_status_request: BatchStatusRequest):
+        logger.info(
+            f"Handling batch status request for {len(batch_status_request.ids)} uploads"
+        )
+        self._validate_request(batch_status_request)
+        metadata_by_id = await self.metadata_strategy.get_metadata_many(
+            [
+                file_id
+                for file_id in batch_status_request.ids
+                if validate_upload_id(file_id)
+            ],
+        )
+        await self._drop_missing_files(metadata_by_id)
+        return self._prepare_response(batch_status_request, metadata_by_id)
+
+    async def _drop_missing_files(
+        self, metadata_by_id: Dict[str, Optional[UploadMetadata]]
+    ):
+        """Reports uploads whose data file is gone as not found, like ``HEAD``."""
+        found_ids = [
+            file_id
+            for file_id, metadata in metadata_by_id.items()
+            if metadata is not None
+        ]
+        exists = await asyncio.gather(
+            *(self.storage_strategy.is_file_exists(file_id) for file_id in found_ids)
+        )
+        for file_id, file_exists in zip(found_ids, exists):
+            if not file_exists:
+                metadata_by_id[file_id] = None
+
+    def _validate_request(self, batch_status_request: BatchStatusRequest):
+        if len(batch_status_request.ids) > self.config.max_batch_status_size:
+            raise BatchTooLargeException(self.config.max_batch_status_size)
+
+    @staticmethod
+    def _get_upload_status(
+        file_id: str, metadata: Optional[UploadMetadata]
+    ) -> UploadStatus:
+        if metadata is None:
+            return UploadStatus(id=file_id, found=False)
+        return UploadStatus(
+            id=file_id,
+            found=True,
+            upload_offset=metadata.upload_offset,
+            upload_length=metadata.upload_length,
+            upload_defer_length=metadata.upload_defer_length,
+            metadata=metadata.metadata,
+        )
+
+    def _prepare_response(
+        self,
+        batch_status_request: BatchStatusRequest,
+        metadata_by_id: Dict[str, Optional[UploadMetadata]],
+    ) -> BatchStatusResponse:
+        return BatchStatusResponse(
+            uploads=[
+                self._get_upload_status(file_id, metadata_by_id.get(file_id))
+                for file_id in batch_status_request.ids
+            ]
+        )
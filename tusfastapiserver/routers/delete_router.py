@@ -1,14 +1,64 @@
+import logging
 from typing import Optional
 
+from fastapi import Response
+from fastapi import status
+from starlette.concurrency import run_in_threadpool
+
+from tusfastapiserver import TUS_RESUMABLE
 from tusfastapiserver.routers import BaseRouter
 from tusfastapiserver.config import Config
+from tusfastapiserver.registry import StrategyRegistry
+from tusfastapiserver.exceptions import FileNotFoundException
+from tusfastapiserver.schemas import UploadMetadata
+from tusfastapiserver.schemas import WebhookEventType
+
+logger = logging.getLogger(__name__)
 
 
 class DeleteRouter(BaseRouter):
-    def __init__(self, config: Optional[Config] = None, dependencies=None):
+    def __init__(
+        self,
+        config: Optional[Config] = None,
+        dependencies=None,
+        registry: Optional[StrategyRegistry] = None,
+    ):
         config = config or Config()
-        super().__init__(config, dependencies)
+        super().__init__(config, dependencies, registry)
         self.add_route("DELETE")
 
     def _get_router_path(self) -> str:
         return self.config.delete_router_path
+
+    async def handle(self, file_id: str, response: Response):
+        logger.info(f"Handling DELETE request for file_id: {file_id}")
+        await self._validate_file_id(file_id)
+        metadata = await self.metadata_strategy.get_metadata(file_id)
+        await self.storage_strategy.delete(metadata)
+        await self.metadata_strategy.delete(metadata)
+        await self._on_upload_terminated(metadata)
+        response = self._prepare_response(response)
+        logger.info(f"DELETE request for file_id: {file_id} completed successfully")
+        return response
+
+    async def _validate_file_id(self, file_id: str):
+        if not await self.metadata_strategy.is_metadata_exists(file_id):
+            raise FileNotFoundException()
+
+    async def _on_upload_terminated(self, metadata: UploadMetadata):
+        if self.config.reservation_ledger is not None:
+            self.config.reservation_ledger.release(metadata.id)
+        if self.config.content_store is not None:
+            self.config.content_store.hasher.discard(metadata.id)
+            if metadata.content_digest is not None:
+                await run_in_threadpool(
+                    self.config.content_store.release, metadata.content_digest
+                )
+        if self.config.progress_broadcaster is not None:
+            self.config.progress_broadcaster.publish(metadata, terminated=True)
+        await self._notify_webhook(WebhookEventType.TERMINATED, metadata)
+
+    def _prepare_response(self, response: Response) -> Response:
+        response.status_code = status.HTTP_204_NO_CONTENT
+        response.headers["Tus-Resumable"] = TUS_RESUMABLE
+        return response
@@ -0,0 +1,79 @@
+import inspect
+from typing import Dict
+from typing import List
+
+from fastapi import FastAPI
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+from starlette.types import Receive
+from starlette.types import Scope
+from starlette.types import Send
+
+from tusfastapiserver.routers.base_router import BaseRouter
+
+SUPPORTED_PARAMETERS = {"file_id", "request", "response"}
+
+
+class FastPathApp:
+    """Minimal ASGI app serving the ``PATCH`` and ``HEAD`` endpoints.
+
+    Requests are passed straight to the ``handle`` method of the routers,
+    skipping FastAPI dependency injection and parameter validation. Responses
+    are built the way FastAPI builds them, and exceptions propagate to the
+    exception handlers of the app, so responses are identical to the regular
+    routes.
+    """
+
+    def __init__(self, routers: Dict[str, BaseRouter]):
+        self.routers = routers
+        self._parameters = {
+            method: self._get_parameters(router) for method, router in routers.items()
+        }
+
+    @staticmethod
+    def _get_parameters(router: BaseRouter) -> List[str]:
+        if router.get_router().dependencies:
+            raise ValueError(
+                f"{type(router).__name__} has dependencies and can't use the fast path"
+            )
+        parameters = list(inspect.signature(router.handle).parameters)
+        unsupported = set(parameters) - SUPPORTED_PARAMETERS
+        if unsupported:
+            raise ValueError(
+                f"{type(router).__name__}.handle takes {sorted(unsupported)}, "
+                f"which the fast path can't provide"
+            )
+        return parameters
+
+    @staticmethod
+    def _create_response() -> Response:
+        # Same as the response FastAPI injects into endpoints.
+        response = Response()
+        del response.headers["content-length"]
+        response.status_code = None  # type: ignore[assignment]
+        return response
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        method = scope["method"]
+        arguments = {
+            "file_id": scope["path_params"]["file_id"],
+            "request": Request(scope, receive, send),
+            "response": self._create_response(),
+        }
+        response = await self.routers[method].handle(
+            **{name: arguments[name] for name in self._parameters[method]}
+        )
+        await response(scope, receive, send)
+
+
+def add_fast_path(app: FastAPI, path: str, routers: Dict[str, BaseRouter]):
+    """Serves ``routers`` (keyed by HTTP method) through ``FastPathApp``. The
+    route is matched before the FastAPI routes of the same path."""
+    if app.router.dependencies:
+        raise ValueError(
+            "The app has dependencies, which the fast path would skip; "
+            "disable enable_asgi_fast_path"
+        )
+    route = Route(path, FastPathApp(routers), methods=list(routers))
+    app.router.routes.insert(0, route)
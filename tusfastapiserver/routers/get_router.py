@@ -0,0 +1,178 @@
+import logging
+from typing import Optional
+from urllib.parse import quote
+
+from fastapi import Request
+from fastapi import Response
+from fastapi import status
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import StreamingResponse
+
+from tusfastapiserver.config import Config
+from tusfastapiserver.registry import StrategyRegistry
+from tusfastapiserver.exceptions import FileNotFoundException
+from tusfastapiserver.exceptions import UploadNotCompletedException
+from tusfastapiserver.responses import FileRangeResponse
+from tusfastapiserver.routers import BaseRouter
+from tusfastapiserver.schemas import UploadMetadata
+from tusfastapiserver.storages.compressed import is_compressed_file
+from tusfastapiserver.storages.compressed import iter_decompressed
+from tusfastapiserver.utils.http_range import content_range
+from tusfastapiserver.utils.http_range import parse as parse_range
+
+logger = logging.getLogger(__name__)
+
+
+CONTENT_TYPE_METADATA_KEYS = ("filetype", "type", "content_type")
+FILENAME_METADATA_KEYS = ("filename", "name")
+DEFAULT_CONTENT_TYPE = "application/octet-stream"
+
+
+class GetRouter(BaseRouter):
+    def __init__(
+        self,
+        config: Optional[Config] = None,
+        dependencies=None,
+        registry: Optional[StrategyRegistry] = None,
+    ):
+        config = config or Config()
+        super().__init__(config, dependencies, registry)
+        self.add_route("GET")
+
+    def _get_router_path(self) -> str:
+        return self.config.get_router_path
+
+    async def handle(self, file_id: str, request: Request):
+        logger.info(f"Handling GET request for file_id: {file_id}")
+        await self._validate_file_id(file_id)
+        metadata = await self.metadata_strategy.get_metadata(file_id)
+        self._validate_completed(metadata)
+
+        etag = self._get_etag(metadata)
+        headers = {
+            "ETag": etag,
+            "Accept-Ranges": "bytes",
+            "Cache-Control": "no-cache",
+            "X-Content-Type-Options": "nosniff",
+        }
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        size = metadata.upload_offset
+        byte_range = None
+        if self._is_range_applicable(request.headers.get("if-range"), etag):
+            byte_range = parse_range(request.headers.get("range"), size)
+
+        is_compressed = await run_in_threadpool(
+            is_compressed_file, metadata.upload_storage_path
+        )
+        response = self._prepare_response(
+            metadata, headers, size, byte_range, is_compressed
+        )
+        logger.info(f"GET request for file_id: {file_id} prepared")
+        return response
+
+    async def _validate_file_id(self, file_id: str):
+        if not await self.metadata_strategy.is_metadata_exists(file_id):
+            raise FileNotFoundException()
+
+        if not await self.storage_strategy.is_file_exists(file_id):
+            raise FileNotFoundException()
+
+    def _validate_completed(self, metadata: UploadMetadata):
+        if self.config.allow_partial_download:
+            return
+        if metadata.upload_length is None or (
+            metadata.upload_offset != metadata.upload_length
+        ):
+            raise UploadNotCompletedException()
+
+    @staticmethod
+    def _get_etag(metadata: UploadMetadata) -> str:
+        created_at = int(metadata.created_at.timestamp() * 1000)
+        return f'"{metadata.id}-{created_at}-{metadata.upload_offset}"'
+
+    @staticmethod
+    def _is_range_applicable(if_range: Optional[str], etag: str) -> bool:
+        return if_range is None or if_range == etag
+
+    @staticmethod
+    def _get_metadata_value(metadata: UploadMetadata, keys: tuple) -> Optional[str]:
+        for key in keys:
+            value = (metadata.metadata or {}).get(key)
+            if value:
+                return value
+        return None
+
+    def _get_content_disposition(self, metadata: UploadMetadata) -> str:
+        disposition_type = self.config.download_content_disposition_type
+        filename = self._get_metadata_value(metadata, FILENAME_METADATA_KEYS)
+        if filename is None:
+            return disposition_type
+        quoted_filename = quote(filename)
+        if quoted_filename != filename:
+            return f"{disposition_type}; filename*=utf-8''{quoted_filename}"
+        return f'{disposition_type}; filename="{filename}"'
+
+    def _prepare_response(
+        self,
+        metadata: UploadMetadata,
+        headers: dict,
+        size: int,
+        byte_range: Optional[tuple],
+        is_compressed: bool,
+    ) -> Response:
+        headers["Content-Disposition"] = self._get_content_disposition(metadata)
+        media_type = (
+            self._get_metadata_value(metadata, CONTENT_TYPE_METADATA_KEYS)
+            or DEFAULT_CONTENT_TYPE
+        )
+        if byte_range is None:
+            return self._get_file_response(
+                metadata,
+                offset=0,
+                count=size,
+                status_code=status.HTTP_200_OK,
+                headers=headers,
+                media_type=media_type,
+                is_compressed=is_compressed,
+            )
+
+        start, end = byte_range
+        headers["Content-Range"] = content_range(start, end, size)
+        return self._get_file_response(
+            metadata,
+            offset=start,
+            count=end - start + 1,
+            status_code=status.HTTP_206_PARTIAL_CONTENT,
+            headers=headers,
+            media_type=media_type,
+            is_compressed=is_compressed,
+        )
+
+    def _get_file_response(
+        self,
+        metadata: UploadMetadata,
+        offset: int,
+        count: int,
+        status_code: int,
+        headers: dict,
+        media_type: str,
+        is_compressed: bool,
+    ) -> Response:
+        if is_compressed:
+            headers["Content-Length"] = str(count)
+            return StreamingResponse(
+                iter_decompressed(metadata.upload_storage_path, offset, count),
+                status_code=status_code,
+                headers=headers,
+                media_type=media_type,
+            )
+        return FileRangeResponse(
+            metadata.upload_storage_path,
+            offset=offset,
+            count=count,
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type,
+        )
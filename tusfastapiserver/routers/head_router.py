@@ -4,6 +4,7 @@ from fastapi import Response
 from fastapi import status
 
 from tusfastapiserver.config import Config
+from tusfastapiserver.registry import StrategyRegistry
 
 from tusfastapiserver.routers import BaseRouter
 from tusfastapiserver.exceptions import FileNotFoundException
@@ -12,25 +13,30 @@ from tusfastapiserver.utils.metadata import stringify
 
 
 class HeadRouter(BaseRouter):
-    def __init__(self, config: Optional[Config] = None, dependencies=None):
+    def __init__(
+        self,
+        config: Optional[Config] = None,
+        dependencies=None,
+        registry: Optional[StrategyRegistry] = None,
+    ):
         config = config or Config()
-        super().__init__(config, dependencies)
+        super().__init__(config, dependencies, registry)
         self.add_route("HEAD")
 
     def _get_router_path(self) -> str:
         return self.config.head_router_path
 
     async def handle(self, file_id: str, response: Response):
-        self._validate_file_id(file_id)
-        metadata = self.metadata_strategy.get_metadata(file_id)
+        await self._validate_file_id(file_id)
+        metadata = await self.metadata_strategy.get_metadata(file_id)
         response = self._prepare_response(response, metadata)
         return response
 
-    def _validate_file_id(self, file_id: str):
-        if not self.metadata_strategy.is_metadata_exists(file_id):
+    async def _validate_file_id(self, file_id: str):
+        if not await self.metadata_strategy.is_metadata_exists(file_id):
             raise FileNotFoundException()
 
-        if not self.storage_strategy.is_file_exists(file_id):
+        if not await self.storage_strategy.is_file_exists(file_id):
             raise FileNotFoundException()
 
     def _prepare_response(self, response: Response, metadata: UploadMetadata):
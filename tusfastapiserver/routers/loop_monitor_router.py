@@ -0,0 +1,23 @@
+from typing import Optional
+
+from tusfastapiserver.config import Config
+from tusfastapiserver.registry import StrategyRegistry
+from tusfastapiserver.routers import BaseRouter
+
+
+class LoopMonitorRouter(BaseRouter):
+    def __init__(
+        self,
+        config: Optional[Config] = None,
+        dependencies=None,
+        registry: Optional[StrategyRegistry] = None,
+    ):
+        config = config or Config()
+        super().__init__(config, dependencies, registry)
+        self.add_route("GET")
+
+    def _get_router_path(self) -> str:
+        return self.config.loop_monitor_router_path
+
+    async def handle(self):
+        return self.config.loop_monitor.report()
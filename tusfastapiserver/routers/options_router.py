@@ -1,14 +1,54 @@
+from typing import List
 from typing import Optional
 
+from fastapi import Response
+from fastapi import status
+
+from tusfastapiserver import TUS_RESUMABLE
 from tusfastapiserver.routers import BaseRouter
 from tusfastapiserver.config import Config
+from tusfastapiserver.config import TusExtension
+from tusfastapiserver.registry import StrategyRegistry
+
+# Extensions this server implements, with their protocol names.
+SUPPORTED_EXTENSIONS = {
+    TusExtension.CREATION: ["creation", "creation-defer-length"],
+    TusExtension.TERMINATION: ["termination"],
+}
 
 
 class OptionsRouter(BaseRouter):
-    def __init__(self, config: Optional[Config] = None, dependencies=None):
+    def __init__(
+        self,
+        config: Optional[Config] = None,
+        dependencies=None,
+        registry: Optional[StrategyRegistry] = None,
+    ):
         config = config or Config()
-        super().__init__(config, dependencies)
+        super().__init__(config, dependencies, registry)
         self.add_route("OPTIONS")
 
     def _get_router_path(self) -> str:
         return self.config.options_router_path
+
+    async def handle(self, response: Response):
+        return self._prepare_response(response)
+
+    def _prepare_response(self, response: Response) -> Response:
+        response.status_code = status.HTTP_204_NO_CONTENT
+        response.headers["Tus-Resumable"] = TUS_RESUMABLE
+        response.headers["Tus-Version"] = TUS_RESUMABLE
+        extensions = self._get_extensions()
+        if extensions:
+            response.headers["Tus-Extension"] = ",".join(extensions)
+        if self.config.max_upload_size is not None:
+            response.headers["Tus-Max-Size"] = str(self.config.max_upload_size)
+        self._set_recommended_chunk_size(response)
+        return response
+
+    def _get_extensions(self) -> List[str]:
+        return [
+            name
+            for extension in self.config.enabled_extensions
+            for name in SUPPORTED_EXTENSIONS.get(extension, [])
+        ]
@@ -1,9 +1,18 @@
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Callable
+from typing import List
 from typing import Optional
+import asyncio
+import errno
 import logging
+import time
 
 from fastapi import Request
 from fastapi import Response
 from fastapi import status
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
 
 from tusfastapiserver.exceptions import InvalidContentTypeException
 from tusfastapiserver.exceptions import MissingContentTypeException
@@ -12,17 +21,36 @@ from tusfastapiserver.exceptions import MissingUploadOffsetException
 from tusfastapiserver.exceptions import InvalidUploadOffsetException
 from tusfastapiserver.exceptions import InvalidUploadLengthException
 from tusfastapiserver.exceptions import MismatchUploadOffsetException
+from tusfastapiserver.exceptions import RequestTimeoutException
+from tusfastapiserver.exceptions import InsufficientStorageException
+from tusfastapiserver.exceptions import RequestBodyTooLargeException
+from tusfastapiserver.exceptions import UploadTooLargeException
 from tusfastapiserver.routers import BaseRouter
 from tusfastapiserver.config import Config
+from tusfastapiserver.registry import StrategyRegistry
 from tusfastapiserver.schemas import UploadMetadata
+from tusfastapiserver.utils.concurrency import shield_until_complete
+from tusfastapiserver.utils.request import get_content_length
+from tusfastapiserver.utils.request import iter_body
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class BodyLimit:
+    size: int
+    exception: Callable[[], Exception]
+
+
 class PatchRouter(BaseRouter):
-    def __init__(self, config: Optional[Config] = None, dependencies=None):
+    def __init__(
+        self,
+        config: Optional[Config] = None,
+        dependencies=None,
+        registry: Optional[StrategyRegistry] = None,
+    ):
         config = config or Config()
-        super().__init__(config, dependencies)
+        super().__init__(config, dependencies, registry)
         self.add_route("PATCH")
 
     def _get_router_path(self) -> str:
@@ -30,26 +58,197 @@ class PatchRouter(BaseRouter):
 
     async def handle(self, file_id: str, request: Request, response: Response):
         logger.info(f"Handling PATCH request for file_id: {file_id}")
-        self._validate_file_id(file_id)
-        self._validate_headers(request)
-        metadata = self.metadata_strategy.get_metadata(file_id)
-        self._compare_headers_with_metadata(request, metadata)
-        if request.headers.get("upload-length"):
-            metadata.upload_length = int(request.headers.get("upload-length"))
-            self.metadata_strategy.update(metadata)
-        async for chunk in request.stream():
-            self.storage_strategy.update(metadata, chunk)
-            metadata.upload_offset += len(chunk)
-            self.metadata_strategy.update(metadata)
-        response = self._prepare_response(response, metadata)
-        logger.info(f"PATCH request for file_id: {file_id} completed successfully")
-        return response
+        with self._admit(file_id, request):
+            started_at = time.monotonic()
+            await self._validate_file_id(file_id)
+            self._validate_headers(request)
+            metadata = await self.metadata_strategy.get_metadata(file_id)
+            self._compare_headers_with_metadata(request, metadata)
+            was_completed = self._is_upload_completed(metadata)
+            if request.headers.get("upload-length"):
+                metadata.upload_length = int(request.headers.get("upload-length"))
+                await self._reserve_storage(metadata)
+                await self.metadata_strategy.update(metadata)
+                self._publish_progress(metadata)
+            upload_offset = metadata.upload_offset
+            stream_started_at = time.monotonic()
+            try:
+                await self._write_stream(request, metadata)
+            except ClientDisconnect:
+                logger.warning(
+                    f"Client disconnected during PATCH for file_id: {file_id}"
+                )
+                await shield_until_complete(
+                    self._commit_interrupted(metadata, was_completed)
+                )
+            except asyncio.TimeoutError:
+                logger.warning(f"PATCH request for file_id: {file_id} timed out")
+                await shield_until_complete(
+                    self._commit_interrupted(metadata, was_completed)
+                )
+                raise RequestTimeoutException()
+            except (UploadTooLargeException, RequestBodyTooLargeException):
+                # The bytes within the limit were kept and may have completed
+                # the upload.
+                await self._complete_if_finished(metadata, was_completed)
+                raise
+            except asyncio.CancelledError:
+                await shield_until_complete(
+                    self._commit_interrupted(metadata, was_completed)
+                )
+                raise
+            except OSError as error:
+                logger.error(
+                    f"Storage error during PATCH for file_id: {file_id}: {error!r}"
+                )
+                await shield_until_complete(
+                    self._commit_interrupted(metadata, was_completed)
+                )
+                if error.errno == errno.ENOSPC:
+                    raise InsufficientStorageException() from error
+                raise
+            transfer_time = time.monotonic() - stream_started_at
+            await self._complete_if_finished(metadata, was_completed)
+            self._record_chunk(
+                file_id,
+                metadata.upload_offset - upload_offset,
+                transfer_time,
+                started_at,
+            )
+            response = self._prepare_response(response, metadata)
+            logger.info(f"PATCH request for file_id: {file_id} completed successfully")
+            return response
+
+    def _admit(self, file_id: str, request: Request):
+        if self.config.admission_controller is None:
+            return nullcontext()
+        return self.config.admission_controller.admit_request(file_id, request)
+
+    def _get_stream(self, request: Request, metadata: UploadMetadata):
+        stream = iter_body(request, self.config.patch_read_timeout)
+        scheduler = self.config.bandwidth_scheduler
+        if scheduler is None:
+            return stream
+        return scheduler.paced(stream, metadata.id, scheduler.get_client_key(request))
+
+    def _get_body_limit(self, metadata: UploadMetadata) -> Optional[BodyLimit]:
+        """Returns how many bytes the request may carry and the exception
+        raised when it carries more."""
+        limits: List[BodyLimit] = []
+        if metadata.upload_length is not None:
+            limits.append(
+                BodyLimit(
+                    metadata.upload_length - metadata.upload_offset,
+                    UploadTooLargeException,
+                )
+            )
+        elif self.config.max_upload_size is not None:
+            limits.append(
+                BodyLimit(
+                    self.config.max_upload_size - metadata.upload_offset,
+                    UploadTooLargeException,
+                )
+            )
+        if self.config.max_request_body_size is not None:
+            limits.append(
+                BodyLimit(
+                    self.config.max_request_body_size, RequestBodyTooLargeException
+                )
+            )
+        if not limits:
+            return None
+        return min(limits, key=lambda limit: limit.size)
+
+    async def _write_stream(self, request: Request, metadata: UploadMetadata):
+        limit = self._get_body_limit(metadata)
+        content_length = get_content_length(request)
+        if (
+            limit is not None
+            and content_length is not None
+            and content_length > limit.size
+        ):
+            logger.error(
+                f"Content-Length {content_length} exceeds the limit of {limit.size}"
+            )
+            raise limit.exception()
+        received = 0
+        async for chunk in self._get_stream(request, metadata):
+            if limit is not None and received + len(chunk) > limit.size:
+                # Keep the bytes within the limit and stop reading.
+                logger.error(f"Request body exceeds the limit of {limit.size}")
+                chunk = chunk[: limit.size - received]
+                if chunk:
+                    await self._write_body_chunk(metadata, chunk)
+                raise limit.exception()
+            received += len(chunk)
+            await self._write_body_chunk(metadata, chunk)
+
+    async def _write_body_chunk(self, metadata: UploadMetadata, chunk: bytes):
+        await self._write_chunk(metadata, chunk)
+        metadata.upload_offset += len(chunk)
+        self._consume_reservation(metadata, len(chunk))
+        await self.metadata_strategy.update(metadata)
+        self._publish_progress(metadata)
+
+    async def _write_chunk(self, metadata: UploadMetadata, chunk: bytes):
+        if self.config.content_store is None:
+            await self.storage_strategy.update(metadata, chunk)
+            return
+        await asyncio.gather(
+            self.storage_strategy.update(metadata, chunk),
+            run_in_threadpool(
+                self.config.content_store.hasher.update,
+                metadata.id,
+                metadata.upload_offset,
+                chunk,
+            ),
+        )
+
+    async def _get_written_size(self, metadata: UploadMetadata) -> int:
+        try:
+            return await self.storage_strategy.get_size(metadata)
+        except NotImplementedError:
+            return metadata.upload_offset
+
+    async def _commit_progress(self, metadata: UploadMetadata):
+        try:
+            await self._save_progress(metadata)
+        except OSError:
+            # The offset could not be saved; drop the bytes written after the
+            # stored offset so that the upload can be resumed from it.
+            logger.exception(f"Failed to commit progress for file_id: {metadata.id}")
+            stored_metadata = await self.metadata_strategy.get_metadata(metadata.id)
+            await self.storage_strategy.truncate(
+                metadata, stored_metadata.upload_offset
+            )
+            metadata.upload_offset = stored_metadata.upload_offset
+            self._publish_progress(metadata)
+
+    async def _commit_interrupted(self, metadata: UploadMetadata, was_completed: bool):
+        await self._commit_progress(metadata)
+        await self._complete_if_finished(metadata, was_completed)
+
+    async def _save_progress(self, metadata: UploadMetadata):
+        # An interrupted request may have left a chunk in storage without the
+        # matching offset update, so the written size is the source of truth.
+        size = await self._get_written_size(metadata)
+        if metadata.upload_length is not None and size > metadata.upload_length:
+            await self.storage_strategy.truncate(metadata, metadata.upload_length)
+            size = metadata.upload_length
+        await self.storage_strategy.flush(metadata)
+        if size > metadata.upload_offset:
+            self._consume_reservation(metadata, size - metadata.upload_offset)
+        metadata.upload_offset = size
+        await self.metadata_strategy.update(metadata)
+        self._publish_progress(metadata)
+        logger.info(f"Committed offset {size} for file_id: {metadata.id}")
 
     def _validate_headers(self, request: Request):
         logger.debug("Validating headers")
         self._validate_content_type(request.headers.get("content-type"))
         self._validate_upload_offset(request.headers.get("upload-offset"))
         self._validate_upload_length(request.headers.get("upload-length"))
+        self._validate_upload_size(request.headers.get("upload-length"))
 
     @staticmethod
     def _validate_content_type(content_type: Optional[str]):
@@ -60,13 +259,13 @@ class PatchRouter(BaseRouter):
             logger.error("Invalid content type")
             raise InvalidContentTypeException()
 
-    def _validate_file_id(self, file_id: str):
+    async def _validate_file_id(self, file_id: str):
         logger.debug(f"Validating file_id: {file_id}")
-        if not self.metadata_strategy.is_metadata_exists(file_id):
+        if not await self.metadata_strategy.is_metadata_exists(file_id):
             logger.error("Metadata not found for file_id")
             raise FileNotFoundException()
 
-        if not self.storage_strategy.is_file_exists(file_id):
+        if not await self.storage_strategy.is_file_exists(file_id):
             logger.error("File not found for file_id")
             raise FileNotFoundException()
 
@@ -136,8 +335,46 @@ class PatchRouter(BaseRouter):
             if int(upload_length) < metadata.upload_offset:
                 raise InvalidUploadLengthException()
 
+    @staticmethod
+    def _is_upload_completed(metadata: UploadMetadata) -> bool:
+        return (
+            metadata.upload_length is not None
+            and metadata.upload_offset == metadata.upload_length
+        )
+
+    async def _complete_if_finished(
+        self, metadata: UploadMetadata, was_completed: bool
+    ):
+        # Only the request that finishes the upload completes it; retries of
+        # the last chunk must not run the completion hooks again.
+        if not was_completed and self._is_upload_completed(metadata):
+            await self._on_upload_completed(metadata)
+
+    async def _reserve_storage(self, metadata: UploadMetadata):
+        if self.config.reservation_ledger is not None:
+            await self.config.reservation_ledger.reserve_async(
+                metadata, metadata.upload_storage_path
+            )
+
+    def _consume_reservation(self, metadata: UploadMetadata, size: int):
+        if self.config.reservation_ledger is not None:
+            self.config.reservation_ledger.consume(metadata.id, size)
+
+    def _record_chunk(
+        self, file_id: str, size: int, transfer_time: float, started_at: float
+    ):
+        if self.config.chunk_size_advisor is not None:
+            self.config.chunk_size_advisor.record_request(
+                file_id, size, transfer_time, started_at, time.monotonic()
+            )
+
+    def _publish_progress(self, metadata: UploadMetadata):
+        if self.config.progress_broadcaster is not None:
+            self.config.progress_broadcaster.publish(metadata)
+
     def _prepare_response(self, response: Response, metadata: UploadMetadata):
         logger.debug("Preparing response")
         response.headers["Upload-Offset"] = str(metadata.upload_offset)
         response.status_code = status.HTTP_204_NO_CONTENT
+        self._set_recommended_chunk_size(response)
         return response
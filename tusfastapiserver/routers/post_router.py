@@ -1,4 +1,3 @@
-import uuid
 import logging
 from typing import Optional
 
@@ -9,12 +8,15 @@ from fastapi import status
 from tusfastapiserver import TUS_RESUMABLE
 from tusfastapiserver.routers import BaseRouter
 from tusfastapiserver.config import Config
+from tusfastapiserver.registry import StrategyRegistry
 from tusfastapiserver.exceptions import InvalidContentTypeException
 from tusfastapiserver.exceptions import InvalidUploadDeferLengthException
 from tusfastapiserver.exceptions import InvalidTusResumableException
 from tusfastapiserver.exceptions import MissingUploadLengthException
 from tusfastapiserver.schemas import UploadMetadata
+from tusfastapiserver.schemas import WebhookEventType
 from tusfastapiserver.utils.metadata import parse as parse_metadata
+from tusfastapiserver.utils.upload_id import generate as generate_upload_id
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -24,9 +26,14 @@ logger = logging.getLogger(__name__)
 # TODO: add upload-concat support
 # TODO: add support for Creation With Upload
 class PostRouter(BaseRouter):
-    def __init__(self, config: Optional[Config] = None, dependencies=None):
+    def __init__(
+        self,
+        config: Optional[Config] = None,
+        dependencies=None,
+        registry: Optional[StrategyRegistry] = None,
+    ):
         config = config or Config()
-        super().__init__(config, dependencies)
+        super().__init__(config, dependencies, registry)
         self.add_route("POST")
         logger.info("PostRouter initialized with POST route.")
 
@@ -39,8 +46,19 @@ class PostRouter(BaseRouter):
         logger.info("Handling request.")
         self._validate_headers(request)
         upload_metadata = self._create_upload_metadata(request)
-        self.storage_strategy.initialize(upload_metadata)
-        self.metadata_strategy.initialize(upload_metadata)
+        # The storage strategy chooses the volume the space is reserved on.
+        await self.storage_strategy.initialize(upload_metadata)
+        try:
+            await self._reserve_storage(upload_metadata)
+            await self.metadata_strategy.initialize(upload_metadata)
+        except Exception:
+            self._release_storage(upload_metadata)
+            await self.storage_strategy.delete(upload_metadata)
+            raise
+        await self._notify_webhook(WebhookEventType.CREATED, upload_metadata)
+        if upload_metadata.upload_length == 0:
+            # No PATCH request will ever complete an empty upload.
+            await self._on_upload_completed(upload_metadata)
         response = self._prepare_response(response, request, upload_metadata)
         logger.info("Request handled successfully.")
         return response
@@ -52,6 +70,7 @@ class PostRouter(BaseRouter):
             request.headers.get("upload-length"),
             request.headers.get("upload-defer-length"),
         )
+        self._validate_upload_size(request.headers.get("upload-length"))
         self._validate_content_type(request.headers.get("content-type"))
         self._validate_metadata(request.headers.get("upload-metadata"))
         logger.debug("Headers validated.")
@@ -83,9 +102,12 @@ class PostRouter(BaseRouter):
             logger.debug("Parsing metadata.")
             parse_metadata(metadata)
 
+    def _generate_file_id(self) -> str:
+        return generate_upload_id(self.config.node_id)
+
     def _create_upload_metadata(self, request: Request) -> UploadMetadata:
         logger.debug("Creating upload metadata.")
-        file_id = str(uuid.uuid4())
+        file_id = self._generate_file_id()
         tus_resumable = request.headers["tus-resumable"]
         upload_length = request.headers.get("upload-length")
         upload_defer_length = request.headers.get("upload-defer-length")
@@ -108,6 +130,17 @@ class PostRouter(BaseRouter):
         logger.info(f"Upload metadata created for file ID: {file_id}")
         return upload_metadata
 
+    async def _reserve_storage(self, upload_metadata: UploadMetadata):
+        if self.config.reservation_ledger is not None:
+            logger.debug("Reserving storage.")
+            await self.config.reservation_ledger.reserve_async(
+                upload_metadata, upload_metadata.upload_storage_path
+            )
+
+    def _release_storage(self, upload_metadata: UploadMetadata):
+        if self.config.reservation_ledger is not None:
+            self.config.reservation_ledger.release(upload_metadata.id)
+
     def _prepare_response(
         self, response: Response, request: Request, upload_metadata: UploadMetadata
     ) -> Response:
@@ -0,0 +1,111 @@
+from typing import AsyncIterator
+from typing import Dict
+from typing import List
+from typing import Optional
+
+from fastapi import Query
+from fastapi.responses import StreamingResponse
+
+from tusfastapiserver.config import Config
+from tusfastapiserver.exceptions import InvalidQueryException
+from tusfastapiserver.exceptions import ProgressBroadcasterNotConfiguredException
+from tusfastapiserver.progress import ProgressSubscription
+from tusfastapiserver.registry import StrategyRegistry
+from tusfastapiserver.routers import BaseRouter
+from tusfastapiserver.schemas import UploadMetadata
+from tusfastapiserver.schemas import UploadProgress
+
+
+class ProgressRouter(BaseRouter):
+    """Streams the progress of one or many uploads as server-sent events.
+
+    The stream starts with the current offset of every upload, followed by the
+    offsets committed by ``PatchRouter``. It ends when all uploads are
+    completed or terminated; ids of unknown uploads get a ``not_found`` event
+    and terminated uploads a ``terminated`` event.
+    """
+
+    def __init__(
+        self,
+        config: Optional[Config] = None,
+        dependencies=None,
+        registry: Optional[StrategyRegistry] = None,
+    ):
+        config = config or Config()
+        super().__init__(config, dependencies, registry)
+        self.add_route("GET")
+
+    def _get_router_path(self) -> str:
+        return self.config.progress_router_path
+
+    async def handle(self, id: List[str] = Query(min_length=1)):
+        broadcaster = self.config.progress_broadcaster
+        if broadcaster is None:
+            raise ProgressBroadcasterNotConfiguredException()
+
+        file_ids = list(dict.fromkeys(id))
+        if len(file_ids) > self.config.max_progress_subscription_size:
+            raise InvalidQueryException(
+                f"At most {self.config.max_progress_subscription_size} uploads "
+                "can be followed by one stream"
+            )
+        # Subscribe before reading the offsets, so no commit is missed.
+        subscription = broadcaster.subscribe(file_ids)
+        try:
+            uploads = await self.metadata_strategy.get_metadata_many(file_ids)
+        except BaseException:
+            subscription.close()
+            raise
+        return StreamingResponse(
+            self._stream(subscription, uploads),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    async def _stream(
+        self,
+        subscription: ProgressSubscription,
+        uploads: Dict[str, Optional[UploadMetadata]],
+    ) -> AsyncIterator[str]:
+        with subscription:
+            remaining = set()
+            for file_id, upload_metadata in uploads.items():
+                if upload_metadata is None:
+                    yield f"event: not_found\ndata: {file_id}\n\n"
+                    continue
+                progress = UploadProgress(
+                    id=file_id,
+                    upload_offset=upload_metadata.upload_offset,
+                    upload_length=upload_metadata.upload_length,
+                )
+                yield self._format_event(progress)
+                if not self._is_completed(progress):
+                    remaining.add(file_id)
+
+            while remaining and not subscription.closed:
+                updates = await subscription.get(
+                    timeout=self.config.progress_keepalive_interval
+                )
+                if not updates:
+                    yield ": keepalive\n\n"
+                    continue
+                for progress in updates:
+                    if progress.terminated:
+                        yield f"event: terminated\ndata: {progress.id}\n\n"
+                        remaining.discard(progress.id)
+                        continue
+                    yield self._format_event(progress)
+                    if self._is_completed(progress):
+                        remaining.discard(progress.id)
+
+    @staticmethod
+    def _format_event(progress: UploadProgress) -> str:
+        data = progress.model_dump_json(exclude={"terminated"})
+        return f"event: progress\ndata: {data}\n\n"
+
+    @staticmethod
+    def _is_completed(progress: UploadProgress) -> bool:
+        return (
+            progress.upload_length is not None
+            and progress.upload_offset >= progress.upload_length
+        )
@@ -0,0 +1,80 @@
+import binascii
+import json
+import logging
+from datetime import datetime
+from typing import Dict
+from typing import List
+from typing import Optional
+
+from fastapi import Query
+from starlette.concurrency import run_in_threadpool
+
+from tusfastapiserver.config import Config
+from tusfastapiserver.registry import StrategyRegistry
+from tusfastapiserver.exceptions import InvalidQueryException
+from tusfastapiserver.exceptions import MetadataIndexNotConfiguredException
+from tusfastapiserver.routers import BaseRouter
+from tusfastapiserver.schemas import UploadListResponse
+from tusfastapiserver.schemas import UploadState
+
+logger = logging.getLogger(__name__)
+
+
+class UploadListRouter(BaseRouter):
+    def __init__(
+        self,
+        config: Optional[Config] = None,
+        dependencies=None,
+        registry: Optional[StrategyRegistry] = None,
+    ):
+        config = config or Config()
+        super().__init__(config, dependencies, registry)
+        self.add_route("GET")
+
+    def _get_router_path(self) -> str:
+        return self.config.upload_list_router_path
+
+    async def handle(
+        self,
+        state: Optional[UploadState] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        updated_before: Optional[datetime] = None,
+        min_length: Optional[int] = Query(default=None, ge=0),
+        max_length: Optional[int] = Query(default=None, ge=0),
+        metadata: List[str] = Query(default=[]),
+        limit: int = Query(default=100, ge=1),
+        cursor: Optional[str] = None,
+    ):
+        index = self.config.metadata_index
+        if index is None:
+            raise MetadataIndexNotConfiguredException()
+
+        try:
+            uploads, next_cursor = await run_in_threadpool(
+                index.query,
+                state=state,
+                created_after=created_after,
+                created_before=created_before,
+                updated_before=updated_before,
+                min_length=min_length,
+                max_length=max_length,
+                metadata=self._parse_metadata_filters(metadata),
+                limit=min(limit, self.config.max_upload_listing_limit),
+                cursor=cursor,
+            )
+        except (ValueError, TypeError, binascii.Error, json.JSONDecodeError):
+            raise InvalidQueryException("Invalid cursor")
+        return UploadListResponse(uploads=uploads, next_cursor=next_cursor)
+
+    @staticmethod
+    def _parse_metadata_filters(metadata: List[str]) -> Dict[str, str]:
+        filters = {}
+        for item in metadata:
+            key, separator, value = item.partition(":")
+            if not separator or not key:
+                raise InvalidQueryException(
+                    "Metadata filters must have the form key:value"
+                )
+            filters[key] = value
+        return filters
@@ -0,0 +1,43 @@
+from typing import Any
+from typing import Dict
+from typing import Optional
+
+from tusfastapiserver.config import Config
+from tusfastapiserver.registry import StrategyRegistry
+from tusfastapiserver.routers import BaseRouter
+
+
+class UsageRouter(BaseRouter):
+    def __init__(
+        self,
+        config: Optional[Config] = None,
+        dependencies=None,
+        registry: Optional[StrategyRegistry] = None,
+    ):
+        config = config or Config()
+        super().__init__(config, dependencies, registry)
+        self.add_route("GET")
+
+    def _get_router_path(self) -> str:
+        return self.config.usage_router_path
+
+    async def handle(self):
+        return self._prepare_response()
+
+    def _prepare_response(self) -> dict:
+        usage: Dict[str, Any] = {}
+        if self.config.admission_controller is not None:
+            usage["admission"] = self.config.admission_controller.usage()
+        if self.config.bandwidth_scheduler is not None:
+            usage["bandwidth"] = {
+                "active_uploads": self.config.bandwidth_scheduler.active_uploads
+            }
+        if self.config.reservation_ledger is not None:
+            usage["reservations"] = self.config.reservation_ledger.usage()
+        if self.config.completion_queue is not None:
+            usage["completion"] = self.config.completion_queue.stats()
+        if self.config.storage_volumes is not None:
+            usage["volumes"] = self.config.storage_volumes.usage()
+        if self.config.loop_monitor is not None:
+            usage["event_loop"] = self.config.loop_monitor.stats()
+        return usage
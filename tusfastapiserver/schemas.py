@@ -1,6 +1,8 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
+from enum import Enum
 from typing import Dict
+from typing import List
 from typing import Optional
 from typing import NewType
 
@@ -23,7 +25,78 @@ class BaseUploadMetadata(BaseModel):
     storage_strategy_type: StorageStrategyType
     upload_metadata_path: UploadMetadataPath | None = None
     metadata_strategy_type: MetadataStrategyType
+    content_digest: Optional[str] = None
 
 
 class UploadMetadata(BaseUploadMetadata):
     id: str
+
+
+class CompletionJob(BaseModel):
+    id: str
+    handler_name: str
+    upload_metadata: UploadMetadata
+    attempts: int = 0
+    last_error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.now)
+
+
+class BatchStatusRequest(BaseModel):
+    ids: List[str]
+
+
+class UploadStatus(BaseModel):
+    id: str
+    found: bool
+    upload_offset: Optional[int] = None
+    upload_length: Optional[int] = None
+    upload_defer_length: Optional[bool] = None
+    metadata: Optional[Dict[str, Optional[str]]] = None
+
+
+class BatchStatusResponse(BaseModel):
+    uploads: List[UploadStatus]
+
+
+class WebhookEventType(str, Enum):
+    CREATED = "upload.created"
+    COMPLETED = "upload.completed"
+    TERMINATED = "upload.terminated"
+
+
+class WebhookEvent(BaseModel):
+    id: str
+    type: WebhookEventType
+    upload: UploadStatus
+    created_at: datetime = Field(default_factory=datetime.now)
+
+
+class WebhookBatch(BaseModel):
+    events: List[WebhookEvent]
+
+
+class UploadProgress(BaseModel):
+    id: str
+    upload_offset: int
+    upload_length: Optional[int] = None
+    terminated: bool = False
+
+
+class UploadState(str, Enum):
+    INCOMPLETE = "INCOMPLETE"
+    COMPLETED = "COMPLETED"
+
+
+class UploadIndexEntry(BaseModel):
+    id: str
+    state: UploadState
+    upload_offset: int
+    upload_length: Optional[int] = None
+    created_at: datetime
+    updated_at: datetime
+    metadata: Dict[str, Optional[str]] = Field(default_factory=dict)
+
+
+class UploadListResponse(BaseModel):
+    uploads: List[UploadIndexEntry]
+    next_cursor: Optional[str] = None
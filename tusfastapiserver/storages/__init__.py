@@ -1,8 +1,18 @@
+from tusfastapiserver.storages.base import AsyncBaseStorageStrategy
 from tusfastapiserver.storages.base import BaseStorageStrategy
 from tusfastapiserver.storages.local import LocalStorageStrategy
+from tusfastapiserver.storages.adapters import ThreadedStorageStrategy
+from tusfastapiserver.storages.adapters import to_async_storage_strategy
+from tusfastapiserver.storages.compressed import CompressedStorageStrategy
+from tusfastapiserver.storages.compressed import with_compression
 
 
 __all__ = [
+    "AsyncBaseStorageStrategy",
     "BaseStorageStrategy",
+    "CompressedStorageStrategy",
     "LocalStorageStrategy",
+    "ThreadedStorageStrategy",
+    "to_async_storage_strategy",
+    "with_compression",
 ]
@@ -0,0 +1,63 @@
+from typing import Union
+
+from tusfastapiserver.schemas import UploadMetadata
+from tusfastapiserver.schemas import UploadStoragePath
+from tusfastapiserver.storages.base import AsyncBaseStorageStrategy
+from tusfastapiserver.storages.base import BaseStorageStrategy
+from tusfastapiserver.utils.concurrency import run_to_completion
+
+
+class ThreadedStorageStrategy(AsyncBaseStorageStrategy):
+    """Runs the methods of a synchronous storage strategy in the thread pool."""
+
+    def __init__(self, strategy: BaseStorageStrategy):
+        super().__init__(strategy.config)
+        self.strategy = strategy
+        self.storage_strategy_type = strategy.storage_strategy_type
+
+    def __getattr__(self, name: str):
+        if name == "strategy":
+            raise AttributeError(name)
+        return getattr(self.strategy, name)
+
+    async def open(self):
+        return await run_to_completion(self.strategy.open)
+
+    async def close(self):
+        return await run_to_completion(self.strategy.close)
+
+    def generate_file_path(self, file_id: str) -> UploadStoragePath:
+        return self.strategy.generate_file_path(file_id)
+
+    async def initialize(self, upload_metadata: UploadMetadata, *args, **kwargs):
+        return await run_to_completion(
+            self.strategy.initialize, upload_metadata, *args, **kwargs
+        )
+
+    async def is_file_exists(self, file_id: str) -> bool:
+        return await run_to_completion(self.strategy.is_file_exists, file_id)
+
+    async def update(self, upload_metadata: UploadMetadata, chunk: bytes):
+        return await run_to_completion(self.strategy.update, upload_metadata, chunk)
+
+    async def delete(self, upload_metadata: UploadMetadata, *args, **kwargs):
+        return await run_to_completion(
+            self.strategy.delete, upload_metadata, *args, **kwargs
+        )
+
+    async def get_size(self, upload_metadata: UploadMetadata) -> int:
+        return await run_to_completion(self.strategy.get_size, upload_metadata)
+
+    async def truncate(self, upload_metadata: UploadMetadata, size: int):
+        return await run_to_completion(self.strategy.truncate, upload_metadata, size)
+
+    async def flush(self, upload_metadata: UploadMetadata):
+        return await run_to_completion(self.strategy.flush, upload_metadata)
+
+
+def to_async_storage_strategy(
+    strategy: Union[BaseStorageStrategy, AsyncBaseStorageStrategy],
+) -> AsyncBaseStorageStrategy:
+    if isinstance(strategy, AsyncBaseStorageStrategy):
+        return strategy
+    return ThreadedStorageStrategy(strategy)
@@ -1,5 +1,7 @@
 from tusfastapiserver.config import Config
 from tusfastapiserver.config import StorageStrategyType
+from tusfastapiserver.schemas import UploadMetadata
+from tusfastapiserver.schemas import UploadStoragePath
 
 
 class BaseStorageStrategy:
@@ -8,8 +10,75 @@ class BaseStorageStrategy:
     def __init__(self, config: Config, *args, **kwargs):
         self.config = config
 
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def generate_file_path(self, file_id: str) -> UploadStoragePath:
+        raise NotImplementedError()
+
     def initialize(self, *args, **kwargs):
         raise NotImplementedError()
 
     def is_file_exists(self, file_id: str) -> bool:
         raise NotImplementedError()
+
+    def update(self, upload_metadata: UploadMetadata, chunk: bytes):
+        raise NotImplementedError()
+
+    def delete(self, upload_metadata: UploadMetadata, *args, **kwargs):
+        raise NotImplementedError()
+
+    def get_size(self, upload_metadata: UploadMetadata) -> int:
+        raise NotImplementedError()
+
+    def truncate(self, upload_metadata: UploadMetadata, size: int):
+        raise NotImplementedError()
+
+    def flush(self, upload_metadata: UploadMetadata):
+        pass
+
+
+class AsyncBaseStorageStrategy:
+    """Storage strategy whose I/O methods are coroutines.
+
+    Routers only talk to this interface; synchronous strategies are wrapped in
+    ``ThreadedStorageStrategy``, which runs them in the thread pool.
+    """
+
+    storage_strategy_type: StorageStrategyType
+
+    def __init__(self, config: Config, *args, **kwargs):
+        self.config = config
+
+    async def open(self):
+        pass
+
+    async def close(self):
+        pass
+
+    def generate_file_path(self, file_id: str) -> UploadStoragePath:
+        raise NotImplementedError()
+
+    async def initialize(self, upload_metadata: UploadMetadata, *args, **kwargs):
+        raise NotImplementedError()
+
+    async def is_file_exists(self, file_id: str) -> bool:
+        raise NotImplementedError()
+
+    async def update(self, upload_metadata: UploadMetadata, chunk: bytes):
+        raise NotImplementedError()
+
+    async def delete(self, upload_metadata: UploadMetadata, *args, **kwargs):
+        raise NotImplementedError()
+
+    async def get_size(self, upload_metadata: UploadMetadata) -> int:
+        raise NotImplementedError()
+
+    async def truncate(self, upload_metadata: UploadMetadata, size: int):
+        raise NotImplementedError()
+
+    async def flush(self, upload_metadata: UploadMetadata):
+        pass
@@ -0,0 +1,328 @@
+import io
+import logging
+import os
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any
+from typing import BinaryIO
+from typing import Iterator
+from typing import Optional
+from typing import Tuple
+
+from tusfastapiserver.config import CompressionCodec
+from tusfastapiserver.config import Config
+from tusfastapiserver.schemas import UploadMetadata
+from tusfastapiserver.schemas import UploadStoragePath
+from tusfastapiserver.storages.base import BaseStorageStrategy
+
+try:
+    import zstandard  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+
+# Compressed files start with this header, so they are never mistaken for raw
+# uploads and the other way around.
+FILE_MAGIC = b"TUSFRM01"
+# Every write is stored as one frame: codec, uncompressed length, stored length.
+FRAME_HEADER = struct.Struct(">BII")
+RAW = 0
+GZIP = 1
+ZSTD = 2
+CODEC_IDS = {CompressionCodec.GZIP: GZIP, CompressionCodec.ZSTD: ZSTD}
+DEFAULT_LEVELS = {CompressionCodec.GZIP: 6, CompressionCodec.ZSTD: 3}
+GZIP_WBITS = 31
+
+_zstd_local = threading.local()
+
+
+def _get_zstd_compressor(level: int) -> "zstandard.ZstdCompressor":
+    compressors = getattr(_zstd_local, "compressors", None)
+    if compressors is None:
+        compressors = _zstd_local.compressors = {}
+    if level not in compressors:
+        compressors[level] = zstandard.ZstdCompressor(level=level)
+    return compressors[level]
+
+
+def _get_zstd_decompressor() -> "zstandard.ZstdDecompressor":
+    decompressor = getattr(_zstd_local, "decompressor", None)
+    if decompressor is None:
+        decompressor = _zstd_local.decompressor = zstandard.ZstdDecompressor()
+    return decompressor
+
+
+def compress(codec_id: int, data: bytes, level: int) -> bytes:
+    if codec_id == GZIP:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, GZIP_WBITS)
+        return compressor.compress(data) + compressor.flush()
+    if codec_id == ZSTD:
+        return _get_zstd_compressor(level).compress(data)
+    return data
+
+
+def decompress(codec_id: int, data: bytes) -> bytes:
+    if codec_id == RAW:
+        return data
+    if codec_id == GZIP:
+        return zlib.decompress(data, GZIP_WBITS)
+    if codec_id == ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd frames")
+        return _get_zstd_decompressor().decompress(data)
+    raise ValueError(f"Unknown frame codec {codec_id}")
+
+
+def is_compressed_file(path: str) -> bool:
+    """Tells whether ``path`` was written by ``CompressedStorageStrategy``."""
+    with open(path, "rb") as file:
+        return file.read(len(FILE_MAGIC)) == FILE_MAGIC
+
+
+def iter_frame_headers(file: BinaryIO) -> Iterator[Tuple[int, int, int, int]]:
+    """Yields ``(position, codec, raw_length, stored_length)`` of every complete
+    frame; a frame torn by a crash ends the iteration."""
+    file_size = os.fstat(file.fileno()).st_size
+    file.seek(0)
+    if file.read(len(FILE_MAGIC)) != FILE_MAGIC:
+        raise ValueError(f"{file.name} is not a compressed upload file")
+    position = len(FILE_MAGIC)
+    while position + FRAME_HEADER.size <= file_size:
+        file.seek(position)
+        codec_id, raw_length, stored_length = FRAME_HEADER.unpack(
+            file.read(FRAME_HEADER.size)
+        )
+        if position + FRAME_HEADER.size + stored_length > file_size:
+            return
+        yield position, codec_id, raw_length, stored_length
+        position += FRAME_HEADER.size + stored_length
+
+
+def iter_decompressed(
+    path: str, offset: int = 0, count: Optional[int] = None
+) -> Iterator[bytes]:
+    """Yields the uncompressed bytes ``[offset, offset + count)`` of a file
+    written by ``CompressedStorageStrategy``. Frames before ``offset`` are
+    skipped without being decompressed."""
+    remaining = count
+    with open(path, "rb") as file:
+        start = 0
+        for position, codec_id, raw_length, stored_length in iter_frame_headers(file):
+            end = start + raw_length
+            if end > offset:
+                file.seek(position + FRAME_HEADER.size)
+                data = decompress(codec_id, file.read(stored_length))
+                data = data[max(offset - start, 0) :]
+                if remaining is not None:
+                    data = data[:remaining]
+                    remaining -= len(data)
+                if data:
+                    yield data
+                if remaining == 0:
+                    return
+            start = end
+
+
+class DecompressingReader(io.RawIOBase):
+    """Read-only file object over the uncompressed content of an upload."""
+
+    def __init__(self, path: str, offset: int = 0):
+        self._chunks = iter_decompressed(path, offset)
+        self._buffer = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._buffer:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._buffer = chunk
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+class CompressedStorageStrategy(BaseStorageStrategy):
+    """Compresses every chunk written through a file based storage strategy.
+
+    Offsets and sizes stay in uncompressed bytes. Chunks that do not shrink
+    below ``min_ratio`` of their size are stored raw, and the next
+    ``skip_frames`` chunks of that upload are not compressed at all.
+
+    New files start with ``FILE_MAGIC``. Files without it were written before
+    compression was enabled and are passed through to ``strategy`` unchanged.
+    The per-upload state is kept for the ``cache_size`` most recently written
+    uploads; an evicted upload is checked again on its next write.
+    """
+
+    is_compressed = True
+
+    def __init__(
+        self,
+        strategy: BaseStorageStrategy,
+        codec: CompressionCodec = CompressionCodec.GZIP,
+        level: Optional[int] = None,
+        min_frame_size: int = 512,
+        min_ratio: float = 0.9,
+        skip_frames: int = 16,
+        cache_size: int = 10000,
+    ):
+        super().__init__(strategy.config)
+        if codec == CompressionCodec.ZSTD and zstandard is None:
+            raise RuntimeError("zstandard is required for zstd compression")
+        self.strategy = strategy
+        self.storage_strategy_type = strategy.storage_strategy_type
+        self.codec_id = CODEC_IDS[codec]
+        self.level = level if level is not None else DEFAULT_LEVELS[codec]
+        self.min_frame_size = min_frame_size
+        self.min_ratio = min_ratio
+        self.skip_frames = skip_frames
+        self.cache_size = cache_size
+        self._skipped_frames: "OrderedDict[str, int]" = OrderedDict()
+        self._compressed_files: "OrderedDict[str, bool]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def __getattr__(self, name: str):
+        if name == "strategy":
+            raise AttributeError(name)
+        return getattr(self.strategy, name)
+
+    def open(self):
+        return self.strategy.open()
+
+    def close(self):
+        return self.strategy.close()
+
+    def generate_file_path(self, file_id: str) -> UploadStoragePath:
+        return self.strategy.generate_file_path(file_id)
+
+    def initialize(self, upload_metadata: UploadMetadata, *args, **kwargs):
+        self.strategy.initialize(upload_metadata, *args, **kwargs)
+        self.strategy.update(upload_metadata, FILE_MAGIC)
+        self._set_cached(self._compressed_files, upload_metadata.id, True)
+
+    def _get_cached(self, cache: "OrderedDict[str, Any]", file_id: str) -> Any:
+        with self._cache_lock:
+            value = cache.get(file_id)
+            if value is not None:
+                cache.move_to_end(file_id)
+            return value
+
+    def _set_cached(self, cache: "OrderedDict[str, Any]", file_id: str, value: Any):
+        with self._cache_lock:
+            cache[file_id] = value
+            cache.move_to_end(file_id)
+            while len(cache) > self.cache_size:
+                cache.popitem(last=False)
+
+    def _is_compressed(self, upload_metadata: UploadMetadata) -> bool:
+        is_compressed = self._get_cached(self._compressed_files, upload_metadata.id)
+        if is_compressed is None:
+            is_compressed = is_compressed_file(upload_metadata.upload_storage_path)
+            self._set_cached(self._compressed_files, upload_metadata.id, is_compressed)
+        return is_compressed
+
+    def is_file_exists(self, file_id: str) -> bool:
+        return self.strategy.is_file_exists(file_id)
+
+    def delete(self, upload_metadata: UploadMetadata, *args, **kwargs):
+        with self._cache_lock:
+            self._skipped_frames.pop(upload_metadata.id, None)
+            self._compressed_files.pop(upload_metadata.id, None)
+        return self.strategy.delete(upload_metadata, *args, **kwargs)
+
+    def flush(self, upload_metadata: UploadMetadata):
+        return self.strategy.flush(upload_metadata)
+
+    def _encode(self, file_id: str, chunk: bytes) -> Tuple[int, bytes]:
+        if len(chunk) < self.min_frame_size:
+            return RAW, chunk
+        skipped = self._get_cached(self._skipped_frames, file_id)
+        if skipped:
+            self._set_cached(self._skipped_frames, file_id, skipped - 1)
+            return RAW, chunk
+        compressed = compress(self.codec_id, chunk, self.level)
+        if len(compressed) > len(chunk) * self.min_ratio:
+            self._set_cached(self._skipped_frames, file_id, self.skip_frames)
+            return RAW, chunk
+        return self.codec_id, compressed
+
+    def update(self, upload_metadata: UploadMetadata, chunk: bytes):
+        if not chunk:
+            return
+        if not self._is_compressed(upload_metadata):
+            self.strategy.update(upload_metadata, chunk)
+            return
+        codec_id, data = self._encode(upload_metadata.id, chunk)
+        self.strategy.update(
+            upload_metadata, FRAME_HEADER.pack(codec_id, len(chunk), len(data)) + data
+        )
+
+    def _scan(self, path: str) -> Tuple[int, int]:
+        logical_size = 0
+        valid_size = len(FILE_MAGIC)
+        with open(path, "rb") as file:
+            for position, _, raw_length, stored_length in iter_frame_headers(file):
+                logical_size += raw_length
+                valid_size = position + FRAME_HEADER.size + stored_length
+        return logical_size, valid_size
+
+    def get_size(self, upload_metadata: UploadMetadata) -> int:
+        """Returns the uncompressed size; a frame torn by a crash is removed."""
+        if not self._is_compressed(upload_metadata):
+            return self.strategy.get_size(upload_metadata)
+        path = upload_metadata.upload_storage_path
+        logical_size, valid_size = self._scan(path)
+        if os.path.getsize(path) > valid_size:
+            logger.warning(f"Removing incomplete frame from {path}")
+            self.strategy.truncate(upload_metadata, valid_size)
+        return logical_size
+
+    def truncate(self, upload_metadata: UploadMetadata, size: int):
+        if not self._is_compressed(upload_metadata):
+            self.strategy.truncate(upload_metadata, size)
+            return
+        path = upload_metadata.upload_storage_path
+        with open(path, "rb") as file:
+            start = 0
+            for position, codec_id, raw_length, stored_length in iter_frame_headers(
+                file
+            ):
+                if start + raw_length <= size:
+                    start += raw_length
+                    continue
+                file.seek(position + FRAME_HEADER.size)
+                head = decompress(codec_id, file.read(stored_length))[: size - start]
+                break
+            else:
+                return
+        self.strategy.truncate(upload_metadata, position)
+        if head:
+            self.update(upload_metadata, head)
+
+    def open_file(self, upload_metadata: UploadMetadata, offset: int = 0) -> BinaryIO:
+        """Returns a reader over the uncompressed content from ``offset``."""
+        if not self._is_compressed(upload_metadata):
+            file = open(upload_metadata.upload_storage_path, "rb")
+            file.seek(offset)
+            return file
+        return io.BufferedReader(
+            DecompressingReader(upload_metadata.upload_storage_path, offset)
+        )
+
+
+def with_compression(strategy, config: Config):
+    if config.storage_compression is None or not isinstance(
+        strategy, BaseStorageStrategy
+    ):
+        return strategy
+    return CompressedStorageStrategy(
+        strategy, config.storage_compression, config.storage_compression_level
+    )
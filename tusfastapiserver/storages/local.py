@@ -1,24 +1,62 @@
+import logging
 import os
 from pathlib import Path
+from typing import List
+from typing import Optional
 
 from tusfastapiserver.storages import BaseStorageStrategy
 from tusfastapiserver.config import StorageStrategyType
 from tusfastapiserver.schemas import UploadMetadata
 from tusfastapiserver.schemas import UploadStoragePath
+from tusfastapiserver.storages.volumes import Volume
+
+logger = logging.getLogger(__name__)
 
 
 class LocalStorageStrategy(BaseStorageStrategy):
     storage_strategy_type = StorageStrategyType.LOCAL
 
+    @staticmethod
+    def _get_file_path(root: str, file_id: str) -> UploadStoragePath:
+        file_name = f"{file_id}"
+        return UploadStoragePath(os.path.join(root, os.path.join(file_id, file_name)))
+
+    def get_volume_paths(self) -> List[str]:
+        if self.config.storage_volumes is None:
+            return [self.config.file_path]
+        return self.config.storage_volumes.paths
+
     # TODO: ensure uniqueness of the path
     def generate_file_path(self, file_id: str) -> UploadStoragePath:
-        file_name = f"{file_id}"
-        return UploadStoragePath(
-            os.path.join(self.config.file_path, os.path.join(file_id, file_name))
-        )
+        """Returns the path of a new upload.
+
+        With ``storage_volumes`` the path is provisional: the volume is chosen
+        by ``initialize``, which runs in the thread pool, because placement
+        checks the free space of every volume.
+        """
+        if self.config.storage_volumes is None:
+            return self._get_file_path(self.config.file_path, file_id)
+        return self._get_file_path(self.config.storage_volumes.paths[0], file_id)
+
+    def find_file_path(self, file_id: str) -> Optional[UploadStoragePath]:
+        for root in self.get_volume_paths():
+            path = self._get_file_path(root, file_id)
+            if os.path.exists(path):
+                return path
+        return None
 
     def is_file_exists(self, file_id: str) -> bool:
-        return os.path.exists(self.generate_file_path(file_id))
+        return self.find_file_path(file_id) is not None
+
+    def get_size(self, upload_metadata: UploadMetadata) -> int:
+        return os.path.getsize(upload_metadata.upload_storage_path)
+
+    def truncate(self, upload_metadata: UploadMetadata, size: int):
+        os.truncate(upload_metadata.upload_storage_path, size)
+
+    def flush(self, upload_metadata: UploadMetadata):
+        with open(upload_metadata.upload_storage_path, "rb") as file:
+            os.fsync(file.fileno())
 
     @staticmethod
     def _check_or_make_folder(path: UploadStoragePath) -> None:
@@ -29,11 +67,53 @@ class LocalStorageStrategy(BaseStorageStrategy):
         with open(path, "w"):
             pass
 
+    def _create_file(self, path: UploadStoragePath):
+        self._check_or_make_folder(path)
+        self._create_empty_file(path)
+
     def initialize(self, upload_metadata: UploadMetadata, *args, **kwargs):
-        self._check_or_make_folder(upload_metadata.upload_storage_path)
-        self._create_empty_file(upload_metadata.upload_storage_path)
+        volumes = self.config.storage_volumes
+        if volumes is None:
+            self._create_file(upload_metadata.upload_storage_path)
+            return
+
+        failed: List[Volume] = []
+        while True:
+            # Raises InsufficientStorageException once every volume failed.
+            volume = volumes.place(exclude=failed)
+            upload_metadata.upload_storage_path = self._get_file_path(
+                volume.path, upload_metadata.id
+            )
+            try:
+                self._create_file(upload_metadata.upload_storage_path)
+                return
+            except OSError as error:
+                volumes.mark_failed(volume, error)
+                failed.append(volume)
+            logger.info(f"Upload {upload_metadata.id} moved off volume {volume.path}")
 
     @staticmethod
-    def update(upload_metadata: UploadMetadata, chunk: bytes):
+    def _remove_file(path: UploadStoragePath) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        try:
+            Path(path).parent.rmdir()
+        except OSError:
+            pass
+
+    def delete(self, upload_metadata: UploadMetadata, *args, **kwargs):
+        self._remove_file(upload_metadata.upload_storage_path)
+        if self.config.storage_volumes is not None:
+            self.config.storage_volumes.forget(
+                upload_metadata.upload_storage_path, upload_metadata.id
+            )
+
+    def update(self, upload_metadata: UploadMetadata, chunk: bytes):
         with open(upload_metadata.upload_storage_path, "ab") as file:
             file.write(chunk)
+        if self.config.storage_volumes is not None:
+            self.config.storage_volumes.record_write(
+                upload_metadata.upload_storage_path, upload_metadata.id
+            )
@@ -0,0 +1,273 @@
+import heapq
+import json
+import logging
+import os
+import shutil
+import time
+from dataclasses import asdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from tusfastapiserver.exceptions import InsufficientStorageException
+from tusfastapiserver.exceptions import QuotaExceededException
+from tusfastapiserver.schemas import UploadMetadata
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Reservation:
+    file_id: str
+    tenant: Optional[str]
+    length: int
+    remaining: int
+    expires_at: Optional[float] = None
+
+
+class ReservationLedger:
+    """Tracks the bytes promised to incomplete uploads.
+
+    Every operation only touches counters and the reservation of a single
+    upload; free space comes from one ``statvfs`` call, never a directory scan.
+    """
+
+    def __init__(
+        self,
+        max_reserved_bytes: Optional[int] = None,
+        tenant_quota_bytes: Optional[int] = None,
+        tenant_metadata_key: Optional[str] = None,
+        min_free_bytes: int = 0,
+        reservation_ttl: Optional[float] = None,
+        ledger_path: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+        disk_usage: Callable[[str], Tuple[int, int, int]] = shutil.disk_usage,
+    ):
+        self.max_reserved_bytes = max_reserved_bytes
+        self.tenant_quota_bytes = tenant_quota_bytes
+        self.tenant_metadata_key = tenant_metadata_key
+        self.min_free_bytes = min_free_bytes
+        self.reservation_ttl = reservation_ttl
+        self.ledger_path = ledger_path
+        self._clock = clock
+        self._disk_usage = disk_usage
+
+        self._reservations: Dict[str, Reservation] = {}
+        self._tenant_reserved: Dict[Optional[str], int] = {}
+        self._expirations: List[Tuple[float, str]] = []
+        self._reserved_bytes = 0
+        self._outstanding_bytes = 0
+
+    def usage(self) -> Dict[str, Optional[int]]:
+        return {
+            "reservations": len(self._reservations),
+            "reserved_bytes": self._reserved_bytes,
+            "outstanding_bytes": self._outstanding_bytes,
+            "max_reserved_bytes": self.max_reserved_bytes,
+        }
+
+    def get_tenant(self, upload_metadata: UploadMetadata) -> Optional[str]:
+        if self.tenant_metadata_key is None or not upload_metadata.metadata:
+            return None
+        return upload_metadata.metadata.get(self.tenant_metadata_key)
+
+    def get_tenant_reserved_bytes(self, tenant: Optional[str]) -> int:
+        return self._tenant_reserved.get(tenant, 0)
+
+    def reserve(
+        self,
+        upload_metadata: UploadMetadata,
+        path: str,
+        free_bytes: Optional[int] = None,
+    ) -> Optional[Reservation]:
+        """Reserves the remaining bytes of an upload stored at ``path``.
+
+        ``free_bytes`` is the free space of ``path``, measured with
+        ``get_free_bytes`` when not given.
+        """
+        if upload_metadata.upload_length is None:
+            return None
+        self.expire()
+        self.release(upload_metadata.id)
+
+        length = upload_metadata.upload_length
+        remaining = length - upload_metadata.upload_offset
+        tenant = self.get_tenant(upload_metadata)
+        self._check_quotas(tenant, length)
+        if free_bytes is None:
+            free_bytes = self.get_free_bytes(path)
+        self._check_free_space(path, remaining, free_bytes)
+
+        expires_at = None
+        if self.reservation_ttl is not None:
+            expires_at = self._clock() + self.reservation_ttl
+            heapq.heappush(self._expirations, (expires_at, upload_metadata.id))
+        reservation = Reservation(
+            file_id=upload_metadata.id,
+            tenant=tenant,
+            length=length,
+            remaining=remaining,
+            expires_at=expires_at,
+        )
+        self._add(reservation)
+        return reservation
+
+    async def reserve_async(
+        self, upload_metadata: UploadMetadata, path: str
+    ) -> Optional[Reservation]:
+        """``reserve`` for the event loop: the ``statvfs`` call runs in the
+        thread pool, the bookkeeping on the loop."""
+        if upload_metadata.upload_length is None:
+            return None
+        free_bytes = await run_in_threadpool(self.get_free_bytes, path)
+        return self.reserve(upload_metadata, path, free_bytes)
+
+    def get_free_bytes(self, path: str) -> int:
+        return self._disk_usage(self._get_existing_path(path))[2]
+
+    def _check_quotas(self, tenant: Optional[str], length: int):
+        if (
+            self.max_reserved_bytes is not None
+            and self._reserved_bytes + length > self.max_reserved_bytes
+        ):
+            logger.warning("Global upload quota exceeded")
+            raise QuotaExceededException()
+
+        if (
+            self.tenant_quota_bytes is not None
+            and tenant is not None
+            and self.get_tenant_reserved_bytes(tenant) + length
+            > self.tenant_quota_bytes
+        ):
+            logger.warning(f"Upload quota exceeded for tenant {tenant}")
+            raise QuotaExceededException()
+
+    def _check_free_space(self, path: str, remaining: int, free_bytes: int):
+        if free_bytes - self._outstanding_bytes - self.min_free_bytes < remaining:
+            logger.warning(f"Not enough free space in {path} for {remaining} bytes")
+            raise InsufficientStorageException()
+
+    @staticmethod
+    def _get_existing_path(path: str) -> str:
+        existing_path = Path(path)
+        while not existing_path.exists() and existing_path != existing_path.parent:
+            existing_path = existing_path.parent
+        return str(existing_path)
+
+    def _add(self, reservation: Reservation):
+        self._reservations[reservation.file_id] = reservation
+        self._tenant_reserved[reservation.tenant] = (
+            self.get_tenant_reserved_bytes(reservation.tenant) + reservation.length
+        )
+        self._reserved_bytes += reservation.length
+        self._outstanding_bytes += reservation.remaining
+
+    def consume(self, file_id: str, size: int):
+        reservation = self._reservations.get(file_id)
+        if reservation is None:
+            return
+        consumed = min(size, reservation.remaining)
+        reservation.remaining -= consumed
+        self._outstanding_bytes -= consumed
+        if self.reservation_ttl is not None and reservation.expires_at is not None:
+            # The heap entry is refreshed lazily when it is popped.
+            reservation.expires_at = self._clock() + self.reservation_ttl
+
+    def release(self, file_id: str) -> Optional[Reservation]:
+        reservation = self._reservations.pop(file_id, None)
+        if reservation is None:
+            return None
+        remaining_tenant_bytes = (
+            self.get_tenant_reserved_bytes(reservation.tenant) - reservation.length
+        )
+        if remaining_tenant_bytes > 0:
+            self._tenant_reserved[reservation.tenant] = remaining_tenant_bytes
+        else:
+            self._tenant_reserved.pop(reservation.tenant, None)
+        self._reserved_bytes -= reservation.length
+        self._outstanding_bytes -= reservation.remaining
+        return reservation
+
+    def expire(self) -> List[str]:
+        expired = []
+        now = self._clock()
+        while self._expirations and self._expirations[0][0] <= now:
+            _, file_id = heapq.heappop(self._expirations)
+            reservation = self._reservations.get(file_id)
+            if reservation is None or reservation.expires_at is None:
+                continue
+            if reservation.expires_at > now:
+                heapq.heappush(self._expirations, (reservation.expires_at, file_id))
+                continue
+            self.release(file_id)
+            expired.append(file_id)
+        if expired:
+            logger.info(f"Released {len(expired)} expired reservations")
+        return expired
+
+    def rebuild(self, uploads: Iterable[UploadMetadata]):
+        """Replaces the reservations by those of the incomplete ``uploads``.
+
+        Quotas and free space are not checked: the uploads already exist.
+        """
+        self._reservations.clear()
+        self._tenant_reserved.clear()
+        self._expirations.clear()
+        self._reserved_bytes = 0
+        self._outstanding_bytes = 0
+        expires_at = None
+        if self.reservation_ttl is not None:
+            expires_at = self._clock() + self.reservation_ttl
+        for upload_metadata in uploads:
+            length = upload_metadata.upload_length
+            if length is None or upload_metadata.upload_offset >= length:
+                continue
+            self._add(
+                Reservation(
+                    file_id=upload_metadata.id,
+                    tenant=self.get_tenant(upload_metadata),
+                    length=length,
+                    remaining=length - upload_metadata.upload_offset,
+                    expires_at=expires_at,
+                )
+            )
+            if expires_at is not None:
+                heapq.heappush(self._expirations, (expires_at, upload_metadata.id))
+        logger.info(f"Rebuilt {len(self._reservations)} reservations")
+
+    async def start(self):
+        if self.ledger_path is not None:
+            await run_in_threadpool(self._load)
+
+    async def stop(self):
+        if self.ledger_path is not None:
+            await run_in_threadpool(self._save)
+
+    def _load(self):
+        if not os.path.exists(self.ledger_path):
+            return
+        with open(self.ledger_path, "r", encoding="utf-8") as f:
+            for data in json.load(f):
+                reservation = Reservation(**data)
+                self._add(reservation)
+                if reservation.expires_at is not None:
+                    heapq.heappush(
+                        self._expirations, (reservation.expires_at, reservation.file_id)
+                    )
+        logger.info(f"Loaded {len(self._reservations)} reservations")
+
+    def _save(self):
+        Path(self.ledger_path).parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = f"{self.ledger_path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            json.dump(
+                [asdict(reservation) for reservation in self._reservations.values()], f
+            )
+        os.replace(temporary_path, self.ledger_path)
@@ -0,0 +1,138 @@
+import itertools
+import logging
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from dataclasses import field
+from pathlib import Path
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+from tusfastapiserver.config import VolumePlacementPolicy
+from tusfastapiserver.exceptions import InsufficientStorageException
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Volume:
+    path: str
+    failed_until: float = 0.0
+    # Upload id -> time of its last write, pruned lazily.
+    writers: Dict[str, float] = field(default_factory=dict)
+
+
+class VolumeSet:
+    """Places new uploads on one of several data directories.
+
+    Volumes with less than ``min_free_bytes`` free are drained: they receive no
+    new uploads, but uploads already placed on them are still written and
+    served. A volume that fails is skipped for ``failure_cooldown`` seconds.
+    """
+
+    def __init__(
+        self,
+        paths: Sequence[str],
+        policy: VolumePlacementPolicy = VolumePlacementPolicy.ROUND_ROBIN,
+        min_free_bytes: int = 0,
+        failure_cooldown: float = 60.0,
+        activity_window: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+        disk_usage: Callable[[str], Tuple[int, int, int]] = shutil.disk_usage,
+    ):
+        if not paths:
+            raise ValueError("At least one volume is required")
+        self.volumes = [Volume(path) for path in paths]
+        self.policy = policy
+        self.min_free_bytes = min_free_bytes
+        self.failure_cooldown = failure_cooldown
+        self.activity_window = activity_window
+        self._clock = clock
+        self._disk_usage = disk_usage
+        self._round_robin = itertools.count()
+
+    @property
+    def paths(self) -> List[str]:
+        return [volume.path for volume in self.volumes]
+
+    def get_volume(self, path: str) -> Optional[Volume]:
+        for volume in self.volumes:
+            if path.startswith(os.path.join(volume.path, "")):
+                return volume
+        return None
+
+    def _get_free_bytes(self, volume: Volume) -> Optional[int]:
+        try:
+            Path(volume.path).mkdir(parents=True, exist_ok=True)
+            return self._disk_usage(volume.path)[2]
+        except OSError as error:
+            self.mark_failed(volume, error)
+            return None
+
+    def _is_failed(self, volume: Volume) -> bool:
+        return volume.failed_until > self._clock()
+
+    def _get_candidates(self) -> List[Tuple[Volume, int]]:
+        candidates = []
+        for volume in self.volumes:
+            if self._is_failed(volume):
+                continue
+            free_bytes = self._get_free_bytes(volume)
+            if free_bytes is None or free_bytes < self.min_free_bytes:
+                continue
+            candidates.append((volume, free_bytes))
+        return candidates
+
+    def place(self, exclude: Sequence[Volume] = ()) -> Volume:
+        candidates = [
+            (volume, free_bytes)
+            for volume, free_bytes in self._get_candidates()
+            if volume not in exclude
+        ]
+        if not candidates:
+            logger.error("No storage volume is available for new uploads")
+            raise InsufficientStorageException()
+
+        if self.policy == VolumePlacementPolicy.MOST_FREE:
+            return max(candidates, key=lambda candidate: candidate[1])[0]
+        if self.policy == VolumePlacementPolicy.LEAST_ACTIVE:
+            return min(
+                candidates, key=lambda candidate: self.active_writers(candidate[0])
+            )[0]
+        return candidates[next(self._round_robin) % len(candidates)][0]
+
+    def mark_failed(self, volume: Volume, error: Optional[Exception] = None):
+        logger.warning(f"Storage volume {volume.path} failed: {error!r}")
+        volume.failed_until = self._clock() + self.failure_cooldown
+
+    def record_write(self, path: str, file_id: str):
+        volume = self.get_volume(path)
+        if volume is not None:
+            volume.writers[file_id] = self._clock()
+
+    def forget(self, path: str, file_id: str):
+        volume = self.get_volume(path)
+        if volume is not None:
+            volume.writers.pop(file_id, None)
+
+    def active_writers(self, volume: Volume) -> int:
+        threshold = self._clock() - self.activity_window
+        for file_id, last_write in list(volume.writers.items()):
+            if last_write < threshold:
+                volume.writers.pop(file_id, None)
+        return len(volume.writers)
+
+    def usage(self) -> List[Dict[str, object]]:
+        return [
+            {
+                "path": volume.path,
+                "failed": self._is_failed(volume),
+                "active_writers": self.active_writers(volume),
+            }
+            for volume in self.volumes
+        ]
@@ -0,0 +1,16 @@
+from tusfastapiserver.testing.asgi import ASGIResponse
+from tusfastapiserver.testing.asgi import send_request
+from tusfastapiserver.testing.disconnect import DisconnectReport
+from tusfastapiserver.testing.disconnect import upload_with_disconnects
+from tusfastapiserver.testing.memory import MemoryMetadataStrategy
+from tusfastapiserver.testing.memory import MemoryStorageStrategy
+
+
+__all__ = [
+    "ASGIResponse",
+    "DisconnectReport",
+    "MemoryMetadataStrategy",
+    "MemoryStorageStrategy",
+    "send_request",
+    "upload_with_disconnects",
+]
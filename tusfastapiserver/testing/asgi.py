@@ -0,0 +1,125 @@
+import asyncio
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+from urllib.parse import urlsplit
+
+from starlette.types import ASGIApp
+from starlette.types import Message
+
+
+@dataclass
+class ASGIResponse:
+    status_code: Optional[int] = None
+    headers: Dict[str, str] = field(default_factory=dict)
+    raw_headers: List[Tuple[bytes, bytes]] = field(default_factory=list)
+    body: bytes = b""
+
+
+class _RequestBody:
+    """ASGI ``receive`` callable that sends a body in chunks and can drop the
+    connection or stop sending once a given number of bytes was delivered."""
+
+    def __init__(
+        self,
+        body: bytes,
+        chunk_size: int,
+        disconnect_at: Optional[int] = None,
+        stall_at: Optional[int] = None,
+    ):
+        self.chunks = self._split(body, chunk_size, disconnect_at, stall_at)
+        self.disconnect = disconnect_at is not None and disconnect_at < len(body)
+        self.stall = stall_at is not None and stall_at < len(body)
+        if not self.chunks and not self.disconnect and not self.stall:
+            # An empty body is still sent as one message, like servers do.
+            self.chunks = [b""]
+        self.delivered = 0
+        self.response_complete = asyncio.Event()
+
+    @staticmethod
+    def _split(
+        body: bytes,
+        chunk_size: int,
+        disconnect_at: Optional[int],
+        stall_at: Optional[int],
+    ) -> List[bytes]:
+        end = len(body)
+        for limit in (disconnect_at, stall_at):
+            if limit is not None:
+                end = min(end, limit)
+        return [
+            body[start : min(start + chunk_size, end)]
+            for start in range(0, end, chunk_size)
+        ]
+
+    async def __call__(self) -> Message:
+        if self.chunks:
+            chunk = self.chunks.pop(0)
+            self.delivered += len(chunk)
+            more_body = bool(self.chunks) or self.disconnect or self.stall
+            return {"type": "http.request", "body": chunk, "more_body": more_body}
+        if self.stall:
+            await asyncio.Event().wait()
+        if not self.disconnect:
+            await self.response_complete.wait()
+        return {"type": "http.disconnect"}
+
+
+async def send_request(
+    app: ASGIApp,
+    method: str,
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    body: bytes = b"",
+    chunk_size: int = 64 * 1024,
+    disconnect_at: Optional[int] = None,
+    stall_at: Optional[int] = None,
+) -> ASGIResponse:
+    """Calls ``app`` directly, without a server or an HTTP client.
+
+    ``disconnect_at`` drops the connection after that many body bytes were
+    received by the app; ``stall_at`` stops sending the body without closing
+    the connection, which exercises read timeouts.
+    """
+    parts = urlsplit(url)
+    request_headers = {"host": "testserver", **(headers or {})}
+    if body and disconnect_at is None and stall_at is None:
+        request_headers.setdefault("content-length", str(len(body)))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "server": ("testserver", 80),
+        "client": ("127.0.0.1", 50000),
+        "path": parts.path,
+        "raw_path": parts.path.encode(),
+        "root_path": "",
+        "query_string": parts.query.encode(),
+        "headers": [
+            (key.lower().encode("latin-1"), value.encode("latin-1"))
+            for key, value in request_headers.items()
+        ],
+    }
+    receive = _RequestBody(body, chunk_size, disconnect_at, stall_at)
+    response = ASGIResponse()
+
+    async def send(message: Message):
+        if message["type"] == "http.response.start":
+            response.status_code = message["status"]
+            response.raw_headers = list(message.get("headers", []))
+            response.headers = {
+                key.decode("latin-1"): value.decode("latin-1")
+                for key, value in message.get("headers", [])
+            }
+        elif message["type"] == "http.response.body":
+            response.body += message.get("body", b"")
+            if not message.get("more_body", False):
+                receive.response_complete.set()
+
+    await app(scope, receive, send)
+    return response
@@ -0,0 +1,139 @@
+import argparse
+import asyncio
+import json
+import logging
+import tempfile
+import time
+from dataclasses import asdict
+from dataclasses import dataclass
+from typing import List
+from typing import Optional
+
+from fastapi import FastAPI
+
+from tusfastapiserver import TUS_RESUMABLE
+from tusfastapiserver.config import Config
+from tusfastapiserver.registry import StrategyRegistry
+from tusfastapiserver.routers import add_tus_routers
+from tusfastapiserver.testing.asgi import send_request
+from tusfastapiserver.testing.memory import MemoryMetadataStrategy
+from tusfastapiserver.testing.memory import MemoryStorageStrategy
+
+
+@dataclass
+class BenchmarkResult:
+    fast_path: bool
+    in_memory: bool
+    requests: int
+    chunk_size: int
+    seconds: float
+
+    @property
+    def requests_per_second(self) -> float:
+        return self.requests / self.seconds
+
+
+async def _create_upload(app: FastAPI, length: int) -> str:
+    response = await send_request(
+        app,
+        "POST",
+        "/files",
+        headers={"tus-resumable": TUS_RESUMABLE, "upload-length": str(length)},
+    )
+    return "/files/" + response.headers["location"].rsplit("/", 1)[1]
+
+
+async def benchmark_patch(
+    app: FastAPI, requests: int, chunk_size: int, with_head: bool = True
+) -> float:
+    """Uploads ``requests`` chunks in sequence, each followed by a ``HEAD``
+    when ``with_head`` is set, and returns the elapsed seconds. The app is
+    called directly, so only the server side of a request is measured."""
+    chunk = b"x" * chunk_size
+    url = await _create_upload(app, requests * chunk_size)
+    headers = {
+        "tus-resumable": TUS_RESUMABLE,
+        "content-type": "application/offset+octet-stream",
+    }
+    started = time.perf_counter()
+    for offset in range(0, requests * chunk_size, chunk_size):
+        response = await send_request(
+            app, "PATCH", url, {**headers, "upload-offset": str(offset)}, chunk
+        )
+        if response.status_code != 204:
+            raise AssertionError(f"PATCH returned {response.status_code}")
+        if with_head:
+            await send_request(app, "HEAD", url, {"tus-resumable": TUS_RESUMABLE})
+    return time.perf_counter() - started
+
+
+def run(
+    fast_path: bool,
+    requests: int,
+    chunk_size: int,
+    in_memory: bool = False,
+    repeat: int = 3,
+    path: Optional[str] = None,
+) -> BenchmarkResult:
+    """Returns the best of ``repeat`` runs; every chunk is a PATCH and a HEAD."""
+    timings = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory(dir=path) as directory:
+            config = Config(
+                file_path=directory,
+                metadata_path=directory,
+                enable_asgi_fast_path=fast_path,
+            )
+            registry = (
+                StrategyRegistry(config, MemoryStorageStrategy, MemoryMetadataStrategy)
+                if in_memory
+                else StrategyRegistry(config)
+            )
+            app = FastAPI()
+            add_tus_routers(app, config, registry=registry)
+            timings.append(asyncio.run(benchmark_patch(app, requests, chunk_size)))
+    return BenchmarkResult(fast_path, in_memory, requests * 2, chunk_size, min(timings))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Compare PATCH/HEAD throughput with and without the ASGI fast path"
+    )
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--chunk-size", type=int, default=1024)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--in-memory",
+        action="store_true",
+        help="Keep uploads in memory to measure only the request handling",
+    )
+    parser.add_argument("--path", help="Directory for temporary uploads")
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args(argv)
+    logging.getLogger("tusfastapiserver").setLevel(args.log_level)
+
+    results = [
+        run(
+            fast_path,
+            args.requests,
+            args.chunk_size,
+            args.in_memory,
+            args.repeat,
+            args.path,
+        )
+        for fast_path in (False, True)
+    ]
+    print(
+        json.dumps(
+            [
+                {**asdict(result), "requests_per_second": result.requests_per_second}
+                for result in results
+            ],
+            indent=2,
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,70 @@
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Dict
+from typing import List
+from typing import Sequence
+
+from starlette.types import ASGIApp
+
+from tusfastapiserver import TUS_RESUMABLE
+from tusfastapiserver.testing.asgi import send_request
+
+
+@dataclass
+class DisconnectReport:
+    offsets: List[int] = field(default_factory=list)
+    retransmitted_bytes: int = 0
+    final_offset: int = 0
+
+
+async def _get_offset(app: ASGIApp, url: str, headers: Dict[str, str]) -> int:
+    response = await send_request(app, "HEAD", url, headers=headers)
+    if response.status_code != 200:
+        raise AssertionError(f"HEAD {url} returned {response.status_code}")
+    return int(response.headers["upload-offset"])
+
+
+async def upload_with_disconnects(
+    app: ASGIApp,
+    url: str,
+    data: bytes,
+    disconnect_at: Sequence[int],
+    chunk_size: int = 64 * 1024,
+) -> DisconnectReport:
+    """Uploads ``data`` to an existing upload like a client on a flaky network.
+
+    The connection is dropped every time the upload reaches one of the
+    absolute byte positions in ``disconnect_at``; the client then resumes from
+    the offset returned by ``HEAD``. ``retransmitted_bytes`` counts bytes that
+    were received by the server but had to be sent again.
+    """
+    headers = {"tus-resumable": TUS_RESUMABLE}
+    patch_headers = {**headers, "content-type": "application/offset+octet-stream"}
+    report = DisconnectReport()
+    offset = await _get_offset(app, url, headers)
+    for position in sorted(disconnect_at):
+        if position <= offset:
+            continue
+        await send_request(
+            app,
+            "PATCH",
+            url,
+            headers={**patch_headers, "upload-offset": str(offset)},
+            body=data[offset:],
+            chunk_size=chunk_size,
+            disconnect_at=position - offset,
+        )
+        offset = await _get_offset(app, url, headers)
+        report.offsets.append(offset)
+        report.retransmitted_bytes += position - offset
+
+    response = await send_request(
+        app,
+        "PATCH",
+        url,
+        headers={**patch_headers, "upload-offset": str(offset)},
+        body=data[offset:],
+        chunk_size=chunk_size,
+    )
+    report.final_offset = int(response.headers.get("upload-offset", offset))
+    return report
@@ -0,0 +1,100 @@
+import errno
+import os
+import random
+import threading
+import time
+from collections import Counter
+from typing import Dict
+from typing import Optional
+from typing import Type
+
+from tusfastapiserver.storages.base import BaseStorageStrategy
+
+FAULTY_METHODS = (
+    "initialize",
+    "update",
+    "get_metadata",
+    "is_file_exists",
+    "is_metadata_exists",
+)
+WRITE_METHODS = ("initialize", "update")
+
+
+class FaultInjector:
+    """Decides which strategy calls are slowed down or fail with ``ENOSPC``.
+
+    A slow call sleeps in the calling thread, like a disk that stalls. A
+    failing storage ``update`` first writes half of its chunk, like a disk
+    that fills up in the middle of a write.
+    """
+
+    def __init__(
+        self,
+        slow_probability: float = 0.0,
+        slow_delay: float = 0.05,
+        enospc_probability: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        self.slow_probability = slow_probability
+        self.slow_delay = slow_delay
+        self.enospc_probability = enospc_probability
+        self.enabled = True
+        self.injected: Counter = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _roll(self, probability: float) -> bool:
+        if not self.enabled or probability <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < probability
+
+    def delay(self, operation: str):
+        if self._roll(self.slow_probability):
+            with self._lock:
+                self.injected[f"slow {operation}"] += 1
+            time.sleep(self.slow_delay)
+
+    def should_fail(self, operation: str) -> bool:
+        if operation not in WRITE_METHODS or not self._roll(self.enospc_probability):
+            return False
+        with self._lock:
+            self.injected[f"ENOSPC {operation}"] += 1
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.injected)
+
+
+def _no_space_error() -> OSError:
+    return OSError(errno.ENOSPC, os.strerror(errno.ENOSPC))
+
+
+def _make_faulty_method(name: str, method, injector: FaultInjector, is_storage: bool):
+    def faulty_method(self, upload_metadata_or_id, *args, **kwargs):
+        injector.delay(name)
+        if injector.should_fail(name):
+            if is_storage and name == "update":
+                chunk = args[0]
+                method(self, upload_metadata_or_id, chunk[: len(chunk) // 2])
+            raise _no_space_error()
+        return method(self, upload_metadata_or_id, *args, **kwargs)
+
+    faulty_method.__name__ = name
+    return faulty_method
+
+
+def with_faults(strategy_cls: Type, injector: FaultInjector) -> Type:
+    """Returns a subclass of a synchronous strategy class whose I/O methods
+    go through ``injector``, e.g. ``with_faults(LocalStorageStrategy, injector)``.
+    Pass it to ``StrategyRegistry`` to use it in every router."""
+    is_storage = issubclass(strategy_cls, BaseStorageStrategy)
+    namespace = {
+        name: _make_faulty_method(
+            name, getattr(strategy_cls, name), injector, is_storage
+        )
+        for name in FAULTY_METHODS
+        if hasattr(strategy_cls, name)
+    }
+    return type(f"Faulty{strategy_cls.__name__}", (strategy_cls,), namespace)
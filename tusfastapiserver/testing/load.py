@@ -0,0 +1,509 @@
+import argparse
+import asyncio
+import json
+import logging
+import random
+import tempfile
+import time
+from collections import Counter
+from contextlib import AsyncExitStack
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+from typing import Union
+
+from fastapi import FastAPI
+from starlette.types import ASGIApp
+
+from tusfastapiserver import TUS_RESUMABLE
+from tusfastapiserver.config import Config
+from tusfastapiserver.metadata import LocalMetadataStrategy
+from tusfastapiserver.registry import StrategyRegistry
+from tusfastapiserver.routers import add_tus_routers
+from tusfastapiserver.storages import LocalStorageStrategy
+from tusfastapiserver.testing.asgi import send_request
+from tusfastapiserver.testing.faults import FaultInjector
+from tusfastapiserver.testing.faults import with_faults
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+Response = Tuple[int, Dict[str, str], bytes]
+
+
+class ConnectionLost(Exception):
+    """The connection was closed before a response was received."""
+
+
+def _percentile(samples: List[float], percentile: float) -> float:
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return samples[min(int(len(samples) * percentile), len(samples) - 1)]
+
+
+@dataclass
+class LoadReport:
+    duration: float = 0.0
+    uploads_started: int = 0
+    uploads_completed: int = 0
+    uploads_verified: int = 0
+    uploads_corrupted: int = 0
+    uploads_failed: int = 0
+    bytes_confirmed: int = 0
+    disconnects: int = 0
+    retransmitted_bytes: int = 0
+    restarts: int = 0
+    errors: Counter = field(default_factory=Counter)
+    latencies: Dict[str, List[float]] = field(default_factory=dict)
+
+    @property
+    def throughput(self) -> float:
+        """Bytes per second acknowledged by the server."""
+        return self.bytes_confirmed / self.duration if self.duration else 0.0
+
+    def record_latency(self, method: str, seconds: float):
+        self.latencies.setdefault(method, []).append(seconds)
+
+    def latency_summary(self) -> Dict[str, Dict[str, float]]:
+        return {
+            method: {
+                "count": len(samples),
+                "p50": _percentile(samples, 0.5),
+                "p95": _percentile(samples, 0.95),
+                "p99": _percentile(samples, 0.99),
+                "max": max(samples),
+            }
+            for method, samples in self.latencies.items()
+        }
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "duration": self.duration,
+            "uploads_started": self.uploads_started,
+            "uploads_completed": self.uploads_completed,
+            "uploads_verified": self.uploads_verified,
+            "uploads_corrupted": self.uploads_corrupted,
+            "uploads_failed": self.uploads_failed,
+            "bytes_confirmed": self.bytes_confirmed,
+            "throughput": self.throughput,
+            "disconnects": self.disconnects,
+            "retransmitted_bytes": self.retransmitted_bytes,
+            "restarts": self.restarts,
+            "errors": dict(self.errors),
+            "latency": self.latency_summary(),
+        }
+
+
+class ASGITransport:
+    """Sends requests to an in-process app. ``restart`` replaces the app with
+    a new one from ``app_factory``, cancelling the requests in flight like a
+    worker that is restarted."""
+
+    def __init__(self, app_factory: Callable[[], ASGIApp]):
+        self.app_factory = app_factory
+        self.app: Optional[ASGIApp] = None
+        self._in_flight: Set[asyncio.Task] = set()
+        self._exit_stack: Optional[AsyncExitStack] = None
+
+    async def start(self):
+        self.app = self.app_factory()
+        self._exit_stack = AsyncExitStack()
+        lifespan_context = getattr(
+            getattr(self.app, "router", None), "lifespan_context", None
+        )
+        if lifespan_context is not None:
+            await self._exit_stack.enter_async_context(lifespan_context(self.app))
+
+    async def stop(self):
+        if self._exit_stack is not None:
+            await self._exit_stack.aclose()
+            self._exit_stack = None
+
+    async def restart(self):
+        # Requests sent while the app restarts are refused.
+        self.app = None
+        for task in list(self._in_flight):
+            task.cancel()
+        await asyncio.gather(*self._in_flight, return_exceptions=True)
+        await self.stop()
+        await self.start()
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        body: bytes = b"",
+        disconnect_at: Optional[int] = None,
+    ) -> Response:
+        if self.app is None:
+            raise ConnectionLost()
+        task = asyncio.create_task(
+            send_request(
+                self.app, method, url, headers, body, disconnect_at=disconnect_at
+            )
+        )
+        self._in_flight.add(task)
+        try:
+            await asyncio.wait({task})
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        finally:
+            self._in_flight.discard(task)
+        if task.cancelled():
+            raise ConnectionLost()
+        if task.exception() is not None:
+            # The server error middleware sent a 500 before re-raising.
+            logger.debug(f"{method} {url} failed: {task.exception()!r}")
+            return 500, {}, b""
+        if disconnect_at is not None and disconnect_at < len(body):
+            raise ConnectionLost()
+        response = task.result()
+        if response.status_code is None:
+            # The app returned without starting a response.
+            return 500, {}, b""
+        return response.status_code, response.headers, response.body
+
+
+class HTTPTransport:
+    """Sends requests to a running server. Dropped connections are simulated by
+    failing the request body stream after ``disconnect_at`` bytes."""
+
+    def __init__(
+        self, base_url: str, timeout: float = 60.0, max_connections: int = 100
+    ):
+        if httpx is None:
+            raise RuntimeError("httpx is required to load test a running server")
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._client: Optional["httpx.AsyncClient"] = None
+
+    async def start(self):
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=self.max_connections),
+        )
+
+    async def stop(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def client(self) -> "httpx.AsyncClient":
+        if self._client is None:
+            raise RuntimeError("HTTPTransport is not started")
+        return self._client
+
+    @staticmethod
+    async def _iter_body(body: bytes, disconnect_at: int):
+        yield body[:disconnect_at]
+        raise ConnectionLost()
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        body: bytes = b"",
+        disconnect_at: Optional[int] = None,
+    ) -> Response:
+        content = body
+        if disconnect_at is not None and disconnect_at < len(body):
+            content = self._iter_body(body, disconnect_at)
+            headers = {**headers, "content-length": str(len(body))}
+        try:
+            response = await self.client.request(
+                method, url, headers=headers, content=content
+            )
+        except (ConnectionLost, httpx.TransportError) as error:
+            raise ConnectionLost() from error
+        return response.status_code, dict(response.headers), response.content
+
+
+class TusClient:
+    """Uploads files like a tus client on an unreliable network: random chunk
+    sizes, dropped connections, resuming from the offset returned by ``HEAD``
+    and retrying after server errors."""
+
+    def __init__(
+        self,
+        transport,
+        report: LoadReport,
+        rng: random.Random,
+        path_prefix: str = "/files",
+        min_chunk: int = 1024,
+        max_chunk: int = 64 * 1024,
+        disconnect_probability: float = 0.0,
+        max_attempts: int = 20,
+        retry_delay: float = 0.01,
+        verify: bool = True,
+    ):
+        self.transport = transport
+        self.report = report
+        self.rng = rng
+        self.path_prefix = path_prefix
+        self.min_chunk = min_chunk
+        self.max_chunk = max_chunk
+        self.disconnect_probability = disconnect_probability
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.verify = verify
+
+    async def _request(self, method: str, url: str, headers: Dict[str, str], **kwargs):
+        started = time.perf_counter()
+        response = await self.transport.request(
+            method, url, {"tus-resumable": TUS_RESUMABLE, **headers}, **kwargs
+        )
+        self.report.record_latency(method, time.perf_counter() - started)
+        return response
+
+    async def _retry(self, attempt: int, reason: str) -> int:
+        self.report.errors[reason] += 1
+        if attempt + 1 >= self.max_attempts:
+            raise ConnectionLost(f"Giving up after {attempt + 1} attempts")
+        await asyncio.sleep(self.retry_delay)
+        return attempt + 1
+
+    async def _send(
+        self, method: str, url: str, headers: Dict[str, str], expected_status: int
+    ) -> Response:
+        """Sends a request without a body until it returns ``expected_status``."""
+        attempt = 0
+        while True:
+            try:
+                response = await self._request(method, url, headers)
+            except ConnectionLost:
+                attempt = await self._retry(attempt, f"{method} connection lost")
+                continue
+            if response[0] == expected_status:
+                return response
+            attempt = await self._retry(attempt, f"{method} {response[0]}")
+
+    async def _create(self, length: int) -> str:
+        _, headers, _ = await self._send(
+            "POST", self.path_prefix, {"upload-length": str(length)}, 201
+        )
+        return f"{self.path_prefix}/{headers['location'].rsplit('/', 1)[1]}"
+
+    async def _get_offset(self, url: str) -> int:
+        _, headers, _ = await self._send("HEAD", url, {}, 200)
+        return int(headers["upload-offset"])
+
+    async def _patch(self, url: str, data: bytes, offset: int) -> Optional[int]:
+        """Sends one chunk; returns the new offset, or None when the offset must
+        be fetched again."""
+        body = data[offset : offset + self.rng.randint(self.min_chunk, self.max_chunk)]
+        disconnect_at = None
+        if self.rng.random() < self.disconnect_probability:
+            disconnect_at = self.rng.randrange(len(body))
+        headers = {
+            "content-type": "application/offset+octet-stream",
+            "upload-offset": str(offset),
+        }
+        try:
+            status, response_headers, _ = await self._request(
+                "PATCH", url, headers, body=body, disconnect_at=disconnect_at
+            )
+        except ConnectionLost:
+            self.report.disconnects += 1
+            new_offset = await self._get_offset(url)
+            if disconnect_at is not None:
+                self.report.retransmitted_bytes += max(
+                    offset + disconnect_at - new_offset, 0
+                )
+            return new_offset
+        if status == 204:
+            return int(response_headers["upload-offset"])
+        self.report.errors[f"PATCH {status}"] += 1
+        return None
+
+    async def _verify(self, url: str, data: bytes):
+        _, _, body = await self._send("GET", url, {}, 200)
+        if body == data:
+            self.report.uploads_verified += 1
+        else:
+            logger.error(f"Upload {url} does not match the data that was sent")
+            self.report.uploads_corrupted += 1
+
+    async def upload(self, data: bytes) -> bool:
+        self.report.uploads_started += 1
+        try:
+            url = await self._create(len(data))
+            offset = 0
+            attempt = 0
+            while offset < len(data):
+                new_offset = await self._patch(url, data, offset)
+                if new_offset is None:
+                    attempt = await self._retry(attempt, "PATCH retry")
+                    new_offset = await self._get_offset(url)
+                else:
+                    attempt = 0
+                self.report.bytes_confirmed += max(new_offset - offset, 0)
+                offset = new_offset
+            self.report.uploads_completed += 1
+            if self.verify:
+                await self._verify(url, data)
+        except ConnectionLost as error:
+            logger.warning(f"Upload failed: {error}")
+            self.report.uploads_failed += 1
+            return False
+        return True
+
+
+async def run_load(
+    transport,
+    clients: int = 10,
+    uploads_per_client: int = 1,
+    min_size: int = 64 * 1024,
+    max_size: int = 1024 * 1024,
+    restart_interval: Optional[float] = None,
+    seed: Optional[int] = None,
+    **client_options,
+) -> LoadReport:
+    """Runs ``clients`` concurrent clients that each upload
+    ``uploads_per_client`` files of random size and content."""
+    if restart_interval and not hasattr(transport, "restart"):
+        raise ValueError(f"{type(transport).__name__} cannot restart the server")
+    report = LoadReport()
+    rng = random.Random(seed)
+    client_rngs = [random.Random(rng.getrandbits(64)) for _ in range(clients)]
+
+    async def run_client(client_rng: random.Random):
+        client = TusClient(transport, report, client_rng, **client_options)
+        for _ in range(uploads_per_client):
+            await client.upload(
+                client_rng.randbytes(client_rng.randint(min_size, max_size))
+            )
+
+    async def restart_periodically():
+        while True:
+            await asyncio.sleep(restart_interval)
+            await transport.restart()
+            report.restarts += 1
+
+    await transport.start()
+    restarter = None
+    if restart_interval:
+        restarter = asyncio.create_task(restart_periodically())
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(run_client(client_rng) for client_rng in client_rngs))
+    finally:
+        report.duration = time.perf_counter() - started
+        if restarter is not None:
+            restarter.cancel()
+            await asyncio.gather(restarter, return_exceptions=True)
+        await transport.stop()
+    return report
+
+
+def create_app_factory(
+    path: str, injector: Optional[FaultInjector] = None, fast_path: bool = False
+) -> Callable[[], FastAPI]:
+    def create_app() -> FastAPI:
+        config = Config(
+            file_path=path,
+            metadata_path=path,
+            enable_download=True,
+            enable_asgi_fast_path=fast_path,
+        )
+        registry = StrategyRegistry(config)
+        if injector is not None:
+            registry = StrategyRegistry(
+                config,
+                with_faults(LocalStorageStrategy, injector),
+                with_faults(LocalMetadataStrategy, injector),
+            )
+        app = FastAPI()
+        add_tus_routers(app, config, registry=registry)
+        return app
+
+    return create_app
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Run simulated tus clients against an in-process app or a server"
+    )
+    parser.add_argument("--url", help="Server to load; defaults to an in-process app")
+    parser.add_argument("--path", help="Upload directory of the in-process app")
+    parser.add_argument("--path-prefix", default="/files")
+    parser.add_argument("--clients", type=int, default=10)
+    parser.add_argument("--uploads", type=int, default=1, help="Uploads per client")
+    parser.add_argument("--min-size", type=int, default=64 * 1024)
+    parser.add_argument("--max-size", type=int, default=1024 * 1024)
+    parser.add_argument("--min-chunk", type=int, default=1024)
+    parser.add_argument("--max-chunk", type=int, default=64 * 1024)
+    parser.add_argument("--disconnect-probability", type=float, default=0.0)
+    parser.add_argument("--slow-disk-probability", type=float, default=0.0)
+    parser.add_argument("--slow-disk-delay", type=float, default=0.05)
+    parser.add_argument("--enospc-probability", type=float, default=0.0)
+    parser.add_argument("--restart-interval", type=float)
+    parser.add_argument("--fast-path", action="store_true")
+    parser.add_argument("--no-verify", action="store_true")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args(argv)
+    if args.url is not None and args.restart_interval:
+        parser.error("--restart-interval requires an in-process app, not --url")
+    logging.getLogger("tusfastapiserver").setLevel(args.log_level)
+
+    injector = None
+    if args.slow_disk_probability or args.enospc_probability:
+        injector = FaultInjector(
+            args.slow_disk_probability,
+            args.slow_disk_delay,
+            args.enospc_probability,
+            seed=args.seed,
+        )
+
+    def create_asgi_transport(path: str) -> ASGITransport:
+        return ASGITransport(create_app_factory(path, injector, args.fast_path))
+
+    async def run(transport: Union[ASGITransport, HTTPTransport]) -> LoadReport:
+        return await run_load(
+            transport,
+            clients=args.clients,
+            uploads_per_client=args.uploads,
+            min_size=args.min_size,
+            max_size=args.max_size,
+            restart_interval=args.restart_interval,
+            seed=args.seed,
+            path_prefix=args.path_prefix,
+            min_chunk=args.min_chunk,
+            max_chunk=args.max_chunk,
+            disconnect_probability=args.disconnect_probability,
+            verify=not args.no_verify,
+        )
+
+    if args.url is not None:
+        report = asyncio.run(run(HTTPTransport(args.url)))
+    elif args.path is not None:
+        report = asyncio.run(run(create_asgi_transport(args.path)))
+    else:
+        with tempfile.TemporaryDirectory() as path:
+            report = asyncio.run(run(create_asgi_transport(path)))
+
+    output = report.to_dict()
+    if injector is not None:
+        output["injected_faults"] = injector.stats()
+    print(json.dumps(output, indent=2))
+    return 0 if not report.uploads_corrupted and not report.uploads_failed else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,69 @@
+from typing import Dict
+
+from tusfastapiserver.config import MetadataStrategyType
+from tusfastapiserver.config import StorageStrategyType
+from tusfastapiserver.metadata import AsyncBaseMetadataStrategy
+from tusfastapiserver.schemas import UploadMetadata
+from tusfastapiserver.schemas import UploadMetadataPath
+from tusfastapiserver.schemas import UploadStoragePath
+from tusfastapiserver.storages import AsyncBaseStorageStrategy
+
+
+class MemoryStorageStrategy(AsyncBaseStorageStrategy):
+    """Keeps uploads in memory. Meant for tests and benchmarks that should not
+    measure disk I/O."""
+
+    storage_strategy_type = StorageStrategyType.LOCAL
+
+    def __init__(self, config, *args, **kwargs):
+        super().__init__(config, *args, **kwargs)
+        self.files: Dict[str, bytearray] = {}
+
+    def generate_file_path(self, file_id: str) -> UploadStoragePath:
+        return UploadStoragePath(file_id)
+
+    async def initialize(self, upload_metadata: UploadMetadata, *args, **kwargs):
+        self.files[upload_metadata.id] = bytearray()
+
+    async def is_file_exists(self, file_id: str) -> bool:
+        return file_id in self.files
+
+    async def update(self, upload_metadata: UploadMetadata, chunk: bytes):
+        self.files[upload_metadata.id] += chunk
+
+    async def delete(self, upload_metadata: UploadMetadata, *args, **kwargs):
+        self.files.pop(upload_metadata.id, None)
+
+    async def get_size(self, upload_metadata: UploadMetadata) -> int:
+        return len(self.files[upload_metadata.id])
+
+    async def truncate(self, upload_metadata: UploadMetadata, size: int):
+        del self.files[upload_metadata.id][size:]
+
+
+class MemoryMetadataStrategy(AsyncBaseMetadataStrategy):
+    """Keeps upload metadata in memory."""
+
+    metadata_strategy_type = MetadataStrategyType.LOCAL
+
+    def __init__(self, config, *args, **kwargs):
+        super().__init__(config, *args, **kwargs)
+        self.metadata: Dict[str, UploadMetadata] = {}
+
+    def generate_metadata_path(self, file_id: str) -> UploadMetadataPath:
+        return UploadMetadataPath(file_id)
+
+    async def initialize(self, upload_metadata: UploadMetadata, *args, **kwargs):
+        self.metadata[upload_metadata.id] = upload_metadata.model_copy()
+
+    async def is_metadata_exists(self, file_id: str) -> bool:
+        return file_id in self.metadata
+
+    async def get_metadata(self, file_id: str) -> UploadMetadata:
+        return self.metadata[file_id].model_copy()
+
+    async def update(self, upload_metadata: UploadMetadata, *args, **kwargs):
+        self.metadata[upload_metadata.id] = upload_metadata.model_copy()
+
+    async def delete(self, upload_metadata: UploadMetadata, *args, **kwargs):
+        self.metadata.pop(upload_metadata.id, None)
@@ -0,0 +1,35 @@
+import asyncio
+from typing import Awaitable
+from typing import Callable
+from typing import TypeVar
+
+from starlette.concurrency import run_in_threadpool
+
+T = TypeVar("T")
+
+
+async def shield_until_complete(awaitable: Awaitable[T]) -> T:
+    """Awaits ``awaitable``, protecting it from cancellation. Unlike
+    ``asyncio.shield``, a cancelled caller keeps waiting until it is done and
+    only then sees the cancellation, so nothing it does can race with
+    whatever the caller does next."""
+    future = asyncio.ensure_future(awaitable)
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        while not future.done():
+            try:
+                await asyncio.wait({future})
+            except asyncio.CancelledError:
+                pass
+        exception = None if future.cancelled() else future.exception()
+        if exception is not None:
+            raise exception
+        raise
+
+
+async def run_to_completion(func: Callable[..., T], *args, **kwargs) -> T:
+    """``run_in_threadpool`` for calls that must not be abandoned: a thread
+    can't be stopped, so without this a cancelled write could land after the
+    caller already committed the upload offset."""
+    return await shield_until_complete(run_in_threadpool(func, *args, **kwargs))
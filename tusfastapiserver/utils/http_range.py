@@ -0,0 +1,43 @@
+import re
+from typing import Optional
+from typing import Tuple
+
+from tusfastapiserver.exceptions import RangeNotSatisfiableException
+
+
+RANGE_REGEX = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Return the inclusive ``(start, end)`` byte range or None to serve everything.
+
+    Malformed and multi-range headers are ignored, as RFC 9110 allows.
+    """
+    if not range_header:
+        return None
+
+    match = RANGE_REGEX.match(range_header.strip())
+    if match is None:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+
+    if not first:
+        suffix_length = int(last)
+        if suffix_length == 0 or size == 0:
+            raise RangeNotSatisfiableException(size)
+        return max(size - suffix_length, 0), size - 1
+
+    start = int(first)
+    end = int(last) if last else size - 1
+    if last and end < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiableException(size)
+    return start, min(end, size - 1)
+
+
+def content_range(start: int, end: int, size: int) -> str:
+    return f"bytes {start}-{end}/{size}"
@@ -0,0 +1,42 @@
+import asyncio
+from typing import AsyncIterator
+from typing import Optional
+
+from fastapi import Request
+
+
+def get_client_key(request: Request, header: Optional[str] = None) -> str:
+    if header is not None:
+        value = request.headers.get(header)
+        if value:
+            return value
+    if request.client is not None:
+        return request.client.host
+    return ""
+
+
+def get_content_length(request: Request) -> Optional[int]:
+    content_length = request.headers.get("content-length")
+    if content_length is None or not content_length.isdigit():
+        return None
+    return int(content_length)
+
+
+async def iter_body(
+    request: Request, timeout: Optional[float] = None
+) -> AsyncIterator[bytes]:
+    """Yields the non-empty chunks of the request body, raising
+    ``asyncio.TimeoutError`` when no chunk arrives within ``timeout`` seconds."""
+    stream = request.stream()
+    if timeout is None:
+        async for chunk in stream:
+            if chunk:
+                yield chunk
+        return
+    while True:
+        try:
+            chunk = await asyncio.wait_for(stream.__anext__(), timeout)
+        except StopAsyncIteration:
+            return
+        if chunk:
+            yield chunk
@@ -0,0 +1,33 @@
+import re
+import uuid
+from typing import Optional
+
+
+NODE_ID_SEPARATOR = "."
+# Node ids never start with "_", the prefix of the internal folders that are
+# skipped when uploads are listed, e.g. by the crash recovery.
+NODE_ID_REGEX = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_-]*$")
+UPLOAD_ID_REGEX = re.compile(r"^[A-Za-z0-9_-]+(\.[A-Za-z0-9_-]+)?$")
+
+
+def validate_node_id(node_id: str) -> bool:
+    return bool(NODE_ID_REGEX.match(node_id))
+
+
+def validate(file_id: str) -> bool:
+    return bool(UPLOAD_ID_REGEX.match(file_id))
+
+
+def generate(node_id: Optional[str] = None) -> str:
+    if node_id is None:
+        return str(uuid.uuid4())
+    if not validate_node_id(node_id):
+        raise ValueError(f"Invalid node id: {node_id}")
+    return f"{node_id}{NODE_ID_SEPARATOR}{uuid.uuid4().hex}"
+
+
+def get_node_id(file_id: str) -> Optional[str]:
+    node_id, separator, _ = file_id.partition(NODE_ID_SEPARATOR)
+    if not separator or not validate_node_id(node_id):
+        return None
+    return node_id
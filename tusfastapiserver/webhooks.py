@@ -0,0 +1,374 @@
+import asyncio
+import logging
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+
+from tusfastapiserver.schemas import UploadMetadata
+from tusfastapiserver.schemas import UploadStatus
+from tusfastapiserver.schemas import WebhookBatch
+from tusfastapiserver.schemas import WebhookEvent
+from tusfastapiserver.schemas import WebhookEventType
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookOutbox:
+    """Events waiting to be delivered, appended to a file in order.
+
+    A cursor file holds the position of the first undelivered event. Once
+    every event is delivered, both files are reset.
+
+    Several worker processes can share an outbox: appends and resets take an
+    ``fcntl`` lock on ``outbox.lock``, and only the worker that claims
+    ``outbox.delivery.lock`` delivers events. Concurrent appends are written
+    with a single ``fsync`` (group commit), so an append waits for at most one
+    ``fsync`` in progress plus its own.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._pending_lock = threading.Lock()
+        self._pending: List[WebhookEvent] = []
+        self._sequence = 0
+        self._written_sequence = 0
+        self._delivery_fd: Optional[int] = None
+
+    @property
+    def events_file_path(self) -> str:
+        return os.path.join(self.path, "outbox.jsonl")
+
+    @property
+    def cursor_file_path(self) -> str:
+        return os.path.join(self.path, "outbox.cursor")
+
+    @property
+    def failed_file_path(self) -> str:
+        return os.path.join(self.path, "failed.jsonl")
+
+    @property
+    def lock_file_path(self) -> str:
+        return os.path.join(self.path, "outbox.lock")
+
+    @property
+    def delivery_lock_file_path(self) -> str:
+        return os.path.join(self.path, "outbox.delivery.lock")
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        # fcntl locks are held by the process, so threads also need a lock.
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            fd = os.open(self.lock_file_path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.lockf(fd, fcntl.LOCK_EX)
+                yield
+            finally:
+                os.close(fd)
+
+    def open(self) -> None:
+        Path(self.path).mkdir(parents=True, exist_ok=True)
+        with self._file_lock():
+            try:
+                with open(self.events_file_path, "rb+") as f:
+                    data = f.read()
+                    if data and not data.endswith(b"\n"):
+                        # The last append was torn by a crash.
+                        f.truncate(data.rfind(b"\n") + 1)
+            except FileNotFoundError:
+                pass
+
+    def close(self) -> None:
+        self.release_delivery()
+
+    def claim_delivery(self) -> bool:
+        """Returns whether this worker delivers the events; the claim is held
+        until ``release_delivery`` or the end of the process."""
+        if self._delivery_fd is not None or fcntl is None:
+            return True
+        fd = os.open(self.delivery_lock_file_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.lockf(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._delivery_fd = fd
+        return True
+
+    def release_delivery(self) -> None:
+        if self._delivery_fd is not None:
+            os.close(self._delivery_fd)
+            self._delivery_fd = None
+
+    @staticmethod
+    def _append(path: str, events: Sequence[WebhookEvent]) -> None:
+        data = "".join(f"{event.model_dump_json()}\n" for event in events).encode()
+        with open(path, "ab") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def append(self, events: Sequence[WebhookEvent]) -> None:
+        with self._pending_lock:
+            self._pending.extend(events)
+            self._sequence += 1
+            sequence = self._sequence
+        Path(self.path).mkdir(parents=True, exist_ok=True)
+        with self._file_lock():
+            if self._written_sequence >= sequence:
+                # Written by the append that held the lock before.
+                return
+            with self._pending_lock:
+                pending, self._pending = self._pending, []
+                last_sequence = self._sequence
+            try:
+                self._append(self.events_file_path, pending)
+            except BaseException:
+                with self._pending_lock:
+                    self._pending[:0] = pending
+                raise
+            self._written_sequence = last_sequence
+
+    def _read_cursor(self) -> int:
+        try:
+            with open(self.cursor_file_path, "r", encoding="utf-8") as f:
+                return int(f.read())
+        except FileNotFoundError:
+            return 0
+
+    def read(self, max_count: int) -> Tuple[List[WebhookEvent], int]:
+        """Returns up to ``max_count`` undelivered events and the position to
+        acknowledge once they are delivered."""
+        position = self._read_cursor()
+        events = []
+        try:
+            with open(self.events_file_path, "rb") as f:
+                f.seek(position)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    position += len(line)
+                    try:
+                        events.append(WebhookEvent.model_validate_json(line))
+                    except ValidationError:
+                        logger.error(f"Skipping malformed webhook event: {line!r}")
+                    if len(events) >= max_count:
+                        break
+        except FileNotFoundError:
+            pass
+        return events, position
+
+    def acknowledge(self, position: int) -> None:
+        with self._file_lock():
+            try:
+                size = os.path.getsize(self.events_file_path)
+            except FileNotFoundError:
+                size = 0
+            if position >= size:
+                # The cursor goes first: a crash in between delivers the
+                # events again instead of skipping new ones.
+                try:
+                    os.remove(self.cursor_file_path)
+                except FileNotFoundError:
+                    pass
+                if size:
+                    os.truncate(self.events_file_path, 0)
+                return
+            temporary_path = f"{self.cursor_file_path}.tmp"
+            with open(temporary_path, "w", encoding="utf-8") as f:
+                f.write(str(position))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporary_path, self.cursor_file_path)
+
+    def fail(self, events: Sequence[WebhookEvent], position: int) -> None:
+        with self._file_lock():
+            self._append(self.failed_file_path, events)
+        self.acknowledge(position)
+
+
+class WebhookNotifier:
+    """Notifies an HTTP endpoint when uploads are created, completed and
+    terminated.
+
+    Events are appended to an on-disk outbox, so routers never wait on the
+    endpoint. A background task posts the outbox as ``{"events": [...]}``, at
+    most ``max_batch_size`` events per request and one round of requests per
+    ``interval`` seconds, over a pooled ``httpx`` client. Failed requests are
+    retried with exponential backoff; after ``max_retries`` the batch is moved
+    to ``failed.jsonl`` in the outbox folder. Delivery is at least once: the
+    receiver deduplicates on the event ``id``.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        outbox_path: str = os.path.join("tmp", "tusfastapiserver", "webhooks"),
+        event_types: Optional[Sequence[WebhookEventType]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        interval: float = 1.0,
+        max_batch_size: int = 100,
+        timeout: float = 10.0,
+        max_connections: int = 10,
+        max_retries: int = 10,
+        retry_delay: float = 1.0,
+        max_retry_delay: float = 300.0,
+    ):
+        if httpx is None:
+            raise RuntimeError("httpx is required to send webhooks")
+        self.url = url
+        self.outbox = WebhookOutbox(outbox_path)
+        self.event_types = set(event_types or WebhookEventType)
+        self.headers = headers or {}
+        self.interval = interval
+        self.max_batch_size = max_batch_size
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self._client: Optional["httpx.AsyncClient"] = None
+        self._notified: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None
+
+    @property
+    def client(self) -> "httpx.AsyncClient":
+        if self._client is None:
+            raise RuntimeError("WebhookNotifier is not started")
+        return self._client
+
+    async def start(self):
+        if self.is_running:
+            return
+        await run_in_threadpool(self.outbox.open)
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=self.max_connections),
+        )
+        self._notified = asyncio.Event()
+        # Events left in the outbox by the previous run are sent right away.
+        self._notified.set()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await run_in_threadpool(self.outbox.close)
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def notify(
+        self, event_type: WebhookEventType, upload_metadata: UploadMetadata
+    ):
+        if event_type not in self.event_types:
+            return
+        event = WebhookEvent(
+            id=uuid.uuid4().hex,
+            type=event_type,
+            upload=UploadStatus(
+                id=upload_metadata.id,
+                found=event_type != WebhookEventType.TERMINATED,
+                upload_offset=upload_metadata.upload_offset,
+                upload_length=upload_metadata.upload_length,
+                upload_defer_length=upload_metadata.upload_defer_length,
+                metadata=upload_metadata.metadata,
+            ),
+        )
+        try:
+            await run_in_threadpool(self.outbox.append, [event])
+        except OSError:
+            logger.exception(
+                f"Failed to queue {event_type.value} webhook for {upload_metadata.id}"
+            )
+            return
+        if self._notified is not None:
+            self._notified.set()
+
+    async def _run(self):
+        while True:
+            await self._notified.wait()
+            self._notified.clear()
+            try:
+                await self._deliver_pending()
+            except Exception:
+                logger.exception("Failed to deliver webhooks")
+            await asyncio.sleep(self.interval)
+
+    async def _deliver_pending(self):
+        if not await run_in_threadpool(self.outbox.claim_delivery):
+            # Another worker delivers; check again in case it stops.
+            self._notified.set()
+            return
+        while True:
+            events, position = await run_in_threadpool(
+                self.outbox.read, self.max_batch_size
+            )
+            if not events:
+                await run_in_threadpool(self.outbox.acknowledge, position)
+                return
+            await self._deliver(events, position)
+
+    async def _deliver(self, events: List[WebhookEvent], position: int):
+        attempts = 0
+        while True:
+            try:
+                await self._send(events)
+            except Exception as error:
+                attempts += 1
+                if attempts > self.max_retries:
+                    logger.error(
+                        f"Giving up on {len(events)} webhooks after {attempts} attempts"
+                    )
+                    await run_in_threadpool(self.outbox.fail, events, position)
+                    return
+                delay = min(
+                    self.retry_delay * 2 ** (attempts - 1), self.max_retry_delay
+                )
+                logger.warning(
+                    f"Failed to send {len(events)} webhooks ({error!r}), "
+                    f"retrying in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+                continue
+            logger.info(f"Sent {len(events)} webhooks to {self.url}")
+            await run_in_threadpool(self.outbox.acknowledge, position)
+            return
+
+    async def _send(self, events: List[WebhookEvent]):
+        response = await self.client.post(
+            self.url,
+            content=WebhookBatch(events=events).model_dump_json(),
+            headers={"content-type": "application/json", **self.headers},
+        )
+        response.raise_for_status()